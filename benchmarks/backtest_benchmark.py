@@ -0,0 +1,52 @@
+"""Benchmark of vectorized backtests of the moving average indicator.
+
+Backtests random walk price histories of growing length in one pass and
+prints the time taken and bars per second. Needs no running services.
+
+    python -m benchmarks.backtest_benchmark --bars 1000000 5000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from foresight.indicator_services.backtest import run_backtest
+from foresight.indicator_services.moving_average_indicator import MovingAverageIndicator
+
+
+def main():
+    """Run the benchmark scenarios and print the backtest times."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--bars",
+        type=int,
+        nargs="+",
+        default=[100_000, 1_000_000, 5_000_000],
+    )
+    parser.add_argument("--fast", type=int, default=10)
+    parser.add_argument("--slow", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for bars in args.bars:
+        prices = 1 + rng.normal(0, 1e-4, bars).cumsum()
+
+        start = time.perf_counter()
+        result = run_backtest(
+            MovingAverageIndicator,
+            prices,
+            timescale="S",
+            fast=args.fast,
+            slow=args.slow,
+        )
+        seconds = time.perf_counter() - start
+
+        print(
+            f"{bars:>10,} bars: {seconds * 1000:8.1f} ms "
+            f"({bars / seconds / 1e6:.1f}M bars/s), {result.trades:,} trades",
+        )
+
+
+if __name__ == "__main__":
+    main()
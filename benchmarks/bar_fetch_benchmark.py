@@ -0,0 +1,89 @@
+"""Benchmark of reading minute bars from raw ticks versus precomputed bars.
+
+Writes an hour of ticks to scratch tables together with the second and minute
+bars the stream service would build from them, then times
+`ForexData.bucket_query` (time_bucket over every tick) against
+`ForexBar.fetch` (one row per bar), both returning models. Needs a running TimescaleDB.
+
+    python -m benchmarks.bar_fetch_benchmark --ticks-per-second 40
+"""
+
+import argparse
+import time
+
+from benchmarks.conflation_benchmark import generate_ticks
+from foresight.stream_service.bar_builder import BarBuilder
+from foresight.utils.database import TimeScaleService
+from foresight.utils.models.forex_bar import ForexBar
+from foresight.utils.models.forex_data import ForexData
+
+
+TICKS_TABLE = "bar_fetch_benchmark_ticks"
+BARS_TABLE = "bar_fetch_benchmark_bars"
+
+
+def best_of(fetch, repeat: int) -> float:
+    """The best time in seconds of the fetch."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fetch()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def main():
+    """Run the benchmark scenarios and print the fetch times."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ticks-per-second", type=int, default=40)
+    parser.add_argument("--seconds", type=int, default=3600)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    ticks = generate_ticks(args.ticks_per_second, args.seconds)
+    builder = BarBuilder(resolutions=["S", "M"])
+    for tick in ticks:
+        builder.add(tick)
+
+    ForexData.create_table(table_name=TICKS_TABLE)
+    ForexBar.create_table(table_name=BARS_TABLE)
+    try:
+        for index in range(0, len(ticks), 5000):
+            ForexData.insert_multiple(data=ticks[index:][:5000], table_name=TICKS_TABLE)
+        ForexBar.insert_multiple(
+            data=builder.drain(flush_all=True),
+            table_name=BARS_TABLE,
+        )
+        TimeScaleService().execute(query=f"ANALYZE {TICKS_TABLE}")
+        TimeScaleService().execute(query=f"ANALYZE {BARS_TABLE}")
+
+        for timescale in ["S", "M"]:
+            query, params = ForexData.bucket_query(
+                "EUR_USD",
+                timescale,
+                table_name=TICKS_TABLE,
+            )
+            ticks_seconds = best_of(
+                lambda: [
+                    ForexData(**row)
+                    for row in TimeScaleService().execute(query=query, params=params)
+                ],
+                args.repeat,
+            )
+            bars = ForexBar.fetch("EUR_USD", timescale, table_name=BARS_TABLE)
+            bars_seconds = best_of(
+                lambda: ForexBar.fetch("EUR_USD", timescale, table_name=BARS_TABLE),
+                args.repeat,
+            )
+            print(
+                f"{timescale}: {len(bars):>6,} bars, from ticks {ticks_seconds * 1000:8.1f} ms, "
+                f"from bars {bars_seconds * 1000:8.1f} ms "
+                f"({ticks_seconds / bars_seconds:.1f}x)",
+            )
+    finally:
+        ForexData.drop_table(table_name=TICKS_TABLE)
+        ForexBar.drop_table(table_name=BARS_TABLE)
+
+
+if __name__ == "__main__":
+    main()
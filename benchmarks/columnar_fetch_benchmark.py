@@ -0,0 +1,84 @@
+"""Benchmark of fetching rows into a DataFrame through dict rows and columnar arrays.
+
+Fills a temporary tick table with generate_series and reads it back through
+`execute` (dict rows), the tuple path and the binary COPY path of
+`TimeScaleService.fetch_columns`. Needs a running TimescaleDB.
+
+    python -m benchmarks.columnar_fetch_benchmark --rows 1000000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import pandas as pd
+
+from foresight.utils.database import TimeScaleService
+
+
+TABLE_NAME = "columnar_fetch_benchmark"
+QUERY = f"SELECT time, bid, ask FROM {TABLE_NAME} ORDER BY time"
+
+
+def dict_rows() -> pd.DataFrame:
+    """Build the DataFrame from RealDictCursor rows."""
+    return pd.DataFrame(TimeScaleService().execute(query=QUERY))
+
+
+def tuple_rows() -> pd.DataFrame:
+    """Build the DataFrame from plain tuples converted per column."""
+    return TimeScaleService().fetch_dataframe(query=QUERY, binary=False)
+
+
+def binary_copy() -> pd.DataFrame:
+    """Build the DataFrame from binary COPY decoded in one pass."""
+    return TimeScaleService().fetch_dataframe(query=QUERY)
+
+
+def measure(fetch) -> tuple[float, float]:
+    """Seconds and peak Python memory in MiB of a fetch, timed without tracing."""
+    start = time.perf_counter()
+    fetch()
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    fetch()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 1024**2
+
+
+def main():
+    """Run the benchmark scenarios and print rows per second."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    service = TimeScaleService()
+    service.execute(query=f"DROP TABLE IF EXISTS {TABLE_NAME}")
+    service.execute(
+        query=f"""CREATE TABLE {TABLE_NAME} AS SELECT
+            TIMESTAMPTZ '2024-01-01 00:00:00+00' + value * INTERVAL '1 millisecond' AS time,
+            1.08 + random() / 100 AS bid,
+            1.0801 + random() / 100 AS ask
+        FROM generate_series(1, %s) AS value""",
+        params=(args.rows,),
+    )
+
+    try:
+        for name, fetch in [
+            ("dict rows", dict_rows),
+            ("tuple rows", tuple_rows),
+            ("binary copy", binary_copy),
+        ]:
+            seconds, peak = measure(fetch)
+            print(
+                f"{name:>12}: {seconds:6.2f} s, {args.rows / seconds:>12,.0f} rows/s, "
+                f"peak {peak:,.0f} MiB",
+            )
+    finally:
+        service.execute(query=f"DROP TABLE {TABLE_NAME}")
+
+
+if __name__ == "__main__":
+    main()
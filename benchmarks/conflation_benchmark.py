@@ -0,0 +1,110 @@
+"""Benchmark of rows written and table size with and without tick conflation.
+
+Generates an hour of ticks for a few instruments, writes them raw and
+conflated to one second means into scratch tables, and checks the one second
+buckets fetched from both are the same. Needs a running TimescaleDB.
+
+    python -m benchmarks.conflation_benchmark --ticks-per-second 40
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+from foresight.stream_service.conflation import Conflator
+from foresight.utils.database import TimeScaleService
+from foresight.utils.models.forex_data import ForexData
+
+
+INSTRUMENTS = ["EUR_USD", "GBP_USD", "USD_JPY", "AUD_USD"]
+
+
+def generate_ticks(ticks_per_second: int, seconds: int) -> list[ForexData]:
+    """Random walk ticks of every instrument at random times."""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    prices = {instrument: 1.0 for instrument in INSTRUMENTS}
+    offsets = sorted(
+        random.uniform(0, seconds) for _ in range(ticks_per_second * seconds)
+    )
+
+    ticks = []
+    for offset in offsets:
+        instrument = random.choice(INSTRUMENTS)
+        prices[instrument] *= 1.0 + (random.random() - 0.5) * 0.001
+        ticks.append(
+            ForexData(
+                instrument=instrument,
+                time=start + timedelta(seconds=offset),
+                bid=round(prices[instrument], 5),
+                ask=round(prices[instrument] + 0.0001, 5),
+            ),
+        )
+    return ticks
+
+
+def write(table_name: str, rows: list[ForexData], batch_size: int = 5000) -> dict:
+    """Write the rows in batches and return the time taken and table size."""
+    start = time.perf_counter()
+    for index in range(0, len(rows), batch_size):
+        batch = rows[index:][:batch_size]
+        ForexData.insert_multiple(data=batch, table_name=table_name)
+    seconds = time.perf_counter() - start
+
+    size = TimeScaleService().execute(
+        query=f"SELECT hypertable_size('{table_name}') AS bytes",
+    )[0]["bytes"]
+    return {"rows": len(rows), "seconds": seconds, "bytes": size}
+
+
+def main():
+    """Run the benchmark scenarios and print rows, time and size."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ticks-per-second", type=int, default=40)
+    parser.add_argument("--seconds", type=int, default=3600)
+    args = parser.parse_args()
+
+    ticks = generate_ticks(args.ticks_per_second, args.seconds)
+    conflator = Conflator(interval=1.0)
+    records = [record for tick in ticks for record in conflator.add(tick)]
+    records += conflator.flush()
+
+    tables = {
+        "raw": "conflation_benchmark_raw",
+        "conflated": "conflation_benchmark_conflated",
+    }
+    for table_name in tables.values():
+        ForexData.create_table(table_name=table_name)
+
+    try:
+        results = {
+            "raw": write(tables["raw"], ticks),
+            "conflated": write(tables["conflated"], records),
+        }
+        for name, result in results.items():
+            print(
+                f"{name:>9}: {result['rows']:>9,} rows, {result['seconds']:6.2f} s, "
+                f"{result['bytes'] / 1024 ** 2:8.2f} MiB",
+            )
+
+        fetched = {
+            name: TimeScaleService().execute(
+                *ForexData.bucket_query("EUR_USD", "S", table_name=table_name),
+            )
+            for name, table_name in tables.items()
+        }
+        same = len(fetched["raw"]) == len(fetched["conflated"]) and all(
+            raw["time"] == conflated["time"]
+            and abs(raw["bid"] - conflated["bid"]) < 1e-9
+            for raw, conflated in zip(fetched["raw"], fetched["conflated"])
+        )
+        print(f"one second buckets identical: {same}")
+    finally:
+        for table_name in tables.values():
+            ForexData.drop_table(table_name=table_name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Benchmark of indicators computed on their own versus as one shared graph.
+
+Builds moving average variants over a few windows plus Bollinger bands on the
+same price history, then times every indicator computing its own operators
+against one `IndicatorGroup` evaluating each unique operator once. Needs no
+running services.
+
+    python -m benchmarks.indicator_graph_benchmark --bars 100000 --indicators 10 40
+"""
+
+import argparse
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+
+from foresight.indicator_services.bollinger_bands_indicator import (
+    BollingerBandsIndicator,
+)
+from foresight.indicator_services.indicator_group import IndicatorGroup
+from foresight.indicator_services.moving_average_indicator import MovingAverageIndicator
+from foresight.indicator_services.operators import count_operators
+
+
+WINDOWS = [5, 10, 20, 50, 100]
+
+
+def build_indicators(count: int) -> list:
+    """Moving average variants over WINDOWS and Bollinger bands, `count` in total."""
+    pairs = [(fast, slow) for fast, slow in itertools.combinations(WINDOWS, 2)]
+    indicators = []
+    for index in range(count):
+        if index % 4 == 3:
+            indicators.append(
+                BollingerBandsIndicator(
+                    "EUR_USD",
+                    "S",
+                    "mid",
+                    window=WINDOWS[index % len(WINDOWS)],
+                    width=1 + index % 3,
+                    subscribe=False,
+                    component_name=f"bollinger_bands_{index}",
+                ),
+            )
+        else:
+            fast, slow = pairs[index % len(pairs)]
+            indicators.append(
+                MovingAverageIndicator(
+                    "EUR_USD",
+                    "S",
+                    "mid",
+                    fast=fast,
+                    slow=slow,
+                    subscribe=False,
+                    component_name=f"moving_average_{index}",
+                ),
+            )
+    return indicators
+
+
+def main():
+    """Run the benchmark scenarios and print the compute times."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bars", type=int, default=100_000)
+    parser.add_argument("--indicators", type=int, nargs="+", default=[1, 10, 40])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    prices = 1 + np.random.default_rng(0).normal(0, 1e-4, args.bars).cumsum()
+    data = pd.DataFrame({"price": prices})
+
+    for count in args.indicators:
+        indicators = build_indicators(count)
+        group = IndicatorGroup(
+            component_name="benchmark_group",
+            indicators=indicators,
+            instrument="EUR_USD",
+            timescale="S",
+            subscribe=False,
+        )
+
+        separate, shared = [], []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            for indicator in indicators:
+                indicator.compute(data.copy())
+            separate.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            group.compute_all(data)
+            shared.append(time.perf_counter() - start)
+
+        operators = count_operators([indicator.nodes() for indicator in indicators])
+        print(
+            f"{count:>3} indicators: {operators:>4} operators on their own "
+            f"{min(separate) * 1000:8.1f} ms, {len(group.graph):>3} shared "
+            f"{min(shared) * 1000:8.1f} ms ({min(separate) / min(shared):.1f}x)",
+        )
+
+
+if __name__ == "__main__":
+    main()
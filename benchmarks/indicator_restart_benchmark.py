@@ -0,0 +1,120 @@
+"""Benchmark of indicator restarts replaying history versus resuming from a checkpoint.
+
+Writes one second ticks to a scratch table and replays their republished
+prices through a moving average indicator in batches, like it receives them
+from its queue, once without a watermark and once restored from a checkpoint
+file. Every batch calculated reads its window from the ticks. Needs a running
+TimescaleDB.
+
+    python -m benchmarks.indicator_restart_benchmark --prices 10000 100000
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import numpy as np
+
+from foresight.indicator_services.moving_average_indicator import MovingAverageIndicator
+from foresight.utils.database import TimeScaleService
+from foresight.utils.models.forex_data import ForexData
+
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+TICKS_TABLE = "indicator_restart_benchmark_ticks"
+
+
+def history_ticks(count: int) -> list[ForexData]:
+    """A tick per second."""
+    bids = 1 + np.random.default_rng(0).normal(0, 1e-4, count).cumsum()
+    return [
+        ForexData(
+            instrument="EUR_USD",
+            time=START + timedelta(seconds=second),
+            bid=bid,
+            ask=bid + 1e-4,
+        )
+        for second, bid in enumerate(bids)
+    ]
+
+
+def history_messages(ticks: list[ForexData]) -> list[dict]:
+    """Queue messages of the mid price of every tick, like the window service sends."""
+    return [
+        {"Body": data_point.convert_to_price(order_type="mid").model_dump_json()}
+        for data_point in ticks
+    ]
+
+
+def replay(
+    indicator: MovingAverageIndicator,
+    messages: list[dict],
+    batch_size: int,
+) -> int:
+    """Calculate the indicator over the messages in batches, returning the batches calculated."""
+    calculated = 0
+    for index in range(0, len(messages), batch_size):
+        times = indicator.load_messages(messages[index:][:batch_size])
+        if times:
+            indicator.load_window(end=times[-1])
+            indicator.format_pricing_data()
+            indicator.last_result = indicator.do_work()
+            indicator.advance_watermark(times)
+            calculated += 1
+    return calculated
+
+
+def run(count: int, batch_size: int, checkpoint_path: str):
+    """Replay a history of `count` prices without and with a checkpoint."""
+    ticks = history_ticks(count)
+    TimeScaleService().execute(query=f"TRUNCATE {TICKS_TABLE}")
+    for index in range(0, len(ticks), 5000):
+        ForexData.insert_multiple(data=ticks[index:][:5000], table_name=TICKS_TABLE)
+    messages = history_messages(ticks)
+
+    def build() -> MovingAverageIndicator:
+        indicator = MovingAverageIndicator("EUR_USD", "S", "mid", subscribe=False)
+        indicator.checkpoint_path = checkpoint_path
+        indicator.table_name = TICKS_TABLE
+        return indicator
+
+    start = time.perf_counter()
+    cold = build()
+    cold_batches = replay(cold, messages, batch_size)
+    cold_seconds = time.perf_counter() - start
+    cold.checkpoint()
+
+    start = time.perf_counter()
+    warm = build()
+    warm.restore_checkpoint()
+    warm_batches = replay(warm, messages, batch_size)
+    warm_seconds = time.perf_counter() - start
+
+    print(
+        f"{count:>8,} prices: replayed {cold_batches:,} batches in "
+        f"{cold_seconds * 1000:9.1f} ms, resumed with {warm_batches:,} in "
+        f"{warm_seconds * 1000:7.1f} ms ({cold_seconds / warm_seconds:.0f}x)",
+    )
+
+
+def main():
+    """Run the benchmark scenarios and print the restart times."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--prices", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--batch-size", type=int, default=10)
+    args = parser.parse_args()
+
+    ForexData.create_table(table_name=TICKS_TABLE)
+    try:
+        with tempfile.TemporaryDirectory() as checkpoint_path:
+            for count in args.prices:
+                run(count, args.batch_size, checkpoint_path)
+    finally:
+        ForexData.drop_table(table_name=TICKS_TABLE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Load test of an interface service endpoint with many concurrent connections.
+
+Opens `--connections` keep-alive HTTP/1.1 connections that each request the
+URL in a loop for `--seconds`, then prints requests per second and latency
+percentiles. Start the service first, e.g. either of:
+
+    python -m foresight.interface_service.app
+    uvicorn foresight.interface_service.asgi:app --workers 2
+
+    python -m benchmarks.interface_load_test --url http://127.0.0.1:8000/latest --connections 1000
+"""
+
+import argparse
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from foresight.utils.latency import percentile
+
+
+async def request(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    message: bytes,
+) -> tuple[int, bool]:
+    """Send a request on an open connection and read the response.
+
+    Returns:
+        tuple[int, bool]: The status code, and whether the connection stays open.
+    """
+    writer.write(message)
+    await writer.drain()
+
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed by the server.")
+
+    length = 0
+    keep_alive = status_line.startswith(b"HTTP/1.1")
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "connection":
+            keep_alive = value.strip().lower() == "keep-alive"
+    await reader.readexactly(length)
+    return int(status_line.split()[1]), keep_alive
+
+
+async def connection_loop(
+    host: str,
+    port: int,
+    message: bytes,
+    deadline: float,
+    latencies: list[float],
+    errors: list[str],
+):
+    """Request the URL on one connection until the deadline, reconnecting on errors."""
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            start = time.perf_counter()
+            status, keep_alive = await request(reader, writer, message)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(f"HTTP {status}")
+            if not keep_alive:
+                writer.close()
+                reader = writer = None
+        except (ConnectionError, OSError, asyncio.IncompleteReadError) as error:
+            errors.append(type(error).__name__)
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.1)
+    if writer is not None:
+        writer.close()
+
+
+async def run(url: str, connections: int, seconds: float, headers: dict) -> dict:
+    """Run the load test and return its statistics."""
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    target = parts.path or "/"
+    if parts.query:
+        target += f"?{parts.query}"
+
+    lines = [f"GET {target} HTTP/1.1", f"Host: {parts.netloc}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    message = ("\r\n".join(lines) + "\r\n\r\n").encode()
+
+    latencies: list[float] = []
+    errors: list[str] = []
+    start = time.perf_counter()
+    deadline = start + seconds
+    await asyncio.gather(
+        *[
+            connection_loop(host, port, message, deadline, latencies, errors)
+            for _ in range(connections)
+        ],
+    )
+    elapsed = time.perf_counter() - start
+
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000 if latencies else float("nan"),
+        "p99_ms": percentile(latencies, 99) * 1000 if latencies else float("nan"),
+    }
+
+
+def main():
+    """Run the load test and print its statistics."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://127.0.0.1:8000/latest")
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--accept", default="application/json")
+    parser.add_argument("--accept-encoding", default="identity")
+    args = parser.parse_args()
+
+    stats = asyncio.run(
+        run(
+            url=args.url,
+            connections=args.connections,
+            seconds=args.seconds,
+            headers={"Accept": args.accept, "Accept-Encoding": args.accept_encoding},
+        ),
+    )
+    print(
+        f"{stats['requests']} requests, {stats['errors']} errors, "
+        f"{stats['requests_per_second']:.0f} requests/s, "
+        f"p50 {stats['p50_ms']:.1f} ms, p99 {stats['p99_ms']:.1f} ms",
+    )
+
+
+if __name__ == "__main__":
+    main()
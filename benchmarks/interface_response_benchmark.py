@@ -0,0 +1,105 @@
+"""Benchmark of bytes on the wire and server CPU per /latest response.
+
+Serves stored moving average results of a few components and compares the
+previous handler (decode every value, re-encode with jsonify) with the rows
+and columnar shapes, uncompressed, gzip and brotli. Does not need a database.
+
+    python -m benchmarks.interface_response_benchmark --records 500
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime
+from datetime import timedelta
+
+from flask import jsonify
+
+from foresight.interface_service import app as interface_app
+from foresight.interface_service.serialization import COLUMNS_MIMETYPE
+from foresight.interface_service.serialization import supported_encodings
+
+
+def generate_rows(components: int, records: int) -> list[dict]:
+    """Stored results shaped like the moving average indicator output."""
+    start = datetime(2024, 1, 1)
+    rows = []
+    for component in range(components):
+        price = 1.0
+        values = []
+        for index in range(records):
+            price *= 1.0 + (random.random() - 0.5) * 0.001
+            values.append(
+                {
+                    "instrument": "EUR_USD",
+                    "time": (start + timedelta(minutes=index)).isoformat(),
+                    "price": price,
+                    "ma_fast": price * (1.0 + random.random() * 1e-4),
+                    "ma_slow": price * (1.0 - random.random() * 1e-4),
+                },
+            )
+        rows.append(
+            {
+                "component_name": f"indicator_{component}",
+                "value": json.dumps(values, separators=(",", ":")),
+            },
+        )
+    return rows
+
+
+def baseline_handler(rows: list[dict]):
+    """The handler before compact responses."""
+    results = {}
+    for row in rows:
+        results[row["component_name"]] = json.loads(row["value"])
+    return jsonify(results)
+
+
+def measure(handler, headers: dict, repeat: int) -> dict:
+    """Server CPU per request and bytes of the response body."""
+    app = interface_app.app
+    with app.test_request_context("/latest", headers=headers):
+        body = handler().get_data()
+        start = time.process_time()
+        for _ in range(repeat):
+            handler().get_data()
+        cpu = (time.process_time() - start) / repeat
+    return {"bytes": len(body), "cpu_ms": cpu * 1000}
+
+
+def main():
+    """Run the benchmark scenarios and print bytes and CPU per request."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--components", type=int, default=4)
+    parser.add_argument("--records", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = generate_rows(args.components, args.records)
+    interface_app.get_latest = lambda: rows
+
+    scenarios = [("baseline jsonify", lambda: baseline_handler(rows), {})]
+    for shape, accept in [("rows", "application/json"), ("columns", COLUMNS_MIMETYPE)]:
+        for encoding in ["identity"] + supported_encodings():
+            scenarios.append(
+                (
+                    f"{shape} {encoding}",
+                    interface_app.get_latest_data,
+                    {"Accept": accept, "Accept-Encoding": encoding},
+                ),
+            )
+
+    baseline = None
+    print(f"{'scenario':<20} {'bytes':>10} {'ratio':>7} {'cpu ms':>8}")
+    for name, handler, headers in scenarios:
+        result = measure(handler, headers, args.repeat)
+        baseline = baseline or result
+        print(
+            f"{name:<20} {result['bytes']:>10} "
+            f"{result['bytes'] / baseline['bytes']:>7.3f} {result['cpu_ms']:>8.2f}",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark of stream ticks per second with tick logging on, sampled and off.
+
+Measures the per tick CPU work of the stream service (parse, validate and log)
+without the database write, so it runs with no external services.
+
+    python -m benchmarks.logging_benchmark --ticks 50000
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+from foresight.stream_service import app as stream_app
+from foresight.utils.logger import SampledLogger
+from foresight.utils.logger import configure_logging
+from foresight.utils.logger import shutdown_logging
+
+
+def generate_lines(count: int) -> list[bytes]:
+    """Generate encoded OANDA pricing lines."""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        json.dumps(
+            {
+                "type": "PRICE",
+                "instrument": "EUR_USD",
+                "time": (start + timedelta(milliseconds=i)).isoformat(),
+                "tradeable": True,
+                "bids": [{"price": "1.08000", "liquidity": 1000000}],
+                "asks": [{"price": "1.08010", "liquidity": 1000000}],
+            },
+        ).encode("utf-8")
+        for i in range(count)
+    ]
+
+
+def run(lines: list[bytes], tick_logger: SampledLogger) -> float:
+    """Process the lines and return the ticks per second."""
+    start = time.perf_counter()
+    for line in lines:
+        forex_data = stream_app.parse_stream_data(line)
+        tick_logger.log("%s", forex_data)
+    return len(lines) / (time.perf_counter() - start)
+
+
+def main():
+    """Run the benchmark scenarios and print ticks per second."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ticks", type=int, default=50000)
+    args = parser.parse_args()
+
+    lines = generate_lines(args.ticks)
+
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        configure_logging(stream=devnull)
+        logger = stream_app.logger
+
+        scenarios = {
+            "logging on (every tick)": (logging.INFO, SampledLogger(logger)),
+            "logging sampled (1/100)": (
+                logging.INFO,
+                SampledLogger(logger, every_n=100),
+            ),
+            "logging off (level WARNING)": (logging.WARNING, SampledLogger(logger)),
+        }
+
+        results = {}
+        for name, (level, tick_logger) in scenarios.items():
+            logger.setLevel(level)
+            results[name] = run(lines, tick_logger)
+
+        shutdown_logging()
+
+    for name, ticks_per_second in results.items():
+        print(f"{name:<30} {ticks_per_second:>12,.0f} ticks/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark of reading buckets from TimescaleDB versus exported Parquet files.
+
+Writes ticks to a scratch table, exports them to Parquet in a temporary
+directory, then times second and minute buckets through `ForexData.fetch`
+(dict rows to models), `ForexData.fetch_columns` (binary COPY to arrays) and
+`ParquetStore.scan_buckets` (pruned Parquet scan to arrays), plus a scan of
+one hour of a single column. Needs a running TimescaleDB and pyarrow.
+
+    python -m benchmarks.parquet_scan_benchmark --ticks-per-second 40
+"""
+
+import argparse
+import os
+import tempfile
+from datetime import timedelta
+
+from benchmarks.bar_fetch_benchmark import best_of
+from benchmarks.conflation_benchmark import generate_ticks
+from foresight.utils.database import TimeScaleService
+from foresight.utils.models.forex_data import ForexData
+from foresight.utils.parquet_store import ParquetStore
+
+
+TICKS_TABLE = "parquet_scan_benchmark_ticks"
+
+
+def directory_size(path: str) -> int:
+    """The total size in bytes of the files under a directory."""
+    return sum(
+        os.path.getsize(os.path.join(directory, name))
+        for directory, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def main():
+    """Run the benchmark scenarios and print the read times."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ticks-per-second", type=int, default=40)
+    parser.add_argument("--seconds", type=int, default=3 * 3600)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    ticks = generate_ticks(args.ticks_per_second, args.seconds)
+    ForexData.create_table(table_name=TICKS_TABLE)
+    try:
+        for index in range(0, len(ticks), 5000):
+            ForexData.insert_multiple(data=ticks[index:][:5000], table_name=TICKS_TABLE)
+        TimeScaleService().execute(query=f"ANALYZE {TICKS_TABLE}")
+
+        with tempfile.TemporaryDirectory() as root:
+            store = ParquetStore(root=root)
+            until = ticks[-1].time + timedelta(seconds=1)
+            exported = store.export(table_name=TICKS_TABLE, until=until)
+            print(
+                f"exported {sum(exported.values()):,} ticks, "
+                f"{directory_size(root) / 1024 ** 2:,.2f} MiB of Parquet",
+            )
+
+            for timescale in ["S", "M"]:
+                query, params = ForexData.bucket_query(
+                    "EUR_USD",
+                    timescale,
+                    table_name=TICKS_TABLE,
+                )
+                rows_seconds = best_of(
+                    lambda: [
+                        ForexData(**row)
+                        for row in TimeScaleService().execute(
+                            query=query,
+                            params=params,
+                        )
+                    ],
+                    args.repeat,
+                )
+                columns_seconds = best_of(
+                    lambda: ForexData.fetch_columns(
+                        "EUR_USD",
+                        timescale,
+                        table_name=TICKS_TABLE,
+                    ),
+                    args.repeat,
+                )
+                parquet_seconds = best_of(
+                    lambda: store.scan_buckets("EUR_USD", timescale),
+                    args.repeat,
+                )
+                print(
+                    f"{timescale}: fetch {rows_seconds * 1000:8.1f} ms, "
+                    f"fetch_columns {columns_seconds * 1000:8.1f} ms, "
+                    f"parquet {parquet_seconds * 1000:8.1f} ms "
+                    f"({rows_seconds / parquet_seconds:.1f}x fetch)",
+                )
+
+            start = ticks[0].time
+            hour_seconds = best_of(
+                lambda: store.scan(
+                    instrument="EUR_USD",
+                    start=start,
+                    end=start + timedelta(hours=1),
+                    columns=["bid"],
+                ),
+                args.repeat,
+            )
+            print(f"one hour of one column: parquet {hour_seconds * 1000:8.1f} ms")
+    finally:
+        ForexData.drop_table(table_name=TICKS_TABLE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Benchmark of service cold start.
+
+For every service this reports the `python -X importtime` total of the entry
+point module, its heaviest direct imports, and the wall time of a fresh
+interpreter until the first useful piece of work is done. External services
+are not needed: the first work is the CPU side of each service.
+
+    python -m benchmarks.startup_benchmark --repeat 5
+"""
+
+import argparse
+import statistics
+import subprocess  # nosec
+import sys
+import time
+
+
+SERVICES = {
+    "stream": (
+        "foresight.stream_service.app",
+        "from foresight.stream_service.app import parse_stream_data\n"
+        'parse_stream_data(b\'{"instrument": "EUR_USD", "time": "2024-01-01T00:00:00Z",'
+        ' "bids": [{"price": 1.1}], "asks": [{"price": 1.2}]}\')',
+    ),
+    "window": (
+        "foresight.window_service.app",
+        "import foresight.window_service.app\n"
+        "from foresight.utils.latency import time_attributes\n"
+        "from foresight.utils.models.forex_data import ForexData\n"
+        "data = ForexData(instrument='EUR_USD', time='2024-01-01T00:00:00Z', bid=1.1, ask=1.2)\n"
+        "data = data.convert_to_price(order_type='mid')\n"
+        "data.model_dump_json(), time_attributes(data.time)",
+    ),
+    "indicator": (
+        "foresight.indicator_services.moving_average_indicator",
+        "from foresight.indicator_services.moving_average_indicator import"
+        " MovingAverageIndicator\n"
+        "indicator = object.__new__(MovingAverageIndicator)\n"
+        "indicator.pricing = [{'price': 1.0 + i / 100} for i in range(10)]\n"
+        "indicator.do_work()",
+    ),
+    "interface": (
+        "foresight.interface_service.app",
+        "from foresight.interface_service.app import app\n"
+        "app.test_client().get('/')",
+    ),
+}
+
+
+def import_times(module: str) -> list[tuple[int, int, str]]:
+    """Run `python -X importtime` on the module.
+
+    Returns:
+        list[tuple[int, int, str]]: (depth, cumulative microseconds, module name).
+    """
+    result = subprocess.run(  # nosec
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        timings.append((depth, int(cumulative), name.strip()))
+    return timings
+
+
+def time_to_first_work(snippet: str, repeat: int) -> float:
+    """Median wall time in seconds of a fresh interpreter running the snippet."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", snippet], check=True)  # nosec
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def main():
+    """Run the startup benchmark for every service."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'service':<10} {'import (ms)':>12} {'first work (ms)':>16}  heaviest imports",
+    )
+    for service, (module, snippet) in SERVICES.items():
+        timings = import_times(module)
+        total = next(cumulative for _, cumulative, name in timings if name == module)
+        children = sorted(
+            (timing for timing in timings if timing[0] == 1),
+            key=lambda timing: timing[1],
+            reverse=True,
+        )[: args.top]
+        first_work = time_to_first_work(snippet, args.repeat)
+
+        heaviest = ", ".join(
+            f"{name} {cumulative / 1000:.0f}" for _, cumulative, name in children
+        )
+        print(
+            f"{service:<10} {total / 1000:>12.0f} {first_work * 1000:>16.0f}  {heaviest}",
+        )
+
+
+if __name__ == "__main__":
+    main()
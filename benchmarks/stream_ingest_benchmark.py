@@ -0,0 +1,72 @@
+"""Benchmark of stream ingest throughput with 1, 2 and 4 worker processes.
+
+Runs the stream supervisor with random walk workers (no sleep between ticks)
+writing to a scratch table, and prints the aggregate ticks stored per second.
+Needs a running TimescaleDB.
+
+    python -m benchmarks.stream_ingest_benchmark --seconds 10
+"""
+
+import argparse
+import time
+
+from foresight.stream_service.supervisor import StreamSupervisor
+from foresight.stream_service.supervisor import tick_callback
+from foresight.utils.models.forex_data import ForexData
+
+
+TABLE_NAME = "stream_ingest_benchmark"
+INSTRUMENTS = ["EUR_USD", "GBP_USD", "USD_JPY", "AUD_USD"]
+
+
+def random_walk_worker(instruments, ticks, heartbeat):
+    """Worker storing random walk ticks as fast as possible."""
+    from foresight.stream_service.app import open_random_walk_stream
+
+    open_random_walk_stream(
+        sleep_between=0,
+        table_name=TABLE_NAME,
+        instruments=instruments,
+        on_tick=tick_callback(ticks, heartbeat),
+    )
+
+
+def run(workers: int, seconds: float) -> float:
+    """Run the supervisor for a while and return the ticks stored per second."""
+    supervisor = StreamSupervisor(
+        instruments=INSTRUMENTS,
+        workers=workers,
+        target=random_walk_worker,
+    )
+    try:
+        supervisor.check()
+        # Skip interpreter start up
+        time.sleep(2)
+        supervisor.report()
+        time.sleep(seconds)
+        return supervisor.report()["ticks_per_second"]
+    finally:
+        supervisor.stop()
+
+
+def main():
+    """Run the benchmark scenarios and print ticks per second."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    ForexData.create_table(table_name=TABLE_NAME)
+    try:
+        baseline = None
+        for workers in [1, 2, 4]:
+            rate = run(workers, args.seconds)
+            baseline = baseline or rate
+            print(
+                f"{workers} worker(s): {rate:>10,.0f} ticks/s ({rate / baseline:.1f}x)",
+            )
+    finally:
+        ForexData.drop_table(table_name=TABLE_NAME)
+
+
+if __name__ == "__main__":
+    main()
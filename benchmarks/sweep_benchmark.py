@@ -0,0 +1,52 @@
+"""Benchmark of moving average parameter sweeps.
+
+Sweeps a grid of fast and slow windows over a random walk of a calendar year
+of minute bars (525,600) and prints the time taken and backtests per second,
+with one process and with a pool. Needs no running services.
+
+    python -m benchmarks.sweep_benchmark --windows 100 --processes 1 8
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from foresight.indicator_services.moving_average_indicator import MovingAverageIndicator
+from foresight.indicator_services.sweep import sweep
+
+
+def main():
+    """Run the benchmark scenarios and print the sweep times."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bars", type=int, default=365 * 24 * 60)
+    parser.add_argument("--windows", type=int, default=100)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+
+    prices = 1 + np.random.default_rng(0).normal(0, 1e-4, args.bars).cumsum()
+    grid = {
+        "fast": range(2, args.windows + 2),
+        "slow": range(3, args.windows + 3),
+    }
+
+    for processes in args.processes:
+        start = time.perf_counter()
+        table = sweep(
+            MovingAverageIndicator,
+            prices,
+            grid=grid,
+            processes=processes,
+        )
+        seconds = time.perf_counter() - start
+
+        best = table.iloc[0]
+        print(
+            f"{processes:>2} processes: {len(table):,} backtests of {args.bars:,} bars "
+            f"in {seconds:6.1f} s ({len(table) / seconds:.0f}/s), best fast "
+            f"{best['fast']:.0f} slow {best['slow']:.0f} sharpe {best['sharpe']:.2f}",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""Vectorized backtests of indicators over a price history.
+
+The indicator is calculated over the whole history in one pass with its
+`compute` method, its `signal` becomes the position held over the next bar,
+and the positions become returns and summary statistics. No queue or
+subscription is created, so nothing but the price source is needed:
+
+    python -m foresight.indicator_services.backtest --instrument EUR_USD --timescale M
+    python -m foresight.indicator_services.backtest --parquet-root parquet --fast 5 --slow 20
+"""
+
+import argparse
+import importlib
+import math
+from datetime import datetime
+from typing import Optional
+from typing import Union
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+from pydantic import ConfigDict
+from pydantic import Field
+
+from foresight.indicator_services.indicator import Indicator
+from foresight.utils.logger import generate_logger
+from foresight.utils.storage.base import timescale_seconds
+
+
+logger = generate_logger(name=__name__)
+
+# Forex trades around the clock on weekdays
+TRADING_SECONDS_PER_YEAR = 260 * 24 * 60 * 60
+
+
+class BacktestResult(BaseModel):
+    """The summary statistics of a backtest.
+
+    Args:
+        bars (int): The number of bars in the history.
+        trades (int): The number of position changes.
+        total_return (float): The compounded return over the history.
+        annualized_return (float): The total return per trading year.
+        sharpe (float): The annualized Sharpe ratio of the bar returns.
+        max_drawdown (float): The largest fall from a peak of the equity.
+        exposure (float): The fraction of bars a position is held over.
+        hit_rate (float): The fraction of bars held over that gained.
+        data (pd.DataFrame): The computed indicator with the position,
+            return and equity of every bar.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    bars: int
+    trades: int
+    total_return: float
+    annualized_return: float
+    sharpe: float
+    max_drawdown: float
+    exposure: float
+    hit_rate: float
+    data: pd.DataFrame = Field(exclude=True, repr=False)
+
+
+def load_indicator(path: str) -> type[Indicator]:
+    """The indicator class at a `module:Class` path."""
+    module_name, _, class_name = path.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def to_price(columns: dict[str, np.ndarray], order_type: str = "mid") -> np.ndarray:
+    """The price of bid and ask columns for an order type."""
+    if order_type == "ask":
+        return columns["ask"]
+    elif order_type == "bid":
+        return columns["bid"]
+    elif order_type == "mid":
+        return (columns["bid"] + columns["ask"]) / 2
+    raise ValueError("Invalid order type. Must be 'ask', 'bid', or 'mid'.")
+
+
+def load_prices(
+    instrument: str = "EUR_USD",
+    timescale: str = "M",
+    order_type: str = "mid",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    parquet_root: Optional[str] = None,
+) -> pd.DataFrame:
+    """The bucketed price history from exported Parquet files, or the database.
+
+    Returns:
+        pd.DataFrame: The time and price of every bucket, oldest first.
+    """
+    if parquet_root is not None:
+        from foresight.utils.parquet_store import ParquetStore
+
+        columns = ParquetStore(root=parquet_root).scan_buckets(
+            instrument,
+            timescale,
+            start=start,
+            end=end,
+        )
+    else:
+        from foresight.utils.models.forex_data import ForexData
+
+        columns = ForexData.fetch_columns(instrument, timescale, start=start, end=end)
+
+    return pd.DataFrame(
+        {"time": columns["time"], "price": to_price(columns, order_type)},
+    )
+
+
+def summarize(
+    strategy_return: np.ndarray,
+    held: np.ndarray,
+    turnover: np.ndarray,
+    timescale: str = "M",
+) -> dict:
+    """The summary statistics of the returns of a strategy.
+
+    Args:
+        strategy_return (np.ndarray): The return of every bar, net of costs.
+        held (np.ndarray): The position held over every bar.
+        turnover (np.ndarray): The change of position after every bar.
+        timescale (str): The timescale of the bars (S, M, H or D).
+
+    Returns:
+        dict: The fields of a BacktestResult but its data.
+    """
+    bars = len(strategy_return)
+    if bars == 0:
+        return {
+            "bars": 0,
+            "trades": 0,
+            "total_return": 0.0,
+            "annualized_return": 0.0,
+            "sharpe": 0.0,
+            "max_drawdown": 0.0,
+            "exposure": 0.0,
+            "hit_rate": 0.0,
+        }
+
+    equity = np.cumprod(1 + strategy_return)
+    total_return = float(equity[-1] - 1)
+    years = bars * timescale_seconds[timescale] / TRADING_SECONDS_PER_YEAR
+    deviation = strategy_return.std()
+    in_market = held != 0
+    held_bars = np.count_nonzero(in_market)
+
+    # In place, the drawdowns of long histories are the bulk of a sweep
+    peak = np.maximum.accumulate(equity)
+    np.divide(equity, peak, out=peak)
+
+    return {
+        "bars": bars,
+        "trades": int(np.count_nonzero(turnover)),
+        "total_return": total_return,
+        "annualized_return": (
+            (1 + total_return) ** (1 / years) - 1 if total_return > -1 else -1.0
+        ),
+        "sharpe": (
+            float(strategy_return.mean() / deviation)
+            * math.sqrt(TRADING_SECONDS_PER_YEAR / timescale_seconds[timescale])
+            if deviation > 0
+            else 0.0
+        ),
+        "max_drawdown": float(1 - peak.min()),
+        "exposure": float(held_bars / bars),
+        "hit_rate": (
+            float(np.count_nonzero((strategy_return > 0) & in_market) / held_bars)
+            if held_bars
+            else 0.0
+        ),
+    }
+
+
+def run_backtest(
+    indicator_class: type[Indicator],
+    prices: Union[np.ndarray, pd.Series, pd.DataFrame],
+    instrument: str = "EUR_USD",
+    timescale: str = "M",
+    order_type: str = "mid",
+    cost: float = 0.0,
+    **params,
+) -> BacktestResult:
+    """Backtest an indicator over a price history in one vectorized pass.
+
+    The position signalled after a bar is held over the next one, so a signal
+    never trades on the price it was calculated from.
+
+    Args:
+        indicator_class (type[Indicator]): The indicator to backtest.
+        prices (Union[np.ndarray, pd.Series, pd.DataFrame]): The prices oldest
+            first, or a DataFrame with a `price` and optionally a `time` column.
+        instrument (str): The instrument of the prices.
+        timescale (str): The timescale of the bars (S, M, H or D).
+        order_type (str): The price the prices are of.
+        cost (float): The cost of changing the position by one, as a
+            fraction of the price (e.g. half the spread).
+        **params: The parameters of the indicator, e.g. `fast` and `slow`.
+
+    Returns:
+        BacktestResult: The summary statistics and the data of every bar.
+    """
+    if isinstance(prices, pd.DataFrame):
+        data = prices.reset_index(drop=True).copy()
+    else:
+        data = pd.DataFrame({"price": np.asarray(prices, dtype=np.float64)})
+
+    indicator = indicator_class(
+        instrument=instrument,
+        timescale=timescale,
+        order_type=order_type,
+        subscribe=False,
+        **params,
+    )
+    data = indicator.compute(data)
+
+    price = data["price"].to_numpy(dtype=np.float64)
+    position = np.asarray(indicator.signal(data), dtype=np.float64)
+
+    bar_return = np.zeros(len(price))
+    bar_return[1:] = price[1:] / price[:-1] - 1
+    held = np.zeros(len(price))
+    held[1:] = position[:-1]
+    turnover = np.abs(np.diff(position, prepend=0.0))
+    strategy_return = held * bar_return - cost * turnover
+
+    data["position"] = position
+    data["return"] = strategy_return
+    data["equity"] = np.cumprod(1 + strategy_return)
+
+    result = BacktestResult(
+        **summarize(strategy_return, held, turnover, timescale),
+        data=data,
+    )
+    logger.info(
+        "Backtested %s over %s bars: %s trades, %.4f total return",
+        indicator.component_name,
+        result.bars,
+        result.trades,
+        result.total_return,
+    )
+    return result
+
+
+def main():
+    """Run a backtest and print its statistics."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--indicator",
+        default="foresight.indicator_services.moving_average_indicator:MovingAverageIndicator",
+    )
+    parser.add_argument("--instrument", default="EUR_USD")
+    parser.add_argument("--timescale", default="M")
+    parser.add_argument("--order-type", default="mid")
+    parser.add_argument("--parquet-root", default=None)
+    parser.add_argument("--cost", type=float, default=0.0)
+    parser.add_argument("--fast", type=int, default=None)
+    parser.add_argument("--slow", type=int, default=None)
+    args = parser.parse_args()
+
+    prices = load_prices(
+        instrument=args.instrument,
+        timescale=args.timescale,
+        order_type=args.order_type,
+        parquet_root=args.parquet_root,
+    )
+    params = {
+        name: value
+        for name, value in (("fast", args.fast), ("slow", args.slow))
+        if value is not None
+    }
+    result = run_backtest(
+        load_indicator(args.indicator),
+        prices,
+        instrument=args.instrument,
+        timescale=args.timescale,
+        order_type=args.order_type,
+        cost=args.cost,
+        **params,
+    )
+    print(result.model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+    main()
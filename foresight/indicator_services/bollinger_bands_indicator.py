@@ -0,0 +1,89 @@
+"""Bollinger bands indicator class"""
+
+from typing import TYPE_CHECKING
+
+from foresight.indicator_services.indicator import Indicator
+from foresight.indicator_services.operators import Node
+from foresight.indicator_services.operators import rolling_mean
+from foresight.indicator_services.operators import rolling_std
+from foresight.indicator_services.operators import source
+from foresight.utils.logger import generate_logger
+
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+
+logger = generate_logger(name=__name__)
+
+
+class BollingerBandsIndicator(Indicator):
+    """Bollinger Bands Indicator
+
+    Parameters:
+        instrument (str): The instrument to fetch
+        timescale (str): The timescale to fetch (M = minutes, H = hours, D = days)
+        order_type (str): The price to subscribe to
+        window (int): The window of the moving average and standard deviation
+        width (float): The distance of the bands in standard deviations
+        subscribe (bool): Whether to create the queue and subscription
+        component_name (str): The name of the indicator and of its queue
+    """
+
+    def __init__(
+        self,
+        instrument: str,
+        timescale: str,
+        order_type: str,
+        window: int = 5,
+        width: float = 2.0,
+        subscribe: bool = True,
+        component_name: str = "bollinger_bands",
+    ):
+        self.window = window
+        self.width = width
+        super().__init__(
+            component_name=component_name,
+            instrument=instrument,
+            timescale=timescale,
+            order_type=order_type,
+            subscribe=subscribe,
+        )
+
+    def do_work(self) -> dict:
+        """Calculates the bands around the moving average of the price."""
+        import pandas as pd
+
+        return self.compute(pd.DataFrame(self.pricing)).dropna().to_dict("records")
+
+    def nodes(self) -> dict[str, Node]:
+        """The moving average of the price and the bands around it."""
+        price = source("price")
+        middle = rolling_mean(price, self.window)
+        deviation = rolling_std(price, self.window) * self.width
+        return {
+            "bb_middle": middle,
+            "bb_upper": middle + deviation,
+            "bb_lower": middle - deviation,
+        }
+
+    def signal(self, data: "pd.DataFrame") -> "np.ndarray":
+        """Long below the lower band and short above the upper band."""
+        import numpy as np
+
+        price = data["price"].to_numpy()
+        return np.where(
+            price < data["bb_lower"].to_numpy(),
+            1.0,
+            np.where(price > data["bb_upper"].to_numpy(), -1.0, 0.0),
+        )
+
+
+if __name__ == "__main__":
+    bbInd = BollingerBandsIndicator(
+        instrument="EUR_USD",
+        timescale="M",
+        order_type="mid",
+    )
+    bbInd.schedule_work()
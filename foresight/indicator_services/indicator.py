@@ -2,26 +2,91 @@
 
 import datetime
 import json
+import os
+import socket
 import time
+from typing import TYPE_CHECKING
+from typing import Optional
 
-import pandas as pd
-from boto3_type_annotations.sqs import Client
-from utils.aws import get_client
-from utils.database import TimeScaleService
-
+from foresight.indicator_services.lease import MessageLease
+from foresight.utils.aws import get_client
+from foresight.utils.database import TimeScaleService
+from foresight.utils.latency import ORIGIN_TIME_ATTRIBUTE
+from foresight.utils.latency import SENT_TIME_ATTRIBUTE
+from foresight.utils.latency import LatencyTracker
+from foresight.utils.latency import parse_time_attribute
 from foresight.utils.logger import generate_logger
+from foresight.utils.migrations import migrate
+from foresight.utils.models.forex_data import ForexData
+from foresight.utils.models.indicator_checkpoint import IndicatorCheckpoint
+from foresight.utils.models.latency_metric import LatencyMetric
+
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    from boto3_type_annotations.sqs import Client
+
+    from foresight.indicator_services.operators import Node
 
 
 logger = generate_logger(name=__name__)
 
+latency_tracker = LatencyTracker()
+
 
 class Indicator:
-    """Indicator Superclass"""
+    """Indicator Superclass
+
+    Any number of replicas of an indicator can consume its queue as a worker
+    group. Received messages stay hidden from the other replicas while their
+    lease is extended, and are only deleted once the result is saved, so a
+    replica that dies hands its messages over when the lease runs out. Results
+    are upserted on the time of the data, so a message processed twice
+    overwrites its result instead of failing.
+
+    The messages only say which prices arrived. The rolling window up to the
+    freshest of them is read from the ticks every replica shares, so replicas
+    calculate the same result for a time whichever messages they received,
+    and a restarted indicator needs no history to be replayed. Each replica
+    keeps a watermark, the time up to which it consumed every price, and
+    checkpoints it with its last result at an interval, to the database or to
+    a local file, restoring both on startup. Republished prices older than the
+    watermark are skipped.
+
+    Args:
+        component_name (str): The name of the indicator and of its queue.
+        instrument (str): The instrument to subscribe to.
+        timescale (str): The timescale to subscribe to.
+        order_type (str): The price to subscribe to.
+        visibility_timeout (Optional[int]): Seconds received messages stay
+            hidden from the other replicas, renewed while they are processed.
+        batch_size (Optional[int]): Messages received per pull, at most 10.
+        wait_time (Optional[int]): Seconds a pull waits for messages.
+        subscribe (bool): Whether to create the queue and subscription. An
+            indicator that is not subscribed only calculates, e.g. in backtests.
+        history (Optional[int]): Buckets read into the rolling window.
+        checkpoint_interval (Optional[float]): Seconds between checkpoints,
+            0 to checkpoint after every batch.
+        checkpoint_path (Optional[str]): The directory of checkpoint files,
+            checkpoints are stored in the database if empty.
+        replica (Optional[str]): The name of the replica its checkpoints are
+            kept under, INDICATOR_REPLICA or the host name by default.
+    """
 
     component_name: str
-    queue_url: str
+    queue_url: Optional[str] = None
     order_type: str  # bid, ask, mid, or both
-    pricing: dict = {}
+    pricing: list = []
+    data_times: list = []  # times of the buckets of the window holding ticks
+    window_start: Optional[datetime.datetime] = (
+        None  # time of the first bucket of the window
+    )
+    received_times: set = set()  # times received after the watermark
+    table_name: str = "forex_data"  # the ticks the window is read from
+    origin_time: Optional[datetime.datetime] = None  # origin of the freshest tick
+    watermark: Optional[datetime.datetime] = None  # every price up to it is consumed
+    last_result = None
 
     def __init__(
         self,
@@ -29,17 +94,48 @@ class Indicator:
         instrument: str,
         timescale: str,
         order_type: str = "mid",
+        visibility_timeout: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        wait_time: Optional[int] = None,
+        subscribe: bool = True,
+        history: Optional[int] = None,
+        checkpoint_interval: Optional[float] = None,
+        checkpoint_path: Optional[str] = None,
+        replica: Optional[str] = None,
     ):
         if type(self) is Indicator:
             raise Exception("<Indicator> must be subclassed.")
         self.component_name = component_name
-        self.queue_url = self.create_queue()
+        self.instrument = instrument
+        self.timescale = timescale
+        self.visibility_timeout = visibility_timeout or int(
+            os.getenv("INDICATOR_VISIBILITY_TIMEOUT") or 30,
+        )
+        self.batch_size = batch_size or int(os.getenv("INDICATOR_BATCH_SIZE") or 10)
+        self.wait_time = (
+            wait_time
+            if wait_time is not None
+            else int(os.getenv("INDICATOR_WAIT_TIME") or 5)
+        )
         self.order_type = order_type
-        self.add_subscription_record(
-            instrument=instrument,
-            timescale=timescale,
-            order_type=order_type,
+        self.history = history or int(os.getenv("INDICATOR_HISTORY") or 200)
+        self.checkpoint_interval = (
+            checkpoint_interval
+            if checkpoint_interval is not None
+            else float(os.getenv("INDICATOR_CHECKPOINT_INTERVAL") or 60)
         )
+        self.checkpoint_path = checkpoint_path or os.getenv("INDICATOR_CHECKPOINT_PATH")
+        self.replica = replica or os.getenv("INDICATOR_REPLICA") or socket.gethostname()
+        self.checkpoint_time = time.monotonic()
+        self.pricing = []
+        self.received_times = set()
+        if subscribe:
+            self.queue_url = self.create_queue()
+            self.add_subscription_record(
+                instrument=instrument,
+                timescale=timescale,
+                order_type=order_type,
+            )
 
     def create_queue(self) -> str:
         """Create a queue."""
@@ -50,74 +146,302 @@ class Indicator:
         return response["QueueUrl"]
 
     def add_subscription_record(self, instrument: str, timescale: str, order_type: str):
-        """Add a subscription record."""
-        TimeScaleService().execute(
-            f"DELETE FROM subscription_feed WHERE queue_url = '{self.queue_url}'",
-        )
-        TimeScaleService().execute(
-            query=f"""
-                INSERT INTO subscription_feed (queue_url, instrument, timescale, order_type)
-                VALUES ('{self.queue_url}', '{instrument}', '{timescale}', '{order_type}')
-            """,
-        )
+        """Add a subscription record.
+
+        Every replica of the indicator registers the same record, so it is
+        upserted and the other subscriptions of the queue are removed in the
+        same transaction.
+        """
+        with TimeScaleService().transaction() as service:
+            service.execute(
+                query="""DELETE FROM subscription_feed
+                WHERE queue_url = %s AND (instrument, timescale) <> (%s, %s)""",
+                params=(self.queue_url, instrument, timescale),
+            )
+            service.execute(
+                query="""INSERT INTO subscription_feed
+                (queue_url, instrument, timescale, order_type) VALUES (%s, %s, %s, %s)
+                ON CONFLICT (queue_url, instrument, timescale)
+                DO UPDATE SET order_type = EXCLUDED.order_type""",
+                params=(self.queue_url, instrument, timescale, order_type),
+            )
         logger.info(f"Added subscription record for {self.component_name}")
 
-    def pull_from_queue(self):
-        """Pulls from Queue and returns a DataFrame."""
+    def pull_from_queue(self) -> list[dict]:
+        """Receive a batch of messages, hidden from the other replicas until their lease ends."""
         sqsClient: Client = get_client("sqs")
-        logger.info(f"Counting messages in queue: {self.queue_url}")
-        response = sqsClient.get_queue_attributes(
+        logger.info(f"Pulling from queue: {self.queue_url}")
+        response = sqsClient.receive_message(
             QueueUrl=self.queue_url,
-            AttributeNames=["ApproximateNumberOfMessages"],
-        )
-        logger.info(
-            f"Messages in queue: {response['Attributes']['ApproximateNumberOfMessages']}",
+            MaxNumberOfMessages=self.batch_size,
+            VisibilityTimeout=self.visibility_timeout,
+            WaitTimeSeconds=self.wait_time,
+            MessageAttributeNames=["All"],
         )
+        return response.get("Messages", [])
 
-        logger.info(f"Pulling from queue: {self.queue_url}")
-        response = sqsClient.receive_message(
+    def delete_messages(self, messages: list[dict]):
+        """Delete processed messages from the queue."""
+        sqsClient: Client = get_client("sqs")
+        response = sqsClient.delete_message_batch(
             QueueUrl=self.queue_url,
-            MaxNumberOfMessages=1,
+            Entries=[
+                {"Id": str(index), "ReceiptHandle": message["ReceiptHandle"]}
+                for index, message in enumerate(messages)
+            ],
+        )
+        # A message whose lease expired may have been received by another replica
+        for failure in response.get("Failed", []):
+            logger.warning("Failed to delete message: %s", failure.get("Message"))
+
+    def is_consumed(self, price: dict) -> bool:
+        """Whether the price is older than the watermark.
+
+        The price at the watermark is not consumed, its bucket may have been
+        updated since.
+        """
+        return (
+            self.watermark is not None
+            and bool(price.get("time"))
+            and datetime.datetime.fromisoformat(price["time"]) < self.watermark
+        )
+
+    def load_messages(self, messages: list[dict]) -> list[datetime.datetime]:
+        """Read the times of the prices of the messages, skipping those consumed.
+
+        Returns:
+            list[datetime.datetime]: The distinct times, oldest first.
+        """
+        times, origins = set(), []
+        for message in messages:
+            self.track_message_latency(message)
+            if self.origin_time is not None:
+                origins.append(self.origin_time)
+            price = json.loads(message["Body"])
+            if price.get("time") and not self.is_consumed(price):
+                times.add(datetime.datetime.fromisoformat(price["time"]))
+
+        # The freshest origin of the batch determines the end to end latency
+        self.origin_time = max(origins) if origins else None
+        return sorted(times)
+
+    def load_window(self, end: datetime.datetime):
+        """Read the prices of the `history` buckets up to `end` from the ticks.
+
+        The window has a fixed length, empty buckets carrying the last price
+        forward. Buckets before the first tick have no price.
+        """
+        window = ForexData.fetch_window(
+            instrument=self.instrument,
+            timescale=self.timescale,
+            length=self.history,
+            end=end,
+            fill="locf",
+            table_name=self.table_name,
         )
-        if "Messages" in response:
-            message = response["Messages"][0]
-            sqsClient.delete_message(
-                QueueUrl=self.queue_url,
-                ReceiptHandle=message["ReceiptHandle"],
+        if self.order_type == "ask":
+            prices = window["ask"]
+        elif self.order_type == "bid":
+            prices = window["bid"]
+        elif self.order_type == "mid":
+            prices = (window["bid"] + window["ask"]) / 2
+        else:
+            raise ValueError("Invalid order type. Must be 'ask', 'bid', or 'mid'.")
+
+        times = [
+            bucket.replace(tzinfo=datetime.timezone.utc)
+            for bucket in window["time"].astype("datetime64[us]").tolist()
+        ]
+        self.window_start = times[0]
+        self.data_times = [
+            bucket for bucket, count in zip(times, window["tick_count"]) if count > 0
+        ]
+        self.pricing = [
+            {
+                "instrument": self.instrument,
+                "time": bucket.isoformat(),
+                "price": float(price),
+            }
+            for bucket, price in zip(times, prices)
+        ]
+
+    def advance_watermark(self, times: list[datetime.datetime]):
+        """Move the watermark to the freshest price if every price since was consumed.
+
+        A replica without a watermark starts it at the first price it
+        receives, the history before it is not its to consume. From there the
+        watermark only advances over contiguous data: every bucket of the
+        window holding ticks since the watermark must have been received by
+        this replica, or be covered by a result another replica saved, the
+        window of a result holding every bucket before it. Prices delivered
+        out of order are never skipped.
+
+        Args:
+            times (list[datetime.datetime]): The times of the prices consumed,
+                oldest first, the last being the end of the window.
+        """
+        if self.watermark is None:
+            self.watermark = times[0]
+        self.received_times.update(time for time in times if time > self.watermark)
+
+        data_times = self.data_times
+        if self.window_start is not None and self.watermark < self.window_start:
+            # The window does not reach back to the watermark
+            data_times = (
+                self.bucket_times(self.watermark, self.window_start) + data_times
             )
-            self.pricing = json.loads(message["Body"])
+        pending = [
+            data_time
+            for data_time in data_times
+            if data_time > self.watermark and data_time not in self.received_times
+        ]
+        if pending and self.latest_foreign_result(since=pending[-1]) is None:
+            return
+        self.watermark = times[-1]
+        self.received_times = {
+            time for time in self.received_times if time > self.watermark
+        }
+
+    def bucket_times(
+        self,
+        start: datetime.datetime,
+        end: datetime.datetime,
+    ) -> list[datetime.datetime]:
+        """The times of the buckets holding ticks from `start` until `end`."""
+        buckets = ForexData.fetch_columns(
+            instrument=self.instrument,
+            timescale=self.timescale,
+            start=start,
+            end=end,
+            table_name=self.table_name,
+        )
+        return [
+            bucket.replace(tzinfo=datetime.timezone.utc)
+            for bucket in buckets["time"].astype("datetime64[us]").tolist()
+        ]
+
+    def latest_foreign_result(
+        self,
+        since: datetime.datetime,
+    ) -> Optional[datetime.datetime]:
+        """The time of the latest result since `since` this replica did not save."""
+        rows = TimeScaleService().execute(
+            query="""SELECT max(time) AS time FROM indicator_results
+            WHERE component_name = %s AND time >= %s AND NOT time = ANY(%s)""",
+            params=(self.component_name, since, list(self.received_times)),
+        )
+        return rows[0]["time"] if rows else None
+
+    def data_time(self) -> datetime.datetime:
+        """The time of the freshest data point, which keys the result."""
+        times = [
+            datetime.datetime.fromisoformat(price["time"])
+            for price in self.pricing
+            if price.get("time")
+        ]
+        if times:
+            return max(times)
+        if self.origin_time is not None:
+            return self.origin_time
+        return datetime.datetime.now(datetime.timezone.utc)
+
+    def track_message_latency(self, message: dict):
+        """Record the queue latency and keep the origin time of a received message."""
+        sent_time = parse_time_attribute(message, SENT_TIME_ATTRIBUTE)
+        if sent_time is not None:
+            latency_tracker.record(stage="queue", origin_time=sent_time)
+
+        self.origin_time = parse_time_attribute(message, ORIGIN_TIME_ATTRIBUTE)
 
     def do_work(self) -> dict:
         """Calculate the value of the indicator."""
         raise NotImplementedError("Subclasses must implement this method.")
 
+    def nodes(self) -> dict[str, "Node"]:
+        """The outputs of the indicator as nodes of shared operators.
+
+        Returns:
+            dict[str, Node]: The node of every output column by name.
+        """
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def compute(self, data: "pd.DataFrame") -> "pd.DataFrame":
+        """Calculate the indicator over a whole price history at once.
+
+        By default the graph of `nodes` is evaluated on the columns of the data.
+
+        Args:
+            data (pd.DataFrame): The time and price of every bar, oldest first.
+
+        Returns:
+            pd.DataFrame: The data with the columns of the indicator added.
+        """
+        from foresight.indicator_services.operators import Graph
+
+        graph = Graph({self.component_name: self.nodes()})
+        outputs = graph.evaluate(
+            {name: data[name].to_numpy() for name in graph.sources()},
+        )
+        for name, values in outputs[self.component_name].items():
+            data[name] = values
+        return data
+
+    def signal(self, data: "pd.DataFrame") -> "np.ndarray":
+        """The position the indicator calls for after each bar of `compute`.
+
+        Returns:
+            np.ndarray: 1 for long, -1 for short and 0 for flat, per bar.
+        """
+        raise NotImplementedError(
+            "Subclasses must implement this method to be backtested.",
+        )
+
     def create_indicator_table(self):
         """Create a table in the data store."""
-        TimeScaleService().create_table(
-            query="""
-                CREATE TABLE IF NOT EXISTS indicator_results (
-                component_name VARCHAR(255) NOT NULL,
-                time TIMESTAMPTZ NOT NULL,
-                value TEXT NOT NULL,
-                PRIMARY KEY (component_name, time)
-            )""",
-            hyper_table_name="indicator_results",
-            hyper_table_column="time",
-        )
-
-    def save_indicator_results(self, value: str):
-        """Save the results of the indicator."""
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        migrate(schema="indicator_results")
+        LatencyMetric.create_table()
+        if not self.checkpoint_path:
+            IndicatorCheckpoint.create_table()
+
+    def save_indicator_results(
+        self,
+        value: str,
+        time: Optional[datetime.datetime] = None,
+        component_name: Optional[str] = None,
+    ):
+        """Save the results of the indicator.
+
+        Args:
+            value (str): The result as JSON.
+            time (Optional[datetime.datetime]): The time of the data the result
+                was calculated from, the time of the pricing data by default.
+            component_name (Optional[str]): The component the result is of,
+                this indicator by default.
+        """
         TimeScaleService().execute(
-            query=f"""
-                INSERT INTO indicator_results (component_name, time, value)
-                VALUES ('{self.component_name}', '{timestamp}', '{value}')
-            """,
+            query="""INSERT INTO indicator_results (component_name, time, value)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (component_name, time) DO UPDATE SET value = EXCLUDED.value""",
+            params=(
+                component_name or self.component_name,
+                time or self.data_time(),
+                value,
+            ),
+        )
+        logger.info(
+            f"Saved indicator results for {component_name or self.component_name}",
         )
-        logger.info(f"Saved indicator results for {self.component_name}")
+
+        if self.origin_time is not None:
+            latency_tracker.record(stage="indicator", origin_time=self.origin_time)
+
+    def save_results(self, result):
+        """Save the result of `do_work` as compact JSON."""
+        self.save_indicator_results(value=json.dumps(result, separators=(",", ":")))
 
     def format_pricing_data(self) -> dict:
         """'Calculate the all price data for the instrument as a list of json objects"""
+        import pandas as pd
 
         data = pd.DataFrame(self.pricing)
 
@@ -129,17 +453,120 @@ class Indicator:
 
         self.pricing = data.to_dict("records")
 
-    def schedule_work(self):
-        """Scheduled for every minute."""
-        self.create_indicator_table()
-        while True:
-            self.pull_from_queue()
+    def checkpoint(self):
+        """Store the watermark and the last result of the replica."""
+        checkpoint = IndicatorCheckpoint(
+            component_name=self.component_name,
+            replica=self.replica,
+            time=datetime.datetime.now(datetime.timezone.utc),
+            watermark=self.watermark,
+            result=self.last_result,
+        )
+        if self.checkpoint_path:
+            checkpoint.write(self.checkpoint_path)
+        else:
+            checkpoint.insert()
+        self.checkpoint_time = time.monotonic()
+        logger.info(
+            "Checkpointed %s (%s) at watermark %s",
+            self.component_name,
+            self.replica,
+            self.watermark,
+        )
+
+    def checkpoint_if_due(self):
+        """Checkpoint once the checkpoint interval has passed."""
+        if time.monotonic() - self.checkpoint_time < self.checkpoint_interval:
+            return
+        try:
+            self.checkpoint()
+        except Exception as checkpoint_exception:  # pylint: disable=broad-except
+            logger.error("Failed to checkpoint: %s", checkpoint_exception)
 
-            if len(self.pricing) > 0:
-                self.format_pricing_data()
+    def restore_checkpoint(self) -> bool:
+        """Resume from the last checkpoint of the replica, if there is one.
 
-                result = self.do_work()
+        Returns:
+            bool: Whether a checkpoint was restored.
+        """
+        if self.checkpoint_path:
+            checkpoint = IndicatorCheckpoint.read(
+                self.checkpoint_path,
+                self.component_name,
+                self.replica,
+            )
+        else:
+            checkpoint = IndicatorCheckpoint.fetch(self.component_name, self.replica)
+        if checkpoint is None:
+            return False
 
-                self.save_indicator_results(value=json.dumps(result))
+        self.watermark = checkpoint.watermark
+        self.last_result = checkpoint.result
+        self.checkpoint_time = time.monotonic()
+        logger.info(
+            "Restored %s (%s) from its checkpoint of %s at watermark %s",
+            self.component_name,
+            self.replica,
+            checkpoint.time,
+            self.watermark,
+        )
+        return True
 
-            time.sleep(5)
+    def process_messages(self, messages: list[dict]) -> bool:
+        """Calculate and save the indicator of a batch, then delete its messages.
+
+        The lease of the messages is extended while the indicator is calculated.
+        On failure the messages are released for another attempt. Batches of
+        consumed prices only are deleted without calculating the indicator.
+
+        Returns:
+            bool: Whether the batch was processed.
+        """
+        lease = MessageLease(
+            queue_url=self.queue_url,
+            receipt_handles=[message["ReceiptHandle"] for message in messages],
+            visibility_timeout=self.visibility_timeout,
+        )
+        try:
+            with lease:
+                times = self.load_messages(messages)
+                if times:
+                    self.load_window(end=times[-1])
+                    if self.pricing:
+                        self.format_pricing_data()
+                        result = self.do_work()
+                        self.save_results(result)
+                        self.last_result = result
+                    self.advance_watermark(times)
+        except Exception as work_exception:  # pylint: disable=broad-except
+            logger.error("Failed to process messages: %s", work_exception)
+            lease.release()
+            return False
+
+        self.delete_messages(messages)
+        self.checkpoint_if_due()
+        return True
+
+    def work_once(self) -> int:
+        """Pull and process one batch of messages.
+
+        Returns:
+            int: The number of messages processed.
+        """
+        messages = self.pull_from_queue()
+        if messages and self.process_messages(messages):
+            return len(messages)
+        return 0
+
+    def schedule_work(self):
+        """Process batches as they arrive, waiting for messages with long polling.
+
+        The indicator resumes from its checkpoint and checkpoints when it stops.
+        """
+        self.create_indicator_table()
+        self.restore_checkpoint()
+        try:
+            while True:
+                self.work_once()
+        finally:
+            self.checkpoint()
@@ -0,0 +1,116 @@
+"""Indicators on the same feed evaluated as one graph of shared operators."""
+
+import json
+from typing import TYPE_CHECKING
+
+from foresight.indicator_services.indicator import Indicator
+from foresight.indicator_services.operators import Graph
+from foresight.utils.logger import generate_logger
+
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+logger = generate_logger(name=__name__)
+
+
+class IndicatorGroup(Indicator):
+    """Consumes one feed for many indicators, sharing their operators.
+
+    The nodes of every member are merged into one graph, so an operator
+    declared by several members (e.g. the rolling sum of the price behind
+    moving averages and Bollinger bands of the same window) is evaluated once
+    per window update. Each member's result is saved under its own component
+    name. Members are built with `subscribe=False`, the group holds the queue.
+
+    Args:
+        component_name (str): The name of the group and of its queue.
+        indicators (list[Indicator]): The members, which implement `nodes`.
+        instrument (str): The instrument to subscribe to.
+        timescale (str): The timescale to subscribe to.
+        order_type (str): The price to subscribe to.
+        **kwargs: The other arguments of `Indicator`.
+    """
+
+    def __init__(
+        self,
+        component_name: str,
+        indicators: list[Indicator],
+        instrument: str,
+        timescale: str,
+        order_type: str = "mid",
+        **kwargs,
+    ):
+        names = [indicator.component_name for indicator in indicators]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Component names must be unique, got {names}.")
+
+        self.indicators = indicators
+        self.graph = Graph(
+            {indicator.component_name: indicator.nodes() for indicator in indicators},
+        )
+        logger.info(
+            "Grouped %s indicators into %s unique operators",
+            len(indicators),
+            len(self.graph),
+        )
+        super().__init__(
+            component_name=component_name,
+            instrument=instrument,
+            timescale=timescale,
+            order_type=order_type,
+            **kwargs,
+        )
+
+    def compute_all(self, data: "pd.DataFrame") -> dict[str, "pd.DataFrame"]:
+        """Evaluate the graph once and return the data of every member.
+
+        Args:
+            data (pd.DataFrame): The time and price of every bar, oldest first.
+
+        Returns:
+            dict[str, pd.DataFrame]: The data with the columns of each member.
+        """
+        sources = {name: data[name].to_numpy() for name in self.graph.sources()}
+        outputs = self.graph.evaluate(sources)
+        return {name: data.assign(**columns) for name, columns in outputs.items()}
+
+    def do_work(self) -> dict:
+        """The records of every member with all of its columns, by component name."""
+        import pandas as pd
+
+        return {
+            name: data.dropna().to_dict("records")
+            for name, data in self.compute_all(pd.DataFrame(self.pricing)).items()
+        }
+
+    def save_results(self, result: dict):
+        """Save the result of every member under its own component name."""
+        for name, records in result.items():
+            self.save_indicator_results(
+                value=json.dumps(records, separators=(",", ":")),
+                component_name=name,
+            )
+
+
+if __name__ == "__main__":
+    from foresight.indicator_services.bollinger_bands_indicator import (
+        BollingerBandsIndicator,
+    )
+    from foresight.indicator_services.moving_average_indicator import (
+        MovingAverageIndicator,
+    )
+
+    members = [
+        MovingAverageIndicator("EUR_USD", "M", "mid", fast=2, slow=5, subscribe=False),
+        BollingerBandsIndicator("EUR_USD", "M", "mid", window=5, subscribe=False),
+    ]
+    group = IndicatorGroup(
+        component_name="indicator_group",
+        indicators=members,
+        instrument="EUR_USD",
+        timescale="M",
+        order_type="mid",
+    )
+    group.schedule_work()
@@ -0,0 +1,105 @@
+"""Visibility leases keeping received SQS messages hidden while they are processed."""
+
+import threading
+from typing import TYPE_CHECKING
+from typing import Optional
+
+from foresight.utils.aws import get_client
+from foresight.utils.logger import generate_logger
+
+
+if TYPE_CHECKING:
+    from boto3_type_annotations.sqs import Client
+
+
+logger = generate_logger(name=__name__)
+
+
+class MessageLease:
+    """Extends the visibility timeout of received messages until released.
+
+    A received message stays hidden from the other workers of the queue for its
+    visibility timeout. The lease renews the timeout from a background thread
+    every `interval` seconds, so a long `do_work` call does not let another
+    replica receive the same messages. Used as a context manager around the
+    processing of the messages.
+
+    Args:
+        queue_url (str): The queue the messages were received from.
+        receipt_handles (list[str]): The receipt handles of the messages.
+        visibility_timeout (int): Seconds the messages stay hidden after each renewal.
+        interval (Optional[float]): Seconds between renewals, half the timeout by default.
+    """
+
+    def __init__(
+        self,
+        queue_url: str,
+        receipt_handles: list[str],
+        visibility_timeout: int = 30,
+        interval: Optional[float] = None,
+    ):
+        if visibility_timeout < 1:
+            raise ValueError(
+                f"Visibility timeout must be at least 1, got {visibility_timeout}.",
+            )
+
+        self.queue_url = queue_url
+        self.receipt_handles = receipt_handles
+        self.visibility_timeout = visibility_timeout
+        self.interval = visibility_timeout / 2 if interval is None else interval
+
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.extensions = 0
+
+    def change_visibility(self, visibility_timeout: int):
+        """Set the visibility timeout of every message of the lease."""
+        sqsClient: Client = get_client("sqs")
+        # The batch API accepts at most 10 entries per call
+        for start in range(0, len(self.receipt_handles), 10):
+            sqsClient.change_message_visibility_batch(
+                QueueUrl=self.queue_url,
+                Entries=[
+                    {
+                        "Id": str(index),
+                        "ReceiptHandle": receipt_handle,
+                        "VisibilityTimeout": visibility_timeout,
+                    }
+                    for index, receipt_handle in enumerate(
+                        self.receipt_handles[start:][:10],
+                    )
+                ],
+            )
+
+    def run(self):
+        """Renew the visibility timeout until the lease is stopped."""
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.change_visibility(self.visibility_timeout)
+                self.extensions += 1
+            except Exception as lease_exception:  # pylint: disable=broad-except
+                logger.error("Failed to extend message lease: %s", lease_exception)
+                return
+
+    def __enter__(self) -> "MessageLease":
+        self.stop_event.clear()
+        self.thread = threading.Thread(
+            target=self.run,
+            name="message-lease",
+            daemon=True,
+        )
+        self.thread.start()
+        return self
+
+    def __exit__(self, *_):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def release(self):
+        """Make the messages visible again right away, e.g. after a failure."""
+        try:
+            self.change_visibility(0)
+        except Exception as release_exception:  # pylint: disable=broad-except
+            logger.error("Failed to release messages: %s", release_exception)
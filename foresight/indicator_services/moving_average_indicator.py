@@ -1,11 +1,19 @@
 """Moving average indicator class"""
 
-import pandas as pd
+from typing import TYPE_CHECKING
 
 from foresight.indicator_services.indicator import Indicator
+from foresight.indicator_services.operators import Node
+from foresight.indicator_services.operators import rolling_mean
+from foresight.indicator_services.operators import source
 from foresight.utils.logger import generate_logger
 
 
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+
 logger = generate_logger(name=__name__)
 
 
@@ -15,32 +23,59 @@ class MovingAverageIndicator(Indicator):
     Parameters:
         instrument (str): The instrument to fetch
         timescale (str): The timescale to fetch (M = minutes, H = hours, D = days)
+        order_type (str): The price to subscribe to
+        fast (int): The window of the fast moving average
+        slow (int): The window of the slow moving average
+        subscribe (bool): Whether to create the queue and subscription
+        component_name (str): The name of the indicator and of its queue
     """
 
-    def __init__(self, instrument: str, timescale: str, order_type: str):
+    def __init__(
+        self,
+        instrument: str,
+        timescale: str,
+        order_type: str,
+        fast: int = 2,
+        slow: int = 5,
+        subscribe: bool = True,
+        component_name: str = "moving_average",
+    ):
+        self.fast = fast
+        self.slow = slow
         super().__init__(
-            component_name="moving_average",
+            component_name=component_name,
             instrument=instrument,
             timescale=timescale,
             order_type=order_type,
+            subscribe=subscribe,
         )
 
     def do_work(self) -> dict:
         """Calculates bullishness or bearishness based on moving averages."""
-        data = pd.DataFrame(self.pricing)
-
-        # Slow and fast moving averages on the price
-        fast = 2
-        slow = 5
+        import pandas as pd
 
-        data["ma_fast"] = data["price"].rolling(window=fast).mean()
-        data["ma_slow"] = data["price"].rolling(window=slow).mean()
+        data = self.compute(pd.DataFrame(self.pricing))
 
         # Drop nulls
         data = data.dropna()
 
         return data.to_dict("records")
 
+    def nodes(self) -> dict[str, Node]:
+        """The slow and fast moving averages of the price."""
+        price = source("price")
+        return {
+            "ma_fast": rolling_mean(price, self.fast),
+            "ma_slow": rolling_mean(price, self.slow),
+        }
+
+    def signal(self, data: "pd.DataFrame") -> "np.ndarray":
+        """Long while the fast average is above the slow one, short while below."""
+        import numpy as np
+
+        spread = (data["ma_fast"] - data["ma_slow"]).to_numpy()
+        return np.nan_to_num(np.sign(spread))
+
 
 if __name__ == "__main__":
     maInd = MovingAverageIndicator(
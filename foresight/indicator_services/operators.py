@@ -0,0 +1,253 @@
+"""Reusable operators indicators are declared from, evaluated as a shared graph.
+
+An indicator declares its outputs as nodes built from operators, e.g.
+
+    price = source("price")
+    {"ma_fast": rolling_mean(price, 5), "ma_slow": rolling_mean(price, 20)}
+
+Nodes are identified by their operator, inputs and parameters, so the same
+operator on the same input declared by several indicators is one node of the
+graph and is evaluated once per update.
+"""
+
+from operator import add
+from operator import mul
+from operator import sub
+from operator import truediv
+from typing import TYPE_CHECKING
+from typing import Callable
+from typing import Union
+
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class Node:
+    """An operator applied to the outputs of other nodes.
+
+    Nodes with the same operator, inputs and parameters are equal, whoever
+    built them. Arithmetic between nodes (or a node and a number) builds nodes.
+
+    Args:
+        operator (str): The name of the operator in OPERATORS.
+        inputs (tuple[Node, ...]): The nodes the operator is applied to.
+        **params: The parameters of the operator.
+    """
+
+    def __init__(self, operator: str, inputs: tuple["Node", ...] = (), **params):
+        if operator != "source" and operator not in OPERATORS:
+            raise ValueError(f"Unknown operator: '{operator}'.")
+        self.operator = operator
+        self.inputs = inputs
+        self.params = params
+        self.key = (
+            operator,
+            tuple(node.key for node in inputs),
+            tuple(sorted(params.items())),
+        )
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Node) and self.key == other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __repr__(self) -> str:
+        arguments = [repr(node) for node in self.inputs]
+        arguments += [f"{name}={value!r}" for name, value in self.params.items()]
+        return f"{self.operator}({', '.join(arguments)})"
+
+    def __add__(self, other: Union["Node", float]) -> "Node":
+        return Node("add", (self, as_node(other)))
+
+    def __sub__(self, other: Union["Node", float]) -> "Node":
+        return Node("sub", (self, as_node(other)))
+
+    def __mul__(self, other: Union["Node", float]) -> "Node":
+        return Node("mul", (self, as_node(other)))
+
+    def __truediv__(self, other: Union["Node", float]) -> "Node":
+        return Node("div", (self, as_node(other)))
+
+    __radd__ = __add__
+    __rmul__ = __mul__
+
+
+def as_node(value: Union[Node, float]) -> Node:
+    """A node, numbers becoming constants."""
+    return value if isinstance(value, Node) else Node("constant", value=float(value))
+
+
+def source(name: str = "price") -> Node:
+    """A column of the input data, e.g. the price."""
+    return Node("source", name=name)
+
+
+def returns(node: Node) -> Node:
+    """The change of the values relative to the previous value."""
+    return Node("returns", (node,))
+
+
+def rolling_sum(node: Node, window: int) -> Node:
+    """The sum of the last `window` values."""
+    return Node("rolling_sum", (node,), window=window)
+
+
+def rolling_mean(node: Node, window: int) -> Node:
+    """The mean of the last `window` values, sharing the rolling sum."""
+    return rolling_sum(node, window) * (1 / window)
+
+
+def rolling_variance(node: Node, window: int) -> Node:
+    """The sample variance of the last `window` values."""
+    return Node("rolling_variance", (node,), window=window)
+
+
+def rolling_std(node: Node, window: int) -> Node:
+    """The sample standard deviation of the last `window` values."""
+    return Node("sqrt", (rolling_variance(node, window),))
+
+
+def ema(node: Node, span: int) -> Node:
+    """The exponential moving average with a smoothing of 2 / (span + 1)."""
+    return Node("ema", (node,), span=span)
+
+
+def compute_constant(value: float) -> "np.float64":
+    """A constant, broadcast against the arrays it is combined with."""
+    import numpy as np
+
+    return np.float64(value)
+
+
+def compute_sqrt(values: "np.ndarray") -> "np.ndarray":
+    """The square root of every value."""
+    import numpy as np
+
+    return np.sqrt(values)
+
+
+def compute_returns(values: "np.ndarray") -> "np.ndarray":
+    """The change of every value relative to the previous one, NaN first."""
+    import numpy as np
+
+    result = np.full(len(values), np.nan)
+    result[1:] = values[1:] / values[:-1] - 1
+    return result
+
+
+def compute_rolling_sum(values: "np.ndarray", window: int) -> "np.ndarray":
+    """Rolling sums, compensated for rounding by pandas."""
+    import pandas as pd
+
+    return pd.Series(values).rolling(window=window).sum().to_numpy()
+
+
+def compute_rolling_variance(values: "np.ndarray", window: int) -> "np.ndarray":
+    """Rolling sample variances."""
+    import pandas as pd
+
+    return pd.Series(values).rolling(window=window).var().to_numpy()
+
+
+def compute_ema(values: "np.ndarray", span: int) -> "np.ndarray":
+    """The exponential moving average, skipping NaN."""
+    import pandas as pd
+
+    return pd.Series(values).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+# Operator name -> function of the input values and the parameters, sources
+# are read from the input data instead. numpy is imported on first evaluation
+OPERATORS: dict[str, Callable[..., "np.ndarray"]] = {
+    "constant": compute_constant,
+    "add": add,
+    "sub": sub,
+    "mul": mul,
+    "div": truediv,
+    "sqrt": compute_sqrt,
+    "returns": compute_returns,
+    "rolling_sum": compute_rolling_sum,
+    "rolling_variance": compute_rolling_variance,
+    "ema": compute_ema,
+}
+
+
+class Graph:
+    """The outputs of many indicators as one graph of unique nodes.
+
+    Args:
+        outputs (dict[str, dict[str, Node]]): The output nodes of every
+            indicator by name, more can be added with `add`.
+    """
+
+    def __init__(self, outputs: dict[str, dict[str, Node]] = None):
+        self.outputs: dict[str, dict[str, Node]] = {}
+        self.nodes: list[Node] = []
+        self.keys: set[tuple] = set()
+        self.evaluations = 0
+        for name, nodes in (outputs or {}).items():
+            self.add(name, nodes)
+
+    def add(self, name: str, outputs: dict[str, Node]):
+        """Add the output nodes of an indicator, keeping nodes already in the graph."""
+        self.outputs[name] = outputs
+        for node in outputs.values():
+            self.visit(node)
+
+    def visit(self, node: Node):
+        """Add a node after its inputs, unless it is already in the graph."""
+        if node.key in self.keys:
+            return
+        for input_node in node.inputs:
+            self.visit(input_node)
+        self.keys.add(node.key)
+        self.nodes.append(node)
+
+    def sources(self) -> list[str]:
+        """The names of the input columns the graph reads."""
+        return [node.params["name"] for node in self.nodes if node.operator == "source"]
+
+    def evaluate(
+        self,
+        sources: dict[str, "np.ndarray"],
+    ) -> dict[str, dict[str, "np.ndarray"]]:
+        """Evaluate every unique node once, inputs first.
+
+        Args:
+            sources (dict[str, np.ndarray]): The input columns, e.g. the price.
+
+        Returns:
+            dict[str, dict[str, np.ndarray]]: The outputs of every indicator.
+        """
+        import numpy as np
+
+        values: dict[tuple, np.ndarray] = {}
+        for node in self.nodes:
+            if node.operator == "source":
+                values[node.key] = np.asarray(
+                    sources[node.params["name"]],
+                    dtype=np.float64,
+                )
+            else:
+                inputs = [values[input_node.key] for input_node in node.inputs]
+                values[node.key] = OPERATORS[node.operator](*inputs, **node.params)
+            self.evaluations += 1
+
+        return {
+            name: {output: values[node.key] for output, node in outputs.items()}
+            for name, outputs in self.outputs.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+
+def count_operators(outputs: list[dict[str, Node]]) -> int:
+    """The number of nodes the outputs would evaluate without sharing."""
+
+    def size(node: Node) -> int:
+        return 1 + sum(size(input_node) for input_node in node.inputs)
+
+    return sum(size(node) for nodes in outputs for node in nodes.values())
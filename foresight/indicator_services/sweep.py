@@ -0,0 +1,260 @@
+"""Parameter sweeps of indicators over a price history, ranked by their backtests.
+
+Every combination of a grid of parameters is backtested across a process
+pool and the results are returned as a table, best first:
+
+    python -m foresight.indicator_services.sweep --fast 2 100 --slow 3 101 --processes 8
+
+Moving average crossovers are swept from one cumulative sum of the prices,
+which gives the moving average of any window in two vector operations, so
+all window lengths share one pass over the history. The positions, returns
+and statistics of every combination still take a few passes over the
+history each, about 20 ms per combination over a calendar year of minute
+bars, so a 100 by 100 grid is about 100 s of CPU time divided across the
+pool. Other indicators are backtested one combination at a time with
+`run_backtest`.
+"""
+
+import argparse
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from foresight.indicator_services.backtest import load_indicator
+from foresight.indicator_services.backtest import load_prices
+from foresight.indicator_services.backtest import run_backtest
+from foresight.indicator_services.backtest import summarize
+from foresight.indicator_services.indicator import Indicator
+from foresight.indicator_services.moving_average_indicator import MovingAverageIndicator
+from foresight.utils.logger import generate_logger
+
+
+logger = generate_logger(name=__name__)
+
+# Statistics ranked in ascending order, the others best first when descending
+ASCENDING_STATISTICS = ("max_drawdown",)
+
+# The prices and settings of the sweep in a worker process, set by init_worker
+worker_state: dict = {}
+
+
+def init_worker(prices: np.ndarray, timescale: str, cost: float, indicator_path: str):
+    """Keep the prices and settings of the sweep in the worker process.
+
+    They are sent once per worker instead of once per task. For moving
+    averages the cumulative sum of the prices is computed once here.
+    """
+    worker_state.clear()
+    worker_state.update(
+        prices=prices,
+        timescale=timescale,
+        cost=cost,
+        indicator_path=indicator_path,
+        # Summed relative to the first price, which keeps the sums small
+        cumulative=np.concatenate(([0.0], np.cumsum(prices - prices[0]))),
+        bar_return=np.concatenate(([0.0], prices[1:] / prices[:-1] - 1)),
+    )
+
+
+def moving_average(cumulative: np.ndarray, window: int) -> np.ndarray:
+    """The moving average of every full window, from the cumulative sum.
+
+    Element i is the mean of the prices i to i + window - 1, less the first
+    price, which cancels out of the difference of two moving averages.
+    """
+    return (cumulative[window:] - cumulative[:-window]) / window
+
+
+def sweep_moving_average_fast(fast: int, slows: Sequence[int]) -> list[dict]:
+    """Backtest a fast window against every slow window in a worker process.
+
+    Returns:
+        list[dict]: The parameters and statistics of every combination.
+    """
+    cumulative = worker_state["cumulative"]
+    bar_return = worker_state["bar_return"]
+    timescale, cost = worker_state["timescale"], worker_state["cost"]
+    bars = len(bar_return)
+
+    fast_average = moving_average(cumulative, fast)
+    results = []
+    for slow in slows:
+        if slow <= fast or slow > bars:
+            continue
+
+        # Positions are flat until the slow average has a full window, and
+        # small integers to keep the passes over the history cheap
+        first, offset = slow - 1, slow - fast
+        position = np.zeros(bars, dtype=np.int8)
+        position[first:] = np.sign(
+            fast_average[offset:] - moving_average(cumulative, slow),
+        )
+        held = np.roll(position, 1)
+        held[0] = 0
+        turnover = np.abs(np.diff(position, prepend=np.int8(0)))
+        strategy_return = held * bar_return
+        if cost:
+            strategy_return -= cost * turnover
+
+        results.append(
+            {
+                "fast": fast,
+                "slow": slow,
+                **summarize(strategy_return, held, turnover, timescale),
+            },
+        )
+    return results
+
+
+def backtest_params(params_list: list[dict]) -> list[dict]:
+    """Backtest an indicator with every set of parameters in a worker process."""
+    indicator_class = load_indicator(worker_state["indicator_path"])
+    results = []
+    for params in params_list:
+        result = run_backtest(
+            indicator_class,
+            worker_state["prices"],
+            timescale=worker_state["timescale"],
+            cost=worker_state["cost"],
+            **params,
+        )
+        results.append({**params, **result.model_dump()})
+    return results
+
+
+def parameter_grid(grid: dict[str, Sequence]) -> list[dict]:
+    """Every combination of the values of the parameters."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+def sweep(
+    indicator_class: type[Indicator],
+    prices: np.ndarray,
+    grid: dict[str, Sequence],
+    timescale: str = "M",
+    cost: float = 0.0,
+    processes: Optional[int] = None,
+    rank_by: str = "sharpe",
+    start_method: str = "spawn",
+) -> pd.DataFrame:
+    """Backtest every combination of a grid of parameters and rank them.
+
+    Args:
+        indicator_class (type[Indicator]): The indicator to sweep, defined at
+            module level so worker processes can import it.
+        prices (np.ndarray): The prices, oldest first.
+        grid (dict[str, Sequence]): The values of every parameter, e.g.
+            `{"fast": range(2, 102), "slow": range(3, 103)}`.
+        timescale (str): The timescale of the bars (S, M, H or D).
+        cost (float): The cost of changing the position by one, as a
+            fraction of the price.
+        processes (Optional[int]): Worker processes, SWEEP_PROCESSES or the
+            number of CPUs by default. With 1 the sweep runs in this process.
+        rank_by (str): The statistic the table is sorted by, best first.
+        start_method (str): The multiprocessing start method.
+
+    Returns:
+        pd.DataFrame: The parameters and backtest statistics of every
+            combination, best first. Moving averages whose fast window is not
+            shorter than the slow one are skipped, and the table is empty
+            without at least two prices to trade on.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    if len(prices) < 2:
+        logger.warning("Not enough prices to sweep: %s", len(prices))
+        return pd.DataFrame()
+
+    processes = processes or int(os.getenv("SWEEP_PROCESSES") or os.cpu_count() or 1)
+    indicator_path = f"{indicator_class.__module__}:{indicator_class.__qualname__}"
+
+    if indicator_class is MovingAverageIndicator and set(grid) == {"fast", "slow"}:
+        # One task per fast window, each sharing the cumulative sum across slow windows
+        function = sweep_moving_average_fast
+        tasks = [(fast, list(grid["slow"])) for fast in grid["fast"]]
+    else:
+        combinations = parameter_grid(grid)
+        chunk = max(1, len(combinations) // (processes * 4))
+        function = backtest_params
+        tasks = [
+            (combinations[index:][:chunk],)
+            for index in range(0, len(combinations), chunk)
+        ]
+
+    initargs = (prices, timescale, cost, indicator_path)
+    if processes == 1:
+        init_worker(*initargs)
+        chunks = [function(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=init_worker,
+            initargs=initargs,
+        ) as executor:
+            chunks = list(executor.map(function, *zip(*tasks)))
+
+    table = pd.DataFrame([row for rows in chunks for row in rows])
+    if table.empty:
+        return table
+
+    logger.info(
+        "Swept %s combinations of %s over %s bars",
+        len(table),
+        indicator_class.__name__,
+        len(prices),
+    )
+    return table.sort_values(
+        rank_by,
+        ascending=rank_by in ASCENDING_STATISTICS,
+        kind="stable",
+    ).reset_index(drop=True)
+
+
+def main():
+    """Run a moving average sweep and print the best combinations."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--instrument", default="EUR_USD")
+    parser.add_argument("--timescale", default="M")
+    parser.add_argument("--order-type", default="mid")
+    parser.add_argument("--parquet-root", default=None)
+    parser.add_argument("--fast", type=int, nargs=2, default=[2, 20], help="start stop")
+    parser.add_argument(
+        "--slow",
+        type=int,
+        nargs=2,
+        default=[5, 100],
+        help="start stop",
+    )
+    parser.add_argument("--cost", type=float, default=0.0)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--rank-by", default="sharpe")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    prices = load_prices(
+        instrument=args.instrument,
+        timescale=args.timescale,
+        order_type=args.order_type,
+        parquet_root=args.parquet_root,
+    )
+    table = sweep(
+        MovingAverageIndicator,
+        prices["price"].to_numpy(),
+        grid={"fast": range(*args.fast), "slow": range(*args.slow)},
+        timescale=args.timescale,
+        cost=args.cost,
+        processes=args.processes,
+        rank_by=args.rank_by,
+    )
+    print(table.head(args.top).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,21 @@
 # app.py
 
-import json
 import os
+from typing import Any
 
 import dotenv
 from flask import Flask
-from flask import jsonify
+from flask import Response
 from flask import render_template
+from flask import request
 
+from foresight.interface_service.serialization import JSON_MIMETYPE
+from foresight.interface_service.serialization import encode
+from foresight.interface_service.serialization import latest_payload
+from foresight.interface_service.serialization import negotiate_mimetype
 from foresight.utils.database import TimeScaleService
 from foresight.utils.logger import generate_logger
+from foresight.utils.models.latency_metric import LatencyMetric
 
 
 app = Flask(__name__)
@@ -19,15 +25,35 @@ dotenv.load_dotenv()
 
 logger = generate_logger(name=__name__)
 
+# Latest stored result of every indicator
+LATEST_QUERY = """SELECT DISTINCT ON (component_name) component_name, value
+    FROM indicator_results
+    ORDER BY component_name, time DESC
+"""
+
 
 def get_latest() -> list[dict]:
     """Get latest value for each indicator."""
-    return TimeScaleService().execute(
-        query="""SELECT DISTINCT ON (component_name) component_name, value
-            FROM indicator_results
-            ORDER BY component_name, time DESC
-        """,
-    )
+    return TimeScaleService().execute(query=LATEST_QUERY)
+
+
+def respond(payload: Any, mimetype: str = JSON_MIMETYPE) -> Response:
+    """Encode the payload and compress it with the best encoding the client accepts.
+
+    Args:
+        payload (Any): The value to send, or a body already encoded as JSON.
+        mimetype (str): The content type of the response.
+
+    Returns:
+        Response: The response.
+    """
+    body, encoding = encode(payload, request.headers.get("Accept-Encoding"))
+
+    response = Response(body, mimetype=mimetype)
+    if encoding is not None:
+        response.headers["Content-Encoding"] = encoding
+    response.vary.update(["Accept", "Accept-Encoding"])
+    return response
 
 
 @app.route("/")
@@ -44,16 +70,27 @@ def sma():
 
 @app.route("/latest", methods=["GET"])
 def get_latest_data():
-    """Get the latest data."""
+    """Get the latest data in the shape the client asked for."""
     data = get_latest()
-    results = {}
-    for row in data:
-        results[row["component_name"]] = json.loads(row["value"])
 
-    if data:
-        return jsonify(results)
+    if not data:
+        return respond({"error": "No data available"})
+
+    mimetype = negotiate_mimetype(request.headers.get("Accept"))
+    return respond(latest_payload(data, mimetype), mimetype=mimetype)
+
+
+@app.route("/latency", methods=["GET"])
+def get_latency_data():
+    """Get the latest latency percentiles for each pipeline stage."""
+    metrics = LatencyMetric.fetch_latest()
+
+    if metrics:
+        return respond(
+            {metric.stage: metric.model_dump(mode="json") for metric in metrics},
+        )
     else:
-        return jsonify({"error": "No data available"})
+        return respond({"error": "No data available"})
 
 
 if __name__ == "__main__":
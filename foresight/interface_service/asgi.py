@@ -0,0 +1,132 @@
+"""ASGI variant of the interface service with async database access.
+
+Serves the same routes and templates as the Flask app. Queries run on an
+async connection pool and the latest results are shared between concurrent
+requests, so one process holds thousands of dashboard connections. Run with
+any ASGI server, e.g.:
+
+    uvicorn foresight.interface_service.asgi:app --workers 4
+"""
+
+import os
+from contextlib import asynccontextmanager
+from typing import Any
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+from starlette.templating import Jinja2Templates
+
+from foresight.interface_service.app import LATEST_QUERY
+from foresight.interface_service.app import app as flask_app
+from foresight.interface_service.serialization import JSON_MIMETYPE
+from foresight.interface_service.serialization import encode
+from foresight.interface_service.serialization import latest_payload
+from foresight.interface_service.serialization import negotiate_mimetype
+from foresight.utils.async_database import AsyncTimeScalePool
+from foresight.utils.async_database import SharedResult
+from foresight.utils.logger import generate_logger
+from foresight.utils.models.latency_metric import LatencyMetric
+
+
+logger = generate_logger(name=__name__)
+
+templates = Jinja2Templates(directory=os.path.join(flask_app.root_path, "templates"))
+
+database = AsyncTimeScalePool()
+
+# Seconds the latest results are shared between requests
+CACHE_TTL = float(os.getenv("INTERFACE_CACHE_TTL") or 1.0)
+
+
+async def fetch_latest() -> list[dict]:
+    """Get latest value for each indicator."""
+    return await database.execute(LATEST_QUERY)
+
+
+async def fetch_latency() -> list[LatencyMetric]:
+    """Get the latest latency percentiles for each pipeline stage."""
+    rows = await database.execute(LatencyMetric.latest_query())
+    return [LatencyMetric(**row) for row in rows]
+
+
+latest_results = SharedResult(fetch_latest, ttl=CACHE_TTL)
+latest_latency = SharedResult(fetch_latency, ttl=CACHE_TTL)
+
+
+def respond(request: Request, payload: Any, mimetype: str = JSON_MIMETYPE) -> Response:
+    """Encode the payload and compress it with the best encoding the client accepts."""
+    body, encoding = encode(payload, request.headers.get("Accept-Encoding"))
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type=mimetype, headers=headers)
+
+
+async def home(request: Request) -> Response:
+    """Render the home page."""
+    return templates.TemplateResponse(request, "index.html")
+
+
+async def sma(request: Request) -> Response:
+    """Render the simple-moving average page."""
+    return templates.TemplateResponse(request, "sma.html")
+
+
+async def get_latest_data(request: Request) -> Response:
+    """Get the latest data in the shape the client asked for."""
+    data = await latest_results.get()
+
+    if not data:
+        return respond(request, {"error": "No data available"})
+
+    mimetype = negotiate_mimetype(request.headers.get("Accept"))
+    return respond(request, latest_payload(data, mimetype), mimetype=mimetype)
+
+
+async def get_latency_data(request: Request) -> Response:
+    """Get the latest latency percentiles for each pipeline stage."""
+    metrics = await latest_latency.get()
+
+    if metrics:
+        return respond(
+            request,
+            {metric.stage: metric.model_dump(mode="json") for metric in metrics},
+        )
+    else:
+        return respond(request, {"error": "No data available"})
+
+
+@asynccontextmanager
+async def lifespan(_: Starlette):
+    """Open the database pool for the lifetime of the server."""
+    await database.open()
+    try:
+        yield
+    finally:
+        await database.close()
+
+
+app = Starlette(
+    debug=os.getenv("APP_DEBUG", "False").lower() == "true",
+    routes=[
+        Route("/", home),
+        Route("/sma", sma),
+        Route("/latest", get_latest_data, methods=["GET"]),
+        Route("/latency", get_latency_data, methods=["GET"]),
+    ],
+    lifespan=lifespan,
+)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(
+        "foresight.interface_service.asgi:app",
+        host=os.getenv("INTERFACE_HOST") or "127.0.0.1",
+        port=int(os.getenv("INTERFACE_PORT") or 8000),
+        workers=int(os.getenv("INTERFACE_WORKERS") or 1),
+    )
@@ -0,0 +1,136 @@
+"""Encoding, shaping and compression of interface service responses."""
+
+import gzip
+import json
+import os
+from typing import Any
+from typing import Optional
+
+from werkzeug.datastructures import Accept
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+
+
+JSON_MIMETYPE = "application/json"
+# Values that are lists of records are sent as one array per field
+COLUMNS_MIMETYPE = "application/vnd.foresight.columns+json"
+
+# Brotli quality 4 compresses about as well as gzip 6 for a fraction of the CPU
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+# Smaller bodies are sent uncompressed, compressing them costs more than it saves
+COMPRESS_MIN_BYTES = int(os.getenv("INTERFACE_COMPRESS_MIN_BYTES") or 1024)
+
+
+def dumps(value: Any) -> bytes:
+    """Encode a value as compact JSON, with orjson when it is installed."""
+    try:
+        import orjson
+    except ImportError:
+        return json.dumps(value, separators=(",", ":")).encode()
+    return orjson.dumps(value)
+
+
+def loads(value: str) -> Any:
+    """Decode JSON, with orjson when it is installed."""
+    try:
+        import orjson
+    except ImportError:
+        return json.loads(value)
+    return orjson.loads(value)
+
+
+def raw_object(items: list[tuple[str, str]]) -> bytes:
+    """A JSON object of values that are already JSON encoded.
+
+    The values are spliced in as is, so stored results are sent without being
+    decoded and encoded again.
+    """
+    return (
+        b"{"
+        + b",".join(dumps(key) + b":" + value.encode() for key, value in items)
+        + b"}"
+    )
+
+
+def to_columns(value: Any) -> Any:
+    """Turn a list of records into one array per field.
+
+    Fields missing from a record are null. Any other value is returned as is.
+    """
+    if not isinstance(value, list) or not value:
+        return value
+    if not all(isinstance(record, dict) for record in value):
+        return value
+
+    fields = list(dict.fromkeys(field for record in value for field in record))
+    return {field: [record.get(field) for record in value] for field in fields}
+
+
+def supported_encodings() -> list[str]:
+    """Content encodings the service can produce, preferred first."""
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return ["gzip"]
+    return ["br", "gzip"]
+
+
+def compress(body: bytes, encoding: Optional[str]) -> bytes:
+    """Compress a body with a content encoding, or return it as is for None."""
+    if encoding is None:
+        return body
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    if encoding == "br":
+        import brotli
+
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    raise ValueError(f"Unsupported content encoding: '{encoding}'.")
+
+
+def negotiate_mimetype(accept: Optional[str]) -> str:
+    """The response shape preferred by an Accept header, JSON rows by default."""
+    best = parse_accept_header(accept, MIMEAccept).best_match(
+        [JSON_MIMETYPE, COLUMNS_MIMETYPE],
+    )
+    return best or JSON_MIMETYPE
+
+
+def negotiate_encoding(accept_encoding: Optional[str], size: int) -> Optional[str]:
+    """The content encoding of a body of the size for an Accept-Encoding header."""
+    if size < COMPRESS_MIN_BYTES:
+        return None
+    return parse_accept_header(accept_encoding, Accept).best_match(
+        supported_encodings(),
+    )
+
+
+def latest_payload(rows: list[dict], mimetype: str) -> Any:
+    """The latest value of every component in the shape of the mimetype.
+
+    Stored values are spliced in as they are, unless the columnar shape was
+    asked for.
+    """
+    if mimetype == COLUMNS_MIMETYPE:
+        return {row["component_name"]: to_columns(loads(row["value"])) for row in rows}
+    return raw_object([(row["component_name"], row["value"]) for row in rows])
+
+
+def encode(
+    payload: Any,
+    accept_encoding: Optional[str],
+) -> tuple[bytes, Optional[str]]:
+    """Encode a payload and compress it with the best accepted encoding.
+
+    Args:
+        payload (Any): The value to send, or a body already encoded as JSON.
+        accept_encoding (Optional[str]): The Accept-Encoding header of the request.
+
+    Returns:
+        tuple[bytes, Optional[str]]: The body and its content encoding, if any.
+    """
+    body = payload if isinstance(payload, bytes) else dumps(payload)
+    encoding = negotiate_encoding(accept_encoding, len(body))
+    return compress(body, encoding), encoding
@@ -2,39 +2,96 @@
 
 import json
 import os
-import traceback
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from datetime import timezone
 from random import random
 from time import sleep
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
 from typing import Optional
 from typing import Union
 
 import dotenv
-import requests
 
+from foresight.stream_service.bar_builder import BarBuilder
+from foresight.stream_service.conflation import Conflator
 from foresight.stream_service.models.stream import Stream
+from foresight.stream_service.tick_queue import TickQueue
+from foresight.utils.latency import LatencyTracker
+from foresight.utils.logger import SampledLogger
 from foresight.utils.logger import generate_logger
+from foresight.utils.models.forex_bar import ForexBar
 from foresight.utils.models.forex_data import ForexData
+from foresight.utils.models.latency_metric import LatencyMetric
 
 
 logger = generate_logger(__name__)
 dotenv.load_dotenv(".env")
 
+latency_tracker = LatencyTracker()
+
+# Per tick logging is sampled so it stays cheap on the ingest hot path
+tick_logger = SampledLogger(
+    logger,
+    every_n=int(os.getenv("LOG_TICK_EVERY_N") or 1),
+    max_per_second=float(os.getenv("LOG_TICK_MAX_PER_SECOND") or 0) or None,
+)
+
+
+def random_walk_lines(
+    sleep_between: Union[int, float],
+    instruments: list[str],
+    max_walk: int = -1,
+) -> Iterator[bytes]:
+    """Stream lines of random walk prices, one tick per instrument and walk."""
+    prices = {name: 1.0 for name in instruments}
+    walks_completed = 0
+
+    while True:
+        for name, price in prices.items():
+            prices[name] = price * (1.0 + (random() - 0.5) * 0.1)
+
+            record = Stream(
+                instrument=name,
+                time=datetime.now(timezone.utc),
+                bids=[{"price": round(prices[name], 5)}],
+                asks=[{"price": round(prices[name] + 0.0001, 5)}],
+            )
+            yield record.model_dump_json().encode("utf-8")
+
+        if max_walk > 0:
+            walks_completed += 1
+            if walks_completed >= max_walk:
+                break
+
+        sleep(sleep_between)
+
 
 def open_random_walk_stream(
     sleep_between: Union[int, float] = 5,
     instrument: str = "EUR_USD",
     max_walk: int = -1,
     table_name: str = "forex_data",
+    instruments: Optional[list[str]] = None,
+    on_tick: Optional[Callable[[Optional[ForexData]], None]] = None,
 ):
     """
     Open a random walk stream and send the data to the data store.
 
+    The ticks are ingested like those of the OANDA stream, through the
+    conflation, the bar builder and the writer thread.
+
     Args:
         sleep_between (Union[int, float]): The time to sleep between each record.
             Set to 0 if max_walk is defined.
+        instrument (str): The instrument to walk when instruments is not given.
         max_walk (int): The maximum number of walks to complete.
         table_name (str): The name of the table to send the data to.
+        instruments (Optional[list[str]]): The instruments to walk, one tick each per walk.
+        on_tick (Optional[Callable]): Called after every stored tick.
     """
 
     if max_walk > 0:
@@ -45,58 +102,253 @@ def open_random_walk_stream(
 {sleep_between} and max_walk: {max_walk}.""",
     )
 
-    initial_price = 1.0
-    walks_completed = 0
+    lines = random_walk_lines(sleep_between, instruments or [instrument], max_walk)
+    ingest_lines(lines, table_name=table_name, on_tick=on_tick)
 
-    while True:
-        initial_price = initial_price * (1.0 + (random() - 0.5) * 0.1)
 
-        record = ForexData(
-            instrument=instrument,
-            time=datetime.now().isoformat(),
-            bid=round(initial_price, 5),
-            ask=round(initial_price + 0.0001, 5),
-        )
+def parse_stream_data(line: bytes) -> Optional[ForexData]:
+    """
+    Parse a line of the stream into forex data.
 
-        record.insert(table_name=table_name)
+    Returns:
+        Optional[ForexData]: The tick, or None for heartbeats, errors and
+            untradeable prices.
+    """
+    if not line:
+        return None
 
-        logger.info(record)
+    record: Stream = Stream.model_validate(json.loads(line.decode("utf-8")))
 
-        if max_walk > 0:
-            walks_completed += 1
-            if walks_completed >= max_walk:
-                break
+    if record.errorMessage not in [None, ""]:
+        logger.error(record.errorMessage)
+    elif record.type == "PRICE" and record.tradeable:
+        return record.to_forex_data()
 
-        sleep(sleep_between)
+    return None
 
 
-def process_stream_data(line: str, table_name: str = "forex_data"):
+def process_stream_data(
+    line: bytes,
+    table_name: str = "forex_data",
+) -> Optional[ForexData]:
     """
     Process the stream data and send it to the data store.
+
+    Returns:
+        Optional[ForexData]: The stored tick, if the line was one.
+    """
+    forex_data = parse_stream_data(line)
+
+    if forex_data is not None:
+        forex_data.insert(
+            table_name=table_name,
+        )
+        # Tick time is the origin of every downstream latency measurement
+        latency_tracker.record(stage="stream", origin_time=forex_data.time)
+        tick_logger.log("%s", forex_data)
+
+    return forex_data
+
+
+def create_tick_queue() -> TickQueue:
+    """Create the reader to writer queue configured from the STREAM_QUEUE_* env vars."""
+    return TickQueue(
+        maxsize=int(os.getenv("STREAM_QUEUE_SIZE") or 10000),
+        policy=os.getenv("STREAM_QUEUE_POLICY") or "block",
+    )
+
+
+def create_conflator() -> Optional[Conflator]:
+    """Create the conflation stage configured from the STREAM_CONFLATE_* env vars.
+
+    Returns:
+        Optional[Conflator]: None when STREAM_CONFLATE_INTERVAL is not set.
+    """
+    interval = float(os.getenv("STREAM_CONFLATE_INTERVAL") or 0)
+    if interval <= 0:
+        return None
+    return Conflator(
+        interval=interval,
+        mode=os.getenv("STREAM_CONFLATE_MODE") or "mean",
+    )
+
+
+def create_bar_builder() -> Optional[BarBuilder]:
+    """Create the bar builder configured from the STREAM_BAR_RESOLUTIONS env var.
+
+    Returns:
+        Optional[BarBuilder]: None when STREAM_BAR_RESOLUTIONS is not set.
     """
-    if line:
-        decoded_line = line.decode("utf-8")
-        record: Stream = Stream.model_validate(json.loads(decoded_line))
+    resolutions = os.getenv("STREAM_BAR_RESOLUTIONS") or ""
+    resolutions = [name.strip() for name in resolutions.split(",") if name.strip()]
+    if not resolutions:
+        return None
+    return BarBuilder(resolutions=resolutions)
 
-        if record.errorMessage not in [None, ""]:
-            logger.error(record.errorMessage)
-        elif record.type == "PRICE" and record.tradeable:
 
-            forex_data = record.to_forex_data()
-            forex_data.insert(
-                table_name=table_name,
+def write_ticks(
+    tick_queue: TickQueue,
+    table_name: str = "forex_data",
+    on_tick: Optional[Callable[[Optional[ForexData]], None]] = None,
+    batch_size: int = 500,
+    report_interval: float = 60,
+    bar_builder: Optional[BarBuilder] = None,
+    bars_table_name: str = "forex_bars",
+):
+    """
+    Drain the queue into the data store in batches until it is closed and empty.
+
+    Args:
+        tick_queue (TickQueue): The queue filled by the stream reader.
+        table_name (str): The name of the table to send the data to.
+        on_tick (Optional[Callable]): Called after every stored tick.
+        batch_size (int): The maximum number of ticks per insert.
+        report_interval (float): Seconds between logs of the queue metrics.
+        bar_builder (Optional[BarBuilder]): Builds bars from the ticks read.
+            Its finished bars are written in batches as well.
+        bars_table_name (str): The name of the table to send the bars to.
+    """
+    last_report = time.monotonic()
+
+    while True:
+        batch = tick_queue.get_batch(max_items=batch_size, timeout=1.0)
+        done = not batch and tick_queue.closed
+
+        if bar_builder is not None:
+            ForexBar.insert_multiple(
+                data=bar_builder.drain(flush_all=done),
+                table_name=bars_table_name,
             )
-            logger.info(record)
+        if done:
+            break
+
+        if batch:
+            ForexData.insert_multiple(data=batch, table_name=table_name)
+            for forex_data in batch:
+                latency_tracker.record(stage="stream", origin_time=forex_data.time)
+                tick_logger.log("%s", forex_data)
+                if on_tick is not None:
+                    on_tick(forex_data)
 
+        if time.monotonic() - last_report >= report_interval:
+            logger.info("Tick queue: %s", tick_queue.stats())
+            if bar_builder is not None:
+                logger.info("Bars: %s", bar_builder.stats())
+            last_report = time.monotonic()
 
-def open_oanda_stream(run_forever: bool = True, limit: Optional[int] = None):
+
+def ingest_lines(
+    lines: Iterable[bytes],
+    table_name: str = "forex_data",
+    on_tick: Optional[Callable[[Optional[ForexData]], None]] = None,
+    limit: Optional[int] = None,
+    tick_queue: Optional[TickQueue] = None,
+    batch_size: Optional[int] = None,
+    conflator: Optional[Conflator] = None,
+    bar_builder: Optional[BarBuilder] = None,
+    bars_table_name: str = "forex_bars",
+) -> TickQueue:
+    """
+    Read stream lines on this thread and store the ticks from a writer thread.
+
+    The threads are split by a bounded queue so a slow data store never stalls
+    reading the socket; what happens when the queue is full is up to its
+    overflow policy. A failure of the writer stops the reader and is raised.
+
+    Args:
+        lines (Iterable[bytes]): The stream lines.
+        table_name (str): The name of the table to send the data to.
+        on_tick (Optional[Callable]): Called after every stored tick, and with
+            None for every other line.
+        limit (Optional[int]): Stop after this line index.
+        tick_queue (Optional[TickQueue]): The queue. Defaults to create_tick_queue().
+        batch_size (Optional[int]): The maximum number of ticks per insert.
+        conflator (Optional[Conflator]): Conflates the ticks before they are
+            queued. Defaults to create_conflator().
+        bar_builder (Optional[BarBuilder]): Builds bars from the raw ticks.
+            Defaults to create_bar_builder().
+        bars_table_name (str): The name of the table to send the bars to.
+
+    Returns:
+        TickQueue: The drained queue, with its metrics.
+    """
+    if tick_queue is None:
+        tick_queue = create_tick_queue()
+    if conflator is None:
+        conflator = create_conflator()
+    if bar_builder is None:
+        bar_builder = create_bar_builder()
+    batch_size = batch_size or int(os.getenv("STREAM_QUEUE_BATCH") or 500)
+
+    def enqueue(records: list[ForexData]):
+        for record in records:
+            while not tick_queue.put(record, timeout=1.0):
+                if writer.done():
+                    return
+
+    with ThreadPoolExecutor(
+        max_workers=1,
+        thread_name_prefix="stream-writer",
+    ) as executor:
+        writer = executor.submit(
+            write_ticks,
+            tick_queue=tick_queue,
+            table_name=table_name,
+            on_tick=on_tick,
+            batch_size=batch_size,
+            bar_builder=bar_builder,
+            bars_table_name=bars_table_name,
+        )
+        try:
+            for line_idx, line in enumerate(lines):
+                if writer.done():
+                    break
+
+                forex_data = parse_stream_data(line)
+                if forex_data is None and on_tick is not None:
+                    on_tick(None)
+                if forex_data is not None and bar_builder is not None:
+                    bar_builder.add(forex_data)
+
+                if conflator is None:
+                    enqueue([forex_data] if forex_data is not None else [])
+                else:
+                    if forex_data is not None:
+                        enqueue(conflator.add(forex_data))
+                    enqueue(conflator.flush_due())
+
+                if limit is not None and line_idx >= limit:
+                    break
+        finally:
+            if conflator is not None and not writer.done():
+                enqueue(conflator.flush())
+            tick_queue.close()
+
+    writer.result()
+    logger.info("Tick queue: %s", tick_queue.stats())
+    if conflator is not None:
+        logger.info("Conflation: %s", conflator.stats())
+    return tick_queue
+
+
+def open_oanda_stream(
+    run_forever: bool = True,
+    limit: Optional[int] = None,
+    instruments: Optional[list[str]] = None,
+    on_tick: Optional[Callable[[Optional[ForexData]], None]] = None,
+):
     """
     Open a stream to the OANDA API and send the data to the data store.
 
     Args:
         run_forever (bool): Whether to run the stream forever.
         limit (Optional[int]): The number of records to limit the stream to.
+        instruments (Optional[list[str]]): The instruments to stream. Defaults to EUR_USD.
+        on_tick (Optional[Callable]): Called after every line, with the tick or
+            None for heartbeats, so callers can tell the stream is alive.
     """
+    import requests
+
     if not run_forever and limit is None:
         raise ValueError("If not running forever, limit must be greater than 0.")
 
@@ -109,21 +361,21 @@ def open_oanda_stream(run_forever: bool = True, limit: Optional[int] = None):
     if not OANDA_API.endswith("/"):
         OANDA_API += "/"
 
-    url = f"{OANDA_API}accounts/{account_id}/pricing/stream?instruments=EUR_USD"
+    instruments = ",".join(instruments or ["EUR_USD"])
+    url = f"{OANDA_API}accounts/{account_id}/pricing/stream?instruments={instruments}"
     head = {
         "Content-type": "application/json",
         "Accept-Datetime-Format": "RFC3339",
         "Authorization": f"Bearer {api_token}",
     }
     resp = requests.get(url, headers=head, stream=True, timeout=30).iter_lines()
-    for resp_idx, line in enumerate(resp):
-        process_stream_data(line)
-
-        if limit is not None and resp_idx >= limit:
-            break
+    ingest_lines(resp, on_tick=on_tick, limit=limit)
 
 
-def open_stream():
+def open_stream(
+    instruments: Optional[list[str]] = None,
+    on_tick: Optional[Callable[[Optional[ForexData]], None]] = None,
+):
     """Stream the data send the data to the data store.
 
     Uses a random walk or the OANDA API endpoint based on env."""
@@ -131,18 +383,17 @@ def open_stream():
     random_walk = os.getenv("APP_RANDOM_WALK", "False").lower() == "true"
 
     execute_stream = open_random_walk_stream if random_walk else open_oanda_stream
-    execute_stream()
+    execute_stream(instruments=instruments, on_tick=on_tick)
 
 
 if __name__ == "__main__":
+    from foresight.stream_service.supervisor import StreamSupervisor
+
     # Create the table in the data store if it does not exist.
     ForexData.create_table()
+    ForexBar.create_table()
+    LatencyMetric.create_table()
 
-    # Open a stream to the OANDA API and send the data to the data store.
-    while True:
-        try:
-            open_stream()
-        except Exception:  # pylint: disable=broad-except
-            logger.error(traceback.format_exc())
-            logger.error("Restarting stream...")
-            continue
+    # Stream every shard of instruments in its own worker process, restarting
+    # workers that crash or stop making progress.
+    StreamSupervisor.from_env().run_forever()
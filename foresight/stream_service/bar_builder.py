@@ -0,0 +1,170 @@
+"""Incremental open/high/low/close bars built from ticks as they arrive."""
+
+import math
+import threading
+import time
+from datetime import datetime
+from datetime import timezone
+from typing import Callable
+
+from foresight.utils.models.forex_bar import ForexBar
+from foresight.utils.models.forex_data import ForexData
+from foresight.utils.models.forex_data import timescale_seconds
+
+
+class OpenBar:
+    """Running open/high/low/close/sum/count of bid and ask within one bar."""
+
+    def __init__(self, start: float, tick: ForexData):
+        self.start = start
+        self.bid_open = self.bid_high = self.bid_low = tick.bid
+        self.ask_open = self.ask_high = self.ask_low = tick.ask
+        self.bid_close = tick.bid
+        self.ask_close = tick.ask
+        self.first_time = self.last_time = tick.time
+        self.bid_sum = 0.0
+        self.ask_sum = 0.0
+        self.count = 0
+
+    def add(self, tick: ForexData):
+        """Add a tick to the bar, which may arrive out of order."""
+        self.bid_high = max(self.bid_high, tick.bid)
+        self.bid_low = min(self.bid_low, tick.bid)
+        self.ask_high = max(self.ask_high, tick.ask)
+        self.ask_low = min(self.ask_low, tick.ask)
+        if tick.time < self.first_time:
+            self.bid_open = tick.bid
+            self.ask_open = tick.ask
+            self.first_time = tick.time
+        if tick.time >= self.last_time:
+            self.bid_close = tick.bid
+            self.ask_close = tick.ask
+            self.last_time = tick.time
+        self.bid_sum += tick.bid * tick.tick_count
+        self.ask_sum += tick.ask * tick.tick_count
+        self.count += tick.tick_count
+
+    def to_bar(self, instrument: str, resolution: str) -> ForexBar:
+        """The finished bar."""
+        return ForexBar(
+            instrument=instrument,
+            resolution=resolution,
+            time=datetime.fromtimestamp(self.start, tz=timezone.utc),
+            bid_open=self.bid_open,
+            bid_high=self.bid_high,
+            bid_low=self.bid_low,
+            bid_close=self.bid_close,
+            bid_mean=self.bid_sum / self.count,
+            ask_open=self.ask_open,
+            ask_high=self.ask_high,
+            ask_low=self.ask_low,
+            ask_close=self.ask_close,
+            ask_mean=self.ask_sum / self.count,
+            tick_count=self.count,
+            first_time=self.first_time,
+            last_time=self.last_time,
+        )
+
+
+class BarBuilder:
+    """Builds bars per instrument and resolution with O(1) work per tick.
+
+    Bars are aligned to the epoch like `time_bucket` and finish when a tick of
+    a later bar arrives, or once their end has passed by a grace period. The
+    stream reader adds ticks while the writer drains finished bars, so every
+    method is thread-safe. A late tick of a finished bar becomes a bar of its
+    own, merged into the finished bar with the same key if it was not drained
+    yet, or else by `ForexBar.insert_multiple` into the stored one.
+
+    Args:
+        resolutions (list[str]): The resolutions to build, e.g. ["S", "M"].
+        grace (float): Seconds after a bar ends to wait for late ticks.
+        clock (Callable[[], float]): Returns the current epoch time.
+    """
+
+    def __init__(
+        self,
+        resolutions: list[str],
+        grace: float = 1.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        unknown = [name for name in resolutions if name not in timescale_seconds]
+        if unknown:
+            raise ValueError(f"Unknown resolutions: {unknown}.")
+
+        self.resolutions = resolutions
+        self.grace = grace
+        self.clock = clock
+        self.lock = threading.Lock()
+
+        self.open_bars: dict[tuple[str, str], OpenBar] = {}
+        self.finished: dict[tuple[str, str, datetime], ForexBar] = {}
+
+        self.ticks_in = 0
+        self.bars_out = 0
+
+    def add(self, tick: ForexData):
+        """Add a tick to the open bar of every resolution."""
+        timestamp = tick.time.timestamp()
+
+        with self.lock:
+            self.ticks_in += 1
+            for resolution in self.resolutions:
+                seconds = timescale_seconds[resolution]
+                start = math.floor(timestamp / seconds) * seconds
+                key = (tick.instrument, resolution)
+                bar = self.open_bars.get(key)
+
+                if bar is not None and start < bar.start:
+                    late = OpenBar(start, tick)
+                    late.add(tick)
+                    self.finish(key, late)
+                    continue
+
+                if bar is None or start > bar.start:
+                    if bar is not None:
+                        self.finish(key, bar)
+                    bar = self.open_bars[key] = OpenBar(start, tick)
+                bar.add(tick)
+
+    def finish(self, key: tuple[str, str], bar: OpenBar):
+        """Move a bar to the finished bars, merging it into one with the same key.
+
+        The lock must be held.
+        """
+        finished = bar.to_bar(instrument=key[0], resolution=key[1])
+        bar_key = (*key, finished.time)
+        if bar_key in self.finished:
+            finished = self.finished[bar_key].merge(finished)
+        else:
+            self.bars_out += 1
+        self.finished[bar_key] = finished
+
+    def drain(self, flush_all: bool = False) -> list[ForexBar]:
+        """Take the finished bars, closing the open bars whose end has passed.
+
+        Args:
+            flush_all (bool): Close every open bar, e.g. when the stream ends.
+
+        Returns:
+            list[ForexBar]: The finished bars, one per key.
+        """
+        now = self.clock()
+        with self.lock:
+            for key, bar in list(self.open_bars.items()):
+                end = bar.start + timescale_seconds[key[1]]
+                if flush_all or end + self.grace <= now:
+                    self.finish(key, bar)
+                    del self.open_bars[key]
+
+            finished, self.finished = self.finished, {}
+            return list(finished.values())
+
+    def stats(self) -> dict:
+        """Tick and bar counters."""
+        with self.lock:
+            return {
+                "ticks_in": self.ticks_in,
+                "bars_out": self.bars_out,
+                "open_bars": len(self.open_bars),
+            }
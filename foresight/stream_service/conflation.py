@@ -0,0 +1,146 @@
+"""Per-instrument conflation of ticks into at most one record per interval."""
+
+import math
+import time
+from datetime import datetime
+from datetime import timezone
+from typing import Callable
+from typing import Optional
+
+from foresight.utils.models.forex_data import ForexData
+
+
+MODES = ("mean", "last")
+
+
+class Bucket:
+    """The ticks of one instrument within one interval."""
+
+    def __init__(self, start: float, tick: ForexData):
+        self.start = start
+        self.count = 0
+        self.bid_sum = 0.0
+        self.ask_sum = 0.0
+        self.last = tick
+
+    def add(self, tick: ForexData):
+        """Add a tick to the bucket."""
+        self.count += 1
+        self.bid_sum += tick.bid
+        self.ask_sum += tick.ask
+        self.last = tick
+
+
+class Conflator:
+    """Conflates ticks per instrument into one record per aligned interval.
+
+    Intervals are aligned to the epoch like `time_bucket`, and records are
+    stamped with the start of their interval and the number of ticks they
+    stand for (`tick_count`). In "mean" mode the record holds the mean bid and
+    ask, so the count weighted averages of `ForexData.fetch` over conflated
+    rows are the same as over the raw ticks. In "last" mode it holds the last
+    bid and ask of the interval.
+
+    Args:
+        interval (float): The interval in seconds, dividing a second (e.g. 1,
+            0.5 or 0.1) so records never straddle the second buckets of fetch.
+        mode (str): "mean" or "last".
+        clock (Callable[[], float]): Returns the current epoch time.
+    """
+
+    def __init__(
+        self,
+        interval: float = 1.0,
+        mode: str = "mean",
+        clock: Callable[[], float] = time.time,
+    ):
+        if interval <= 0:
+            raise ValueError(f"Interval must be positive, got {interval}.")
+        per_second = 1 / interval
+        if not math.isclose(per_second, round(per_second)):
+            raise ValueError(f"Interval must divide a second, got {interval}.")
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode: '{mode}'. Expected one of {MODES}.")
+
+        self.interval = interval
+        self.mode = mode
+        self.clock = clock
+        self.buckets: dict[str, Bucket] = {}
+
+        self.ticks_in = 0
+        self.records_out = 0
+
+    def bucket_start(self, tick_time: datetime) -> float:
+        """The epoch start of the interval containing the tick time."""
+        return math.floor(tick_time.timestamp() / self.interval) * self.interval
+
+    def to_record(self, instrument: str, bucket: Bucket) -> ForexData:
+        """The conflated record of a finished bucket."""
+        self.records_out += 1
+        if self.mode == "mean":
+            bid, ask = bucket.bid_sum / bucket.count, bucket.ask_sum / bucket.count
+        else:
+            bid, ask = bucket.last.bid, bucket.last.ask
+        return ForexData(
+            instrument=instrument,
+            time=datetime.fromtimestamp(bucket.start, tz=timezone.utc),
+            bid=bid,
+            ask=ask,
+            tick_count=bucket.count,
+        )
+
+    def add(self, tick: ForexData) -> list[ForexData]:
+        """Add a tick.
+
+        Returns:
+            list[ForexData]: The record of the previous interval of the
+                instrument, if this tick closed it.
+        """
+        self.ticks_in += 1
+        start = self.bucket_start(tick.time)
+        bucket = self.buckets.get(tick.instrument)
+
+        records = []
+        if bucket is not None and start < bucket.start:
+            # A late tick of a closed interval becomes a record of its own,
+            # which the count weighted averages of fetch merge back in
+            late = Bucket(start, tick)
+            late.add(tick)
+            return [self.to_record(tick.instrument, late)]
+
+        if bucket is None or start > bucket.start:
+            if bucket is not None:
+                records.append(self.to_record(tick.instrument, bucket))
+            bucket = self.buckets[tick.instrument] = Bucket(start, tick)
+
+        bucket.add(tick)
+        return records
+
+    def flush(self, now: Optional[float] = None, grace: float = 0.0) -> list[ForexData]:
+        """Close the intervals that ended before now.
+
+        Args:
+            now (Optional[float]): The epoch time. Closes every interval if None.
+            grace (float): Seconds to wait after an interval ends for late ticks.
+
+        Returns:
+            list[ForexData]: The records of the closed intervals.
+        """
+        records = []
+        for instrument, bucket in list(self.buckets.items()):
+            if now is None or bucket.start + self.interval + grace <= now:
+                records.append(self.to_record(instrument, bucket))
+                del self.buckets[instrument]
+        return records
+
+    def flush_due(self) -> list[ForexData]:
+        """Close the intervals that ended at least one interval ago."""
+        return self.flush(now=self.clock(), grace=self.interval)
+
+    def stats(self) -> dict:
+        """Tick and record counters."""
+        return {
+            "ticks_in": self.ticks_in,
+            "records_out": self.records_out,
+            "ratio": self.ticks_in / self.records_out if self.records_out else 0.0,
+        }
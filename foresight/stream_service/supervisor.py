@@ -0,0 +1,266 @@
+"""Supervisor running the stream service as one worker process per instrument shard."""
+
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from multiprocessing.sharedctypes import Synchronized
+from typing import Callable
+from typing import Optional
+
+from foresight.utils.logger import generate_logger
+from foresight.utils.models.forex_data import ForexData
+
+
+logger = generate_logger(name=__name__)
+
+
+def shard_instruments(instruments: list[str], workers: int) -> list[list[str]]:
+    """Split the instruments round robin into at most `workers` non-empty shards."""
+    if workers < 1:
+        raise ValueError(f"Workers must be at least 1, got {workers}.")
+    shards = [instruments[index::workers] for index in range(workers)]
+    return [shard for shard in shards if shard]
+
+
+def tick_callback(
+    ticks: Synchronized,
+    heartbeat: Synchronized,
+) -> Callable[[Optional[ForexData]], None]:
+    """Callback counting the ticks of a worker and recording it is alive.
+
+    The values are shared without a lock: the worker is their only writer and
+    the supervisor only reads them.
+    """
+
+    def on_tick(forex_data: Optional[ForexData]):
+        heartbeat.value = time.time()
+        if forex_data is not None:
+            ticks.value += 1
+
+    return on_tick
+
+
+def run_worker(instruments: list[str], ticks: Synchronized, heartbeat: Synchronized):
+    """Entry point of a worker process streaming a shard of instruments.
+
+    Every worker is a fresh interpreter with its own database connection.
+    """
+    from foresight.stream_service.app import open_stream
+
+    logger.info("Streaming %s", ",".join(instruments))
+    open_stream(instruments=instruments, on_tick=tick_callback(ticks, heartbeat))
+
+
+class WorkerSlot:
+    """The process, counters and restart state of one shard.
+
+    Args:
+        index (int): The shard index.
+        instruments (list[str]): The instruments streamed by the shard.
+        ticks (Synchronized): Ticks stored by the shard, kept across restarts.
+        heartbeat (Synchronized): Epoch time the shard last made progress.
+    """
+
+    def __init__(
+        self,
+        index: int,
+        instruments: list[str],
+        ticks: Synchronized,
+        heartbeat: Synchronized,
+    ):
+        self.index = index
+        self.instruments = instruments
+        self.ticks = ticks
+        self.heartbeat = heartbeat
+        self.process: Optional[multiprocessing.Process] = None
+        self.started_at = 0.0
+        self.failures = 0
+        self.next_start = 0.0
+
+
+class StreamSupervisor:
+    """Runs one stream worker process per shard of instruments.
+
+    Each worker parses, validates and stores the ticks of its shard over its
+    own database connection, so ingest scales with the number of cores. A
+    worker that exits or stops sending heartbeats is restarted with an
+    exponential backoff, and the aggregate throughput is logged periodically.
+
+    Args:
+        instruments (list[str]): The instruments to stream.
+        workers (int): The maximum number of worker processes.
+        target (Callable): The worker entry point, called with the shard,
+            its tick counter and its heartbeat.
+        stale_after (float): Seconds without a heartbeat before a worker is restarted.
+        report_interval (float): Seconds between throughput reports.
+        max_backoff (float): The longest delay in seconds before a restart.
+        start_method (str): The multiprocessing start method.
+        clock (Callable[[], float]): Returns the current epoch time.
+    """
+
+    def __init__(
+        self,
+        instruments: list[str],
+        workers: int = 1,
+        target: Callable[[list[str], Synchronized, Synchronized], None] = run_worker,
+        stale_after: float = 120,
+        report_interval: float = 60,
+        max_backoff: float = 60,
+        start_method: str = "spawn",
+        clock: Callable[[], float] = time.time,
+    ):
+        self.target = target
+        self.stale_after = stale_after
+        self.report_interval = report_interval
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.context = multiprocessing.get_context(start_method)
+
+        self.slots = [
+            WorkerSlot(
+                index=index,
+                instruments=shard,
+                ticks=self.context.Value("Q", 0, lock=False),
+                heartbeat=self.context.Value("d", 0.0, lock=False),
+            )
+            for index, shard in enumerate(shard_instruments(instruments, workers))
+        ]
+
+        self.restarts = 0
+        self.last_report = self.clock()
+        self.last_ticks = 0
+
+    @classmethod
+    def from_env(cls) -> "StreamSupervisor":
+        """Create a supervisor configured from the STREAM_* environment variables."""
+        instruments = os.getenv("STREAM_INSTRUMENTS") or "EUR_USD"
+        return cls(
+            instruments=[
+                name.strip() for name in instruments.split(",") if name.strip()
+            ],
+            workers=int(os.getenv("STREAM_WORKERS") or os.cpu_count() or 1),
+            stale_after=float(os.getenv("STREAM_STALE_AFTER") or 120),
+            report_interval=float(os.getenv("STREAM_REPORT_INTERVAL") or 60),
+        )
+
+    @property
+    def ticks(self) -> int:
+        """Ticks stored by every worker since the supervisor started."""
+        return sum(slot.ticks.value for slot in self.slots)
+
+    def start_worker(self, slot: WorkerSlot, now: float):
+        """Start the worker process of a shard."""
+        slot.heartbeat.value = now
+        slot.started_at = now
+        slot.process = self.context.Process(
+            target=self.target,
+            args=(slot.instruments, slot.ticks, slot.heartbeat),
+            name=f"stream-{slot.index}",
+            daemon=True,
+        )
+        slot.process.start()
+        logger.info(
+            "Started stream worker %s (pid %s) for %s",
+            slot.index,
+            slot.process.pid,
+            ",".join(slot.instruments),
+        )
+
+    def check(self, now: Optional[float] = None) -> list[int]:
+        """Restart the workers that exited or stopped sending heartbeats.
+
+        Returns:
+            list[int]: The indexes of the workers started.
+        """
+        now = self.clock() if now is None else now
+        started = []
+
+        for slot in self.slots:
+            process = slot.process
+            if process is not None:
+                if process.is_alive():
+                    if now - slot.heartbeat.value <= self.stale_after:
+                        # Healthy for a full period, so the next failure starts a fresh backoff
+                        if now - slot.started_at > self.stale_after:
+                            slot.failures = 0
+                        continue
+                    logger.warning(
+                        "Stream worker %s sent no heartbeat for %.0fs, restarting",
+                        slot.index,
+                        now - slot.heartbeat.value,
+                    )
+                    process.terminate()
+                    process.join(timeout=5)
+                else:
+                    logger.warning(
+                        "Stream worker %s exited with code %s, restarting",
+                        slot.index,
+                        process.exitcode,
+                    )
+
+                slot.process = None
+                slot.failures += 1
+                slot.next_start = now + min(2 ** (slot.failures - 1), self.max_backoff)
+                self.restarts += 1
+
+            if now >= slot.next_start:
+                self.start_worker(slot, now)
+                started.append(slot.index)
+
+        return started
+
+    def report(self, now: Optional[float] = None) -> dict:
+        """Log and return the aggregate throughput since the last report."""
+        now = self.clock() if now is None else now
+        ticks = self.ticks
+        elapsed = max(now - self.last_report, 1e-9)
+
+        stats = {
+            "workers": len(self.slots),
+            "alive": sum(
+                1
+                for slot in self.slots
+                if slot.process is not None and slot.process.is_alive()
+            ),
+            "ticks": ticks,
+            "ticks_per_second": (ticks - self.last_ticks) / elapsed,
+            "restarts": self.restarts,
+        }
+        self.last_report = now
+        self.last_ticks = ticks
+
+        logger.info(
+            "Stream workers alive: %s/%s, ticks: %s (%.1f/s), restarts: %s",
+            stats["alive"],
+            stats["workers"],
+            stats["ticks"],
+            stats["ticks_per_second"],
+            stats["restarts"],
+        )
+        return stats
+
+    def stop(self):
+        """Terminate every worker process."""
+        for slot in self.slots:
+            if slot.process is not None and slot.process.is_alive():
+                slot.process.terminate()
+        for slot in self.slots:
+            if slot.process is not None:
+                slot.process.join(timeout=5)
+                slot.process = None
+
+    def run_forever(self, poll_interval: float = 1.0):
+        """Supervise the workers until interrupted or terminated."""
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+        try:
+            while True:
+                now = self.clock()
+                self.check(now)
+                if now - self.last_report >= self.report_interval:
+                    self.report(now)
+                time.sleep(poll_interval)
+        finally:
+            self.stop()
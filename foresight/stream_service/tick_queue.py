@@ -0,0 +1,145 @@
+"""Bounded queue between the stream reader and the database writer."""
+
+import threading
+import time
+from collections import deque
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+
+POLICIES = ("block", "drop_oldest", "coalesce")
+
+
+class QueueClosed(Exception):
+    """Raised when putting into a closed queue."""
+
+
+class TickQueue:
+    """Bounded FIFO queue with a configurable overflow policy.
+
+    When the queue is full, `put`:
+        - block: waits for the writer to make room.
+        - drop_oldest: discards the oldest pending tick.
+        - coalesce: replaces the pending tick of the same instrument with the
+          new one, keeping its place in the queue, and otherwise discards the
+          oldest pending tick.
+
+    Args:
+        maxsize (int): The maximum number of pending ticks.
+        policy (str): The overflow policy, one of POLICIES.
+        key (Callable[[Any], str]): The coalescing key of a tick.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        policy: str = "block",
+        key: Callable[[Any], str] = lambda tick: tick.instrument,
+    ):
+        if maxsize < 1:
+            raise ValueError(f"Queue size must be at least 1, got {maxsize}.")
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy: '{policy}'. Expected one of {POLICIES}.")
+
+        self.maxsize = maxsize
+        self.policy = policy
+        self.key = key
+
+        # Entries are [key, tick] so a coalesced tick is replaced in place
+        self.entries: deque[list] = deque()
+        self.pending: dict[str, list] = {}
+        self.closed = False
+        self.condition = threading.Condition()
+
+        self.put_count = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self.blocked_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def put(self, tick: Any, timeout: Optional[float] = None) -> bool:
+        """Add a tick, applying the overflow policy when the queue is full.
+
+        Returns:
+            bool: False if the block policy timed out, in which case the tick
+                was not added and can be put again.
+        """
+        with self.condition:
+            if self.closed:
+                raise QueueClosed("Cannot put into a closed queue.")
+
+            if len(self.entries) >= self.maxsize:
+                if self.policy == "block":
+                    start = time.perf_counter()
+                    has_room = self.condition.wait_for(
+                        lambda: len(self.entries) < self.maxsize or self.closed,
+                        timeout=timeout,
+                    )
+                    self.blocked_seconds += time.perf_counter() - start
+                    if self.closed:
+                        raise QueueClosed("Cannot put into a closed queue.")
+                    if not has_room:
+                        return False
+                elif self.policy == "coalesce" and self.key(tick) in self.pending:
+                    self.pending[self.key(tick)][1] = tick
+                    self.put_count += 1
+                    self.coalesced += 1
+                    return True
+                else:
+                    self.pop_entry()
+                    self.dropped += 1
+
+            self.put_count += 1
+
+            entry = [self.key(tick) if self.policy == "coalesce" else None, tick]
+            self.entries.append(entry)
+            if self.policy == "coalesce":
+                self.pending[entry[0]] = entry
+            self.max_depth = max(self.max_depth, len(self.entries))
+            self.condition.notify_all()
+            return True
+
+    def pop_entry(self) -> Any:
+        """Remove and return the oldest tick. The lock must be held."""
+        entry = self.entries.popleft()
+        if self.pending.get(entry[0]) is entry:
+            del self.pending[entry[0]]
+        return entry[1]
+
+    def get_batch(self, max_items: int = 500, timeout: Optional[float] = None) -> list:
+        """Remove up to max_items ticks, waiting for the first one.
+
+        Returns:
+            list: The ticks in queue order, empty on timeout or once closed and drained.
+        """
+        with self.condition:
+            self.condition.wait_for(
+                lambda: len(self.entries) > 0 or self.closed,
+                timeout=timeout,
+            )
+            batch = [self.pop_entry() for _ in range(min(max_items, len(self.entries)))]
+            if batch:
+                self.condition.notify_all()
+            return batch
+
+    def close(self):
+        """Stop accepting ticks. Pending ticks can still be drained."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def stats(self) -> dict:
+        """Queue depth and overflow counters."""
+        with self.condition:
+            return {
+                "depth": len(self.entries),
+                "max_depth": self.max_depth,
+                "put": self.put_count,
+                "dropped": self.dropped,
+                "coalesced": self.coalesced,
+                "blocked_seconds": self.blocked_seconds,
+            }
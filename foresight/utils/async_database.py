@@ -0,0 +1,124 @@
+"""Async connection pool to Timescale DB for asyncio services."""
+
+import asyncio
+import os
+import time
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Optional
+
+from foresight.utils.database import connection_params
+from foresight.utils.logger import generate_logger
+
+
+logger = generate_logger(name=__name__)
+
+
+class AsyncTimeScalePool:
+    """A pool of async autocommit connections returning rows as dicts.
+
+    Queries wait for a free connection instead of sharing one, so a few
+    connections serve any number of concurrent requests. Requires the psycopg
+    3 pool (`pip install "psycopg[binary,pool]"`).
+
+    Args:
+        min_size (Optional[int]): Connections kept open, TIMESCALE_POOL_MIN_SIZE by default.
+        max_size (Optional[int]): The most connections, TIMESCALE_POOL_MAX_SIZE by default.
+    """
+
+    def __init__(self, min_size: Optional[int] = None, max_size: Optional[int] = None):
+        self.min_size = min_size or int(os.getenv("TIMESCALE_POOL_MIN_SIZE") or 2)
+        self.max_size = max_size or int(os.getenv("TIMESCALE_POOL_MAX_SIZE") or 10)
+        self.pool = None
+
+    async def open(self):
+        """Open the pool and wait for its first connections."""
+        # Imported on first use, only the async services need psycopg 3
+        from psycopg.rows import dict_row
+        from psycopg_pool import AsyncConnectionPool
+
+        params = {name: value for name, value in connection_params().items() if value}
+        self.pool = AsyncConnectionPool(
+            kwargs={**params, "autocommit": True, "row_factory": dict_row},
+            min_size=self.min_size,
+            max_size=self.max_size,
+            open=False,
+        )
+        await self.pool.open(wait=True)
+        logger.info("Opened a pool of %s connections to TimescaleDB", self.min_size)
+
+    async def close(self):
+        """Close every connection of the pool."""
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    async def execute(
+        self,
+        query: str,
+        params: Optional[tuple] = None,
+    ) -> list[dict]:
+        """Execute a query on a pooled connection.
+
+        Returns:
+            list[dict]: The rows, empty for statements without results.
+        """
+        if self.pool is None:
+            raise Exception("Database pool not open.")
+
+        async with self.pool.connection() as connection:
+            cursor = await connection.execute(query, params)
+            if cursor.description is None:
+                return []
+            return await cursor.fetchall()
+
+
+class SharedResult:
+    """Shares the result of an async call between concurrent callers.
+
+    Callers within `ttl` seconds of the last result get it without a call, and
+    callers arriving while a call is running await that call instead of
+    starting their own. Thousands of dashboards polling the same endpoint
+    then cost one query per `ttl`.
+
+    Args:
+        fetch (Callable[[], Awaitable[Any]]): The call whose result is shared.
+        ttl (float): Seconds a result is reused.
+        clock (Callable[[], float]): Returns a monotonic time.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.clock = clock
+
+        self.value: Any = None
+        self.fetched_at = float("-inf")
+        self.running: Optional[asyncio.Future] = None
+        self.calls = 0
+
+    async def get(self) -> Any:
+        """The shared result, calling fetch when it is stale."""
+        if self.clock() - self.fetched_at < self.ttl:
+            return self.value
+
+        if self.running is None:
+            self.running = asyncio.ensure_future(self.refresh())
+        # Shielded so a cancelled request does not cancel the call of the others
+        return await asyncio.shield(self.running)
+
+    async def refresh(self) -> Any:
+        """Call fetch and keep its result."""
+        try:
+            self.calls += 1
+            self.value = await self.fetch()
+            self.fetched_at = self.clock()
+            return self.value
+        finally:
+            self.running = None
@@ -1,34 +1,127 @@
 """AWS utility functions"""
 
 import os
+import threading
+from typing import TYPE_CHECKING
+from typing import Optional
 
-import boto3
 
+if TYPE_CHECKING:
+    from botocore.config import Config
 
-def get_client(service_type: str):
-    """Get a service client."""
+
+# Clients are thread-safe and expensive to build, so one is kept per process
+# for each service, endpoint and connection configuration.
+_client_cache: dict[tuple, object] = {}
+_client_lock = threading.Lock()
+
+
+def get_config(
+    max_pool_connections: Optional[int] = None,
+    max_attempts: Optional[int] = None,
+    retry_mode: Optional[str] = None,
+    tcp_keepalive: Optional[bool] = None,
+) -> "Config":
+    """Build the botocore connection configuration.
+
+    Unset arguments fall back to the AWS_MAX_POOL_CONNECTIONS, AWS_MAX_ATTEMPTS,
+    AWS_RETRY_MODE and AWS_TCP_KEEPALIVE environment variables.
+
+    Args:
+        max_pool_connections (Optional[int]): Connections kept open per client.
+        max_attempts (Optional[int]): Attempts per request including the first.
+        retry_mode (Optional[str]): The botocore retry mode (legacy, standard, adaptive).
+        tcp_keepalive (Optional[bool]): Whether to enable TCP keep-alive.
+
+    Returns:
+        Config: The botocore configuration.
+    """
+    from botocore.config import Config
+
+    if max_pool_connections is None:
+        max_pool_connections = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "50"))
+    if max_attempts is None:
+        max_attempts = int(os.getenv("AWS_MAX_ATTEMPTS", "3"))
+    if retry_mode is None:
+        retry_mode = os.getenv("AWS_RETRY_MODE", "standard")
+    if tcp_keepalive is None:
+        tcp_keepalive = os.getenv("AWS_TCP_KEEPALIVE", "True").lower() == "true"
+
+    return Config(
+        max_pool_connections=max_pool_connections,
+        retries={"max_attempts": max_attempts, "mode": retry_mode},
+        tcp_keepalive=tcp_keepalive,
+    )
+
+
+def get_client(
+    service_type: str,
+    max_pool_connections: Optional[int] = None,
+    max_attempts: Optional[int] = None,
+    retry_mode: Optional[str] = None,
+    tcp_keepalive: Optional[bool] = None,
+):
+    """Get a cached service client.
+
+    The first call for a service, endpoint and configuration builds the client;
+    later calls return the same instance and its warm connection pool.
+
+    Args:
+        service_type (str): The AWS service name, e.g. "sqs".
+        max_pool_connections (Optional[int]): Connections kept open per client.
+        max_attempts (Optional[int]): Attempts per request including the first.
+        retry_mode (Optional[str]): The botocore retry mode.
+        tcp_keepalive (Optional[bool]): Whether to enable TCP keep-alive.
+    """
 
     endpoint_url = os.getenv("AWS_ENDPOINT_URL", None)
+    region_name = os.getenv("AWS_REGION")
+    config = get_config(
+        max_pool_connections=max_pool_connections,
+        max_attempts=max_attempts,
+        retry_mode=retry_mode,
+        tcp_keepalive=tcp_keepalive,
+    )
 
-    if endpoint_url is None:
-        return boto3.client(
-            service_type,
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            region_name=os.getenv("AWS_REGION"),
-        )
-    else:
-        return boto3.client(
-            service_type,
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            region_name=os.getenv("AWS_REGION"),
-            endpoint_url=endpoint_url,
-        )
+    key = (
+        service_type,
+        endpoint_url,
+        region_name,
+        config.max_pool_connections,
+        config.retries["max_attempts"],
+        config.retries["mode"],
+        config.tcp_keepalive,
+    )
+
+    client = _client_cache.get(key)
+    if client is not None:
+        return client
+
+    with _client_lock:
+        if key not in _client_cache:
+            # Imported on first use, boto3 dominates service import time
+            import boto3
+
+            _client_cache[key] = boto3.client(
+                service_type,
+                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                region_name=region_name,
+                endpoint_url=endpoint_url,
+                config=config,
+            )
+        return _client_cache[key]
+
+
+def clear_client_cache():
+    """Drop every cached client, e.g. after forking a worker process."""
+    with _client_lock:
+        _client_cache.clear()
 
 
 def get_resource(service_type: str):
     """Get a service resource."""
+    import boto3
 
     endpoint_url = os.getenv("AWS_ENDPOINT_URL", None)
 
@@ -38,6 +131,7 @@ def get_resource(service_type: str):
             aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
             aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
             region_name=os.getenv("AWS_REGION"),
+            config=get_config(),
         )
     else:
         return boto3.resource(
@@ -46,4 +140,5 @@ def get_resource(service_type: str):
             aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
             region_name=os.getenv("AWS_REGION"),
             endpoint_url=endpoint_url,
+            config=get_config(),
         )
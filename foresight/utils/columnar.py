@@ -0,0 +1,126 @@
+"""Column-oriented decoding of query results into NumPy arrays.
+
+Two paths are supported. Binary COPY output of fixed width columns is decoded
+with a single `np.frombuffer` call. Anything else (text columns, NULLs) goes
+through plain tuples, converted column by column.
+"""
+
+import struct
+from datetime import datetime
+from datetime import timezone
+from typing import Optional
+
+import numpy as np
+
+
+COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+
+# Microseconds between the Unix epoch and the PostgreSQL epoch (2000-01-01)
+POSTGRES_EPOCH_US = 946_684_800_000_000
+
+# PostgreSQL type OID -> (binary COPY format, NumPy dtype)
+FIXED_WIDTH_TYPES: dict[int, tuple[str, str]] = {
+    16: ("?", "bool"),  # boolean
+    20: (">i8", "int64"),  # bigint
+    21: (">i2", "int16"),  # smallint
+    23: (">i4", "int32"),  # integer
+    700: (">f4", "float32"),  # real
+    701: (">f8", "float64"),  # double precision
+    1114: (">i8", "datetime64[us]"),  # timestamp
+    1184: (">i8", "datetime64[us]"),  # timestamptz, in UTC
+}
+
+TIMESTAMP_TYPES = {1114, 1184}
+FLOAT_TYPES = {700, 701, 1700}
+INTEGER_TYPES = {20, 21, 23}
+
+
+def parse_copy_binary(
+    data: bytes,
+    names: list[str],
+    type_codes: list[int],
+) -> Optional[dict[str, np.ndarray]]:
+    """Decode binary COPY output of fixed width, non-null columns.
+
+    Args:
+        data (bytes): The output of COPY ... TO STDOUT WITH (FORMAT binary).
+        names (list[str]): The column names.
+        type_codes (list[int]): The PostgreSQL type OID of every column.
+
+    Returns:
+        Optional[dict[str, np.ndarray]]: The columns, or None when the data
+            cannot be decoded as fixed width rows (e.g. it contains NULLs).
+    """
+    if any(type_code not in FIXED_WIDTH_TYPES for type_code in type_codes):
+        return None
+    if not data.startswith(COPY_SIGNATURE):
+        raise ValueError("Not a binary COPY stream.")
+
+    # Signature, flags and header extension, then the rows and a -1 trailer
+    (extension_length,) = struct.unpack_from(">i", data, len(COPY_SIGNATURE) + 4)
+    start = len(COPY_SIGNATURE) + 8 + extension_length
+    body = data[start:-2]
+
+    fields = [("count", ">i2")]
+    for index, type_code in enumerate(type_codes):
+        fields.append((f"length_{index}", ">i4"))
+        fields.append((f"value_{index}", FIXED_WIDTH_TYPES[type_code][0]))
+    row_type = np.dtype(fields)
+
+    if len(body) % row_type.itemsize != 0:
+        return None
+    rows = np.frombuffer(body, dtype=row_type)
+    if not (rows["count"] == len(names)).all():
+        return None
+
+    columns = {}
+    for index, (name, type_code) in enumerate(zip(names, type_codes)):
+        width = row_type.fields[f"value_{index}"][0].itemsize
+        if not (rows[f"length_{index}"] == width).all():
+            return None
+
+        values = rows[f"value_{index}"]
+        if type_code in TIMESTAMP_TYPES:
+            columns[name] = (values.astype("int64") + POSTGRES_EPOCH_US).astype(
+                "datetime64[us]",
+            )
+        else:
+            columns[name] = values.astype(FIXED_WIDTH_TYPES[type_code][1])
+    return columns
+
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert an aware datetime to naive UTC, which NumPy can represent."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def columns_from_rows(
+    rows: list[tuple],
+    names: list[str],
+    type_codes: list[int],
+) -> dict[str, np.ndarray]:
+    """Convert plain tuples into one NumPy array per column.
+
+    Timestamps become UTC datetime64[us] (NULL as NaT), floats float64 (NULL as
+    NaN), integers int64 (float64 if they contain NULL) and anything else an
+    object array.
+    """
+    values_by_column = list(zip(*rows)) if rows else [() for _ in names]
+
+    columns = {}
+    for name, type_code, values in zip(names, type_codes, values_by_column):
+        if type_code in TIMESTAMP_TYPES:
+            columns[name] = np.array(
+                [to_naive_utc(value) for value in values],
+                dtype="datetime64[us]",
+            )
+        elif type_code in FLOAT_TYPES:
+            columns[name] = np.array(values, dtype="float64")
+        elif type_code in INTEGER_TYPES:
+            has_null = any(value is None for value in values)
+            columns[name] = np.array(values, dtype="float64" if has_null else "int64")
+        else:
+            columns[name] = np.array(values, dtype=object)
+    return columns
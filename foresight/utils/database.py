@@ -1,21 +1,44 @@
 """Provides a singleton class to interact with the TimescaleDB database."""
 
+import io
 import os
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+from typing import Iterator
+from typing import Optional
 from typing import Union
+from uuid import uuid4
 
 import dotenv
-import psycopg2
-import psycopg2.extras
 
 from foresight.utils.logger import generate_logger
 
 
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+
 dotenv.load_dotenv(".env")
 
 
 logger = generate_logger(name=__name__)
 
 
+def connection_params() -> dict:
+    """The TIMESCALE_* connection parameters of the database."""
+    return {
+        "host": os.getenv("TIMESCALE_HOST"),  # Replace with your TimescaleDB host
+        "port": os.getenv("TIMESCALE_PORT"),  # Replace with your TimescaleDB port
+        "dbname": os.getenv("TIMESCALE_DB"),  # Replace with your database name
+        "user": os.getenv("TIMESCALE_USER"),  # Replace with your database user
+        "password": os.getenv(
+            "TIMESCALE_PASSWORD",
+        ),  # Replace with your database password
+    }
+
+
 class TimeScaleService:
     """Singleton Service to interact with Timescale DB"""
 
@@ -26,37 +49,41 @@ class TimeScaleService:
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance.connection = None
+            # Idle connections reused by stream, which needs one per cursor
+            cls._instance.stream_connections = []
+            cls._instance.stream_lock = threading.Lock()
         return cls._instance
 
     def __init__(self):
         """Connect to the database."""
-        # Connection parameters
-        db_params = {
-            "host": os.getenv("TIMESCALE_HOST"),  # Replace with your TimescaleDB host
-            "port": os.getenv("TIMESCALE_PORT"),  # Replace with your TimescaleDB port
-            "database": os.getenv("TIMESCALE_DB"),  # Replace with your database name
-            "user": os.getenv("TIMESCALE_USER"),  # Replace with your database user
-            "password": os.getenv(
-                "TIMESCALE_PASSWORD",
-            ),  # Replace with your database password
-        }
-
         if self.connection is None:
-            try:
-                self.connection = psycopg2.connect(
-                    **db_params,
-                    cursor_factory=psycopg2.extras.RealDictCursor,
-                )
-                self.connection.autocommit = True
-                logger.info("Connected to TimescaleDB")
-            except Exception as connection_exception:
-                raise Exception(
-                    f"Failed to connect to the database: {connection_exception}",
-                )
+            self.connection = self.connect()
+            logger.info("Connected to TimescaleDB")
+
+    @staticmethod
+    def connect():
+        """Open a new autocommit connection to the database."""
+        # Imported on first connection to keep service start up fast
+        import psycopg2
+        import psycopg2.extras
+
+        try:
+            connection = psycopg2.connect(
+                **connection_params(),
+                cursor_factory=psycopg2.extras.RealDictCursor,
+            )
+            connection.autocommit = True
+            return connection
+        except Exception as connection_exception:
+            raise Exception(
+                f"Failed to connect to the database: {connection_exception}",
+            )
 
     def create_table(self, query, table_name=None, column_name=None):
         """Create a table in the database."""
         if self.connection is not None:
+            import psycopg2
+
             try:
                 with self.connection.cursor() as cursor:
                     cursor.execute(query)
@@ -78,6 +105,8 @@ class TimeScaleService:
     def execute(self, query, params: Union[tuple, list] = None):
         """Execute a query on the database."""
         if self.connection is not None:
+            import psycopg2.extras
+
             try:
                 with self.connection.cursor() as cursor:
                     if params is None or isinstance(params, tuple):
@@ -93,12 +122,196 @@ class TimeScaleService:
         else:
             raise Exception("Database connection not established.")
 
+    def stream(
+        self,
+        query,
+        params: tuple = None,
+        itersize: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+    ) -> Iterator[Union[dict, list[dict]]]:
+        """Stream the rows of a query through a server-side cursor.
+
+        Rows are fetched from the server itersize at a time, so arbitrarily large
+        results are read in constant memory. The cursor runs on a connection
+        of its own to keep the shared connection free for other queries, taken
+        from the idle streaming connections of the process and returned once
+        the stream ends.
+
+        Args:
+            query (str): The query to run.
+            params (tuple): The query parameters.
+            itersize (Optional[int]): Rows fetched per round trip. Defaults to
+                env TIMESCALE_ITERSIZE or 10000.
+            chunk_size (Optional[int]): Yield lists of this many rows instead of
+                single rows.
+
+        Yields:
+            Union[dict, list[dict]]: A row, or a chunk of rows.
+        """
+        if itersize is None:
+            itersize = int(os.getenv("TIMESCALE_ITERSIZE", "10000"))
+
+        connection = self.acquire_stream_connection()
+        try:
+            with connection.cursor(name=f"foresight_{uuid4().hex}") as cursor:
+                cursor.itersize = itersize
+                cursor.execute(query, params)
+
+                if chunk_size is None:
+                    yield from cursor
+                else:
+                    while rows := cursor.fetchmany(chunk_size):
+                        yield rows
+        except Exception as stream_exception:
+            raise Exception(f"Failed to stream query: {stream_exception}")
+        finally:
+            self.release_stream_connection(connection)
+
+    def acquire_stream_connection(self):
+        """An idle streaming connection, or a new one if all of them are in use."""
+        with self.stream_lock:
+            if self.stream_connections:
+                return self.stream_connections.pop()
+
+        connection = self.connect()
+        # Named cursors must live inside a transaction
+        connection.autocommit = False
+        return connection
+
+    def release_stream_connection(self, connection):
+        """End the transaction of a streaming connection and keep it for reuse.
+
+        At most TIMESCALE_STREAM_POOL_SIZE (default 8) connections are kept
+        idle. Connections that cannot be rolled back are closed.
+        """
+        try:
+            connection.rollback()
+        except Exception as rollback_exception:  # pylint: disable=broad-except
+            logger.warning("Closing a broken stream connection: %s", rollback_exception)
+            connection.close()
+            return
+
+        pool_size = int(os.getenv("TIMESCALE_STREAM_POOL_SIZE") or 8)
+        with self.stream_lock:
+            if len(self.stream_connections) < pool_size:
+                self.stream_connections.append(connection)
+                return
+        connection.close()
+
+    def fetch_columns(
+        self,
+        query,
+        params: tuple = None,
+        binary: bool = True,
+    ) -> dict[str, "np.ndarray"]:
+        """Run a query and return one NumPy array per column.
+
+        Results made only of fixed width columns (numbers, booleans and
+        timestamps) without NULLs are read with binary COPY and decoded in one
+        pass. Otherwise rows are read as plain tuples, skipping dict rows.
+        Timestamps are returned as UTC datetime64[us].
+
+        Args:
+            query (str): The query to run.
+            params (tuple): The query parameters.
+            binary (bool): Whether to try the binary COPY path.
+
+        Returns:
+            dict[str, np.ndarray]: The columns in query order.
+        """
+        if self.connection is None:
+            raise Exception("Database connection not established.")
+
+        import psycopg2.extensions
+
+        from foresight.utils.columnar import FIXED_WIDTH_TYPES
+        from foresight.utils.columnar import columns_from_rows
+        from foresight.utils.columnar import parse_copy_binary
+
+        try:
+            with self.connection.cursor(
+                cursor_factory=psycopg2.extensions.cursor,
+            ) as cursor:
+                if binary:
+                    cursor.execute(f"SELECT * FROM ({query}) AS q LIMIT 0", params)
+                    names = [column.name for column in cursor.description]
+                    type_codes = [column.type_code for column in cursor.description]
+
+                    if all(type_code in FIXED_WIDTH_TYPES for type_code in type_codes):
+                        buffer = io.BytesIO()
+                        inlined = cursor.mogrify(query, params).decode("utf-8")
+                        cursor.copy_expert(
+                            f"COPY ({inlined}) TO STDOUT WITH (FORMAT binary)",
+                            buffer,
+                        )
+                        columns = parse_copy_binary(
+                            buffer.getvalue(),
+                            names=names,
+                            type_codes=type_codes,
+                        )
+                        if columns is not None:
+                            return columns
+
+                cursor.execute(query, params)
+                return columns_from_rows(
+                    cursor.fetchall(),
+                    names=[column.name for column in cursor.description],
+                    type_codes=[column.type_code for column in cursor.description],
+                )
+        except Exception as query_execute_exception:
+            raise Exception(f"Failed to execute query: {query_execute_exception}")
+
+    def fetch_dataframe(
+        self,
+        query,
+        params: tuple = None,
+        binary: bool = True,
+    ) -> "pd.DataFrame":
+        """Run a query and return a DataFrame built from columnar arrays.
+
+        Timestamp columns are returned as timezone aware UTC.
+        """
+        import pandas as pd
+
+        data = pd.DataFrame(self.fetch_columns(query, params=params, binary=binary))
+        for name in data.columns:
+            if pd.api.types.is_datetime64_dtype(data[name]):
+                data[name] = data[name].dt.tz_localize("UTC")
+        return data
+
+    @contextmanager
+    def transaction(self):
+        """Run the queries executed within the block in a single transaction."""
+        if self.connection is None:
+            raise Exception("Database connection not established.")
+
+        self.connection.autocommit = False
+        try:
+            yield self
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            self.connection.autocommit = True
+
+    def explain(self, query, params: tuple = None, analyze: bool = True) -> dict:
+        """Return the JSON query plan, executing the query when analyze is set."""
+        options = "ANALYZE, FORMAT JSON" if analyze else "FORMAT JSON"
+        result = self.execute(query=f"EXPLAIN ({options}) {query}", params=params)
+        return result[0]["QUERY PLAN"][0]
+
     def close(self):
-        """Close the database connection."""
+        """Close the database connection and the idle streaming connections."""
         if self.connection is not None:
             self.connection.close()
             self.connection = None
 
+        with self.stream_lock:
+            idle, self.stream_connections = self.stream_connections, []
+        for connection in idle:
+            connection.close()
+
 
 # Example usage:
 # # Execute a sample query against native tables.
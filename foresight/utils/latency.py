@@ -0,0 +1,149 @@
+"""Tracks tick-to-indicator latency across the pipeline stages."""
+
+import math
+import threading
+import time
+from datetime import datetime
+from datetime import timezone
+from typing import Optional
+
+from foresight.utils.logger import generate_logger
+from foresight.utils.models.latency_metric import LatencyMetric
+
+
+logger = generate_logger(name=__name__)
+
+# Message attribute names used to carry timestamps through SQS
+ORIGIN_TIME_ATTRIBUTE = "origin_time"
+SENT_TIME_ATTRIBUTE = "sent_time"
+
+
+def to_utc(value: datetime) -> datetime:
+    """Normalize a datetime to UTC. Naive values are treated as local time."""
+    return value.astimezone(timezone.utc)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of the samples.
+
+    Args:
+        samples (list[float]): The samples, in any order.
+        pct (float): The percentile to compute (0-100).
+
+    Returns:
+        float: The percentile value.
+    """
+    if len(samples) == 0:
+        raise ValueError("Cannot compute a percentile without samples.")
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def time_attributes(origin_time: datetime) -> dict:
+    """Build the SQS message attributes carrying the origin and sent timestamps."""
+    return {
+        ORIGIN_TIME_ATTRIBUTE: {
+            "DataType": "String",
+            "StringValue": to_utc(origin_time).isoformat(),
+        },
+        SENT_TIME_ATTRIBUTE: {
+            "DataType": "String",
+            "StringValue": datetime.now(timezone.utc).isoformat(),
+        },
+    }
+
+
+def parse_time_attribute(message: dict, name: str) -> Optional[datetime]:
+    """Read a timestamp attribute from a received SQS message, if present."""
+    attribute = message.get("MessageAttributes", {}).get(name)
+    if attribute is None:
+        return None
+    return datetime.fromisoformat(attribute["StringValue"])
+
+
+class LatencyTracker:
+    """Collects latency samples per stage and periodically stores percentiles.
+
+    Args:
+        flush_interval (float): Seconds between writes of the percentiles.
+        table_name (str): The table the percentiles are written to.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = 60,
+        table_name: str = "latency_metrics",
+    ):
+        self.flush_interval = flush_interval
+        self.table_name = table_name
+        self.samples: dict[str, list[float]] = {}
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+
+    def record(
+        self,
+        stage: str,
+        origin_time: datetime,
+        now: Optional[datetime] = None,
+    ) -> float:
+        """Record the latency between the origin time and now for a stage.
+
+        Args:
+            stage (str): The pipeline stage.
+            origin_time (datetime): When the data originated.
+            now (Optional[datetime]): The observation time. Defaults to now.
+
+        Returns:
+            float: The latency in seconds.
+        """
+        if now is None:
+            now = datetime.now(timezone.utc)
+        latency = (to_utc(now) - to_utc(origin_time)).total_seconds()
+        self.observe(stage=stage, seconds=latency)
+        return latency
+
+    def observe(self, stage: str, seconds: float):
+        """Add a latency sample in seconds and flush when the interval elapsed."""
+        with self.lock:
+            self.samples.setdefault(stage, []).append(seconds)
+            due = time.monotonic() - self.last_flush >= self.flush_interval
+
+        if due:
+            self.flush()
+
+    def summarize(self, stage: str) -> Optional[LatencyMetric]:
+        """Compute the percentiles for the samples collected for a stage."""
+        samples = self.samples.get(stage, [])
+        if len(samples) == 0:
+            return None
+
+        return LatencyMetric(
+            stage=stage,
+            time=datetime.now(timezone.utc),
+            count=len(samples),
+            p50=percentile(samples, 50),
+            p95=percentile(samples, 95),
+            p99=percentile(samples, 99),
+            max=max(samples),
+        )
+
+    def flush(self) -> list[LatencyMetric]:
+        """Store the percentiles of every stage and reset the samples.
+
+        Returns:
+            list[LatencyMetric]: The metrics that were computed.
+        """
+        with self.lock:
+            metrics = [self.summarize(stage) for stage in self.samples]
+            metrics = [metric for metric in metrics if metric is not None]
+            self.samples = {}
+            self.last_flush = time.monotonic()
+
+        for metric in metrics:
+            try:
+                metric.insert(table_name=self.table_name)
+            except Exception as insert_exception:  # pylint: disable=broad-except
+                logger.error("Error saving latency metric: %s", insert_exception)
+
+        return metrics
@@ -1,27 +1,156 @@
+"""Queued logging shared by every Foresight service.
+
+Records are handed to a queue on the calling thread and formatted and written
+by a single background listener, so the hot paths never block on I/O.
+"""
+
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
+import time
+from typing import Optional
+from typing import TextIO
+
+
+DEFAULT_FORMAT = "%(asctime)s %(levelname)-8s %(message)s"
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that leaves all message formatting to the listener thread.
+
+    The standard handler renders the message before enqueueing it. Arguments
+    are instead passed through untouched, so they must not be mutated after
+    the logging call.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Enqueue the record as is."""
+        return record
+
+
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_queue_handler = DeferredQueueHandler(_log_queue)
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging(
+    formatter_str: str = DEFAULT_FORMAT,
+    stream: Optional[TextIO] = None,
+) -> logging.handlers.QueueListener:
+    """Start (or restart) the background listener writing queued records.
+
+    Args:
+        formatter_str (str, optional): The formatter string.
+        stream (Optional[TextIO], optional): Where to write. Defaults to stderr.
+
+    Returns:
+        logging.handlers.QueueListener: The running listener.
+    """
+    global _listener  # pylint: disable=global-statement
+
+    if _listener is not None:
+        _listener.stop()
+    else:
+        atexit.register(shutdown_logging)
+
+    stream_handler = logging.StreamHandler(stream)
+    stream_handler.setFormatter(logging.Formatter(formatter_str))
+
+    _listener = logging.handlers.QueueListener(_log_queue, stream_handler)
+    _listener.start()
+
+    return _listener
+
+
+def shutdown_logging():
+    """Flush the queued records and stop the background listener."""
+    global _listener  # pylint: disable=global-statement
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
 
 def generate_logger(
     name: str,
-    log_level: str = "INFO",
-    formatter_str: str = "%(asctime)s %(levelname)-8s %(message)s",
+    log_level: Optional[str] = None,
+    formatter_str: str = DEFAULT_FORMAT,
 ) -> logging.Logger:
     """Generate a logger with the given name and log level.
 
+    Handlers are only configured once per process, so calling this repeatedly
+    for the same name never duplicates output.
+
     Args:
         name (str): The name of the logger.
-        log_level (str, optional): The log level. Defaults to "INFO".
-        formatter_str (str, optional): The formatter string. Defaults to "".
+        log_level (str, optional): The log level. Defaults to env LOG_LEVEL or "INFO".
+        formatter_str (str, optional): The formatter string. Only used when the
+            listener is first configured.
 
     Returns:
         logging.Logger: The logger.
     """
+    if _listener is None:
+        configure_logging(formatter_str=formatter_str)
+
     logger = logging.getLogger(name)
-    logger.setLevel(log_level)
+    logger.setLevel(log_level or os.getenv("LOG_LEVEL", "INFO"))
 
-    formatter = logging.Formatter(formatter_str)
-    stream_handler = logging.StreamHandler()
-    stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
+    if _queue_handler not in logger.handlers:
+        logger.addHandler(_queue_handler)
 
     return logger
+
+
+class SampledLogger:
+    """Rate limits high frequency log lines such as one per tick.
+
+    Args:
+        logger (logging.Logger): The logger to write to.
+        every_n (int): Only log one out of every n calls.
+        max_per_second (Optional[float]): Upper bound of lines per second.
+        level (int): The level to log at.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        every_n: int = 1,
+        max_per_second: Optional[float] = None,
+        level: int = logging.INFO,
+    ):
+        if every_n < 1:
+            raise ValueError("every_n must be at least 1.")
+        self.logger = logger
+        self.every_n = every_n
+        self.min_interval = 0.0 if max_per_second is None else 1.0 / max_per_second
+        self.level = level
+        self.calls = 0
+        self.suppressed = 0
+        self.last_logged = float("-inf")
+
+    def log(self, msg: str, *args) -> bool:
+        """Log the message if the level is enabled and the sample allows it.
+
+        Returns:
+            bool: Whether the message was logged.
+        """
+        if not self.logger.isEnabledFor(self.level):
+            return False
+
+        self.calls += 1
+        if self.calls % self.every_n != 0:
+            self.suppressed += 1
+            return False
+
+        if self.min_interval > 0:
+            now = time.monotonic()
+            if now - self.last_logged < self.min_interval:
+                self.suppressed += 1
+                return False
+            self.last_logged = now
+
+        self.logger.log(self.level, msg, *args)
+        return True
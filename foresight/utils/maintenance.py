@@ -0,0 +1,136 @@
+"""Maintenance command reporting hypertable storage and compressing chunks.
+
+    python -m foresight.utils.maintenance report
+    python -m foresight.utils.maintenance compress --older-than "1 hour"
+"""
+
+import argparse
+import time
+
+from foresight.utils.database import TimeScaleService
+from foresight.utils.logger import generate_logger
+from foresight.utils.models.storage_policy import INTERVAL_PATTERN
+from foresight.utils.storage.timescale_storage import TimescaleStorage
+
+
+logger = generate_logger(name=__name__)
+
+
+def storage_stats(table_name: str = "forex_data") -> dict:
+    """Total, compressed and uncompressed size of a hypertable.
+
+    Args:
+        table_name (str): The hypertable to inspect.
+
+    Returns:
+        dict: Chunk counts and sizes in bytes.
+    """
+    total = TimeScaleService().execute(
+        query=f"SELECT hypertable_size('{table_name}') AS total_bytes",
+    )[0]
+    compression = TimeScaleService().execute(
+        query=f"""SELECT
+            COALESCE(total_chunks, 0) AS total_chunks,
+            COALESCE(number_compressed_chunks, 0) AS compressed_chunks,
+            COALESCE(before_compression_total_bytes, 0) AS before_compression_bytes,
+            COALESCE(after_compression_total_bytes, 0) AS after_compression_bytes
+        FROM hypertable_compression_stats('{table_name}')""",
+    )
+
+    stats = {
+        "total_bytes": total["total_bytes"] or 0,
+        "total_chunks": 0,
+        "compressed_chunks": 0,
+        "before_compression_bytes": 0,
+        "after_compression_bytes": 0,
+    }
+    if compression:
+        stats.update(compression[0])
+    return stats
+
+
+def time_scan(
+    table_name: str = "forex_data",
+    instrument: str = "EUR_USD",
+    repeat: int = 3,
+) -> float:
+    """Best time in seconds of the one second bucket scan run by ForexData.fetch.
+
+    Args:
+        table_name (str): The hypertable to scan.
+        instrument (str): The instrument to fetch.
+        repeat (int): The number of runs.
+    """
+    query, params = TimescaleStorage.bucket_query(
+        instrument=instrument,
+        timescale="S",
+        table_name=table_name,
+    )
+
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        TimeScaleService().execute(query=query, params=params)
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def compress_chunks(table_name: str = "forex_data", older_than: str = "1 hour") -> int:
+    """Compress every chunk older than the interval now instead of waiting for the policy.
+
+    Returns:
+        int: The number of chunks processed.
+    """
+    if not INTERVAL_PATTERN.match(older_than):
+        raise ValueError(f"Invalid interval: '{older_than}'. Expected e.g. '7 days'.")
+
+    chunks = TimeScaleService().execute(
+        query=f"""SELECT compress_chunk(chunk, if_not_compressed => true)
+        FROM show_chunks('{table_name}', older_than => INTERVAL '{older_than}') AS chunk""",
+    )
+    return len(chunks)
+
+
+def format_report(stats: dict, scan_seconds: float) -> str:
+    """Human readable storage report."""
+    ratio = (
+        stats["before_compression_bytes"] / stats["after_compression_bytes"]
+        if stats["after_compression_bytes"]
+        else 0.0
+    )
+    return (
+        f"total size: {stats['total_bytes'] / 1024 ** 2:,.2f} MiB, "
+        f"chunks: {stats['compressed_chunks']}/{stats['total_chunks']} compressed, "
+        f"compressed chunks: {stats['before_compression_bytes'] / 1024 ** 2:,.2f} MiB -> "
+        f"{stats['after_compression_bytes'] / 1024 ** 2:,.2f} MiB ({ratio:.1f}x), "
+        f"scan: {scan_seconds * 1000:,.1f} ms"
+    )
+
+
+def main():
+    """Run the maintenance command."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("command", choices=["report", "compress"])
+    parser.add_argument("--table-name", default="forex_data")
+    parser.add_argument("--instrument", default="EUR_USD")
+    parser.add_argument("--older-than", default="1 hour")
+    args = parser.parse_args()
+
+    before = format_report(
+        storage_stats(args.table_name),
+        time_scan(args.table_name, args.instrument),
+    )
+    print(f"{'before' if args.command == 'compress' else 'current'}: {before}")
+
+    if args.command == "compress":
+        chunks = compress_chunks(args.table_name, older_than=args.older_than)
+        after = format_report(
+            storage_stats(args.table_name),
+            time_scan(args.table_name, args.instrument),
+        )
+        print(f"compressed {chunks} chunks")
+        print(f"after: {after}")
+
+
+if __name__ == "__main__":
+    main()
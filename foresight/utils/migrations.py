@@ -0,0 +1,335 @@
+"""Versioned schema migrations for every table owned by Foresight.
+
+Each schema is an ordered list of migrations. Statements are templates on
+`{table_name}` so the same schema can back temporary tables, and the applied
+versions are tracked per table in `schema_migrations`. Migrations only ever
+add to a schema, so existing data is kept.
+
+    python -m foresight.utils.migrations
+"""
+
+from typing import Optional
+
+from pydantic import BaseModel
+
+from foresight.utils.database import TimeScaleService
+from foresight.utils.logger import generate_logger
+
+
+logger = generate_logger(name=__name__)
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+
+class Migration(BaseModel):
+    """A versioned change to a schema.
+
+    Args:
+        version (int): The version, increasing within a schema.
+        description (str): What the migration does.
+        statements (list[str]): SQL templates formatted with the table name.
+    """
+
+    version: int
+    description: str
+    statements: list[str]
+
+
+SCHEMAS: dict[str, list[Migration]] = {
+    "forex_data": [
+        Migration(
+            version=1,
+            description="Create the forex data hypertable",
+            statements=[
+                """CREATE TABLE IF NOT EXISTS {table_name} (
+                    instrument VARCHAR(10) NOT NULL,
+                    time TIMESTAMPTZ NOT NULL,
+                    bid FLOAT NOT NULL,
+                    ask FLOAT NOT NULL
+                )""",
+                "SELECT create_hypertable('{table_name}', 'time', if_not_exists => TRUE)",
+            ],
+        ),
+        Migration(
+            version=2,
+            description="Index ticks by instrument and time for fetch",
+            statements=[
+                """CREATE INDEX IF NOT EXISTS {table_name}_instrument_time_idx
+                ON {table_name} (instrument, time DESC)""",
+            ],
+        ),
+        Migration(
+            version=3,
+            description="Count the ticks a conflated row stands for",
+            statements=[
+                """ALTER TABLE {table_name}
+                ADD COLUMN IF NOT EXISTS tick_count INTEGER NOT NULL DEFAULT 1""",
+            ],
+        ),
+    ],
+    "subscription_feed": [
+        Migration(
+            version=1,
+            description="Create the subscription feed table",
+            statements=[
+                """CREATE TABLE IF NOT EXISTS {table_name} (
+                    queue_url VARCHAR(255) NOT NULL,
+                    instrument VARCHAR(10) NOT NULL,
+                    timescale VARCHAR(10) NOT NULL,
+                    order_type VARCHAR(10) NOT NULL,
+                    PRIMARY KEY (queue_url, instrument, timescale)
+                )""",
+            ],
+        ),
+        Migration(
+            version=2,
+            description="Notify listeners of subscription changes",
+            statements=[
+                """CREATE OR REPLACE FUNCTION {table_name}_notify() RETURNS TRIGGER AS $$
+                BEGIN
+                    PERFORM pg_notify(
+                        TG_TABLE_NAME,
+                        json_build_object(
+                            'op', TG_OP,
+                            'old', row_to_json(OLD),
+                            'new', row_to_json(NEW)
+                        )::TEXT
+                    );
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql""",
+                "DROP TRIGGER IF EXISTS {table_name}_notify_rows ON {table_name}",
+                """CREATE TRIGGER {table_name}_notify_rows
+                AFTER INSERT OR UPDATE OR DELETE ON {table_name}
+                FOR EACH ROW EXECUTE FUNCTION {table_name}_notify()""",
+                "DROP TRIGGER IF EXISTS {table_name}_notify_truncate ON {table_name}",
+                """CREATE TRIGGER {table_name}_notify_truncate
+                AFTER TRUNCATE ON {table_name}
+                FOR EACH STATEMENT EXECUTE FUNCTION {table_name}_notify()""",
+            ],
+        ),
+    ],
+    "indicator_results": [
+        Migration(
+            version=1,
+            description="Create the indicator results hypertable",
+            statements=[
+                """CREATE TABLE IF NOT EXISTS {table_name} (
+                    component_name VARCHAR(255) NOT NULL,
+                    time TIMESTAMPTZ NOT NULL,
+                    value TEXT NOT NULL,
+                    PRIMARY KEY (component_name, time)
+                )""",
+                "SELECT create_hypertable('{table_name}', 'time', if_not_exists => TRUE)",
+            ],
+        ),
+        # Version 2 created an index on (component_name, time DESC), which the
+        # primary key already serves in both directions
+        Migration(
+            version=3,
+            description="Drop the index duplicating the primary key",
+            statements=[
+                "DROP INDEX IF EXISTS {table_name}_component_time_idx",
+            ],
+        ),
+    ],
+    "forex_bars": [
+        Migration(
+            version=1,
+            description="Create the forex bars hypertable",
+            statements=[
+                """CREATE TABLE IF NOT EXISTS {table_name} (
+                    instrument VARCHAR(10) NOT NULL,
+                    resolution VARCHAR(10) NOT NULL,
+                    time TIMESTAMPTZ NOT NULL,
+                    bid_open FLOAT NOT NULL,
+                    bid_high FLOAT NOT NULL,
+                    bid_low FLOAT NOT NULL,
+                    bid_close FLOAT NOT NULL,
+                    bid_mean FLOAT NOT NULL,
+                    ask_open FLOAT NOT NULL,
+                    ask_high FLOAT NOT NULL,
+                    ask_low FLOAT NOT NULL,
+                    ask_close FLOAT NOT NULL,
+                    ask_mean FLOAT NOT NULL,
+                    tick_count INTEGER NOT NULL,
+                    PRIMARY KEY (instrument, resolution, time)
+                )""",
+                "SELECT create_hypertable('{table_name}', 'time', if_not_exists => TRUE)",
+            ],
+        ),
+        Migration(
+            version=2,
+            description="Keep the times of the ticks the open and close are taken from",
+            statements=[
+                """ALTER TABLE {table_name}
+                ADD COLUMN IF NOT EXISTS first_time TIMESTAMPTZ,
+                ADD COLUMN IF NOT EXISTS last_time TIMESTAMPTZ""",
+            ],
+        ),
+    ],
+    "indicator_checkpoints": [
+        Migration(
+            version=1,
+            description="Create the indicator checkpoints table",
+            statements=[
+                """CREATE TABLE IF NOT EXISTS {table_name} (
+                    component_name VARCHAR(255) NOT NULL PRIMARY KEY,
+                    time TIMESTAMPTZ NOT NULL,
+                    watermark TIMESTAMPTZ,
+                    pricing TEXT NOT NULL,
+                    result TEXT
+                )""",
+            ],
+        ),
+        Migration(
+            version=2,
+            description="Key checkpoints by replica, reading the window from the ticks",
+            statements=[
+                """ALTER TABLE {table_name}
+                ADD COLUMN IF NOT EXISTS replica VARCHAR(255) NOT NULL DEFAULT ''""",
+                "ALTER TABLE {table_name} DROP COLUMN IF EXISTS pricing",
+                "ALTER TABLE {table_name} DROP CONSTRAINT IF EXISTS {table_name}_pkey",
+                "ALTER TABLE {table_name} ADD PRIMARY KEY (component_name, replica)",
+            ],
+        ),
+    ],
+    "latency_metrics": [
+        Migration(
+            version=1,
+            description="Create the latency metrics hypertable",
+            statements=[
+                """CREATE TABLE IF NOT EXISTS {table_name} (
+                    stage VARCHAR(64) NOT NULL,
+                    time TIMESTAMPTZ NOT NULL,
+                    count INTEGER NOT NULL,
+                    p50 FLOAT NOT NULL,
+                    p95 FLOAT NOT NULL,
+                    p99 FLOAT NOT NULL,
+                    max FLOAT NOT NULL
+                )""",
+                "SELECT create_hypertable('{table_name}', 'time', if_not_exists => TRUE)",
+            ],
+        ),
+        Migration(
+            version=2,
+            description="Index metrics by stage and latest time for DISTINCT ON",
+            statements=[
+                """CREATE INDEX IF NOT EXISTS {table_name}_stage_time_idx
+                ON {table_name} (stage, time DESC)""",
+            ],
+        ),
+    ],
+}
+
+
+def check_schemas(schemas: dict[str, list[Migration]] = SCHEMAS):
+    """Validates that every schema has unique, strictly increasing versions."""
+    for schema, migrations in schemas.items():
+        versions = [migration.version for migration in migrations]
+        if versions != sorted(set(versions)) or versions[0] < 1:
+            raise ValueError(
+                f"Migrations of '{schema}' must have unique increasing versions: {versions}",
+            )
+
+
+def create_migrations_table():
+    """Create the table tracking the applied migrations if it does not exist."""
+    TimeScaleService().execute(
+        query=f"""CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+            table_name VARCHAR(255) NOT NULL,
+            schema_name VARCHAR(255) NOT NULL,
+            version INTEGER NOT NULL,
+            description TEXT NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (table_name, version)
+        )""",
+    )
+
+
+def applied_versions(table_name: str) -> set[int]:
+    """The migration versions already applied to a table."""
+    rows = TimeScaleService().execute(
+        query=f"SELECT version FROM {MIGRATIONS_TABLE} WHERE table_name = %s",
+        params=(table_name,),
+    )
+    return {row["version"] for row in rows}
+
+
+def migrate(schema: str, table_name: Optional[str] = None) -> list[int]:
+    """Apply the pending migrations of a schema to a table.
+
+    Each migration runs in its own transaction under an advisory lock, so
+    services starting at the same time apply it exactly once.
+
+    Args:
+        schema (str): The schema to apply, e.g. "forex_data".
+        table_name (Optional[str]): The table to migrate. Defaults to the schema name.
+
+    Returns:
+        list[int]: The versions that were applied.
+    """
+    if schema not in SCHEMAS:
+        raise ValueError(f"Unknown schema: '{schema}'.")
+    if table_name is None:
+        table_name = schema
+
+    create_migrations_table()
+
+    applied = []
+    for migration in SCHEMAS[schema]:
+        if migration.version in applied_versions(table_name):
+            continue
+
+        service = TimeScaleService()
+        with service.transaction():
+            service.execute(
+                query="SELECT pg_advisory_xact_lock(hashtext(%s))",
+                params=(table_name,),
+            )
+            # Another process may have applied it while we waited on the lock
+            if migration.version in applied_versions(table_name):
+                continue
+
+            for statement in migration.statements:
+                service.execute(query=statement.format(table_name=table_name))
+            service.execute(
+                query=f"""INSERT INTO {MIGRATIONS_TABLE}
+                (table_name, schema_name, version, description)
+                VALUES (%s, %s, %s, %s)""",
+                params=(table_name, schema, migration.version, migration.description),
+            )
+
+        logger.info(
+            "Applied migration %s of %s to %s: %s",
+            migration.version,
+            schema,
+            table_name,
+            migration.description,
+        )
+        applied.append(migration.version)
+
+    return applied
+
+
+def forget_migrations(table_name: str):
+    """Remove the migration history of a dropped table."""
+    create_migrations_table()
+    TimeScaleService().execute(
+        query=f"DELETE FROM {MIGRATIONS_TABLE} WHERE table_name = %s",
+        params=(table_name,),
+    )
+
+
+def migrate_all() -> dict[str, list[int]]:
+    """Apply the pending migrations of every schema to its default table."""
+    return {schema: migrate(schema) for schema in SCHEMAS}
+
+
+check_schemas()
+
+
+if __name__ == "__main__":
+    for schema_name, versions in migrate_all().items():
+        current = max(applied_versions(schema_name), default=0)
+        print(f"{schema_name}: version {current} (applied {versions or 'none'})")
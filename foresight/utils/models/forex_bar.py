@@ -0,0 +1,229 @@
+"""Forex Bar Model used in TimeScaleDB"""
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+from foresight.utils.database import TimeScaleService
+from foresight.utils.logger import generate_logger
+from foresight.utils.migrations import forget_migrations
+from foresight.utils.migrations import migrate
+from foresight.utils.models.forex_data import ForexData
+
+
+logger = generate_logger(name=__name__)
+
+COLUMNS = [
+    "instrument",
+    "resolution",
+    "time",
+    "bid_open",
+    "bid_high",
+    "bid_low",
+    "bid_close",
+    "bid_mean",
+    "ask_open",
+    "ask_high",
+    "ask_low",
+    "ask_close",
+    "ask_mean",
+    "tick_count",
+    "first_time",
+    "last_time",
+]
+
+
+class ForexBar(BaseModel):
+    """TimescaleDB model for an open/high/low/close bar of bid and ask prices.
+
+    Args:
+        instrument (str): The currency pair.
+        resolution (str): The bar resolution (S, M, H or D).
+        time (datetime): The start of the bar.
+        bid_open (float): The first bid price.
+        bid_high (float): The highest bid price.
+        bid_low (float): The lowest bid price.
+        bid_close (float): The last bid price.
+        bid_mean (float): The mean bid price.
+        ask_open (float): The first ask price.
+        ask_high (float): The highest ask price.
+        ask_low (float): The lowest ask price.
+        ask_close (float): The last ask price.
+        ask_mean (float): The mean ask price.
+        tick_count (int): The number of ticks in the bar.
+        first_time (Optional[datetime]): The time of the tick the open is taken from.
+        last_time (Optional[datetime]): The time of the tick the close is taken from.
+    """
+
+    instrument: str
+    resolution: str
+    time: datetime
+    bid_open: float
+    bid_high: float
+    bid_low: float
+    bid_close: float
+    bid_mean: float
+    ask_open: float
+    ask_high: float
+    ask_low: float
+    ask_close: float
+    ask_mean: float
+    tick_count: int
+    first_time: Optional[datetime] = None
+    last_time: Optional[datetime] = None
+
+    @staticmethod
+    def create_table(table_name: str = "forex_bars") -> str:
+        """Create a table in the data store if it does not exist.
+
+        Args:
+            table_name (str): The name of the table to create.
+
+        Returns:
+            str: The name of the table created.
+        """
+
+        migrate(schema="forex_bars", table_name=table_name)
+        return table_name
+
+    @staticmethod
+    def drop_table(table_name: str = "forex_bars"):
+        """Drop a table in the data store.
+
+        Args:
+            table_name (str): The name of the table to drop.
+        """
+
+        TimeScaleService().execute(query=f"DROP TABLE {table_name}")
+        forget_migrations(table_name=table_name)
+
+    @staticmethod
+    def insert_multiple(data: list["ForexBar"], table_name: str = "forex_bars"):
+        """Upsert bars efficiently.
+
+        A bar written again (e.g. with ticks that arrived after it was
+        written) is merged into the stored one, keeping the open of the
+        earliest tick and the close of the latest. The bars must have
+        distinct keys, as Postgres cannot update a row twice in one insert.
+        """
+        if len(data) > 0:
+            TimeScaleService().execute(
+                query=f"""INSERT INTO {table_name} ({", ".join(COLUMNS)}) VALUES %s
+                ON CONFLICT (instrument, resolution, time) DO UPDATE SET
+                    bid_open = CASE WHEN EXCLUDED.first_time < {table_name}.first_time
+                        THEN EXCLUDED.bid_open ELSE {table_name}.bid_open END,
+                    bid_high = GREATEST({table_name}.bid_high, EXCLUDED.bid_high),
+                    bid_low = LEAST({table_name}.bid_low, EXCLUDED.bid_low),
+                    bid_close = CASE WHEN {table_name}.last_time IS NULL
+                        OR EXCLUDED.last_time >= {table_name}.last_time
+                        THEN EXCLUDED.bid_close ELSE {table_name}.bid_close END,
+                    bid_mean = ({table_name}.bid_mean * {table_name}.tick_count
+                        + EXCLUDED.bid_mean * EXCLUDED.tick_count)
+                        / ({table_name}.tick_count + EXCLUDED.tick_count),
+                    ask_open = CASE WHEN EXCLUDED.first_time < {table_name}.first_time
+                        THEN EXCLUDED.ask_open ELSE {table_name}.ask_open END,
+                    ask_high = GREATEST({table_name}.ask_high, EXCLUDED.ask_high),
+                    ask_low = LEAST({table_name}.ask_low, EXCLUDED.ask_low),
+                    ask_close = CASE WHEN {table_name}.last_time IS NULL
+                        OR EXCLUDED.last_time >= {table_name}.last_time
+                        THEN EXCLUDED.ask_close ELSE {table_name}.ask_close END,
+                    ask_mean = ({table_name}.ask_mean * {table_name}.tick_count
+                        + EXCLUDED.ask_mean * EXCLUDED.tick_count)
+                        / ({table_name}.tick_count + EXCLUDED.tick_count),
+                    tick_count = {table_name}.tick_count + EXCLUDED.tick_count,
+                    first_time = LEAST({table_name}.first_time, EXCLUDED.first_time),
+                    last_time = GREATEST({table_name}.last_time, EXCLUDED.last_time)""",
+                params=[
+                    tuple(getattr(bar, column) for column in COLUMNS) for bar in data
+                ],
+            )
+
+    @staticmethod
+    def fetch(
+        instrument: str = "EUR_USD",
+        timescale: str = "S",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        table_name: str = "forex_bars",
+    ) -> list["ForexBar"]:
+        """
+        Fetch the precomputed bars of an instrument, reading one row per bar.
+
+        Parameters:
+            instrument (str): The instrument to fetch
+            timescale (str): The bar resolution (S = Second, M = Minute, H = Hour, D = Day)
+            start (Optional[datetime]): Inclusive lower bound of the bar time
+            end (Optional[datetime]): Exclusive upper bound of the bar time
+            table_name (str): The table to read from
+
+        Returns:
+            list[ForexBar]: The bars in ascending time.
+        """
+        conditions = ["instrument = %s", "resolution = %s"]
+        params = [instrument, timescale]
+        if start is not None:
+            conditions.append("time >= %s")
+            params.append(start)
+        if end is not None:
+            conditions.append("time < %s")
+            params.append(end)
+
+        try:
+            results = TimeScaleService().execute(
+                query=f"""SELECT {", ".join(COLUMNS)}
+                FROM {table_name}
+                WHERE {" AND ".join(conditions)}
+                ORDER BY time ASC""",
+                params=tuple(params),
+            )
+            return [ForexBar(**row) for row in results]
+        except Exception as fetch_exception:  # pylint: disable=broad-except
+            logger.error("Error fetching data: %s", fetch_exception)
+            return []
+
+    def merge(self, other: "ForexBar") -> "ForexBar":
+        """Merge a bar with the same key, the way `insert_multiple` merges a stored one.
+
+        Args:
+            other (ForexBar): Another bar of the same instrument, resolution and time.
+
+        Returns:
+            ForexBar: The merged bar.
+        """
+        earlier = other if other.first_time < self.first_time else self
+        later = other if other.last_time >= self.last_time else self
+        tick_count = self.tick_count + other.tick_count
+        return self.model_copy(
+            update={
+                "bid_open": earlier.bid_open,
+                "bid_high": max(self.bid_high, other.bid_high),
+                "bid_low": min(self.bid_low, other.bid_low),
+                "bid_close": later.bid_close,
+                "bid_mean": (
+                    self.bid_mean * self.tick_count + other.bid_mean * other.tick_count
+                )
+                / tick_count,
+                "ask_open": earlier.ask_open,
+                "ask_high": max(self.ask_high, other.ask_high),
+                "ask_low": min(self.ask_low, other.ask_low),
+                "ask_close": later.ask_close,
+                "ask_mean": (
+                    self.ask_mean * self.tick_count + other.ask_mean * other.tick_count
+                )
+                / tick_count,
+                "tick_count": tick_count,
+                "first_time": earlier.first_time,
+                "last_time": later.last_time,
+            },
+        )
+
+    def to_forex_data(self) -> ForexData:
+        """The bar as the mean bid and ask, like a ForexData.fetch bucket."""
+        return ForexData(
+            instrument=self.instrument,
+            time=self.time,
+            bid=self.bid_mean,
+            ask=self.ask_mean,
+            tick_count=self.tick_count,
+        )
@@ -2,24 +2,30 @@
 
 import json
 from datetime import datetime
+from typing import TYPE_CHECKING
+from typing import Iterator
 from typing import Optional
 
 from pydantic import BaseModel
 from pydantic import model_validator
 
-from foresight.utils.database import TimeScaleService
 from foresight.utils.logger import generate_logger
+from foresight.utils.models.storage_policy import StoragePolicy
+from foresight.utils.storage import get_storage
+from foresight.utils.storage.base import FILL_MODES  # noqa: F401
+from foresight.utils.storage.base import interval_map  # noqa: F401
+from foresight.utils.storage.base import timescale_seconds  # noqa: F401
+from foresight.utils.storage.timescale_storage import TimescaleStorage
+
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 logger = generate_logger(name=__name__)
 
 # time_map: dict = {"S": "second"}
 
-# Generate the interval based on the timescale
-interval_map: dict = {
-    "S": "1 second",
-}
-
 
 class ForexData(BaseModel):
     """TimescaleDB model for forex data.
@@ -29,6 +35,9 @@ class ForexData(BaseModel):
         time (datetime): The time of the record.
         bid (float): The bid price.
         ask (float): The ask price.
+        tick_count (int): The number of ticks the record stands for.
+        last_time (Optional[datetime]): The time of the newest tick of a
+            bucket, only set on fetched buckets.
     """
 
     instrument: str
@@ -36,6 +45,8 @@ class ForexData(BaseModel):
     bid: Optional[float] = None
     ask: Optional[float] = None
     price: Optional[float] = None
+    tick_count: int = 1
+    last_time: Optional[datetime] = None
 
     @model_validator(mode="before")
     def check_bid_ask_or_price(cls, values):  # pylint: disable=no-self-argument
@@ -67,60 +78,37 @@ class ForexData(BaseModel):
         return values
 
     @staticmethod
-    def create_table(table_name: str = "forex_data") -> str:
+    def create_table(
+        table_name: str = "forex_data",
+        policy: Optional[StoragePolicy] = None,
+    ) -> str:
         """Create a table in the data store if it does not exist.
 
         Args:
             table_name (str): The name of the table to create.
+            policy (Optional[StoragePolicy]): Chunking, compression and retention.
+                Defaults to the FOREX_* environment settings.
 
         Returns:
             str: The name of the table created.
         """
+        return get_storage().create_forex_table(table_name=table_name, policy=policy)
 
-        # Execute SQL queries here
-        # ? Do we need a PK for INSTRUMENT and TIME?
-        TimeScaleService().create_table(
-            query=f"""CREATE TABLE IF NOT EXISTS {table_name} (
-            instrument VARCHAR(10) NOT NULL,
-            time TIMESTAMPTZ NOT NULL,
-            bid FLOAT NOT NULL,
-            ask FLOAT NOT NULL
-        )""",
-            table_name=table_name,
-            column_name="time",
-        )
-
-        return table_name
+    def to_row(self) -> tuple:
+        """The values of the stored columns, in FOREX_COLUMNS order."""
+        return (self.instrument, self.time, self.bid, self.ask, self.tick_count)
 
     def insert(self, table_name: str = "forex_data"):
         """Insert forex data into the database."""
-        TimeScaleService().execute(
-            query=f"""INSERT INTO {table_name} (instrument, time, bid, ask)
-            VALUES (%s, %s, %s, %s)""",
-            params=(
-                self.instrument,
-                self.time,
-                self.bid,
-                self.ask,
-            ),
-        )
+        get_storage().insert_forex(rows=[self.to_row()], table_name=table_name)
 
     @staticmethod
     def insert_multiple(data: list["ForexData"], table_name: str = "forex_data"):
         """Insert list of multiple forex data efficiently."""
-        if len(data) > 0:
-            TimeScaleService().execute(
-                query=f"""INSERT INTO {table_name} (instrument, time, bid, ask) VALUES %s""",
-                params=[
-                    (
-                        row.instrument,
-                        row.time,
-                        row.bid,
-                        row.ask,
-                    )
-                    for row in data
-                ],
-            )
+        get_storage().insert_forex(
+            rows=[row.to_row() for row in data],
+            table_name=table_name,
+        )
 
     @staticmethod
     def drop_table(table_name: str = "forex_data"):
@@ -129,9 +117,82 @@ class ForexData(BaseModel):
         Args:
             table_name (str): The name of the table to drop.
         """
+        get_storage().drop_forex_table(table_name=table_name)
+
+    @staticmethod
+    def bucket_query(
+        instrument: str,
+        timescale: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        table_name: str = "forex_data",
+    ) -> tuple[str, tuple]:
+        """Build the Timescale query averaging bid and ask per time bucket.
+
+        See `TimescaleStorage.bucket_query`.
+        """
+        return TimescaleStorage.bucket_query(
+            instrument=instrument,
+            timescale=timescale,
+            start=start,
+            end=end,
+            table_name=table_name,
+        )
 
-        # Execute SQL queries here
-        TimeScaleService().execute(query=f"DROP TABLE {table_name}")
+    @staticmethod
+    def window_query(
+        instrument: str,
+        timescale: str,
+        length: int,
+        end: Optional[datetime] = None,
+        fill: str = "locf",
+        table_name: str = "forex_data",
+    ) -> tuple[str, tuple]:
+        """Build the Timescale query returning exactly `length` consecutive buckets.
+
+        See `TimescaleStorage.window_query`.
+        """
+        return TimescaleStorage.window_query(
+            instrument=instrument,
+            timescale=timescale,
+            length=length,
+            end=end,
+            fill=fill,
+            table_name=table_name,
+        )
+
+    @staticmethod
+    def fetch_window(
+        instrument: str = "EUR_USD",
+        timescale: str = "S",
+        length: int = 60,
+        end: Optional[datetime] = None,
+        fill: str = "locf",
+        table_name: str = "forex_data",
+    ) -> dict[str, "np.ndarray"]:
+        """
+        Fetch the `length` most recent buckets as fixed-length NumPy arrays.
+
+        Parameters:
+            instrument (str): The instrument to fetch
+            timescale (str): The timescale to fetch (S = Second, M = Minute, H = Hour, D = Day)
+            length (int): The number of buckets
+            end (Optional[datetime]): The time of the last bucket. Defaults to now.
+            fill (str): "locf" to carry the last price forward, "nan" to leave gaps as NaN
+            table_name (str): The table to read from
+
+        Returns:
+            dict[str, np.ndarray]: time (UTC datetime64), bid, ask and
+                tick_count arrays of exactly `length` elements.
+        """
+        return get_storage().fetch_forex_window(
+            instrument=instrument,
+            timescale=timescale,
+            length=length,
+            end=end,
+            fill=fill,
+            table_name=table_name,
+        )
 
     @staticmethod
     def fetch(instrument: str = "EUR_USD", timescale: str = "S") -> list["ForexData"]:
@@ -142,28 +203,87 @@ class ForexData(BaseModel):
 
         Parameters:
             instrument (str): The instrument to fetch
-            timescale (str): The timescale to fetch (S = Second)
+            timescale (str): The timescale to fetch (S = Second, M = Minute, H = Hour, D = Day)
 
         Returns:
             dict: The data from the database
         """
         try:
-            query = f"""SELECT
-                instrument,
-                time_bucket('{interval_map[timescale]}', time) as time,
-                AVG(bid) as bid,
-                AVG(ask) as ask
-            FROM forex_data
-            WHERE instrument = '{instrument}'
-            GROUP BY instrument, time
-            ORDER BY time ASC"""
-            results = TimeScaleService().execute(query=query)
+            results = get_storage().fetch_forex(
+                instrument=instrument,
+                timescale=timescale,
+            )
 
             return [ForexData(**row) for row in results]
 
         except Exception as fetch_exception:  # pylint: disable=broad-except
             logger.error("Error fetching data: %s", fetch_exception)
 
+    @staticmethod
+    def fetch_columns(
+        instrument: str = "EUR_USD",
+        timescale: str = "S",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        table_name: str = "forex_data",
+    ) -> dict[str, "np.ndarray"]:
+        """
+        Fetch the bucketed data as NumPy arrays, skipping the model per row.
+
+        Parameters:
+            instrument (str): The instrument to fetch
+            timescale (str): The timescale to fetch (S = Second, M = Minute, H = Hour, D = Day)
+            start (Optional[datetime]): Inclusive lower bound of the tick time
+            end (Optional[datetime]): Exclusive upper bound of the tick time
+            table_name (str): The table to read from
+
+        Returns:
+            dict[str, np.ndarray]: time (UTC datetime64), bid and ask arrays.
+        """
+        return get_storage().fetch_forex_columns(
+            instrument=instrument,
+            timescale=timescale,
+            start=start,
+            end=end,
+            table_name=table_name,
+        )
+
+    @staticmethod
+    def stream(
+        instrument: str = "EUR_USD",
+        timescale: str = "S",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        chunk_size: int = 1000,
+        table_name: str = "forex_data",
+    ) -> Iterator[list["ForexData"]]:
+        """
+        Stream the bucketed data in chunks through a cursor.
+
+        Unlike fetch, only one chunk is held in memory at a time, so arbitrarily
+        large ranges such as backfills can be processed.
+
+        Parameters:
+            instrument (str): The instrument to fetch
+            timescale (str): The timescale to fetch (S = Second, M = Minute, H = Hour, D = Day)
+            start (Optional[datetime]): Inclusive lower bound of the tick time
+            end (Optional[datetime]): Exclusive upper bound of the tick time
+            chunk_size (int): The number of buckets per chunk
+            table_name (str): The table to read from
+
+        Yields:
+            list[ForexData]: The next chunk of buckets in ascending time.
+        """
+        for rows in get_storage().stream_forex(
+            instrument=instrument,
+            timescale=timescale,
+            start=start,
+            end=end,
+            chunk_size=chunk_size,
+            table_name=table_name,
+        ):
+            yield [ForexData(**row) for row in rows]
+
     def convert_to_price(self, order_type: str = "ask") -> "ForexData":
         """Convert the data to desired price format format.
 
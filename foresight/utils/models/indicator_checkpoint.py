@@ -0,0 +1,150 @@
+"""Indicator Checkpoint Model used in TimeScaleDB or in local files"""
+
+import json
+import os
+from datetime import datetime
+from typing import Any
+from typing import Optional
+
+from pydantic import BaseModel
+
+from foresight.utils.database import TimeScaleService
+from foresight.utils.logger import generate_logger
+from foresight.utils.migrations import forget_migrations
+from foresight.utils.migrations import migrate
+
+
+logger = generate_logger(name=__name__)
+
+
+class IndicatorCheckpoint(BaseModel):
+    """The state a replica of an indicator needs to resume where it stopped.
+
+    Args:
+        component_name (str): The indicator the state is of.
+        replica (str): The replica of the indicator the state is of.
+        time (datetime): The time the checkpoint was taken.
+        watermark (Optional[datetime]): The time up to which the replica
+            consumed every price, None until it has.
+        result (Any): The last result the replica saved, if any.
+    """
+
+    component_name: str
+    replica: str = ""
+    time: datetime
+    watermark: Optional[datetime] = None
+    result: Any = None
+
+    @staticmethod
+    def create_table(table_name: str = "indicator_checkpoints") -> str:
+        """Create a table in the data store if it does not exist.
+
+        Args:
+            table_name (str): The name of the table to create.
+
+        Returns:
+            str: The name of the table created.
+        """
+
+        migrate(schema="indicator_checkpoints", table_name=table_name)
+        return table_name
+
+    @staticmethod
+    def drop_table(table_name: str = "indicator_checkpoints"):
+        """Drop a table in the data store.
+
+        Args:
+            table_name (str): The name of the table to drop.
+        """
+
+        TimeScaleService().execute(query=f"DROP TABLE {table_name}")
+        forget_migrations(table_name=table_name)
+
+    def insert(self, table_name: str = "indicator_checkpoints"):
+        """Replace the checkpoint of the replica in the database."""
+        TimeScaleService().execute(
+            query=f"""INSERT INTO {table_name}
+            (component_name, replica, time, watermark, result)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (component_name, replica) DO UPDATE SET
+            time = EXCLUDED.time,
+            watermark = EXCLUDED.watermark,
+            result = EXCLUDED.result""",
+            params=(
+                self.component_name,
+                self.replica,
+                self.time,
+                self.watermark,
+                json.dumps(self.result, separators=(",", ":")),
+            ),
+        )
+
+    @staticmethod
+    def fetch(
+        component_name: str,
+        replica: str = "",
+        table_name: str = "indicator_checkpoints",
+    ) -> Optional["IndicatorCheckpoint"]:
+        """
+        Fetch the checkpoint of a replica of an indicator from the database.
+
+        Args:
+            component_name (str): The indicator to fetch the checkpoint of.
+            replica (str): The replica to fetch the checkpoint of.
+            table_name (str): The name of the table to fetch data from.
+
+        Returns:
+            Optional[IndicatorCheckpoint]: The checkpoint, None if there is none.
+        """
+        rows = TimeScaleService().execute(
+            query=f"""SELECT component_name, replica, time, watermark, result
+            FROM {table_name} WHERE component_name = %s AND replica = %s""",
+            params=(component_name, replica),
+        )
+        if not rows:
+            return None
+
+        row = rows[0]
+        return IndicatorCheckpoint(
+            component_name=row["component_name"],
+            replica=row["replica"],
+            time=row["time"],
+            watermark=row["watermark"],
+            result=json.loads(row["result"]) if row["result"] is not None else None,
+        )
+
+    @staticmethod
+    def file_path(directory: str, component_name: str, replica: str = "") -> str:
+        """The path of the checkpoint file of a replica of an indicator."""
+        name = f"{component_name}.{replica}" if replica else component_name
+        return os.path.join(directory, f"{name}.json")
+
+    def write(self, directory: str) -> str:
+        """Replace the checkpoint file of the replica atomically.
+
+        Returns:
+            str: The path of the file.
+        """
+        path = IndicatorCheckpoint.file_path(
+            directory,
+            self.component_name,
+            self.replica,
+        )
+        os.makedirs(directory, exist_ok=True)
+        with open(f"{path}.tmp", "w") as file:
+            file.write(self.model_dump_json())
+        os.replace(f"{path}.tmp", path)
+        return path
+
+    @staticmethod
+    def read(
+        directory: str,
+        component_name: str,
+        replica: str = "",
+    ) -> Optional["IndicatorCheckpoint"]:
+        """Read the checkpoint file of a replica of an indicator, None if there is none."""
+        path = IndicatorCheckpoint.file_path(directory, component_name, replica)
+        if not os.path.exists(path):
+            return None
+        with open(path) as file:
+            return IndicatorCheckpoint.model_validate_json(file.read())
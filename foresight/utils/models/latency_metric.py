@@ -0,0 +1,103 @@
+"""Latency Metric Model used in TimeScaleDB"""
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from foresight.utils.database import TimeScaleService
+from foresight.utils.logger import generate_logger
+from foresight.utils.migrations import forget_migrations
+from foresight.utils.migrations import migrate
+
+
+logger = generate_logger(name=__name__)
+
+
+class LatencyMetric(BaseModel):
+    """TimescaleDB model for latency percentiles of a pipeline stage.
+
+    Args:
+        stage (str): The pipeline stage the samples were taken at.
+        time (datetime): The time the percentiles were computed.
+        count (int): The number of samples in the period.
+        p50 (float): The median latency in seconds.
+        p95 (float): The 95th percentile latency in seconds.
+        p99 (float): The 99th percentile latency in seconds.
+        max (float): The maximum latency in seconds.
+    """
+
+    stage: str
+    time: datetime
+    count: int
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+    @staticmethod
+    def create_table(table_name: str = "latency_metrics") -> str:
+        """Create a table in the data store if it does not exist.
+
+        Args:
+            table_name (str): The name of the table to create.
+
+        Returns:
+            str: The name of the table created.
+        """
+
+        migrate(schema="latency_metrics", table_name=table_name)
+        return table_name
+
+    @staticmethod
+    def drop_table(table_name: str = "latency_metrics"):
+        """Drop a table in the data store.
+
+        Args:
+            table_name (str): The name of the table to drop.
+        """
+
+        TimeScaleService().execute(query=f"DROP TABLE {table_name}")
+        forget_migrations(table_name=table_name)
+
+    def insert(self, table_name: str = "latency_metrics"):
+        """Insert the latency metric into the database."""
+        TimeScaleService().execute(
+            query=f"""INSERT INTO {table_name} (stage, time, count, p50, p95, p99, max)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+            params=(
+                self.stage,
+                self.time,
+                self.count,
+                self.p50,
+                self.p95,
+                self.p99,
+                self.max,
+            ),
+        )
+
+    @staticmethod
+    def latest_query(table_name: str = "latency_metrics") -> str:
+        """The query of the most recent percentiles for every stage."""
+        return f"""SELECT DISTINCT ON (stage) stage, time, count, p50, p95, p99, max
+            FROM {table_name}
+            ORDER BY stage, time DESC"""
+
+    @staticmethod
+    def fetch_latest(table_name: str = "latency_metrics") -> list["LatencyMetric"]:
+        """
+        Fetch the most recent percentiles for every stage.
+
+        Args:
+            table_name (str): The name of the table to fetch data from.
+
+        Returns:
+            list[LatencyMetric]: The latest metric per stage.
+        """
+        try:
+            results = TimeScaleService().execute(
+                query=LatencyMetric.latest_query(table_name=table_name),
+            )
+            return [LatencyMetric(**row) for row in results]
+        except Exception as fetch_exception:  # pylint: disable=broad-except
+            logger.error("Error fetching data: %s", fetch_exception)
+            return []
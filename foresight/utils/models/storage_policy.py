@@ -0,0 +1,129 @@
+"""Storage Policy Model for TimescaleDB hypertables"""
+
+import os
+import re
+from typing import Optional
+
+from pydantic import BaseModel
+from pydantic import field_validator
+
+from foresight.utils.database import TimeScaleService
+from foresight.utils.logger import generate_logger
+
+
+logger = generate_logger(name=__name__)
+
+# Intervals are interpolated into SQL, so only plain PostgreSQL intervals are allowed
+INTERVAL_PATTERN = re.compile(
+    r"^\d+ (microsecond|millisecond|second|minute|hour|day|week|month|year)s?$",
+)
+
+
+class StoragePolicy(BaseModel):
+    """Chunking, compression and retention of a hypertable.
+
+    Args:
+        chunk_time_interval (str): The time range covered by each chunk.
+        compress_after (Optional[str]): Age after which chunks are compressed.
+            None disables compression.
+        retention (Optional[str]): Age after which chunks are dropped.
+            None keeps the data forever.
+    """
+
+    chunk_time_interval: str = "1 day"
+    compress_after: Optional[str] = "7 days"
+    retention: Optional[str] = None
+
+    @field_validator("chunk_time_interval", "compress_after", "retention")
+    def check_interval(cls, value):  # pylint: disable=no-self-argument
+        """Validates that the value is a plain interval such as '7 days'."""
+        if value is not None and not INTERVAL_PATTERN.match(value):
+            raise ValueError(f"Invalid interval: '{value}'. Expected e.g. '7 days'.")
+        return value
+
+    @staticmethod
+    def from_env(prefix: str) -> "StoragePolicy":
+        """Load the policy from <prefix>_CHUNK_TIME_INTERVAL, <prefix>_COMPRESS_AFTER
+        and <prefix>_RETENTION. Empty values disable compression or retention.
+
+        Args:
+            prefix (str): The environment variable prefix, e.g. "FOREX".
+        """
+        defaults = StoragePolicy()
+        return StoragePolicy(
+            chunk_time_interval=os.getenv(
+                f"{prefix}_CHUNK_TIME_INTERVAL",
+                defaults.chunk_time_interval,
+            ),
+            compress_after=os.getenv(
+                f"{prefix}_COMPRESS_AFTER",
+                defaults.compress_after,
+            )
+            or None,
+            retention=os.getenv(f"{prefix}_RETENTION", defaults.retention) or None,
+        )
+
+    @staticmethod
+    def compression_configured(table_name: str) -> bool:
+        """Whether compression is already enabled on a hypertable.
+
+        Args:
+            table_name (str): The hypertable to check.
+        """
+        hypertables = TimeScaleService().execute(
+            query="""SELECT compression_enabled FROM timescaledb_information.hypertables
+            WHERE hypertable_name = %s""",
+            params=(table_name,),
+        )
+        return bool(hypertables) and bool(hypertables[0]["compression_enabled"])
+
+    def apply(self, table_name: str, segment_by: str, order_by: str = "time DESC"):
+        """Apply the policy to an existing hypertable.
+
+        Args:
+            table_name (str): The hypertable to configure.
+            segment_by (str): The column(s) compressed data is segmented by.
+            order_by (str): The order of the rows within a compressed segment.
+        """
+        service = TimeScaleService()
+
+        service.execute(
+            query=f"""SELECT set_chunk_time_interval(
+                '{table_name}', INTERVAL '{self.chunk_time_interval}'
+            )""",
+        )
+
+        # Policies are replaced so changed settings take effect on restart
+        service.execute(
+            query=f"SELECT remove_compression_policy('{table_name}', if_exists => true)",
+        )
+        if self.compress_after is not None:
+            # Compression settings cannot be altered once chunks are compressed
+            if StoragePolicy.compression_configured(table_name):
+                logger.info(
+                    "Compression already configured on %s. Skipping.",
+                    table_name,
+                )
+            else:
+                service.execute(
+                    query=f"""ALTER TABLE {table_name} SET (
+                        timescaledb.compress,
+                        timescaledb.compress_segmentby = '{segment_by}',
+                        timescaledb.compress_orderby = '{order_by}'
+                    )""",
+                )
+            service.execute(
+                query=f"""SELECT add_compression_policy(
+                    '{table_name}', INTERVAL '{self.compress_after}'
+                )""",
+            )
+
+        service.execute(
+            query=f"SELECT remove_retention_policy('{table_name}', if_exists => true)",
+        )
+        if self.retention is not None:
+            service.execute(
+                query=f"""SELECT add_retention_policy(
+                    '{table_name}', INTERVAL '{self.retention}'
+                )""",
+            )
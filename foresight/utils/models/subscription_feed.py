@@ -2,8 +2,8 @@
 
 from pydantic import BaseModel
 
-from foresight.utils.database import TimeScaleService
 from foresight.utils.logger import generate_logger
+from foresight.utils.storage import get_storage
 
 
 logger = generate_logger(name=__name__)
@@ -34,17 +34,7 @@ class SubscriptionFeed(BaseModel):
         Returns:
             str: The name of the table created.
         """
-
-        TimeScaleService().create_table(
-            query=f"""CREATE TABLE IF NOT EXISTS {table_name} (
-                queue_url VARCHAR(255) NOT NULL,
-                instrument VARCHAR(10) NOT NULL,
-                timescale VARCHAR(10) NOT NULL,
-                order_type VARCHAR(10) NOT NULL,
-                PRIMARY KEY (queue_url, instrument, timescale)
-            )""",
-        )
-        return table_name
+        return get_storage().create_subscription_table(table_name=table_name)
 
     @staticmethod
     def drop_table(table_name: str = "subscription_feed"):
@@ -53,21 +43,18 @@ class SubscriptionFeed(BaseModel):
         Args:
             table_name (str): The name of the table to drop.
         """
-
-        # Execute SQL queries here
-        TimeScaleService().execute(query=f"DROP TABLE {table_name}")
+        get_storage().drop_subscription_table(table_name=table_name)
 
     def insert(self, table_name: str = "subscription_feed"):
         """Insert subscription feed into the database."""
-        TimeScaleService().execute(
-            query=f"""INSERT INTO {table_name} (queue_url, instrument, timescale, order_type)
-            VALUES (%s, %s, %s, %s)""",
-            params=(
+        get_storage().insert_subscription(
+            row=(
                 self.queue_url,
                 self.instrument,
                 self.timescale,
                 self.order_type,
             ),
+            table_name=table_name,
         )
 
     @staticmethod
@@ -82,8 +69,8 @@ class SubscriptionFeed(BaseModel):
             dict: The data from the database
         """
         try:
-            active_feeds: list[dict] = TimeScaleService().execute(
-                query=f"SELECT queue_url, instrument, timescale, order_type FROM {table_name}",
+            active_feeds: list[dict] = get_storage().fetch_subscriptions(
+                table_name=table_name,
             )
 
             return [SubscriptionFeed(**feed) for feed in active_feeds]
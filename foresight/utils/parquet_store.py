@@ -0,0 +1,428 @@
+"""Parquet export of Timescale DB tables and pruned scans of the exported files.
+
+Research jobs read ticks and bars from Parquet files instead of the
+production database. Files are partitioned by instrument (and resolution for
+bars) and UTC date, and exported incrementally from a watermark per
+partition key:
+
+    python -m foresight.utils.parquet_store export --dataset forex_data
+    python -m foresight.utils.parquet_store export --dataset forex_bars
+
+Requires pyarrow (`pip install pyarrow`).
+"""
+
+import argparse
+import functools
+import json
+import math
+import operator
+import os
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import TYPE_CHECKING
+from typing import Optional
+
+import numpy as np
+
+from foresight.utils.columnar import to_naive_utc
+from foresight.utils.database import TimeScaleService
+from foresight.utils.logger import generate_logger
+from foresight.utils.storage.base import timescale_seconds
+
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+
+logger = generate_logger(name=__name__)
+
+# Partition keys and stored columns of every dataset, in file order
+DATASETS: dict[str, dict] = {
+    "forex_data": {
+        "partition_by": ("instrument",),
+        "columns": ("time", "bid", "ask", "tick_count"),
+    },
+    "forex_bars": {
+        "partition_by": ("instrument", "resolution"),
+        "columns": (
+            "time",
+            "bid_open",
+            "bid_high",
+            "bid_low",
+            "bid_close",
+            "bid_mean",
+            "ask_open",
+            "ask_high",
+            "ask_low",
+            "ask_close",
+            "ask_mean",
+            "tick_count",
+        ),
+    },
+}
+
+WATERMARKS_FILE = "_watermarks.json"
+
+DAY = timedelta(days=1)
+
+
+def parse_time(value: str) -> datetime:
+    """Parse an ISO 8601 time, naive times being UTC."""
+    time = datetime.fromisoformat(value)
+    return time if time.tzinfo is not None else time.replace(tzinfo=timezone.utc)
+
+
+def floor_time(time: datetime, seconds: int) -> datetime:
+    """The start of the bucket of `seconds` the time falls in."""
+    return datetime.fromtimestamp(
+        math.floor(time.timestamp() / seconds) * seconds,
+        tz=timezone.utc,
+    )
+
+
+class ParquetStore:
+    """Parquet files of the exported datasets under a root directory.
+
+    Each dataset is laid out as hive partitions, e.g.
+    `forex_data/instrument=EUR_USD/date=2024-01-01/part-<start>-<end>.parquet`,
+    so scans skip the directories outside of their instrument and dates, read
+    only the columns asked for and skip row groups by their time statistics.
+
+    Args:
+        root (Optional[str]): The root directory, PARQUET_ROOT or `parquet` by default.
+        lag (Optional[float]): Seconds before now the export stops at, so rows
+            still arriving are not exported, PARQUET_EXPORT_LAG or 60 by default.
+    """
+
+    def __init__(self, root: Optional[str] = None, lag: Optional[float] = None):
+        self.root = root or os.getenv("PARQUET_ROOT") or "parquet"
+        self.lag = (
+            lag if lag is not None else float(os.getenv("PARQUET_EXPORT_LAG") or 60)
+        )
+
+    def dataset_path(self, dataset: str) -> str:
+        """The directory of a dataset."""
+        if dataset not in DATASETS:
+            raise ValueError(
+                f"Unknown dataset: '{dataset}'. Expected one of {tuple(DATASETS)}.",
+            )
+        return os.path.join(self.root, dataset)
+
+    def load_watermarks(self, dataset: str) -> dict[str, datetime]:
+        """The exclusive end of the exported rows of every partition key."""
+        path = os.path.join(self.dataset_path(dataset), WATERMARKS_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as file:
+            return {key: parse_time(value) for key, value in json.load(file).items()}
+
+    def save_watermarks(self, dataset: str, watermarks: dict[str, datetime]):
+        """Replace the watermarks of a dataset atomically."""
+        path = os.path.join(self.dataset_path(dataset), WATERMARKS_FILE)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", "w") as file:
+            json.dump(
+                {key: value.isoformat() for key, value in watermarks.items()},
+                file,
+            )
+        os.replace(f"{path}.tmp", path)
+
+    @staticmethod
+    def partition_schema(dataset: str) -> "pa.Schema":
+        """The hive partition fields of a dataset, all strings."""
+        import pyarrow as pa
+
+        keys = DATASETS[dataset]["partition_by"] + ("date",)
+        return pa.schema([(key, pa.string()) for key in keys])
+
+    def write_part(
+        self,
+        dataset: str,
+        key: dict[str, str],
+        start: datetime,
+        end: datetime,
+        columns: dict[str, np.ndarray],
+    ) -> str:
+        """Write the rows of a partition key between start and end to a file.
+
+        The file is named after its time range, so exporting the same range
+        again replaces it instead of duplicating its rows.
+
+        Returns:
+            str: The path of the file.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        directory = os.path.join(
+            self.dataset_path(dataset),
+            *[f"{name}={value}" for name, value in key.items()],
+            f"date={start:%Y-%m-%d}",
+        )
+        os.makedirs(directory, exist_ok=True)
+        name = f"part-{start:%Y%m%dT%H%M%S%f}-{end:%Y%m%dT%H%M%S%f}.parquet"
+        path = os.path.join(directory, name)
+
+        arrays = {
+            "time": pa.array(columns["time"], type=pa.timestamp("us", tz="UTC")),
+            **{
+                column: pa.array(values)
+                for column, values in columns.items()
+                if column != "time"
+            },
+        }
+        # Files starting with a dot are skipped by scans until they are complete
+        temporary_path = os.path.join(directory, f".{name}")
+        pq.write_table(pa.table(arrays), temporary_path, compression="zstd")
+        os.replace(temporary_path, path)
+        return path
+
+    def export(
+        self,
+        dataset: str = "forex_data",
+        table_name: Optional[str] = None,
+        until: Optional[datetime] = None,
+    ) -> dict[str, int]:
+        """Export the rows added since the last export, one file per key and day.
+
+        Watermarks are saved after each file, so an interrupted export resumes
+        where it stopped.
+
+        Args:
+            dataset (str): The dataset to export, `forex_data` or `forex_bars`.
+            table_name (Optional[str]): The table to read, the dataset name by default.
+            until (Optional[datetime]): The exclusive end of the export, `lag`
+                seconds before now by default. Bars are only exported once
+                they are complete.
+
+        Returns:
+            dict[str, int]: The number of rows exported per partition key.
+        """
+        partition_by = DATASETS[dataset]["partition_by"]
+        columns = DATASETS[dataset]["columns"]
+        table_name = table_name or dataset
+        until = until or datetime.now(timezone.utc) - timedelta(seconds=self.lag)
+
+        watermarks = self.load_watermarks(dataset)
+        key_columns = ", ".join(partition_by)
+        first_times = TimeScaleService().execute(
+            query=f"""SELECT {key_columns}, MIN(time) AS first_time
+            FROM {table_name}
+            WHERE time < %s
+            GROUP BY {key_columns}
+            ORDER BY {key_columns}""",
+            params=(until,),
+        )
+
+        exported = {}
+        for row in first_times:
+            key = {name: row[name] for name in partition_by}
+            watermark_key = "/".join(key.values())
+
+            end = until
+            if "resolution" in key:
+                # A bar is complete once its whole interval is before the end
+                end = floor_time(until, timescale_seconds[key["resolution"]])
+
+            start = watermarks.get(watermark_key) or floor_time(row["first_time"], 1)
+            exported[watermark_key] = 0
+            while start < end:
+                slice_end = min(floor_time(start, int(DAY.total_seconds())) + DAY, end)
+                conditions = " AND ".join(f"{name} = %s" for name in partition_by)
+                data = TimeScaleService().fetch_columns(
+                    query=f"""SELECT {", ".join(columns)}
+                    FROM {table_name}
+                    WHERE {conditions} AND time >= %s AND time < %s
+                    ORDER BY time ASC""",
+                    params=(*key.values(), start, slice_end),
+                )
+                if len(data["time"]) > 0:
+                    self.write_part(dataset, key, start, slice_end, data)
+                    exported[watermark_key] += len(data["time"])
+
+                watermarks[watermark_key] = start = slice_end
+                self.save_watermarks(dataset, watermarks)
+
+            logger.info(
+                "Exported %s rows of %s %s",
+                exported[watermark_key],
+                dataset,
+                watermark_key,
+            )
+        return exported
+
+    def scan(
+        self,
+        dataset: str = "forex_data",
+        instrument: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        columns: Optional[list[str]] = None,
+        resolution: Optional[str] = None,
+    ) -> dict[str, np.ndarray]:
+        """Read exported rows, pruning partitions, row groups and columns.
+
+        Args:
+            dataset (str): The dataset to read.
+            instrument (Optional[str]): Only read this instrument.
+            start (Optional[datetime]): Inclusive lower bound of the time.
+            end (Optional[datetime]): Exclusive upper bound of the time.
+            columns (Optional[list[str]]): The columns to read, every stored one by default.
+            resolution (Optional[str]): Only read bars of this resolution.
+
+        Returns:
+            dict[str, np.ndarray]: The columns in ascending time, times as
+                UTC datetime64[us] like `TimeScaleService.fetch_columns`.
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.dataset as ds
+
+        columns = list(columns or DATASETS[dataset]["columns"])
+        if "time" not in columns:
+            columns.append("time")
+
+        path = self.dataset_path(dataset)
+        if not os.path.isdir(path):
+            return {
+                column: np.array(
+                    [],
+                    dtype="datetime64[us]" if column == "time" else None,
+                )
+                for column in columns
+            }
+
+        conditions = []
+        if instrument is not None:
+            conditions.append(pc.field("instrument") == instrument)
+        if resolution is not None:
+            conditions.append(pc.field("resolution") == resolution)
+        time_type = pa.timestamp("us", tz="UTC")
+        if start is not None:
+            conditions.append(pc.field("date") >= f"{to_naive_utc(start):%Y-%m-%d}")
+            conditions.append(
+                pc.field("time") >= pa.scalar(to_naive_utc(start), time_type),
+            )
+        if end is not None:
+            last = to_naive_utc(end) - timedelta(microseconds=1)
+            conditions.append(pc.field("date") <= f"{last:%Y-%m-%d}")
+            conditions.append(
+                pc.field("time") < pa.scalar(to_naive_utc(end), time_type),
+            )
+
+        table = ds.dataset(
+            path,
+            format="parquet",
+            partitioning=ds.partitioning(self.partition_schema(dataset), flavor="hive"),
+        ).to_table(
+            columns=columns,
+            filter=functools.reduce(operator.and_, conditions) if conditions else None,
+        )
+
+        result = {}
+        for column in columns:
+            values = table.column(column).to_numpy()
+            if column == "time":
+                values = values.astype("datetime64[us]")
+            result[column] = values
+
+        # Files are read in path order, which is only time order per instrument
+        if (np.diff(result["time"]) < np.timedelta64(0, "us")).any():
+            order = np.argsort(result["time"], kind="stable")
+            result = {column: values[order] for column, values in result.items()}
+        return result
+
+    def scan_buckets(
+        self,
+        instrument: str = "EUR_USD",
+        timescale: str = "S",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> dict[str, np.ndarray]:
+        """Exported ticks averaged per time bucket, like `ForexData.fetch_columns`.
+
+        Returns:
+            dict[str, np.ndarray]: The time, bid, ask and tick_count of every
+                bucket with ticks, in ascending time.
+        """
+        ticks = self.scan(
+            "forex_data",
+            instrument=instrument,
+            start=start,
+            end=end,
+            columns=["time", "bid", "ask", "tick_count"],
+        )
+        if len(ticks["time"]) == 0:
+            return {
+                "time": np.array([], dtype="datetime64[us]"),
+                "bid": np.array([], dtype=np.float64),
+                "ask": np.array([], dtype=np.float64),
+                "tick_count": np.array([], dtype=np.int64),
+            }
+
+        bucket_us = timescale_seconds[timescale] * 1_000_000
+        buckets = ticks["time"].astype("int64") // bucket_us
+        # The ticks are sorted, so each bucket is a run of equal values
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+        tick_count = ticks["tick_count"].astype(np.int64)
+        weight = np.add.reduceat(tick_count, starts)
+        return {
+            "time": (buckets[starts] * bucket_us).astype("datetime64[us]"),
+            "bid": np.add.reduceat(ticks["bid"] * tick_count, starts) / weight,
+            "ask": np.add.reduceat(ticks["ask"] * tick_count, starts) / weight,
+            "tick_count": weight,
+        }
+
+    def scan_prices(
+        self,
+        instrument: str = "EUR_USD",
+        timescale: str = "S",
+        order_type: str = "mid",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> "pd.DataFrame":
+        """Exported buckets as the instrument, time and price records indicators read.
+
+        `scan_prices(...).to_dict("records")` can be assigned to an
+        indicator's `pricing`.
+        """
+        import pandas as pd
+
+        buckets = self.scan_buckets(instrument, timescale, start=start, end=end)
+        if order_type == "ask":
+            price = buckets["ask"]
+        elif order_type == "bid":
+            price = buckets["bid"]
+        elif order_type == "mid":
+            price = (buckets["bid"] + buckets["ask"]) / 2
+        else:
+            raise ValueError("Invalid order type. Must be 'ask', 'bid', or 'mid'.")
+
+        return pd.DataFrame(
+            {
+                "instrument": instrument,
+                "time": pd.to_datetime(buckets["time"]).tz_localize("UTC"),
+                "price": price,
+            },
+        )
+
+
+def main():
+    """Run the export command."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("command", choices=["export"])
+    parser.add_argument("--dataset", choices=list(DATASETS), default="forex_data")
+    parser.add_argument("--table-name", default=None)
+    parser.add_argument("--root", default=None)
+    args = parser.parse_args()
+
+    store = ParquetStore(root=args.root)
+    exported = store.export(dataset=args.dataset, table_name=args.table_name)
+    for key, rows in exported.items():
+        print(f"{args.dataset} {key}: {rows:,} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Storage backends of the Foresight models, selected by STORAGE_BACKEND.
+
+    STORAGE_BACKEND=timescale  # Timescale DB through TIMESCALE_* (default)
+    STORAGE_BACKEND=duckdb     # Embedded DuckDB in DUCKDB_PATH, in memory by default
+"""
+
+import os
+import threading
+
+from foresight.utils.storage.base import StorageBackend
+
+
+BACKENDS = ("timescale", "duckdb")
+
+_backends: dict[str, StorageBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def create_storage(name: str) -> StorageBackend:
+    """Create the storage backend with the name."""
+    if name == "timescale":
+        from foresight.utils.storage.timescale_storage import TimescaleStorage
+
+        return TimescaleStorage()
+    if name == "duckdb":
+        from foresight.utils.storage.duckdb_storage import DuckDBStorage
+
+        return DuckDBStorage()
+    raise ValueError(f"Unknown storage backend: '{name}'. Expected one of {BACKENDS}.")
+
+
+def get_storage() -> StorageBackend:
+    """The storage backend selected by STORAGE_BACKEND, one per process."""
+    name = (os.getenv("STORAGE_BACKEND") or "timescale").lower()
+
+    backend = _backends.get(name)
+    if backend is not None:
+        return backend
+
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = create_storage(name)
+        return _backends[name]
@@ -0,0 +1,126 @@
+"""Interface of the storage backends behind the Foresight models."""
+
+from datetime import datetime
+from typing import TYPE_CHECKING
+from typing import Iterator
+from typing import Optional
+
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from foresight.utils.models.storage_policy import StoragePolicy
+
+
+# Generate the interval based on the timescale
+interval_map: dict = {
+    "S": "1 second",
+    "M": "1 minute",
+    "H": "1 hour",
+    "D": "1 day",
+}
+
+# Seconds per bucket of every timescale, all of which divide a day
+timescale_seconds: dict = {
+    "S": 1,
+    "M": 60,
+    "H": 60 * 60,
+    "D": 60 * 60 * 24,
+}
+
+FILL_MODES = ("locf", "nan")
+
+# Column order of the forex rows passed to insert_forex
+FOREX_COLUMNS = ("instrument", "time", "bid", "ask", "tick_count")
+
+# Column order of the subscription rows passed to insert_subscription
+SUBSCRIPTION_COLUMNS = ("queue_url", "instrument", "timescale", "order_type")
+
+
+class StorageBackend:
+    """Storage of forex ticks and subscription feeds.
+
+    Ticks are averaged per time bucket weighted by their tick_count, with
+    buckets aligned to the epoch. Rows are returned as dicts with timezone
+    aware UTC times, and columns as NumPy arrays with naive UTC datetime64.
+    """
+
+    name: str
+
+    def create_forex_table(
+        self,
+        table_name: str,
+        policy: Optional["StoragePolicy"] = None,
+    ) -> str:
+        """Create the forex table if it does not exist and return its name."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def drop_forex_table(self, table_name: str):
+        """Drop a forex table."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def insert_forex(self, rows: list[tuple], table_name: str):
+        """Insert rows of FOREX_COLUMNS."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def fetch_forex(
+        self,
+        instrument: str,
+        timescale: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        table_name: str = "forex_data",
+    ) -> list[dict]:
+        """The buckets of an instrument in ascending time."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def stream_forex(
+        self,
+        instrument: str,
+        timescale: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        chunk_size: int = 1000,
+        table_name: str = "forex_data",
+    ) -> Iterator[list[dict]]:
+        """The buckets of an instrument in chunks of ascending time."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def fetch_forex_columns(
+        self,
+        instrument: str,
+        timescale: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        table_name: str = "forex_data",
+    ) -> dict[str, "np.ndarray"]:
+        """The time, bid and ask of the buckets of an instrument as arrays."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def fetch_forex_window(
+        self,
+        instrument: str,
+        timescale: str,
+        length: int,
+        end: Optional[datetime] = None,
+        fill: str = "locf",
+        table_name: str = "forex_data",
+    ) -> dict[str, "np.ndarray"]:
+        """Exactly `length` consecutive buckets ending at the one containing end."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def create_subscription_table(self, table_name: str) -> str:
+        """Create the subscription table if it does not exist and return its name."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def drop_subscription_table(self, table_name: str):
+        """Drop a subscription table."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def insert_subscription(self, row: tuple, table_name: str):
+        """Insert a row of SUBSCRIPTION_COLUMNS."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def fetch_subscriptions(self, table_name: str) -> list[dict]:
+        """Every subscription row."""
+        raise NotImplementedError("Subclasses must implement this method.")
@@ -0,0 +1,309 @@
+"""Embedded DuckDB storage of the Foresight models."""
+
+import math
+import os
+import threading
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import TYPE_CHECKING
+from typing import Iterator
+from typing import Optional
+
+from foresight.utils.columnar import to_naive_utc
+from foresight.utils.logger import generate_logger
+from foresight.utils.storage.base import FILL_MODES
+from foresight.utils.storage.base import FOREX_COLUMNS
+from foresight.utils.storage.base import SUBSCRIPTION_COLUMNS
+from foresight.utils.storage.base import StorageBackend
+from foresight.utils.storage.base import interval_map
+from foresight.utils.storage.base import timescale_seconds
+
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from foresight.utils.models.storage_policy import StoragePolicy
+
+
+logger = generate_logger(name=__name__)
+
+
+class DuckDBStorage(StorageBackend):
+    """Storage in an embedded, columnar DuckDB database.
+
+    Needs no server: the database lives in a file, or in memory by default,
+    which suits single-node analysis and tests. Times are stored as naive UTC
+    TIMESTAMP and returned as aware UTC datetimes. Only one process can open
+    a database file for writing, so the services sharing data across
+    processes keep using Timescale DB. Requires `pip install duckdb`.
+
+    Args:
+        path (Optional[str]): The database file, DUCKDB_PATH or in memory by default.
+    """
+
+    name = "duckdb"
+
+    def __init__(self, path: Optional[str] = None):
+        import duckdb
+
+        self.path = path or os.getenv("DUCKDB_PATH") or ":memory:"
+        self.connection = duckdb.connect(self.path)
+        # A connection must not be used by two threads at once
+        self.lock = threading.Lock()
+        logger.info("Opened DuckDB database %s", self.path)
+
+    def execute(self, query: str, params: Optional[tuple] = None) -> list[dict]:
+        """Execute a query and return its rows as dicts with aware UTC times."""
+        with self.lock:
+            cursor = self.connection.execute(query, params or ())
+            if cursor.description is None:
+                return []
+            names = [column[0] for column in cursor.description]
+            return [self.to_row(names, values) for values in cursor.fetchall()]
+
+    @staticmethod
+    def to_row(names: list[str], values: tuple) -> dict:
+        """A row as a dict, with naive UTC datetimes made timezone aware."""
+        return {
+            name: (
+                value.replace(tzinfo=timezone.utc)
+                if isinstance(value, datetime)
+                else value
+            )
+            for name, value in zip(names, values)
+        }
+
+    @staticmethod
+    def bucket_query(
+        instrument: str,
+        timescale: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        table_name: str = "forex_data",
+    ) -> tuple[str, tuple]:
+        """Build the query averaging bid and ask per time bucket, like Timescale's."""
+        conditions = ["instrument = ?"]
+        params = [instrument]
+        if start is not None:
+            conditions.append("time >= ?")
+            params.append(to_naive_utc(start))
+        if end is not None:
+            conditions.append("time < ?")
+            params.append(to_naive_utc(end))
+
+        # Buckets under a day are aligned to midnight, so to the epoch
+        query = f"""SELECT
+            instrument,
+            time_bucket(INTERVAL '{interval_map[timescale]}', time) AS time,
+            SUM(bid * tick_count) / SUM(tick_count) AS bid,
+            SUM(ask * tick_count) / SUM(tick_count) AS ask,
+            CAST(SUM(tick_count) AS INTEGER) AS tick_count,
+            MAX(time) AS last_time
+        FROM {table_name}
+        WHERE {" AND ".join(conditions)}
+        GROUP BY 1, 2
+        ORDER BY time ASC"""
+        return query, tuple(params)
+
+    def create_forex_table(
+        self,
+        table_name: str,
+        policy: Optional["StoragePolicy"] = None,
+    ) -> str:
+        """Create the forex table. Storage policies only apply to hypertables."""
+        self.execute(
+            f"""CREATE TABLE IF NOT EXISTS {table_name} (
+                instrument VARCHAR NOT NULL,
+                time TIMESTAMP NOT NULL,
+                bid DOUBLE NOT NULL,
+                ask DOUBLE NOT NULL,
+                tick_count INTEGER NOT NULL DEFAULT 1
+            )""",
+        )
+        return table_name
+
+    def drop_forex_table(self, table_name: str):
+        """Drop a forex table."""
+        self.execute(f"DROP TABLE {table_name}")
+
+    def insert_forex(self, rows: list[tuple], table_name: str):
+        """Insert rows of FOREX_COLUMNS, in bulk through a DataFrame."""
+        if len(rows) == 0:
+            return
+        import pandas as pd
+
+        frame = pd.DataFrame(
+            [(row[0], to_naive_utc(row[1]), *row[2:]) for row in rows],
+            columns=FOREX_COLUMNS,
+        )
+        with self.lock:
+            self.connection.register("forex_rows", frame)
+            try:
+                self.connection.execute(
+                    f"""INSERT INTO {table_name} ({", ".join(FOREX_COLUMNS)})
+                    SELECT {", ".join(FOREX_COLUMNS)} FROM forex_rows""",
+                )
+            finally:
+                self.connection.unregister("forex_rows")
+
+    def fetch_forex(
+        self,
+        instrument: str,
+        timescale: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        table_name: str = "forex_data",
+    ) -> list[dict]:
+        """The buckets of an instrument in ascending time."""
+        query, params = self.bucket_query(instrument, timescale, start, end, table_name)
+        return self.execute(query, params)
+
+    def stream_forex(
+        self,
+        instrument: str,
+        timescale: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        chunk_size: int = 1000,
+        table_name: str = "forex_data",
+    ) -> Iterator[list[dict]]:
+        """The buckets of an instrument in chunks, on a cursor of their own."""
+        query, params = self.bucket_query(instrument, timescale, start, end, table_name)
+
+        with self.lock:
+            cursor = self.connection.cursor()
+        try:
+            cursor.execute(query, params)
+            names = [column[0] for column in cursor.description]
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield [self.to_row(names, values) for values in rows]
+        finally:
+            cursor.close()
+
+    def fetch_forex_columns(
+        self,
+        instrument: str,
+        timescale: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        table_name: str = "forex_data",
+    ) -> dict[str, "np.ndarray"]:
+        """The time, bid and ask of the buckets of an instrument as arrays."""
+        import numpy as np
+
+        query, params = self.bucket_query(instrument, timescale, start, end, table_name)
+        with self.lock:
+            columns = self.connection.execute(
+                f"SELECT time, bid, ask FROM ({query}) AS buckets",
+                params,
+            ).fetchnumpy()
+        return {
+            "time": np.asarray(columns["time"], dtype="datetime64[us]"),
+            "bid": np.asarray(columns["bid"], dtype=np.float64),
+            "ask": np.asarray(columns["ask"], dtype=np.float64),
+        }
+
+    def fetch_forex_window(
+        self,
+        instrument: str,
+        timescale: str,
+        length: int,
+        end: Optional[datetime] = None,
+        fill: str = "locf",
+        table_name: str = "forex_data",
+    ) -> dict[str, "np.ndarray"]:
+        """Exactly `length` consecutive buckets, gaps filled with NumPy."""
+        import numpy as np
+
+        if length < 1:
+            raise ValueError(f"Length must be at least 1, got {length}.")
+        if fill not in FILL_MODES:
+            raise ValueError(f"Unknown fill: '{fill}'. Expected one of {FILL_MODES}.")
+
+        seconds = timescale_seconds[timescale]
+        end = end or datetime.now(timezone.utc)
+        last_slot = math.floor(end.timestamp() / seconds) * seconds
+        first_slot = last_slot - seconds * (length - 1)
+        start = datetime.fromtimestamp(first_slot, tz=timezone.utc)
+
+        buckets = self.fetch_forex(
+            instrument=instrument,
+            timescale=timescale,
+            start=start,
+            end=start + timedelta(seconds=seconds * length),
+            table_name=table_name,
+        )
+
+        bid = np.full(length, np.nan)
+        ask = np.full(length, np.nan)
+        tick_count = np.zeros(length, dtype=np.int64)
+        for bucket in buckets:
+            index = int((bucket["time"].timestamp() - first_slot) // seconds)
+            bid[index], ask[index] = bucket["bid"], bucket["ask"]
+            tick_count[index] = bucket["tick_count"]
+
+        if fill == "locf":
+            seed = self.execute(
+                f"""SELECT
+                    SUM(bid * tick_count) / SUM(tick_count) AS bid,
+                    SUM(ask * tick_count) / SUM(tick_count) AS ask
+                FROM {table_name}
+                WHERE instrument = ? AND time < ? AND time >= (
+                    SELECT time_bucket(INTERVAL '{interval_map[timescale]}', MAX(time))
+                    FROM {table_name}
+                    WHERE instrument = ? AND time < ?
+                )""",
+                (instrument, to_naive_utc(start), instrument, to_naive_utc(start)),
+            )[0]
+            last_bid, last_ask = seed["bid"], seed["ask"]
+            for index in range(length):
+                if tick_count[index] == 0:
+                    bid[index] = np.nan if last_bid is None else last_bid
+                    ask[index] = np.nan if last_ask is None else last_ask
+                else:
+                    last_bid, last_ask = bid[index], ask[index]
+
+        return {
+            "time": (
+                np.datetime64(first_slot, "s")
+                + np.arange(length) * np.timedelta64(seconds, "s")
+            ).astype("datetime64[us]"),
+            "bid": bid,
+            "ask": ask,
+            "tick_count": tick_count,
+        }
+
+    def create_subscription_table(self, table_name: str) -> str:
+        """Create the subscription table."""
+        self.execute(
+            f"""CREATE TABLE IF NOT EXISTS {table_name} (
+                queue_url VARCHAR NOT NULL,
+                instrument VARCHAR NOT NULL,
+                timescale VARCHAR NOT NULL,
+                order_type VARCHAR NOT NULL,
+                PRIMARY KEY (queue_url, instrument, timescale)
+            )""",
+        )
+        return table_name
+
+    def drop_subscription_table(self, table_name: str):
+        """Drop a subscription table."""
+        self.execute(f"DROP TABLE {table_name}")
+
+    def insert_subscription(self, row: tuple, table_name: str):
+        """Insert a row of SUBSCRIPTION_COLUMNS."""
+        self.execute(
+            f"""INSERT INTO {table_name} ({", ".join(SUBSCRIPTION_COLUMNS)})
+            VALUES (?, ?, ?, ?)""",
+            row,
+        )
+
+    def fetch_subscriptions(self, table_name: str) -> list[dict]:
+        """Every subscription row."""
+        return self.execute(
+            f"SELECT {', '.join(SUBSCRIPTION_COLUMNS)} FROM {table_name}",
+        )
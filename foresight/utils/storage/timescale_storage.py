@@ -0,0 +1,333 @@
+"""Timescale DB storage of the Foresight models."""
+
+import math
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import TYPE_CHECKING
+from typing import Iterator
+from typing import Optional
+
+from foresight.utils.database import TimeScaleService
+from foresight.utils.migrations import forget_migrations
+from foresight.utils.migrations import migrate
+from foresight.utils.storage.base import FILL_MODES
+from foresight.utils.storage.base import FOREX_COLUMNS
+from foresight.utils.storage.base import SUBSCRIPTION_COLUMNS
+from foresight.utils.storage.base import StorageBackend
+from foresight.utils.storage.base import interval_map
+from foresight.utils.storage.base import timescale_seconds
+
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from foresight.utils.models.storage_policy import StoragePolicy
+
+
+class TimescaleStorage(StorageBackend):
+    """Storage in Timescale DB hypertables through the shared TimeScaleService.
+
+    Tables are created by the versioned migrations and buckets are computed
+    with `time_bucket`.
+    """
+
+    name = "timescale"
+
+    def create_forex_table(
+        self,
+        table_name: str,
+        policy: Optional["StoragePolicy"] = None,
+    ) -> str:
+        """Create the forex hypertable and apply its storage policy."""
+        from foresight.utils.models.storage_policy import StoragePolicy
+
+        # The schema is owned by the forex_data migrations
+        migrate(schema="forex_data", table_name=table_name)
+
+        if policy is None:
+            policy = StoragePolicy.from_env(prefix="FOREX")
+        policy.apply(table_name=table_name, segment_by="instrument")
+
+        return table_name
+
+    def drop_forex_table(self, table_name: str):
+        """Drop a forex table and forget its migrations."""
+        TimeScaleService().execute(query=f"DROP TABLE {table_name}")
+        forget_migrations(table_name=table_name)
+
+    def insert_forex(self, rows: list[tuple], table_name: str):
+        """Insert rows of FOREX_COLUMNS in one statement."""
+        if len(rows) == 1:
+            TimeScaleService().execute(
+                query=f"""INSERT INTO {table_name} ({", ".join(FOREX_COLUMNS)})
+                VALUES (%s, %s, %s, %s, %s)""",
+                params=rows[0],
+            )
+        elif len(rows) > 1:
+            TimeScaleService().execute(
+                query=f"""INSERT INTO {table_name}
+                ({", ".join(FOREX_COLUMNS)}) VALUES %s""",
+                params=rows,
+            )
+
+    @staticmethod
+    def bucket_query(
+        instrument: str,
+        timescale: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        table_name: str = "forex_data",
+    ) -> tuple[str, tuple]:
+        """Build the query averaging bid and ask per time bucket.
+
+        Args:
+            instrument (str): The instrument to fetch
+            timescale (str): The timescale of the buckets (S, M, H or D)
+            start (Optional[datetime]): Inclusive lower bound of the tick time
+            end (Optional[datetime]): Exclusive upper bound of the tick time
+            table_name (str): The table to read from
+
+        Returns:
+            tuple[str, tuple]: The query and its parameters.
+        """
+        conditions = ["instrument = %s"]
+        params = [instrument]
+        if start is not None:
+            conditions.append("time >= %s")
+            params.append(start)
+        if end is not None:
+            conditions.append("time < %s")
+            params.append(end)
+
+        # Group by position, a bare "time" would group by the raw tick time.
+        # Averages are weighted by tick_count so conflated rows average like raw ticks.
+        # last_time is the newest tick of the bucket, the origin of its latency.
+        query = f"""SELECT
+            instrument,
+            time_bucket('{interval_map[timescale]}', time) as time,
+            SUM(bid * tick_count) / SUM(tick_count) as bid,
+            SUM(ask * tick_count) / SUM(tick_count) as ask,
+            SUM(tick_count)::INTEGER as tick_count,
+            MAX(time) as last_time
+        FROM {table_name}
+        WHERE {" AND ".join(conditions)}
+        GROUP BY 1, 2
+        ORDER BY time ASC"""
+        return query, tuple(params)
+
+    @staticmethod
+    def window_query(
+        instrument: str,
+        timescale: str,
+        length: int,
+        end: Optional[datetime] = None,
+        fill: str = "locf",
+        table_name: str = "forex_data",
+    ) -> tuple[str, tuple]:
+        """Build the query returning exactly `length` consecutive buckets.
+
+        Every bucket of the window is generated in SQL and left joined to the
+        averaged ticks. Empty buckets have a tick_count of 0 and either carry
+        the last observed bid and ask forward (locf), including the last bucket
+        before the window, or are NULL (nan).
+
+        Args:
+            instrument (str): The instrument to fetch
+            timescale (str): The timescale of the buckets (S, M, H or D)
+            length (int): The number of buckets
+            end (Optional[datetime]): The window holds the buckets up to and
+                including the one containing this time. Defaults to now.
+            fill (str): How to fill empty buckets, "locf" or "nan"
+            table_name (str): The table to read from
+
+        Returns:
+            tuple[str, tuple]: The query and its parameters.
+        """
+        if length < 1:
+            raise ValueError(f"Length must be at least 1, got {length}.")
+        if fill not in FILL_MODES:
+            raise ValueError(f"Unknown fill: '{fill}'. Expected one of {FILL_MODES}.")
+
+        # Buckets of every timescale are aligned to the epoch, like time_bucket
+        seconds = timescale_seconds[timescale]
+        end = end or datetime.now(timezone.utc)
+        last_slot = datetime.fromtimestamp(
+            math.floor(end.timestamp() / seconds) * seconds,
+            tz=timezone.utc,
+        )
+        first_slot = last_slot - timedelta(seconds=seconds * (length - 1))
+        window_end = last_slot + timedelta(seconds=seconds)
+        interval = interval_map[timescale]
+
+        weighted = """SUM(bid * tick_count) / SUM(tick_count) AS bid,
+            SUM(ask * tick_count) / SUM(tick_count) AS ask"""
+        query = f"""WITH slots AS (
+            SELECT generate_series(%s::TIMESTAMPTZ, %s::TIMESTAMPTZ, %s::INTERVAL) AS time
+        ),
+        buckets AS (
+            SELECT
+                time_bucket('{interval}', time) AS time,
+                {weighted},
+                SUM(tick_count)::INTEGER AS tick_count
+            FROM {table_name}
+            WHERE instrument = %s AND time >= %s AND time < %s
+            GROUP BY 1
+        ),
+        joined AS (
+            SELECT
+                slots.time,
+                buckets.bid,
+                buckets.ask,
+                COALESCE(buckets.tick_count, 0) AS tick_count
+            FROM slots
+            LEFT JOIN buckets ON buckets.time = slots.time
+        )"""
+        params = [first_slot, last_slot, interval, instrument, first_slot, window_end]
+
+        if fill == "nan":
+            query += """
+        SELECT time, bid, ask, tick_count FROM joined ORDER BY time"""
+            return query, tuple(params)
+
+        # Carry values forward within groups that start at every observed bucket,
+        # seeded with the last bucket before the window
+        query += f""",
+        seed AS (
+            SELECT
+                time_bucket('{interval}', time) AS time,
+                {weighted},
+                0 AS tick_count
+            FROM {table_name}
+            WHERE instrument = %s AND time < %s AND time >= (
+                SELECT time_bucket('{interval}', MAX(time))
+                FROM {table_name}
+                WHERE instrument = %s AND time < %s
+            )
+            GROUP BY 1
+        ),
+        grouped AS (
+            SELECT *, COUNT(bid) OVER (ORDER BY time) AS observed
+            FROM (SELECT * FROM joined UNION ALL SELECT * FROM seed) AS rows
+        )
+        SELECT time, bid, ask, tick_count FROM (
+            SELECT
+                time,
+                FIRST_VALUE(bid) OVER (PARTITION BY observed ORDER BY time) AS bid,
+                FIRST_VALUE(ask) OVER (PARTITION BY observed ORDER BY time) AS ask,
+                tick_count
+            FROM grouped
+        ) AS filled
+        WHERE time >= %s
+        ORDER BY time"""
+        params += [instrument, first_slot, instrument, first_slot, first_slot]
+        return query, tuple(params)
+
+    def fetch_forex(
+        self,
+        instrument: str,
+        timescale: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        table_name: str = "forex_data",
+    ) -> list[dict]:
+        """The buckets of an instrument in ascending time."""
+        query, params = self.bucket_query(
+            instrument=instrument,
+            timescale=timescale,
+            start=start,
+            end=end,
+            table_name=table_name,
+        )
+        return TimeScaleService().execute(query=query, params=params)
+
+    def stream_forex(
+        self,
+        instrument: str,
+        timescale: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        chunk_size: int = 1000,
+        table_name: str = "forex_data",
+    ) -> Iterator[list[dict]]:
+        """The buckets of an instrument in chunks, through a server-side cursor."""
+        query, params = self.bucket_query(
+            instrument=instrument,
+            timescale=timescale,
+            start=start,
+            end=end,
+            table_name=table_name,
+        )
+        yield from TimeScaleService().stream(
+            query=query,
+            params=params,
+            chunk_size=chunk_size,
+        )
+
+    def fetch_forex_columns(
+        self,
+        instrument: str,
+        timescale: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        table_name: str = "forex_data",
+    ) -> dict[str, "np.ndarray"]:
+        """The time, bid and ask of the buckets of an instrument, over binary COPY."""
+        query, params = self.bucket_query(
+            instrument=instrument,
+            timescale=timescale,
+            start=start,
+            end=end,
+            table_name=table_name,
+        )
+        return TimeScaleService().fetch_columns(
+            query=f"SELECT time, bid, ask FROM ({query}) AS buckets",
+            params=params,
+        )
+
+    def fetch_forex_window(
+        self,
+        instrument: str,
+        timescale: str,
+        length: int,
+        end: Optional[datetime] = None,
+        fill: str = "locf",
+        table_name: str = "forex_data",
+    ) -> dict[str, "np.ndarray"]:
+        """Exactly `length` consecutive buckets, gaps filled in SQL."""
+        query, params = self.window_query(
+            instrument=instrument,
+            timescale=timescale,
+            length=length,
+            end=end,
+            fill=fill,
+            table_name=table_name,
+        )
+        return TimeScaleService().fetch_columns(query=query, params=params)
+
+    def create_subscription_table(self, table_name: str) -> str:
+        """Create the subscription table and its change notifications."""
+        migrate(schema="subscription_feed", table_name=table_name)
+        return table_name
+
+    def drop_subscription_table(self, table_name: str):
+        """Drop a subscription table, its notify function and its migrations."""
+        TimeScaleService().execute(query=f"DROP TABLE {table_name}")
+        TimeScaleService().execute(
+            query=f"DROP FUNCTION IF EXISTS {table_name}_notify()",
+        )
+        forget_migrations(table_name=table_name)
+
+    def insert_subscription(self, row: tuple, table_name: str):
+        """Insert a row of SUBSCRIPTION_COLUMNS."""
+        TimeScaleService().execute(
+            query=f"""INSERT INTO {table_name} ({", ".join(SUBSCRIPTION_COLUMNS)})
+            VALUES (%s, %s, %s, %s)""",
+            params=row,
+        )
+
+    def fetch_subscriptions(self, table_name: str) -> list[dict]:
+        """Every subscription row."""
+        return TimeScaleService().execute(
+            query=f"SELECT {', '.join(SUBSCRIPTION_COLUMNS)} FROM {table_name}",
+        )
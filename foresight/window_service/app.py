@@ -1,35 +1,104 @@
-"""Aggregates the data from the database and calculates one-minute averages."""
+"""Aggregates the data from the database and sends windows at each feed's cadence."""
 
-import time
-
-from boto3_type_annotations.sqs import Client
+import os
+from datetime import datetime
+from typing import TYPE_CHECKING
+from typing import Optional
 
 from foresight.utils.aws import get_client
+from foresight.utils.latency import LatencyTracker
+from foresight.utils.latency import time_attributes
 from foresight.utils.logger import generate_logger
 from foresight.utils.models.forex_data import ForexData
+from foresight.utils.models.latency_metric import LatencyMetric
 from foresight.utils.models.subscription_feed import SubscriptionFeed
+from foresight.window_service.partition import PartitionedPool
+from foresight.window_service.registry import SubscriptionRegistry
+from foresight.window_service.scheduler import CadenceScheduler
+
+
+if TYPE_CHECKING:
+    from boto3_type_annotations.sqs import Client
 
 
 logger = generate_logger(name=__name__)
 
-sqsClient: Client = get_client("sqs")
+latency_tracker = LatencyTracker()
 
 
 def setup():
     """Setup for the window service."""
     SubscriptionFeed.create_table()
+    LatencyMetric.create_table()
+
+
+def send_feed_to_queue(
+    subscription: SubscriptionFeed,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> int:
+    """Gets the buckets of a subscription in a window and sends them to its queue.
 
+    Args:
+        subscription (SubscriptionFeed): The subscription to serve.
+        start (Optional[datetime]): Inclusive start of the window, unbounded if None.
+        end (Optional[datetime]): Exclusive end of the window, unbounded if None.
+
+    Returns:
+        int: The number of messages sent.
+    """
+    sqsClient: Client = get_client("sqs")
+    messages_sent: int = 0
+    latest_time = None
+
+    order_type = subscription.order_type
+
+    # Streamed in chunks so the full history is never held in memory
+    for chunk in ForexData.stream(
+        instrument=subscription.instrument,
+        timescale=subscription.timescale,
+        start=start,
+        end=end,
+    ):
+        logger.info(
+            "Publishing %s to Queue: %s",
+            f"{len(chunk)} messages",
+            subscription.queue_url,
+        )
+        for data_point in chunk:
+            # Latency starts at the newest tick of the bucket, not its start
+            origin_time = data_point.last_time or data_point.time
+            data_point = data_point.convert_to_price(order_type=order_type)
+            sqsClient.send_message(
+                QueueUrl=subscription.queue_url,
+                MessageBody=data_point.model_dump_json(),
+                MessageAttributes=time_attributes(origin_time),
+            )
+            messages_sent += 1
+            latest_time = origin_time
 
-def wait_until_next_minute():
-    """Wait until the next minute."""
-    til_next_minute = round(60 - time.time() % 60, 2)
-    logger.info("Sleeping for %s seconds", til_next_minute)
-    time.sleep(til_next_minute)
+    # The freshest tick is what determines dashboard staleness
+    if latest_time is not None:
+        latency_tracker.record(stage="window", origin_time=latest_time)
+    return messages_sent
 
 
-def send_data_to_queues() -> int:
+def create_pool() -> Optional[PartitionedPool]:
+    """The worker processes configured by WINDOW_PARTITIONS, if any."""
+    partitions = int(os.getenv("WINDOW_PARTITIONS") or 0)
+    if partitions < 1:
+        return None
+    return PartitionedPool(partitions=partitions)
+
+
+def send_data_to_queues(pool: Optional[PartitionedPool] = None) -> int:
     """Based on subscriptions, gets relevant data and sends to the queues.
 
+    Args:
+        pool (Optional[PartitionedPool]): Worker processes to partition the
+            subscriptions across. The subscriptions run one after the other
+            in this process if None.
+
     Returns:
         int: The number of messages sent.
     """
@@ -38,33 +107,20 @@ def send_data_to_queues() -> int:
         subscriptions: list[SubscriptionFeed] = SubscriptionFeed.fetch()
         messages_sent: int = 0
 
-        # Calculate averages for each subscription
-        for subscription in subscriptions:
-            all_forex_data: list[ForexData] = ForexData.fetch(
-                instrument=subscription.instrument,
-                timescale=subscription.timescale,
+        if pool is not None:
+            cycle = pool.run_cycle(send_feed_to_queue, subscriptions)
+            logger.info(
+                "Sent %s messages for %s feeds in %.2f seconds, %s failed",
+                cycle["messages_sent"],
+                cycle["feeds"],
+                cycle["duration"],
+                cycle["failures"],
             )
+            return cycle["messages_sent"]
 
-            order_type = subscription.order_type
-
-            forex_data = [
-                data_point.convert_to_price(order_type=order_type).model_dump_json()
-                for data_point in all_forex_data
-            ]
-
-            # Only send if it has data
-            if len(forex_data) > 0:
-                logger.info(
-                    "Publishing %s to Queue: %s",
-                    f"{len(forex_data)} messages",
-                    subscription.queue_url,
-                )
-                for data_point in forex_data:
-                    sqsClient.send_message(
-                        QueueUrl=subscription.queue_url,
-                        MessageBody=data_point,
-                    )
-                    messages_sent += 1
+        # Calculate averages for each subscription
+        for subscription in subscriptions:
+            messages_sent += send_feed_to_queue(subscription)
         return messages_sent
 
     except Exception as sending_exception:  # pylint: disable=broad-except
@@ -74,7 +130,19 @@ def send_data_to_queues() -> int:
 if __name__ == "__main__":
     setup()
 
-    while True:
-        send_data_to_queues()
-
-        wait_until_next_minute()
+    # Feeds are read from memory; the registry follows the table through NOTIFY
+    registry = SubscriptionRegistry()
+    scheduler = CadenceScheduler(
+        run_feed=send_feed_to_queue,
+        fetch_feeds=registry.feeds,
+        max_workers=int(os.getenv("WINDOW_MAX_WORKERS", "8")),
+        refresh_interval=float(os.getenv("WINDOW_REFRESH_INTERVAL", "60")),
+        pool=create_pool(),
+        lag=float(os.getenv("WINDOW_LAG", "2")),
+    )
+    registry.on_change = scheduler.request_refresh
+    registry.start()
+    try:
+        scheduler.run_forever()
+    finally:
+        registry.stop()
@@ -0,0 +1,161 @@
+"""Worker processes serving the subscription feeds partitioned by instrument and timescale."""
+
+import multiprocessing
+import time
+import zlib
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable
+from typing import Optional
+
+from foresight.utils.aws import clear_client_cache
+from foresight.utils.database import TimeScaleService
+from foresight.utils.logger import generate_logger
+from foresight.utils.models.subscription_feed import SubscriptionFeed
+
+
+logger = generate_logger(name=__name__)
+
+
+def feed_key(feed: SubscriptionFeed) -> tuple[str, str, str]:
+    """The primary key of a subscription feed."""
+    return (feed.queue_url, feed.instrument, feed.timescale)
+
+
+def partition_of(feed: SubscriptionFeed, partitions: int) -> int:
+    """The partition serving a feed.
+
+    The hash of (instrument, timescale) is stable across processes and runs,
+    so a feed is always served by the same worker.
+    """
+    key = f"{feed.instrument}:{feed.timescale}".encode()
+    return zlib.crc32(key) % partitions
+
+
+def init_worker():
+    """Give a worker process its own database connection and AWS clients.
+
+    A forked worker inherits the connection of its parent. The reference is
+    dropped without closing it, which would end the session of the parent.
+    """
+    TimeScaleService._instance = None
+    clear_client_cache()
+
+
+def run_partition(
+    run_feed: Callable[..., int],
+    feeds: list[SubscriptionFeed],
+    windows: Optional[dict[tuple[str, str, str], tuple[datetime, datetime]]] = None,
+) -> list[dict]:
+    """Run the feeds of a partition in a worker process, one after the other.
+
+    Args:
+        run_feed (Callable[..., int]): Sends a feed, over its window when
+            there is one.
+        feeds (list[SubscriptionFeed]): The feeds of the partition.
+        windows (Optional[dict[tuple[str, str, str], tuple[datetime, datetime]]]):
+            The start and end of the window of every feed by its key, if any.
+
+    Returns:
+        list[dict]: The feed, messages sent, duration and error of every feed.
+    """
+    results = []
+    for feed in feeds:
+        start = time.time()
+        window = (windows or {}).get(feed_key(feed), ())
+        try:
+            messages_sent, error = run_feed(feed, *window), None
+        except Exception as feed_exception:  # pylint: disable=broad-except
+            messages_sent, error = 0, str(feed_exception)
+        results.append(
+            {
+                "feed": feed,
+                "messages_sent": messages_sent,
+                "duration": time.time() - start,
+                "error": error,
+            },
+        )
+    return results
+
+
+class PartitionedPool:
+    """One worker process per partition of the subscription feeds.
+
+    Each partition has a single process, so the feeds of a partition never run
+    concurrently and keep their connections warm across cycles. The callable
+    run in the workers must be picklable, i.e. defined at module level.
+
+    Args:
+        partitions (int): The number of worker processes.
+        start_method (str): The multiprocessing start method.
+    """
+
+    def __init__(self, partitions: int, start_method: str = "spawn"):
+        if partitions < 1:
+            raise ValueError(f"Partitions must be at least 1, got {partitions}.")
+
+        context = multiprocessing.get_context(start_method)
+        self.partitions = partitions
+        self.executors = [
+            ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=context,
+                initializer=init_worker,
+            )
+            for _ in range(partitions)
+        ]
+
+    def split(self, feeds: list[SubscriptionFeed]) -> dict[int, list[SubscriptionFeed]]:
+        """Group the feeds by partition."""
+        groups: dict[int, list[SubscriptionFeed]] = {}
+        for feed in feeds:
+            groups.setdefault(partition_of(feed, self.partitions), []).append(feed)
+        return groups
+
+    def submit(
+        self,
+        partition: int,
+        run_feed: Callable[..., int],
+        feeds: list[SubscriptionFeed],
+        windows: Optional[dict[tuple[str, str, str], tuple[datetime, datetime]]] = None,
+    ) -> Future:
+        """Run the feeds in the worker of the partition, over their windows if any."""
+        return self.executors[partition].submit(run_partition, run_feed, feeds, windows)
+
+    def run_cycle(
+        self,
+        run_feed: Callable[[SubscriptionFeed], int],
+        feeds: list[SubscriptionFeed],
+    ) -> dict:
+        """Run every feed once across the workers and collect the results.
+
+        Returns:
+            dict: The messages sent, feeds run, failed feeds and duration of the cycle.
+        """
+        start = time.time()
+        futures = [
+            self.submit(partition, run_feed, partition_feeds)
+            for partition, partition_feeds in self.split(feeds).items()
+        ]
+
+        cycle = {"messages_sent": 0, "feeds": 0, "failures": 0}
+        for future in futures:
+            for result in future.result():
+                cycle["feeds"] += 1
+                cycle["messages_sent"] += result["messages_sent"]
+                if result["error"] is not None:
+                    cycle["failures"] += 1
+                    logger.error(
+                        "Error sending feed %s %s: %s",
+                        result["feed"].instrument,
+                        result["feed"].timescale,
+                        result["error"],
+                    )
+        cycle["duration"] = time.time() - start
+        return cycle
+
+    def shutdown(self, wait: bool = True):
+        """Stop every worker process."""
+        for executor in self.executors:
+            executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,159 @@
+"""In-memory subscription registry kept current by PostgreSQL notifications."""
+
+import json
+import select
+import threading
+import time
+from typing import Callable
+from typing import Optional
+
+from foresight.utils.database import TimeScaleService
+from foresight.utils.logger import generate_logger
+from foresight.utils.models.subscription_feed import SubscriptionFeed
+from foresight.window_service.scheduler import feed_key
+
+
+logger = generate_logger(name=__name__)
+
+
+class SubscriptionRegistry:
+    """The active subscription feeds, loaded once and updated from NOTIFY events.
+
+    Triggers on the subscription table (see the subscription_feed migrations)
+    notify a channel named after the table on every insert, update, delete and
+    truncate. The registry listens on its own connection before loading the
+    table, so no change is missed, and applies every notification to its
+    in-memory copy. Reading the feeds never queries the database. If the
+    listening connection fails, it reconnects and reloads the table.
+
+    Args:
+        table_name (str): The subscription table, also the notification channel.
+        on_change (Optional[Callable[[], None]]): Called after the feeds changed.
+        connect (Callable): Opens the dedicated listening connection.
+    """
+
+    def __init__(
+        self,
+        table_name: str = "subscription_feed",
+        on_change: Optional[Callable[[], None]] = None,
+        connect: Callable = TimeScaleService.connect,
+    ):
+        self.table_name = table_name
+        self.on_change = on_change
+        self.connect = connect
+
+        self.lock = threading.Lock()
+        self.subscriptions: dict[tuple[str, str, str], SubscriptionFeed] = {}
+        self.connection = None
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+        self.loads = 0
+        self.changes = 0
+
+    def feeds(self) -> list[SubscriptionFeed]:
+        """The active subscription feeds."""
+        with self.lock:
+            return list(self.subscriptions.values())
+
+    def listen(self):
+        """Open the listening connection and subscribe to the table channel."""
+        self.close()
+        self.connection = self.connect()
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.table_name}")
+
+    def load(self):
+        """Replace the registry with the current content of the table."""
+        feeds = SubscriptionFeed.fetch(table_name=self.table_name)
+        if feeds is None:
+            raise Exception(f"Failed to load subscriptions from {self.table_name}.")
+
+        with self.lock:
+            self.subscriptions = {feed_key(feed): feed for feed in feeds}
+            self.loads += 1
+        logger.info("Loaded %s subscriptions", len(feeds))
+
+    def apply(self, payload: str):
+        """Apply a change notification to the registry."""
+        change = json.loads(payload)
+
+        with self.lock:
+            if change["op"] == "TRUNCATE":
+                self.subscriptions = {}
+            if change.get("old"):
+                self.subscriptions.pop(
+                    feed_key(SubscriptionFeed(**change["old"])),
+                    None,
+                )
+            if change.get("new"):
+                feed = SubscriptionFeed(**change["new"])
+                self.subscriptions[feed_key(feed)] = feed
+            self.changes += 1
+
+    def poll(self, timeout: float = 0.0) -> int:
+        """Wait up to timeout seconds for notifications and apply them.
+
+        Returns:
+            int: The number of notifications applied.
+        """
+        if self.connection is None:
+            raise Exception("Registry is not listening.")
+
+        if select.select([self.connection], [], [], timeout) != ([], [], []):
+            self.connection.poll()
+
+        applied = 0
+        while self.connection.notifies:
+            notify = self.connection.notifies.pop(0)
+            self.apply(notify.payload)
+            applied += 1
+
+        if applied and self.on_change is not None:
+            self.on_change()
+        return applied
+
+    def start(self):
+        """Listen, load the table and keep the registry current in the background."""
+        self.listen()
+        self.load()
+
+        self.stop_event.clear()
+        self.thread = threading.Thread(
+            target=self.run,
+            name="subscription-registry",
+            daemon=True,
+        )
+        self.thread.start()
+
+    def run(self):
+        """Apply notifications until stopped, reconnecting on failures."""
+        while not self.stop_event.is_set():
+            try:
+                if self.connection is None:
+                    self.listen()
+                    self.load()
+                    if self.on_change is not None:
+                        self.on_change()
+                self.poll(timeout=1.0)
+            except Exception as registry_exception:  # pylint: disable=broad-except
+                logger.error("Subscription registry error: %s", registry_exception)
+                self.close()
+                time.sleep(1.0)
+
+    def stop(self):
+        """Stop the background thread and close the listening connection."""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+            self.thread = None
+        self.close()
+
+    def close(self):
+        """Close the listening connection."""
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:  # pylint: disable=broad-except
+                pass
+            self.connection = None
@@ -0,0 +1,329 @@
+"""Deadline-aware scheduler running every feed at the cadence of its timescale."""
+
+import math
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from datetime import timezone
+from typing import Callable
+from typing import Optional
+
+from foresight.utils.logger import generate_logger
+from foresight.utils.models.subscription_feed import SubscriptionFeed
+from foresight.window_service.partition import PartitionedPool
+from foresight.window_service.partition import feed_key
+
+
+logger = generate_logger(name=__name__)
+
+# Seconds between two windows of a timescale
+CADENCES: dict[str, int] = {
+    "S": 1,
+    "M": 60,
+    "H": 60 * 60,
+    "D": 60 * 60 * 24,
+}
+
+
+def next_boundary(now: float, cadence: int) -> float:
+    """The first cadence-aligned timestamp strictly after now."""
+    return (math.floor(now / cadence) + 1) * cadence
+
+
+def to_datetime(timestamp: float) -> datetime:
+    """The UTC datetime of an epoch timestamp."""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+
+class CadenceScheduler:
+    """Runs each subscription feed at the cadence of its timescale.
+
+    Feeds are dispatched to a thread pool when the aligned deadline of their
+    timescale passes, with the window of buckets completed since their previous
+    run, `[start, end)`. A bucket only counts as completed `lag` seconds after
+    it ends, so ticks still being written make it in. A deadline found late
+    counts the missed windows and runs once over all of them instead of once
+    per missed window. A feed still running from a previous window is skipped
+    and counted as an overrun, so slow feeds never pile up duplicate work, and
+    its next window extends back over the one it skipped.
+
+    With a partitioned pool, the due feeds of a window are grouped by
+    partition and each group runs in the worker process of its partition,
+    whose results are collected when the group completes. A partition still
+    running from a previous window skips all of its feeds.
+
+    Args:
+        run_feed (Callable[[SubscriptionFeed, datetime, datetime], int]): Sends
+            the buckets of a feed from the start (inclusive) to the end
+            (exclusive) of a window.
+        fetch_feeds (Callable[[], list[SubscriptionFeed]]): Returns the active feeds.
+        max_workers (int): The number of feeds that can run concurrently.
+        refresh_interval (float): Seconds between refreshes of the active feeds.
+        clock (Callable[[], float]): Returns the current epoch time.
+        pool (Optional[PartitionedPool]): Worker processes running the feeds
+            instead of the thread pool. run_feed must then be picklable.
+        lag (float): Seconds after a bucket ends until it counts as completed.
+    """
+
+    def __init__(
+        self,
+        run_feed: Callable[[SubscriptionFeed, datetime, datetime], int],
+        fetch_feeds: Callable[[], list[SubscriptionFeed]],
+        max_workers: int = 8,
+        refresh_interval: float = 60,
+        clock: Callable[[], float] = time.time,
+        pool: Optional[PartitionedPool] = None,
+        lag: float = 0.0,
+    ):
+        self.run_feed = run_feed
+        self.pool = pool
+        self.fetch_feeds = fetch_feeds
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self.lag = lag
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="window",
+        )
+
+        self.feeds: list[SubscriptionFeed] = []
+        self.last_refresh = float("-inf")
+        self.deadlines: dict[str, float] = {}
+        self.window_starts: dict[tuple[str, str, str], datetime] = {}
+        self.in_flight: dict[tuple[str, str, str], Future] = {}
+        self.partitions_in_flight: dict[int, Future] = {}
+
+        self.lock = threading.Lock()
+        self.wake_event = threading.Event()
+        self.messages_sent = 0
+        self.overruns = 0
+        self.missed_windows = 0
+
+    def request_refresh(self):
+        """Reload the feeds on the next dispatch and wake up run_forever for it."""
+        self.last_refresh = float("-inf")
+        self.wake_event.set()
+
+    def refresh_feeds(self, now: float):
+        """Reload the active feeds once the refresh interval elapsed."""
+        if now - self.last_refresh < self.refresh_interval:
+            return
+
+        feeds = self.fetch_feeds()
+        if feeds is not None:
+            self.feeds = feeds
+        self.last_refresh = now
+
+        # Forget deadlines of timescales and windows of feeds nobody subscribes to anymore
+        active = {feed.timescale for feed in self.feeds}
+        self.deadlines = {
+            timescale: deadline
+            for timescale, deadline in self.deadlines.items()
+            if timescale in active
+        }
+        keys = {feed_key(feed) for feed in self.feeds}
+        self.window_starts = {
+            key: start for key, start in self.window_starts.items() if key in keys
+        }
+
+    def due_timescales(self, now: float) -> dict[str, tuple[datetime, datetime]]:
+        """Timescales whose deadline passed, advancing their next deadline.
+
+        The window of a timescale is its last completed bucket. A feed that ran
+        before starts its window where its previous one ended instead, see
+        `feed_window`.
+
+        Returns:
+            dict[str, tuple[datetime, datetime]]: The window of every due timescale.
+        """
+        due = {}
+        for timescale in {feed.timescale for feed in self.feeds}:
+            cadence = CADENCES.get(timescale)
+            if cadence is None:
+                logger.error("Unknown timescale %s, skipping its feeds.", timescale)
+                continue
+
+            deadline = self.deadlines.get(timescale)
+            if deadline is not None and now < deadline:
+                continue
+
+            if deadline is not None:
+                missed = int((now - deadline) // cadence)
+                if missed > 0:
+                    with self.lock:
+                        self.missed_windows += missed
+                    logger.warning(
+                        "Timescale %s is %.2f seconds late, %s windows missed.",
+                        timescale,
+                        now - deadline,
+                        missed,
+                    )
+
+            # Buckets complete and deadlines pass `lag` seconds after a boundary
+            completed = now - self.lag
+            end = math.floor(completed / cadence) * cadence
+            due[timescale] = (to_datetime(end - cadence), to_datetime(end))
+            self.deadlines[timescale] = next_boundary(completed, cadence) + self.lag
+        return due
+
+    def feed_window(
+        self,
+        feed: SubscriptionFeed,
+        due: dict[str, tuple[datetime, datetime]],
+    ) -> tuple[datetime, datetime]:
+        """The window of a due feed, from the end of its previous window if it ran."""
+        start, end = due[feed.timescale]
+        return self.window_starts.get(feed_key(feed), start), end
+
+    def dispatch(self, now: Optional[float] = None) -> list[Future]:
+        """Submit every due feed that is not still running.
+
+        Returns:
+            list[Future]: The submitted feed runs.
+        """
+        if now is None:
+            now = self.clock()
+
+        self.refresh_feeds(now)
+        due = self.due_timescales(now)
+
+        if self.pool is not None:
+            return self.dispatch_partitions(
+                [feed for feed in self.feeds if feed.timescale in due],
+                windows=due,
+            )
+
+        submitted = []
+        for feed in self.feeds:
+            if feed.timescale not in due:
+                continue
+
+            key = feed_key(feed)
+            running = self.in_flight.get(key)
+            if running is not None and not running.done():
+                with self.lock:
+                    self.overruns += 1
+                logger.warning(
+                    "Feed %s %s for %s is still running, skipping this window.",
+                    feed.instrument,
+                    feed.timescale,
+                    feed.queue_url,
+                )
+                continue
+
+            start, end = self.feed_window(feed, due)
+            future = self.executor.submit(self.run, feed, start, end)
+            self.in_flight[key] = future
+            self.window_starts[key] = end
+            submitted.append(future)
+        return submitted
+
+    def dispatch_partitions(
+        self,
+        feeds: list[SubscriptionFeed],
+        windows: dict[str, tuple[datetime, datetime]],
+    ) -> list[Future]:
+        """Submit the due feeds of every partition that is not still running.
+
+        Returns:
+            list[Future]: The submitted partition runs.
+        """
+        submitted = []
+        for partition, partition_feeds in self.pool.split(feeds).items():
+            running = self.partitions_in_flight.get(partition)
+            if running is not None and not running.done():
+                with self.lock:
+                    self.overruns += len(partition_feeds)
+                logger.warning(
+                    "Partition %s is still running, skipping %s feeds this window.",
+                    partition,
+                    len(partition_feeds),
+                )
+                continue
+
+            partition_windows = {
+                feed_key(feed): self.feed_window(feed, windows)
+                for feed in partition_feeds
+            }
+            future = self.pool.submit(
+                partition,
+                self.run_feed,
+                partition_feeds,
+                windows=partition_windows,
+            )
+            for key, (_, end) in partition_windows.items():
+                self.window_starts[key] = end
+            future.add_done_callback(self.collect)
+            self.partitions_in_flight[partition] = future
+            submitted.append(future)
+        return submitted
+
+    def collect(self, future: Future):
+        """Record the results of a partition run."""
+        try:
+            results = future.result()
+        except Exception as partition_exception:  # pylint: disable=broad-except
+            logger.error("Error running partition: %s", partition_exception)
+            return
+
+        for result in results:
+            if result["error"] is not None:
+                logger.error(
+                    "Error sending feed %s: %s",
+                    feed_key(result["feed"]),
+                    result["error"],
+                )
+                continue
+            self.record(result["feed"], result["messages_sent"], result["duration"])
+
+    def run(self, feed: SubscriptionFeed, start: datetime, end: datetime) -> int:
+        """Run a feed over a window and report it when it exceeds its cadence.
+
+        Returns:
+            int: The number of messages sent.
+        """
+        started = self.clock()
+        try:
+            messages_sent = self.run_feed(feed, start, end)
+        except Exception as feed_exception:  # pylint: disable=broad-except
+            logger.error("Error sending feed %s: %s", feed_key(feed), feed_exception)
+            return 0
+
+        self.record(feed, messages_sent, self.clock() - started)
+        return messages_sent
+
+    def record(self, feed: SubscriptionFeed, messages_sent: int, duration: float):
+        """Count the messages of a feed run and report it when it exceeds its cadence."""
+        with self.lock:
+            self.messages_sent += messages_sent
+            if duration > CADENCES[feed.timescale]:
+                self.overruns += 1
+                logger.warning(
+                    "Feed %s %s took %.2f seconds, longer than its cadence.",
+                    feed.instrument,
+                    feed.timescale,
+                    duration,
+                )
+
+    def seconds_until_next_deadline(self, now: float) -> float:
+        """Seconds to sleep until the earliest deadline or feed refresh."""
+        upcoming = list(self.deadlines.values())
+        upcoming.append(self.last_refresh + self.refresh_interval)
+        return max(min(upcoming) - now, 0.0)
+
+    def run_forever(self):
+        """Dispatch feeds at their cadence until interrupted."""
+        try:
+            while True:
+                now = self.clock()
+                self.dispatch(now=now)
+
+                # Sleeps until the next deadline unless a refresh is requested
+                self.wake_event.wait(self.seconds_until_next_deadline(self.clock()))
+                self.wake_event.clear()
+        finally:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            if self.pool is not None:
+                self.pool.shutdown(wait=False)
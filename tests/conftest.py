@@ -7,6 +7,7 @@ from datetime import timezone
 
 import pytest
 
+from foresight.utils.models.forex_bar import ForexBar
 from foresight.utils.models.forex_data import ForexData
 from foresight.utils.models.subscription_feed import SubscriptionFeed
 
@@ -51,3 +52,11 @@ def setup_subscription_feed_table():
     table_name = SubscriptionFeed.create_table()
     yield table_name
     SubscriptionFeed.drop_table(table_name=table_name)
+
+
+@pytest.fixture()
+def setup_forex_bars_table():
+    """Setup forex bars for testing."""
+    table_name = ForexBar.create_table()
+    yield table_name
+    ForexBar.drop_table(table_name=table_name)
@@ -0,0 +1,107 @@
+"""Test the vectorized backtests."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from foresight.indicator_services import indicator as indicator_module
+from foresight.indicator_services.backtest import load_indicator
+from foresight.indicator_services.backtest import run_backtest
+from foresight.indicator_services.moving_average_indicator import MovingAverageIndicator
+
+
+@pytest.fixture(autouse=True)
+def no_network(monkeypatch):
+    """Fail on any attempt to create a queue."""
+
+    def get_client(*_, **__):
+        raise AssertionError("Backtests must not use AWS.")
+
+    monkeypatch.setattr(indicator_module, "get_client", get_client)
+
+
+def test_positions_are_held_over_the_next_bar():
+    """The crossover signal trades the bar after it was calculated."""
+
+    prices = [1.0, 1.0, 2.0, 4.0, 2.0, 1.0]
+
+    result = run_backtest(MovingAverageIndicator, prices, timescale="D", fast=1, slow=2)
+
+    assert result.data["position"].tolist() == [0, 0, 1, 1, -1, -1]
+    # Long from 2 to 4 and from 4 to 2, then short from 2 to 1
+    assert result.data["return"].tolist() == [0, 0, 0, 1.0, -0.5, 0.5]
+    assert result.bars == 6
+    assert result.trades == 2
+    assert result.total_return == pytest.approx(0.5)
+    assert result.max_drawdown == pytest.approx(0.5)
+    assert result.exposure == pytest.approx(0.5)
+    assert result.hit_rate == pytest.approx(2 / 3)
+
+
+def test_costs_are_charged_per_position_change():
+    """Every unit of position change costs the cost."""
+
+    prices = [1.0, 1.0, 2.0, 4.0, 2.0, 1.0]
+
+    free = run_backtest(MovingAverageIndicator, prices, timescale="D", fast=1, slow=2)
+    costly = run_backtest(
+        MovingAverageIndicator,
+        prices,
+        timescale="D",
+        cost=0.01,
+        fast=1,
+        slow=2,
+    )
+
+    turnover = np.abs(np.diff(free.data["position"], prepend=0)).sum()
+    assert turnover == 3
+    assert (free.data["return"] - costly.data["return"]).sum() == pytest.approx(0.03)
+
+
+def test_backtest_matches_do_work():
+    """The vectorized pass computes what the live indicator does per batch."""
+
+    rng = np.random.default_rng(0)
+    prices = pd.DataFrame(
+        {
+            "time": pd.date_range("2024-01-01", periods=50, freq="min", tz="UTC"),
+            "price": 1 + rng.normal(0, 0.001, 50).cumsum(),
+        },
+    )
+
+    result = run_backtest(MovingAverageIndicator, prices, timescale="M")
+
+    indicator = MovingAverageIndicator("EUR_USD", "M", "mid", subscribe=False)
+    indicator.pricing = prices.to_dict("records")
+    live = pd.DataFrame(indicator.do_work())
+
+    np.testing.assert_allclose(result.data["ma_slow"].dropna(), live["ma_slow"])
+    assert indicator.queue_url is None
+    assert "data" not in result.model_dump()
+
+
+def test_millions_of_bars():
+    """A long history is backtested in one pass."""
+
+    prices = 1 + np.random.default_rng(1).normal(0, 1e-4, 2_000_000).cumsum()
+
+    result = run_backtest(
+        MovingAverageIndicator,
+        prices,
+        timescale="S",
+        fast=10,
+        slow=50,
+    )
+
+    assert result.bars == 2_000_000
+    assert result.trades > 0
+    assert np.isfinite(result.sharpe)
+
+
+def test_load_indicator():
+    """Indicators are loaded from module:Class paths."""
+
+    path = (
+        "foresight.indicator_services.moving_average_indicator:MovingAverageIndicator"
+    )
+    assert load_indicator(path) is MovingAverageIndicator
@@ -0,0 +1,114 @@
+"""Test indicators grouped on one graph of shared operators."""
+
+import json
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import numpy as np
+import pytest
+
+from foresight.indicator_services.bollinger_bands_indicator import (
+    BollingerBandsIndicator,
+)
+from foresight.indicator_services.indicator_group import IndicatorGroup
+from foresight.indicator_services.moving_average_indicator import MovingAverageIndicator
+from foresight.indicator_services.operators import Graph
+from foresight.utils.database import TimeScaleService
+
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_group(*indicators) -> IndicatorGroup:
+    """A group of the indicators without a queue."""
+    return IndicatorGroup(
+        component_name="test_indicator_group",
+        indicators=list(indicators),
+        instrument="EUR_USD",
+        timescale="S",
+        subscribe=False,
+    )
+
+
+def pricing(count: int) -> list[dict]:
+    """Prices of one second bars, like the window service sends."""
+    prices = 1 + np.random.default_rng(0).normal(0, 0.01, count).cumsum()
+    return [
+        {
+            "instrument": "EUR_USD",
+            "time": (START + timedelta(seconds=second)).isoformat(),
+            "price": price,
+        }
+        for second, price in enumerate(prices)
+    ]
+
+
+def test_group_matches_members():
+    """Each member's result is the result of the member on its own."""
+
+    moving_average = MovingAverageIndicator("EUR_USD", "S", "mid", subscribe=False)
+    bands = BollingerBandsIndicator("EUR_USD", "S", "mid", subscribe=False)
+    group = make_group(moving_average, bands)
+    group.pricing = moving_average.pricing = bands.pricing = pricing(30)
+
+    result = group.do_work()
+
+    assert result["moving_average"] == moving_average.do_work()
+    assert result["bollinger_bands"] == bands.do_work()
+
+    # The rolling sum and mean of 5 prices are shared by ma_slow and bb_middle
+    separate = sum(
+        len(Graph({member.component_name: member.nodes()}))
+        for member in (moving_average, bands)
+    )
+    assert len(group.graph) == separate - 4
+
+
+def test_group_saves_every_member():
+    """Results are saved under the component name of each member."""
+
+    members = [
+        MovingAverageIndicator(
+            "EUR_USD",
+            "S",
+            "mid",
+            fast=fast,
+            slow=10,
+            subscribe=False,
+            component_name=f"test_moving_average_{fast}",
+        )
+        for fast in (2, 3)
+    ]
+    group = make_group(*members)
+    group.create_indicator_table()
+    group.pricing = pricing(20)
+
+    try:
+        group.save_results(group.do_work())
+
+        saved = TimeScaleService().execute(
+            query="""SELECT component_name, value FROM indicator_results
+            WHERE component_name LIKE 'test_moving_average_%%'
+            ORDER BY component_name""",
+        )
+        assert [row["component_name"] for row in saved] == [
+            "test_moving_average_2",
+            "test_moving_average_3",
+        ]
+        assert len(json.loads(saved[0]["value"])) == 11
+    finally:
+        TimeScaleService().execute(
+            query="""DELETE FROM indicator_results
+            WHERE component_name LIKE 'test_moving_average_%%'""",
+        )
+
+
+def test_member_names_are_unique():
+    """Members saving under the same component name are rejected."""
+
+    with pytest.raises(ValueError):
+        make_group(
+            MovingAverageIndicator("EUR_USD", "S", "mid", fast=2, subscribe=False),
+            MovingAverageIndicator("EUR_USD", "S", "mid", fast=3, subscribe=False),
+        )
@@ -0,0 +1,333 @@
+"""Test the indicator superclass as a worker group."""
+
+import json
+import uuid
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import pytest
+from boto3_type_annotations.sqs import Client
+
+from foresight.indicator_services.indicator import Indicator
+from foresight.utils.aws import get_client
+from foresight.utils.database import TimeScaleService
+from foresight.utils.latency import time_attributes
+from foresight.utils.models.forex_data import ForexData
+from foresight.utils.models.subscription_feed import SubscriptionFeed
+
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class LastPriceIndicator(Indicator):
+    """Returns the last price of the batch."""
+
+    def do_work(self) -> dict:
+        return {"price": self.pricing[-1]["price"]}
+
+
+class CountingIndicator(LastPriceIndicator):
+    """Counts the prices in its window on every batch."""
+
+    batches: int = 0
+
+    def do_work(self) -> dict:
+        self.batches += 1
+        return {"price": self.pricing[-1]["price"], "window": len(self.pricing)}
+
+
+class FailingIndicator(Indicator):
+    """Fails on every batch."""
+
+    def do_work(self) -> dict:
+        raise ValueError("Failed")
+
+
+def tick(second: int) -> ForexData:
+    """A tick some seconds after the start, with a bid of one more than the second."""
+    return ForexData(
+        instrument="EUR_USD",
+        time=START + timedelta(seconds=second),
+        bid=1.0 + second,
+        ask=1.0002 + second,
+    )
+
+
+def send_prices(queue_url: str, count: int, start: int = 0):
+    """Store a tick per second and send its bid to the queue, like the window service does."""
+    ticks = [tick(second) for second in range(start, count)]
+    ForexData.insert_multiple(data=ticks)
+
+    sqsClient: Client = get_client("sqs")
+    for data_point in ticks:
+        data_point = data_point.convert_to_price(order_type="bid")
+        sqsClient.send_message(
+            QueueUrl=queue_url,
+            MessageBody=data_point.model_dump_json(),
+            MessageAttributes=time_attributes(data_point.time),
+        )
+
+
+def fetch_results(component_name: str) -> list[dict]:
+    """The saved results of the component."""
+    return TimeScaleService().execute(
+        query="""SELECT time, value FROM indicator_results
+        WHERE component_name = %s ORDER BY time""",
+        params=(component_name,),
+    )
+
+
+@pytest.fixture()
+def make_indicator(setup_subscription_feed_table, setup_forex_data_table):
+    """Build indicators on a temporary queue, removing their queue and results."""
+    component_name = f"test_{uuid.uuid4().hex}"
+    indicators = []
+
+    def make(indicator_class=LastPriceIndicator, **kwargs) -> Indicator:
+        indicator = indicator_class(
+            component_name=component_name,
+            instrument="EUR_USD",
+            timescale="S",
+            order_type="bid",
+            visibility_timeout=1,
+            wait_time=0,
+            **kwargs,
+        )
+        indicator.create_indicator_table()
+        indicators.append(indicator)
+        return indicator
+
+    yield make
+
+    if indicators:
+        get_client("sqs").delete_queue(QueueUrl=indicators[0].queue_url)
+        TimeScaleService().execute(
+            query="DELETE FROM indicator_results WHERE component_name = %s",
+            params=(component_name,),
+        )
+
+
+def test_replicas_share_a_subscription(make_indicator):
+    """Replicas register the same subscription once."""
+
+    first = make_indicator()
+    make_indicator()
+
+    feeds = SubscriptionFeed.fetch()
+    assert [feed.queue_url for feed in feeds] == [first.queue_url]
+
+
+def test_results_are_keyed_on_data_time(make_indicator):
+    """Results are stored at the time of the freshest data of the batch."""
+
+    indicator = make_indicator()
+    send_prices(indicator.queue_url, count=3)
+
+    processed = 0
+    while processed < 3:
+        batch = indicator.work_once()
+        assert batch > 0
+        processed += batch
+
+    results = fetch_results(indicator.component_name)
+    assert results[-1]["time"] == START + timedelta(seconds=2)
+    assert json.loads(results[-1]["value"]) == {"price": 3.0}
+    assert indicator.pull_from_queue() == []
+
+
+def test_duplicate_results_are_upserted(make_indicator):
+    """Processing the same data twice overwrites its result."""
+
+    indicator = make_indicator()
+    indicator.pricing = [{"time": START.isoformat(), "price": 1.0}]
+
+    indicator.save_indicator_results(value=json.dumps({"price": 1.0}))
+    indicator.save_indicator_results(value=json.dumps({"price": 2.0}))
+
+    results = fetch_results(indicator.component_name)
+    assert [json.loads(result["value"]) for result in results] == [{"price": 2.0}]
+
+
+def test_failed_batch_is_released(make_indicator):
+    """Messages of a failed batch are released to the group instead of deleted."""
+
+    indicator = make_indicator(FailingIndicator)
+    send_prices(indicator.queue_url, count=1)
+
+    assert indicator.work_once() == 0
+    assert len(indicator.pull_from_queue()) == 1
+    assert fetch_results(indicator.component_name) == []
+
+
+def work_until_empty(indicator: Indicator) -> int:
+    """Process batches until the queue is empty, returning the messages processed."""
+    processed = 0
+    while batch := indicator.work_once():
+        processed += batch
+    return processed
+
+
+def test_window_is_read_from_the_ticks(make_indicator):
+    """The window holds the latest prices of the ticks up to the freshest message."""
+
+    indicator = make_indicator(history=3)
+    send_prices(indicator.queue_url, count=4)
+    work_until_empty(indicator)
+
+    assert [price["price"] for price in indicator.pricing] == [2.0, 3.0, 4.0]
+    assert indicator.watermark == START + timedelta(seconds=3)
+
+
+def test_window_carries_prices_over_gaps(make_indicator):
+    """The window keeps its length, empty buckets carrying the last price forward."""
+
+    indicator = make_indicator(history=6)
+    ForexData.insert_multiple(data=[tick(second) for second in [1, 2, 5]])
+
+    indicator.load_window(end=START + timedelta(seconds=5))
+
+    assert len(indicator.pricing) == 6
+    assert [price["price"] for price in indicator.pricing[1:]] == [
+        2.0,
+        3.0,
+        3.0,
+        3.0,
+        6.0,
+    ]
+    assert indicator.data_times == [
+        START + timedelta(seconds=second) for second in [1, 2, 5]
+    ]
+
+    indicator.format_pricing_data()
+    assert len(indicator.pricing) == 5
+
+
+def test_replicas_calculate_the_same_results(make_indicator):
+    """Replicas splitting the messages calculate every result from a full window."""
+
+    replicas = [make_indicator(CountingIndicator, history=4) for _ in range(2)]
+    send_prices(replicas[0].queue_url, count=8)
+
+    while sum(replica.work_once() for replica in replicas):
+        pass
+
+    results = fetch_results(replicas[0].component_name)
+    assert results[-1]["time"] == START + timedelta(seconds=7)
+    for result in results:
+        second = int((result["time"] - START).total_seconds())
+        assert json.loads(result["value"]) == {
+            "price": 1.0 + second,
+            "window": min(second + 1, 4),
+        }
+
+
+def test_watermark_only_advances_over_contiguous_prices(make_indicator):
+    """Prices not received yet are not skipped, however fresh the prices received are."""
+
+    indicator = make_indicator(history=10)
+    ForexData.insert_multiple(data=[tick(second) for second in range(5)])
+
+    def consume(*seconds: int):
+        times = [START + timedelta(seconds=second) for second in seconds]
+        indicator.load_window(end=times[-1])
+        indicator.advance_watermark(times)
+
+    consume(0, 1, 2)
+    assert indicator.watermark == START + timedelta(seconds=2)
+
+    consume(4)
+    assert indicator.watermark == START + timedelta(seconds=2)
+    assert not indicator.is_consumed(
+        {"time": (START + timedelta(seconds=3)).isoformat()},
+    )
+
+    consume(3)
+    assert indicator.watermark == START + timedelta(seconds=3)
+    assert indicator.is_consumed({"time": (START + timedelta(seconds=2)).isoformat()})
+
+
+def test_watermark_starts_at_the_first_price(make_indicator, tmp_path):
+    """History older than the first price received does not hold the watermark back."""
+
+    indicator = make_indicator(history=10, checkpoint_path=str(tmp_path))
+    ForexData.insert_multiple(data=[tick(second) for second in range(-5, 0)])
+    send_prices(indicator.queue_url, count=4)
+    work_until_empty(indicator)
+
+    assert indicator.watermark == START + timedelta(seconds=3)
+    indicator.checkpoint()
+
+    restarted = make_indicator(checkpoint_path=str(tmp_path))
+    assert restarted.restore_checkpoint()
+    assert restarted.watermark == START + timedelta(seconds=3)
+
+
+def test_watermark_advances_over_results_of_other_replicas(make_indicator):
+    """Prices covered by a result another replica saved count as consumed."""
+
+    indicator, other = make_indicator(history=10), make_indicator(history=10)
+    ForexData.insert_multiple(data=[tick(second) for second in range(4)])
+
+    def consume(*seconds: int):
+        times = [START + timedelta(seconds=second) for second in seconds]
+        indicator.load_window(end=times[-1])
+        indicator.advance_watermark(times)
+
+    consume(0)
+    # The other replica consumed the prices at 1 and 2 in one batch
+    other.save_indicator_results(
+        value=json.dumps({"price": 3.0}),
+        time=START + timedelta(seconds=2),
+    )
+    consume(3)
+    assert indicator.watermark == START + timedelta(seconds=3)
+
+
+def test_restart_resumes_from_checkpoint(make_indicator, tmp_path):
+    """A restarted indicator skips the prices consumed before its checkpoint."""
+
+    first = make_indicator(CountingIndicator, checkpoint_path=str(tmp_path))
+    send_prices(first.queue_url, count=5)
+    work_until_empty(first)
+    first.checkpoint()
+
+    restarted = make_indicator(CountingIndicator, checkpoint_path=str(tmp_path))
+    assert restarted.restore_checkpoint()
+    assert restarted.watermark == START + timedelta(seconds=4)
+    assert restarted.last_result == {"price": 5.0, "window": 5}
+
+    # The window service republishes the whole history with a newer price
+    send_prices(restarted.queue_url, count=6)
+    assert work_until_empty(restarted) == 6
+
+    results = fetch_results(restarted.component_name)
+    assert json.loads(results[-1]["value"]) == {"price": 6.0, "window": 6}
+    assert restarted.batches <= 2
+
+
+def test_replicas_keep_their_own_checkpoints(make_indicator, tmp_path):
+    """Each replica restores its own watermark."""
+
+    replicas = [
+        make_indicator(checkpoint_path=str(tmp_path), replica=name)
+        for name in ["first", "second"]
+    ]
+    for seconds, replica in enumerate(replicas, start=1):
+        replica.watermark = START + timedelta(seconds=seconds)
+        replica.checkpoint()
+
+    for seconds, name in enumerate(["first", "second"], start=1):
+        restarted = make_indicator(checkpoint_path=str(tmp_path), replica=name)
+        assert restarted.restore_checkpoint()
+        assert restarted.watermark == START + timedelta(seconds=seconds)
+
+
+def test_restart_without_checkpoint(make_indicator, tmp_path):
+    """An indicator without a checkpoint has no watermark."""
+
+    indicator = make_indicator(checkpoint_path=str(tmp_path))
+
+    assert not indicator.restore_checkpoint()
+    assert indicator.pricing == []
+    assert indicator.watermark is None
@@ -0,0 +1,76 @@
+"""Test the message leases of the indicator services."""
+
+import time
+import uuid
+
+import pytest
+from boto3_type_annotations.sqs import Client
+
+from foresight.indicator_services.lease import MessageLease
+from foresight.utils.aws import get_client
+
+
+@pytest.fixture()
+def received_message():
+    """A message received from a temporary queue with a one second visibility timeout."""
+    sqsClient: Client = get_client("sqs")
+    queue_url = sqsClient.create_queue(QueueName=f"test-queue-{uuid.uuid4()}")[
+        "QueueUrl"
+    ]
+    sqsClient.send_message(QueueUrl=queue_url, MessageBody="{}")
+    message = sqsClient.receive_message(QueueUrl=queue_url, VisibilityTimeout=1)[
+        "Messages"
+    ][0]
+    yield queue_url, message
+    sqsClient.delete_queue(QueueUrl=queue_url)
+
+
+def receive(queue_url: str) -> list[dict]:
+    """Receive the visible messages of the queue."""
+    sqsClient: Client = get_client("sqs")
+    return sqsClient.receive_message(QueueUrl=queue_url, VisibilityTimeout=1).get(
+        "Messages",
+        [],
+    )
+
+
+def test_lease_keeps_message_hidden(received_message):
+    """The message stays hidden past its visibility timeout while leased."""
+
+    queue_url, message = received_message
+
+    with MessageLease(
+        queue_url=queue_url,
+        receipt_handles=[message["ReceiptHandle"]],
+        visibility_timeout=1,
+        interval=0.3,
+    ) as lease:
+        time.sleep(1.8)
+        assert receive(queue_url) == []
+
+    assert lease.extensions >= 3
+    assert lease.thread is None
+
+
+def test_release(received_message):
+    """A released message is visible again right away."""
+
+    queue_url, message = received_message
+
+    lease = MessageLease(
+        queue_url=queue_url,
+        receipt_handles=[message["ReceiptHandle"]],
+        visibility_timeout=30,
+    )
+    lease.release()
+
+    assert [visible["MessageId"] for visible in receive(queue_url)] == [
+        message["MessageId"],
+    ]
+
+
+def test_invalid_visibility_timeout():
+    """The visibility timeout must be at least a second."""
+
+    with pytest.raises(ValueError):
+        MessageLease(queue_url="queue", receipt_handles=[], visibility_timeout=0)
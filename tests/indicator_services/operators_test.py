@@ -0,0 +1,97 @@
+"""Test the shared operator graph."""
+
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from foresight.indicator_services.operators import Graph
+from foresight.indicator_services.operators import Node
+from foresight.indicator_services.operators import count_operators
+from foresight.indicator_services.operators import ema
+from foresight.indicator_services.operators import returns
+from foresight.indicator_services.operators import rolling_mean
+from foresight.indicator_services.operators import rolling_std
+from foresight.indicator_services.operators import rolling_sum
+from foresight.indicator_services.operators import source
+
+
+PRICES = 1 + np.random.default_rng(0).normal(0, 0.01, 200).cumsum()
+
+
+def test_equal_declarations_are_one_node():
+    """Nodes built separately with the same operator and parameters are equal."""
+
+    assert rolling_mean(source(), 5) == rolling_mean(source("price"), 5)
+    assert rolling_mean(source(), 5) != rolling_mean(source(), 6)
+    assert len({returns(source()), returns(source())}) == 1
+
+    with pytest.raises(ValueError):
+        Node("median")
+
+
+def test_operators_match_pandas():
+    """Every operator computes what pandas does."""
+
+    price = source()
+    graph = Graph(
+        {
+            "checks": {
+                "returns": returns(price),
+                "sum": rolling_sum(price, 10),
+                "mean": rolling_mean(price, 10),
+                "std": rolling_std(price, 10),
+                "ema": ema(price, 10),
+            },
+        },
+    )
+
+    outputs = graph.evaluate({"price": PRICES})["checks"]
+
+    series = pd.Series(PRICES)
+    np.testing.assert_allclose(outputs["returns"], series.pct_change())
+    np.testing.assert_allclose(outputs["sum"], series.rolling(10).sum())
+    np.testing.assert_allclose(outputs["mean"], series.rolling(10).mean())
+    np.testing.assert_allclose(outputs["std"], series.rolling(10).std())
+    np.testing.assert_allclose(outputs["ema"], series.ewm(span=10, adjust=False).mean())
+
+
+def test_shared_nodes_are_evaluated_once():
+    """The cost grows with the unique operators, not with the indicators."""
+
+    price = source()
+    variants = [
+        {"ma_fast": rolling_mean(price, fast), "ma_slow": rolling_mean(price, 20)}
+        for fast in (5, 5, 10, 10)
+    ]
+    bands = {
+        "bb_middle": rolling_mean(price, 20),
+        "bb_upper": rolling_mean(price, 20) + rolling_std(price, 20) * 2,
+    }
+
+    graph = Graph()
+    for index, outputs in enumerate(variants):
+        graph.add(f"moving_average_{index}", outputs)
+    graph.add("bollinger_bands", bands)
+    graph.evaluate({"price": PRICES})
+
+    # price, 3 rolling sums and their 3 scales (constant + mul), variance,
+    # sqrt, 2 and its product, and the upper band
+    assert len(graph) == 15
+    assert graph.evaluations == 15
+    assert count_operators(variants + [bands]) > 3 * len(graph)
+    assert graph.sources() == ["price"]
+
+
+def test_indicators_import_without_numpy():
+    """Declaring indicators does not load numpy, only evaluating them does."""
+
+    script = (
+        "import sys\n"
+        "import foresight.indicator_services.moving_average_indicator\n"
+        "assert 'numpy' not in sys.modules\n"
+    )
+
+    subprocess.run([sys.executable, "-c", script], check=True)
@@ -0,0 +1,151 @@
+"""Test the parameter sweeps of indicators."""
+
+import numpy as np
+import pytest
+
+from foresight.indicator_services import indicator as indicator_module
+from foresight.indicator_services.backtest import run_backtest
+from foresight.indicator_services.bollinger_bands_indicator import (
+    BollingerBandsIndicator,
+)
+from foresight.indicator_services.moving_average_indicator import MovingAverageIndicator
+from foresight.indicator_services.sweep import parameter_grid
+from foresight.indicator_services.sweep import sweep
+
+
+STATISTICS = [
+    "bars",
+    "trades",
+    "total_return",
+    "annualized_return",
+    "sharpe",
+    "max_drawdown",
+    "exposure",
+    "hit_rate",
+]
+
+
+@pytest.fixture(autouse=True)
+def no_network(monkeypatch):
+    """Fail on any attempt to create a queue."""
+
+    def get_client(*_, **__):
+        raise AssertionError("Sweeps must not use AWS.")
+
+    monkeypatch.setattr(indicator_module, "get_client", get_client)
+
+
+@pytest.fixture
+def prices() -> np.ndarray:
+    """A random walk of minute prices."""
+    return 1 + np.random.default_rng(0).normal(0, 1e-3, 2000).cumsum()
+
+
+def test_parameter_grid():
+    """Every combination of the values is a set of parameters."""
+
+    assert parameter_grid({"fast": [2, 3], "slow": [5]}) == [
+        {"fast": 2, "slow": 5},
+        {"fast": 3, "slow": 5},
+    ]
+
+
+def test_moving_average_sweep_matches_backtests(prices):
+    """The shared cumulative sum gives the statistics of every backtest."""
+
+    table = sweep(
+        MovingAverageIndicator,
+        prices,
+        grid={"fast": range(2, 6), "slow": range(3, 30, 4)},
+        cost=0.0001,
+        processes=1,
+    )
+
+    for row in table.head(5).to_dict("records"):
+        result = run_backtest(
+            MovingAverageIndicator,
+            prices,
+            cost=0.0001,
+            fast=row["fast"],
+            slow=row["slow"],
+        )
+        for statistic in STATISTICS:
+            assert row[statistic] == pytest.approx(getattr(result, statistic))
+
+
+def test_sweep_is_ranked(prices):
+    """The table is sorted best first, drawdowns smallest first."""
+
+    grid = {"fast": range(2, 6), "slow": range(3, 30, 4)}
+
+    by_sharpe = sweep(MovingAverageIndicator, prices, grid=grid, processes=1)
+    by_drawdown = sweep(
+        MovingAverageIndicator,
+        prices,
+        grid=grid,
+        processes=1,
+        rank_by="max_drawdown",
+    )
+
+    assert by_sharpe["sharpe"].is_monotonic_decreasing
+    assert by_drawdown["max_drawdown"].is_monotonic_increasing
+
+
+def test_fast_windows_shorter_than_slow(prices):
+    """Combinations without a shorter fast window are skipped."""
+
+    table = sweep(
+        MovingAverageIndicator,
+        prices,
+        grid={"fast": [2, 5, 8], "slow": [3, 5, 7]},
+        processes=1,
+    )
+
+    assert sorted(zip(table["fast"], table["slow"])) == [(2, 3), (2, 5), (2, 7), (5, 7)]
+
+
+def test_other_indicators_are_backtested(prices):
+    """Indicators without a fast path are backtested per combination."""
+
+    table = sweep(
+        BollingerBandsIndicator,
+        prices,
+        grid={"window": [5, 10], "width": [1.0, 2.0]},
+        processes=1,
+    )
+
+    assert len(table) == 4
+    row = table.to_dict("records")[0]
+    result = run_backtest(
+        BollingerBandsIndicator,
+        prices,
+        window=row["window"],
+        width=row["width"],
+    )
+    assert row["sharpe"] == pytest.approx(result.sharpe)
+
+
+@pytest.mark.parametrize("history", [[], [1.1]])
+@pytest.mark.parametrize("processes", [1, 2])
+def test_sweep_without_history(history, processes):
+    """Too short a history gives an empty table instead of failing the workers."""
+
+    table = sweep(
+        MovingAverageIndicator,
+        np.array(history),
+        grid={"fast": [2], "slow": [3]},
+        processes=processes,
+    )
+
+    assert table.empty
+
+
+def test_sweep_across_processes(prices):
+    """Worker processes give the same table as one process."""
+
+    grid = {"fast": range(2, 5), "slow": range(3, 12)}
+
+    inline = sweep(MovingAverageIndicator, prices, grid=grid, processes=1)
+    pooled = sweep(MovingAverageIndicator, prices, grid=grid, processes=2)
+
+    assert pooled.to_dict("records") == pytest.approx(inline.to_dict("records"))
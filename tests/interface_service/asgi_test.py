@@ -0,0 +1,76 @@
+"""Test the ASGI variant of the interface service."""
+
+import json
+
+import pytest
+
+from foresight.interface_service.serialization import COLUMNS_MIMETYPE
+from foresight.utils.models.latency_metric import LatencyMetric
+
+
+pytest.importorskip("starlette")
+pytest.importorskip("httpx")
+
+from starlette.testclient import TestClient  # noqa: E402
+
+from foresight.interface_service import asgi  # noqa: E402
+
+
+RECORDS = [
+    {"time": f"2024-01-01T00:{minute:02d}:00", "price": 1.1, "ma_fast": 1.05}
+    for minute in range(60)
+]
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    """A test client serving stored moving average results."""
+
+    async def fetch_latest() -> list[dict]:
+        return [{"component_name": "moving_average", "value": json.dumps(RECORDS)}]
+
+    monkeypatch.setattr(asgi.latest_results, "fetch", fetch_latest)
+    monkeypatch.setattr(asgi.latest_results, "fetched_at", float("-inf"))
+    with TestClient(asgi.app) as client:
+        yield client
+
+
+def test_pages(client):
+    """The dashboard pages are rendered from the Flask templates."""
+
+    assert "<html>" in client.get("/").text
+    assert "Simple Moving Average" in client.get("/sma").text
+
+
+def test_latest_rows(client):
+    """Without negotiation the stored values are sent as rows."""
+
+    response = client.get("/latest", headers={"Accept-Encoding": "identity"})
+
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {"moving_average": RECORDS}
+
+
+def test_latest_columns_gzip(client):
+    """The columnar shape and gzip are chosen through the request headers."""
+
+    response = client.get(
+        "/latest",
+        headers={"Accept": COLUMNS_MIMETYPE, "Accept-Encoding": "gzip"},
+    )
+
+    assert response.headers["content-type"] == COLUMNS_MIMETYPE
+    assert response.headers["content-encoding"] == "gzip"
+    # The test client decodes the body like a browser would
+    columns = response.json()["moving_average"]
+    assert columns["price"] == [record["price"] for record in RECORDS]
+
+
+def test_latency(client):
+    """The latency route queries the pool."""
+
+    LatencyMetric.create_table()
+    asgi.latest_latency.fetched_at = float("-inf")
+    response = client.get("/latency")
+
+    assert response.status_code == 200
@@ -0,0 +1,64 @@
+"""Test the interface service responses."""
+
+import gzip
+import json
+
+import pytest
+
+from foresight.interface_service import app as interface_app
+from foresight.interface_service.serialization import COLUMNS_MIMETYPE
+
+
+RECORDS = [
+    {"time": f"2024-01-01T00:{minute:02d}:00", "price": 1.1, "ma_fast": 1.05}
+    for minute in range(60)
+]
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    """A test client serving stored moving average results."""
+    monkeypatch.setattr(
+        interface_app,
+        "get_latest",
+        lambda: [{"component_name": "moving_average", "value": json.dumps(RECORDS)}],
+    )
+    return interface_app.app.test_client()
+
+
+def test_latest_rows(client):
+    """Without negotiation the stored values are sent as uncompressed rows."""
+
+    response = client.get("/latest")
+
+    assert response.mimetype == "application/json"
+    assert "Content-Encoding" not in response.headers
+    assert response.json == {"moving_average": RECORDS}
+
+
+def test_latest_columns_gzip(client):
+    """The columnar shape and gzip are chosen through the request headers."""
+
+    response = client.get(
+        "/latest",
+        headers={"Accept": COLUMNS_MIMETYPE, "Accept-Encoding": "gzip"},
+    )
+
+    assert response.mimetype == COLUMNS_MIMETYPE
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert set(response.vary) == {"Accept", "Accept-Encoding"}
+
+    columns = json.loads(gzip.decompress(response.data))["moving_average"]
+    assert columns["price"] == [record["price"] for record in RECORDS]
+    assert len(columns["time"]) == len(RECORDS)
+
+
+def test_small_bodies_are_not_compressed(client, monkeypatch):
+    """Bodies under the threshold are sent as is."""
+
+    monkeypatch.setattr(interface_app, "get_latest", lambda: [])
+
+    response = client.get("/latest", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in response.headers
+    assert response.json == {"error": "No data available"}
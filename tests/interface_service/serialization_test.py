@@ -0,0 +1,69 @@
+"""Test the serialization of interface service responses."""
+
+import gzip
+import json
+
+import pytest
+
+from foresight.interface_service.serialization import compress
+from foresight.interface_service.serialization import dumps
+from foresight.interface_service.serialization import loads
+from foresight.interface_service.serialization import raw_object
+from foresight.interface_service.serialization import supported_encodings
+from foresight.interface_service.serialization import to_columns
+
+
+RECORDS = [
+    {"time": "2024-01-01T00:00:00", "price": 1.1, "ma_fast": 1.05},
+    {"time": "2024-01-01T00:01:00", "price": 1.2},
+]
+
+
+def test_dumps_is_compact_json():
+    """Values are encoded without whitespace and decode to the same value."""
+
+    body = dumps({"records": RECORDS})
+
+    assert b" " not in body
+    assert loads(body) == {"records": RECORDS}
+
+
+def test_raw_object():
+    """Encoded values are spliced into the object unchanged."""
+
+    body = raw_object([("moving_average", json.dumps(RECORDS)), ('quote"d', "1")])
+
+    assert json.loads(body) == {"moving_average": RECORDS, 'quote"d': 1}
+
+
+def test_to_columns():
+    """Records become one array per field, with nulls for missing fields."""
+
+    assert to_columns(RECORDS) == {
+        "time": ["2024-01-01T00:00:00", "2024-01-01T00:01:00"],
+        "price": [1.1, 1.2],
+        "ma_fast": [1.05, None],
+    }
+
+
+@pytest.mark.parametrize("value", [[], [1, 2], {"price": 1.1}, "text"])
+def test_to_columns_other_values(value):
+    """Values that are not lists of records are left as they are."""
+
+    assert to_columns(value) == value
+
+
+def test_compress():
+    """Bodies round trip through every supported encoding."""
+
+    body = dumps(RECORDS * 100)
+
+    assert compress(body, None) is body
+    assert gzip.decompress(compress(body, "gzip")) == body
+    if "br" in supported_encodings():
+        import brotli
+
+        assert brotli.decompress(compress(body, "br")) == body
+
+    with pytest.raises(ValueError):
+        compress(body, "deflate")
@@ -0,0 +1,181 @@
+"""Test the incremental bar builder."""
+
+import random
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import pytest
+
+from foresight.stream_service.app import ingest_lines
+from foresight.stream_service.bar_builder import BarBuilder
+from foresight.utils.database import TimeScaleService
+from foresight.utils.models.forex_bar import ForexBar
+from foresight.utils.models.forex_data import ForexData
+
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def tick(instrument: str, milliseconds: int, bid: float) -> ForexData:
+    """A tick some milliseconds after the start."""
+    return ForexData(
+        instrument=instrument,
+        time=START + timedelta(milliseconds=milliseconds),
+        bid=bid,
+        ask=bid + 0.0001,
+    )
+
+
+def test_unknown_resolution():
+    """Only the ForexData timescales can be built."""
+
+    with pytest.raises(ValueError):
+        BarBuilder(resolutions=["W"])
+
+
+def test_open_high_low_close():
+    """A bar keeps the first, highest, lowest, last and mean prices."""
+
+    builder = BarBuilder(resolutions=["S", "M"], clock=lambda: START.timestamp())
+    for milliseconds, bid in [(100, 1.2), (300, 1.5), (600, 1.1), (900, 1.3)]:
+        builder.add(tick("EUR_USD", milliseconds, bid))
+    builder.add(tick("EUR_USD", 1100, 1.4))
+
+    (second,) = builder.drain()
+
+    assert second.resolution == "S"
+    assert second.time == START
+    assert (second.bid_open, second.bid_high, second.bid_low, second.bid_close) == (
+        1.2,
+        1.5,
+        1.1,
+        1.3,
+    )
+    assert second.bid_mean == pytest.approx(1.275)
+    assert second.ask_high == pytest.approx(1.5001)
+    assert second.tick_count == 4
+
+    bars = builder.drain(flush_all=True)
+    assert sorted((bar.resolution, bar.tick_count) for bar in bars) == [
+        ("M", 5),
+        ("S", 1),
+    ]
+    assert builder.stats() == {"ticks_in": 5, "bars_out": 3, "open_bars": 0}
+
+
+def test_drain_closes_ended_bars():
+    """Open bars are finished once their end and the grace have passed."""
+
+    now = [START.timestamp()]
+    builder = BarBuilder(resolutions=["S"], grace=1.0, clock=lambda: now[0])
+    builder.add(tick("EUR_USD", 100, 1.2))
+
+    now[0] += 1.5
+    assert builder.drain() == []
+
+    now[0] += 0.5
+    assert len(builder.drain()) == 1
+
+
+@pytest.mark.usefixtures("setup_forex_bars_table")
+def test_upsert_merges_late_bars():
+    """A bar written twice is merged into one."""
+
+    builder = BarBuilder(resolutions=["S"])
+    builder.add(tick("EUR_USD", 100, 1.2))
+    builder.add(tick("EUR_USD", 200, 1.4))
+    ForexBar.insert_multiple(data=builder.drain(flush_all=True))
+
+    builder.add(tick("EUR_USD", 300, 1.0))
+    ForexBar.insert_multiple(data=builder.drain(flush_all=True))
+
+    (bar,) = ForexBar.fetch(instrument="EUR_USD", timescale="S")
+
+    assert bar.bid_open == 1.2
+    assert bar.bid_high == 1.4
+    assert bar.bid_low == 1.0
+    assert bar.bid_mean == pytest.approx(1.2)
+    assert bar.tick_count == 3
+
+
+@pytest.mark.usefixtures("setup_forex_bars_table")
+def test_late_tick_merged_before_drain():
+    """A late tick drained with its bar is merged into it, not written twice."""
+
+    builder = BarBuilder(resolutions=["S"], clock=lambda: START.timestamp())
+    builder.add(tick("EUR_USD", 100, 1.2))
+    builder.add(tick("EUR_USD", 800, 1.4))
+    builder.add(tick("EUR_USD", 1100, 1.3))
+    builder.add(tick("EUR_USD", 500, 1.0))
+
+    bars = builder.drain(flush_all=True)
+    ForexBar.insert_multiple(data=bars)
+
+    assert len(bars) == 2
+    first, _ = ForexBar.fetch(instrument="EUR_USD", timescale="S")
+    assert (first.bid_open, first.bid_low, first.bid_close) == (1.2, 1.0, 1.4)
+    assert first.tick_count == 3
+    assert builder.stats()["bars_out"] == 2
+
+
+@pytest.mark.usefixtures("setup_forex_bars_table")
+def test_upsert_keeps_the_latest_close():
+    """A late bar written after the stored one only moves the open and close if newer."""
+
+    builder = BarBuilder(resolutions=["S"])
+    builder.add(tick("EUR_USD", 300, 1.2))
+    builder.add(tick("EUR_USD", 600, 1.4))
+    ForexBar.insert_multiple(data=builder.drain(flush_all=True))
+
+    builder.add(tick("EUR_USD", 100, 1.1))
+    builder.add(tick("EUR_USD", 400, 1.0))
+    ForexBar.insert_multiple(data=builder.drain(flush_all=True))
+
+    (bar,) = ForexBar.fetch(instrument="EUR_USD", timescale="S")
+
+    assert (bar.bid_open, bar.bid_close) == (1.1, 1.4)
+    assert (bar.first_time, bar.last_time) == (
+        START + timedelta(milliseconds=100),
+        START + timedelta(milliseconds=600),
+    )
+
+
+@pytest.mark.usefixtures("setup_forex_data_table", "setup_forex_bars_table")
+def test_bars_match_fetch():
+    """Bars built at ingest have the means fetch computes from the raw ticks."""
+
+    # ARRANGE
+    ticks = [
+        tick("EUR_USD", milliseconds, round(random.uniform(1.0, 1.1), 5))
+        for milliseconds in sorted(random.sample(range(180_000), 1000))
+    ]
+    lines = [
+        (
+            '{"type": "PRICE", "instrument": "EUR_USD", "tradeable": true, '
+            f'"time": "{item.time.isoformat()}", '
+            f'"bids": [{{"price": {item.bid}}}], "asks": [{{"price": {item.ask}}}]}}'
+        ).encode("utf-8")
+        for item in ticks
+    ]
+
+    # ACT
+    ingest_lines(
+        lines,
+        bar_builder=BarBuilder(resolutions=["S", "M"], clock=lambda: START.timestamp()),
+    )
+
+    # ASSERT
+    for timescale in ["S", "M"]:
+        bars = ForexBar.fetch(instrument="EUR_USD", timescale=timescale)
+        buckets = TimeScaleService().execute(
+            *ForexData.bucket_query("EUR_USD", timescale),
+        )
+
+        assert [bar.time for bar in bars] == [row["time"] for row in buckets]
+        assert [bar.tick_count for bar in bars] == [
+            row["tick_count"] for row in buckets
+        ]
+        assert [bar.to_forex_data().bid for bar in bars] == pytest.approx(
+            [row["bid"] for row in buckets],
+        )
@@ -0,0 +1,160 @@
+"""Test the per-instrument tick conflation."""
+
+import random
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import pytest
+
+from foresight.stream_service.conflation import Conflator
+from foresight.utils.database import TimeScaleService
+from foresight.utils.models.forex_data import ForexData
+
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def tick(instrument: str, milliseconds: int, bid: float) -> ForexData:
+    """A tick some milliseconds after the start."""
+    return ForexData(
+        instrument=instrument,
+        time=START + timedelta(milliseconds=milliseconds),
+        bid=bid,
+        ask=bid + 0.0001,
+    )
+
+
+def test_invalid_arguments():
+    """The interval and mode are validated."""
+
+    with pytest.raises(ValueError):
+        Conflator(interval=0)
+
+    with pytest.raises(ValueError):
+        Conflator(mode="median")
+
+
+@pytest.mark.parametrize("interval", [1.5, 2, 0.3])
+def test_interval_must_divide_a_second(interval):
+    """Intervals straddling or merging second buckets are rejected."""
+
+    with pytest.raises(ValueError):
+        Conflator(interval=interval)
+
+
+@pytest.mark.parametrize("interval", [1, 0.5, 0.25, 0.1])
+def test_intervals_dividing_a_second(interval):
+    """Intervals dividing a second are accepted."""
+
+    assert Conflator(interval=interval).interval == interval
+
+
+def test_mean_per_interval():
+    """One record per instrument and interval, emitted when the next one starts."""
+
+    conflator = Conflator(interval=1.0)
+
+    assert conflator.add(tick("EUR_USD", 100, 1.0)) == []
+    assert conflator.add(tick("EUR_USD", 900, 2.0)) == []
+    assert conflator.add(tick("GBP_USD", 950, 5.0)) == []
+
+    records = conflator.add(tick("EUR_USD", 1200, 4.0))
+
+    assert len(records) == 1
+    assert records[0].time == START
+    assert records[0].bid == 1.5
+    assert records[0].tick_count == 2
+
+    remaining = conflator.flush()
+    assert sorted((record.instrument, record.bid) for record in remaining) == [
+        ("EUR_USD", 4.0),
+        ("GBP_USD", 5.0),
+    ]
+    assert conflator.stats() == {"ticks_in": 4, "records_out": 3, "ratio": 4 / 3}
+
+
+def test_last_per_interval():
+    """The last mode keeps the last prices and the count."""
+
+    conflator = Conflator(interval=1.0, mode="last")
+    conflator.add(tick("EUR_USD", 100, 1.0))
+    conflator.add(tick("EUR_USD", 900, 2.0))
+
+    (record,) = conflator.flush()
+
+    assert record.bid == 2.0
+    assert record.tick_count == 2
+
+
+def test_flush_waits_for_grace():
+    """Idle instruments are flushed once their interval and the grace ended."""
+
+    conflator = Conflator(interval=1.0)
+    conflator.add(tick("EUR_USD", 100, 1.0))
+
+    assert conflator.flush(now=START.timestamp() + 1.5, grace=1.0) == []
+    assert len(conflator.flush(now=START.timestamp() + 2.0, grace=1.0)) == 1
+    assert conflator.buckets == {}
+
+    conflator = Conflator(interval=1.0, clock=lambda: START.timestamp() + 2.0)
+    conflator.add(tick("EUR_USD", 100, 1.0))
+    assert len(conflator.flush_due()) == 1
+
+
+def test_late_tick_is_its_own_record():
+    """A tick of an interval that was already emitted is not mixed into the next one."""
+
+    conflator = Conflator(interval=1.0)
+    conflator.add(tick("EUR_USD", 1100, 2.0))
+
+    (late,) = conflator.add(tick("EUR_USD", 500, 1.0))
+
+    assert late.time == START
+    assert late.tick_count == 1
+    assert conflator.flush()[0].bid == 2.0
+
+
+def test_conflated_rows_fetch_like_raw_ticks():
+    """Fetching conflated rows gives the same buckets as fetching the raw ticks."""
+
+    # ARRANGE
+    raw_table = ForexData.create_table(table_name="conflation_test_raw")
+    conflated_table = ForexData.create_table(table_name="conflation_test_conflated")
+    ticks = [
+        tick("EUR_USD", milliseconds, round(random.uniform(1.0, 1.1), 5))
+        for milliseconds in sorted(random.sample(range(120_000), 2000))
+    ]
+    conflator = Conflator(interval=1.0)
+
+    # ACT
+    records = [record for item in ticks for record in conflator.add(item)]
+    records += conflator.flush()
+    ForexData.insert_multiple(data=ticks, table_name=raw_table)
+    ForexData.insert_multiple(data=records, table_name=conflated_table)
+
+    # ASSERT
+    try:
+        assert len(records) <= 120
+        for timescale in ["S", "M"]:
+            raw = TimeScaleService().execute(
+                *ForexData.bucket_query("EUR_USD", timescale, table_name=raw_table),
+            )
+            conflated = TimeScaleService().execute(
+                *ForexData.bucket_query(
+                    "EUR_USD",
+                    timescale,
+                    table_name=conflated_table,
+                ),
+            )
+
+            assert [row["time"] for row in raw] == [row["time"] for row in conflated]
+            assert [row["tick_count"] for row in raw] == [
+                row["tick_count"] for row in conflated
+            ]
+            assert [row["bid"] for row in raw] == pytest.approx(
+                [row["bid"] for row in conflated],
+            )
+    finally:
+        ForexData.drop_table(table_name=raw_table)
+        ForexData.drop_table(table_name=conflated_table)
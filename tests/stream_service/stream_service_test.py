@@ -2,13 +2,17 @@
 
 import time
 from datetime import datetime
+from datetime import timedelta
 
 import pytest
 
+from foresight.stream_service.app import ingest_lines
 from foresight.stream_service.app import open_oanda_stream
 from foresight.stream_service.app import open_random_walk_stream
 from foresight.stream_service.app import process_stream_data
+from foresight.stream_service.conflation import Conflator
 from foresight.stream_service.models.stream import Stream
+from foresight.stream_service.tick_queue import TickQueue
 from foresight.utils.database import TimeScaleService
 
 
@@ -36,6 +40,26 @@ def test_open_random_walk_stream(create_forex_data_table):
     assert len(records) == MAX_WALK
 
 
+@pytest.mark.usefixtures("setup_forex_bars_table")
+def test_random_walk_builds_bars(create_forex_data_table, monkeypatch):
+    """Random walk ticks go through the bar builder like streamed ones."""
+
+    # ARRANGE
+    monkeypatch.setenv("STREAM_BAR_RESOLUTIONS", "M")
+
+    # ACT
+    open_random_walk_stream(max_walk=10, instruments=["EUR_USD", "GBP_USD"])
+
+    # ASSERT
+    bars = TimeScaleService().execute(
+        query="SELECT instrument, SUM(tick_count) AS ticks FROM forex_bars GROUP BY 1",
+    )
+    assert sorted((bar["instrument"], bar["ticks"]) for bar in bars) == [
+        ("EUR_USD", 10),
+        ("GBP_USD", 10),
+    ]
+
+
 def test_process_steam_data(create_forex_data_table):
     """Test the process_stream_data method."""
 
@@ -71,6 +95,88 @@ def test_process_steam_data(create_forex_data_table):
     )
 
 
+def stream_lines(count: int, ticks_per_second: int = 1) -> list[bytes]:
+    """Encoded price lines with a heartbeat after every tick."""
+    lines = []
+    for i in range(count):
+        tick_time = datetime(2024, 1, 1) + timedelta(
+            seconds=i // ticks_per_second,
+            microseconds=i,
+        )
+        record = Stream(
+            instrument="EUR_USD",
+            time=tick_time.isoformat(),
+            bids=[{"price": 1.2 + i / 1e5}],
+            asks=[{"price": 1.2001 + i / 1e5}],
+        )
+        lines.append(record.model_dump_json().encode("utf-8"))
+        lines.append(b'{"type": "HEARTBEAT", "time": "2024-01-01T00:00:00Z"}')
+    return lines
+
+
+def test_ingest_lines(create_forex_data_table):
+    """Ticks read on one thread are stored in batches by the writer thread."""
+
+    # ARRANGE
+    table_name = create_forex_data_table
+    calls = []
+
+    # ACT
+    tick_queue = ingest_lines(
+        stream_lines(250),
+        table_name=table_name,
+        on_tick=calls.append,
+        tick_queue=TickQueue(maxsize=10),
+        batch_size=20,
+    )
+
+    # ASSERT
+    records = TimeScaleService().execute(
+        query=f"SELECT COUNT(*) AS count FROM {table_name}",
+    )
+    assert records[0]["count"] == 250
+    assert len([call for call in calls if call is not None]) == 250
+    assert len([call for call in calls if call is None]) == 250
+    assert tick_queue.stats()["put"] == 250
+    assert tick_queue.stats()["max_depth"] <= 10
+    assert tick_queue.stats()["dropped"] == 0
+
+
+def test_ingest_lines_conflated(create_forex_data_table):
+    """Conflated ingest writes fewer rows standing for every tick."""
+
+    # ARRANGE
+    table_name = create_forex_data_table
+
+    # ACT
+    ingest_lines(
+        stream_lines(250, ticks_per_second=10),
+        table_name=table_name,
+        conflator=Conflator(
+            interval=1.0,
+            clock=lambda: datetime(2024, 1, 1).timestamp(),
+        ),
+    )
+
+    # ASSERT
+    records = TimeScaleService().execute(
+        query=f"SELECT COUNT(*) AS count, SUM(tick_count) AS ticks FROM {table_name}",
+    )
+    assert records[0]["count"] == 25
+    assert records[0]["ticks"] == 250
+
+
+def test_ingest_lines_writer_failure():
+    """A failing writer stops the reader instead of blocking it forever."""
+
+    with pytest.raises(Exception):
+        ingest_lines(
+            stream_lines(100),
+            table_name="missing_table",
+            tick_queue=TickQueue(maxsize=1),
+        )
+
+
 def test_open_oanda_stream(create_forex_data_table):
     """Test the open_oanda_stream method."""
     # ARRANGE
@@ -0,0 +1,127 @@
+"""Test the stream service supervisor."""
+
+import sys
+import time
+
+import pytest
+
+from foresight.stream_service.supervisor import StreamSupervisor
+from foresight.stream_service.supervisor import shard_instruments
+from foresight.stream_service.supervisor import tick_callback
+from foresight.utils.models.forex_data import ForexData
+
+
+def count_ticks(instruments, ticks, heartbeat):
+    """Worker storing ten ticks per instrument, then idling."""
+    on_tick = tick_callback(ticks, heartbeat)
+    for _ in range(10):
+        for instrument in instruments:
+            on_tick(
+                ForexData(instrument=instrument, time="2024-01-01", bid=1.0, ask=1.1),
+            )
+        on_tick(None)
+    time.sleep(30)
+
+
+def crash(instruments, ticks, heartbeat):
+    """Worker exiting straight away."""
+    sys.exit(1)
+
+
+def hang(instruments, ticks, heartbeat):
+    """Worker that never sends a heartbeat."""
+    time.sleep(30)
+
+
+def wait_for(condition, timeout: float = 10):
+    """Poll until the condition holds."""
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.05)
+
+
+def test_shard_instruments():
+    """Instruments are split round robin without empty shards."""
+
+    instruments = ["EUR_USD", "GBP_USD", "USD_JPY", "AUD_USD", "USD_CAD"]
+
+    assert shard_instruments(instruments, 2) == [
+        ["EUR_USD", "USD_JPY", "USD_CAD"],
+        ["GBP_USD", "AUD_USD"],
+    ]
+    assert len(shard_instruments(instruments, 8)) == 5
+
+    with pytest.raises(ValueError):
+        shard_instruments(instruments, 0)
+
+
+def test_aggregate_throughput():
+    """Every shard runs in its own process and the ticks are summed."""
+
+    supervisor = StreamSupervisor(
+        instruments=["EUR_USD", "GBP_USD", "USD_JPY"],
+        workers=2,
+        target=count_ticks,
+        start_method="fork",
+    )
+    try:
+        assert supervisor.check() == [0, 1]
+        wait_for(lambda: supervisor.ticks == 30)
+
+        stats = supervisor.report(now=supervisor.last_report + 1)
+
+        assert stats["alive"] == 2
+        assert stats["ticks"] == 30
+        assert stats["ticks_per_second"] == 30
+        assert supervisor.check() == []
+    finally:
+        supervisor.stop()
+
+
+def test_restart_exited_worker_with_backoff():
+    """A worker that exits is restarted after an increasing delay."""
+
+    supervisor = StreamSupervisor(
+        instruments=["EUR_USD"],
+        target=crash,
+        start_method="fork",
+    )
+    try:
+        supervisor.check()
+        slot = supervisor.slots[0]
+        wait_for(lambda: not slot.process.is_alive())
+
+        now = time.time()
+        assert supervisor.check(now) == []
+        assert supervisor.restarts == 1
+        assert supervisor.check(now + 1) == [0]
+
+        wait_for(lambda: not slot.process.is_alive())
+        assert supervisor.check(now + 1) == []
+        assert slot.next_start == now + 1 + 2
+    finally:
+        supervisor.stop()
+
+
+def test_restart_stale_worker():
+    """A worker without heartbeats is terminated and restarted."""
+
+    supervisor = StreamSupervisor(
+        instruments=["EUR_USD"],
+        target=hang,
+        stale_after=5,
+        start_method="fork",
+    )
+    try:
+        supervisor.check()
+        process = supervisor.slots[0].process
+
+        now = time.time() + 10
+        supervisor.check(now)
+
+        assert not process.is_alive()
+        assert supervisor.restarts == 1
+        assert supervisor.check(now + 1) == [0]
+    finally:
+        supervisor.stop()
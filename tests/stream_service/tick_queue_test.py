@@ -0,0 +1,99 @@
+"""Test the bounded queue between the stream reader and writer."""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from foresight.stream_service.tick_queue import QueueClosed
+from foresight.stream_service.tick_queue import TickQueue
+
+
+def tick(instrument: str, bid: float) -> SimpleNamespace:
+    """A minimal tick."""
+    return SimpleNamespace(instrument=instrument, bid=bid)
+
+
+def test_invalid_arguments():
+    """The size and policy are validated."""
+
+    with pytest.raises(ValueError):
+        TickQueue(maxsize=0)
+
+    with pytest.raises(ValueError):
+        TickQueue(policy="unknown")
+
+
+def test_block_waits_for_room():
+    """A full blocking queue waits until the writer takes a batch."""
+
+    tick_queue = TickQueue(maxsize=2, policy="block")
+    tick_queue.put(tick("EUR_USD", 1))
+    tick_queue.put(tick("EUR_USD", 2))
+
+    assert tick_queue.put(tick("EUR_USD", 3), timeout=0.05) is False
+
+    threading.Timer(0.1, tick_queue.get_batch, kwargs={"max_items": 1}).start()
+    assert tick_queue.put(tick("EUR_USD", 3), timeout=5) is True
+
+    stats = tick_queue.stats()
+    assert [item.bid for item in tick_queue.get_batch()] == [2, 3]
+    assert stats["put"] == 3
+    assert stats["dropped"] == 0
+    assert stats["blocked_seconds"] > 0
+
+
+def test_drop_oldest():
+    """A full queue discards the oldest tick."""
+
+    tick_queue = TickQueue(maxsize=3, policy="drop_oldest")
+    for bid in range(5):
+        tick_queue.put(tick("EUR_USD", bid))
+
+    assert [item.bid for item in tick_queue.get_batch()] == [2, 3, 4]
+    assert tick_queue.stats()["dropped"] == 2
+    assert tick_queue.stats()["max_depth"] == 3
+
+
+def test_coalesce_latest_per_instrument():
+    """A full queue replaces the pending tick of the same instrument in place."""
+
+    tick_queue = TickQueue(maxsize=2, policy="coalesce")
+    tick_queue.put(tick("EUR_USD", 1))
+    tick_queue.put(tick("GBP_USD", 1))
+    tick_queue.put(tick("EUR_USD", 2))
+    tick_queue.put(tick("EUR_USD", 3))
+
+    assert [(item.instrument, item.bid) for item in tick_queue.get_batch()] == [
+        ("EUR_USD", 3),
+        ("GBP_USD", 1),
+    ]
+
+    # Without a pending tick of the instrument the oldest one is dropped
+    tick_queue.put(tick("EUR_USD", 4))
+    tick_queue.put(tick("GBP_USD", 2))
+    tick_queue.put(tick("USD_JPY", 1))
+
+    assert [(item.instrument, item.bid) for item in tick_queue.get_batch()] == [
+        ("GBP_USD", 2),
+        ("USD_JPY", 1),
+    ]
+    assert tick_queue.stats()["coalesced"] == 2
+    assert tick_queue.stats()["dropped"] == 1
+
+
+def test_close_drains_pending_ticks():
+    """Pending ticks can be read after closing, new ones are refused."""
+
+    tick_queue = TickQueue()
+    tick_queue.put(tick("EUR_USD", 1))
+    tick_queue.close()
+
+    with pytest.raises(QueueClosed):
+        tick_queue.put(tick("EUR_USD", 2))
+
+    assert len(tick_queue.get_batch()) == 1
+    start = time.perf_counter()
+    assert tick_queue.get_batch(timeout=5) == []
+    assert time.perf_counter() - start < 1
@@ -0,0 +1,85 @@
+"""Test the async connection pool and shared results."""
+
+import asyncio
+
+import pytest
+
+from foresight.utils.async_database import AsyncTimeScalePool
+from foresight.utils.async_database import SharedResult
+
+
+pytest.importorskip("psycopg_pool")
+
+
+def test_execute():
+    """Queries run on pooled connections and return dict rows."""
+
+    async def run() -> list[list[dict]]:
+        pool = AsyncTimeScalePool(min_size=1, max_size=2)
+        await pool.open()
+        try:
+            return await asyncio.gather(
+                *[
+                    pool.execute("SELECT %s::INTEGER AS value", (index,))
+                    for index in range(5)
+                ],
+            )
+        finally:
+            await pool.close()
+
+    assert asyncio.run(run()) == [[{"value": index}] for index in range(5)]
+
+
+def test_execute_without_pool():
+    """Queries need an open pool."""
+
+    with pytest.raises(Exception):
+        asyncio.run(AsyncTimeScalePool().execute("SELECT 1"))
+
+
+def test_shared_result():
+    """Concurrent callers share one call, and results are reused within the ttl."""
+
+    now = [0.0]
+
+    async def fetch() -> float:
+        await asyncio.sleep(0.01)
+        return now[0]
+
+    shared = SharedResult(fetch, ttl=1.0, clock=lambda: now[0])
+
+    async def run():
+        results = await asyncio.gather(*[shared.get() for _ in range(100)])
+        assert results == [0.0] * 100
+        assert shared.calls == 1
+
+        now[0] = 0.5
+        assert await shared.get() == 0.0
+        assert shared.calls == 1
+
+        now[0] = 1.5
+        assert await shared.get() == 1.5
+        assert shared.calls == 2
+
+    asyncio.run(run())
+
+
+def test_shared_result_failure():
+    """A failed call is raised to its callers and retried by the next one."""
+
+    calls = []
+
+    async def fetch() -> int:
+        calls.append(1)
+        if len(calls) == 1:
+            raise ValueError("Failed")
+        return len(calls)
+
+    shared = SharedResult(fetch)
+
+    async def run():
+        with pytest.raises(ValueError):
+            await shared.get()
+        assert await shared.get() == 2
+
+    asyncio.run(run())
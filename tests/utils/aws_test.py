@@ -0,0 +1,65 @@
+"""Test the AWS client cache."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from foresight.utils.aws import clear_client_cache
+from foresight.utils.aws import get_client
+from foresight.utils.aws import get_config
+
+
+@pytest.fixture()
+def aws_environment(monkeypatch):
+    """Fake AWS settings pointing at a local endpoint."""
+    monkeypatch.setenv("AWS_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+    monkeypatch.setenv("AWS_ENDPOINT_URL", "http://localhost:4566")
+    clear_client_cache()
+    yield
+    clear_client_cache()
+
+
+@pytest.mark.usefixtures("aws_environment")
+def test_get_client_is_cached():
+    """The same client is returned for the same service and configuration."""
+
+    client = get_client("sqs")
+
+    assert get_client("sqs") is client
+    assert get_client("s3") is not client
+    assert get_client("sqs", max_pool_connections=5) is not client
+
+
+@pytest.mark.usefixtures("aws_environment")
+def test_get_client_is_cached_per_endpoint(monkeypatch):
+    """A different endpoint gets its own client."""
+
+    client = get_client("sqs")
+    monkeypatch.setenv("AWS_ENDPOINT_URL", "http://localhost:4567")
+
+    assert get_client("sqs") is not client
+
+
+@pytest.mark.usefixtures("aws_environment")
+def test_get_client_is_thread_safe():
+    """Concurrent callers all share a single client."""
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        clients = list(executor.map(lambda _: get_client("sqs"), range(32)))
+
+    assert all(client is clients[0] for client in clients)
+
+
+def test_get_config(monkeypatch):
+    """Connection settings come from arguments or the environment."""
+
+    monkeypatch.setenv("AWS_MAX_POOL_CONNECTIONS", "25")
+    monkeypatch.setenv("AWS_TCP_KEEPALIVE", "False")
+
+    config = get_config(max_attempts=7)
+
+    assert config.max_pool_connections == 25
+    assert config.retries == {"max_attempts": 7, "mode": "standard"}
+    assert config.tcp_keepalive is False
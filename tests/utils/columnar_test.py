@@ -0,0 +1,89 @@
+"""Test the columnar decoding of query results."""
+
+import struct
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import numpy as np
+
+from foresight.utils.columnar import COPY_SIGNATURE
+from foresight.utils.columnar import POSTGRES_EPOCH_US
+from foresight.utils.columnar import columns_from_rows
+from foresight.utils.columnar import parse_copy_binary
+
+
+def copy_binary(rows: list[tuple]) -> bytes:
+    """Encode (bigint, double, timestamptz in microseconds) rows as binary COPY."""
+    data = COPY_SIGNATURE + struct.pack(">ii", 0, 0)
+    for identifier, price, micros in rows:
+        data += struct.pack(">h", 3)
+        data += struct.pack(">iq", 8, identifier)
+        data += (
+            struct.pack(">id", 8, price) if price is not None else struct.pack(">i", -1)
+        )
+        data += struct.pack(">iq", 8, micros - POSTGRES_EPOCH_US)
+    return data + struct.pack(">h", -1)
+
+
+def test_parse_copy_binary():
+    """Fixed width columns are decoded into typed arrays."""
+
+    epoch = 1_704_067_200_000_000  # 2024-01-01 UTC
+    columns = parse_copy_binary(
+        copy_binary([(1, 1.5, epoch), (2, 2.5, epoch + 1_000_000)]),
+        names=["id", "price", "time"],
+        type_codes=[20, 701, 1184],
+    )
+
+    assert columns["id"].dtype == np.int64
+    assert columns["id"].tolist() == [1, 2]
+    assert columns["price"].tolist() == [1.5, 2.5]
+    assert columns["time"].tolist() == [
+        datetime(2024, 1, 1),
+        datetime(2024, 1, 1, second=1),
+    ]
+
+
+def test_parse_copy_binary_with_nulls():
+    """NULLs cannot be decoded as fixed width rows."""
+
+    columns = parse_copy_binary(
+        copy_binary([(1, None, POSTGRES_EPOCH_US)]),
+        names=["id", "price", "time"],
+        type_codes=[20, 701, 1184],
+    )
+
+    assert columns is None
+
+
+def test_parse_copy_binary_text_columns():
+    """Variable width columns are not decoded."""
+
+    assert parse_copy_binary(COPY_SIGNATURE, names=["name"], type_codes=[25]) is None
+
+
+def test_columns_from_rows():
+    """Tuples are converted column by column, keeping NULLs."""
+
+    time = datetime(2024, 1, 1, 2, tzinfo=timezone(timedelta(hours=2)))
+    columns = columns_from_rows(
+        [("EUR_USD", 1, 1.5, time), ("GBP_USD", None, None, None)],
+        names=["instrument", "count", "price", "time"],
+        type_codes=[1043, 23, 701, 1184],
+    )
+
+    assert columns["instrument"].tolist() == ["EUR_USD", "GBP_USD"]
+    assert columns["count"].dtype == np.float64
+    assert np.isnan(columns["price"][1])
+    assert columns["time"][0] == np.datetime64("2024-01-01T00:00:00")
+    assert np.isnat(columns["time"][1])
+
+
+def test_columns_from_rows_empty():
+    """An empty result still has every column."""
+
+    columns = columns_from_rows([], names=["price"], type_codes=[701])
+
+    assert columns["price"].dtype == np.float64
+    assert len(columns["price"]) == 0
@@ -0,0 +1,114 @@
+"""Test the TimescaleDB service."""
+
+import numpy as np
+import pytest
+
+from foresight.utils.database import TimeScaleService
+
+
+def test_stream_rows():
+    """Rows are streamed one at a time through a server-side cursor."""
+
+    rows = list(
+        TimeScaleService().stream(
+            query="SELECT generate_series(1, %s) AS value",
+            params=(2500,),
+            itersize=100,
+        ),
+    )
+
+    assert len(rows) == 2500
+    assert rows[0]["value"] == 1
+    assert rows[-1]["value"] == 2500
+
+
+def test_stream_chunks():
+    """Rows are grouped in chunks when a chunk size is given."""
+
+    chunks = list(
+        TimeScaleService().stream(
+            query="SELECT generate_series(1, 2500) AS value",
+            chunk_size=1000,
+        ),
+    )
+
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 500]
+    assert chunks[-1][-1]["value"] == 2500
+
+
+def test_stream_leaves_shared_connection_usable():
+    """Abandoning a stream half way does not affect other queries."""
+
+    stream = TimeScaleService().stream(query="SELECT generate_series(1, 10) AS value")
+    assert next(stream)["value"] == 1
+    stream.close()
+
+    assert TimeScaleService().execute(query="SELECT 1 AS value") == [{"value": 1}]
+
+
+def test_stream_reuses_its_connection():
+    """Streams one after the other run on the same connection, apart from the shared one."""
+
+    first = list(TimeScaleService().stream(query="SELECT pg_backend_pid() AS pid"))
+    second = list(TimeScaleService().stream(query="SELECT pg_backend_pid() AS pid"))
+    shared = TimeScaleService().execute(query="SELECT pg_backend_pid() AS pid")
+
+    assert first == second
+    assert first != shared
+
+
+def test_stream_recovers_from_failed_queries():
+    """A failed stream leaves its connection usable for the next one."""
+
+    with pytest.raises(Exception):
+        list(TimeScaleService().stream(query="SELECT * FROM missing_stream_table"))
+
+    rows = list(TimeScaleService().stream(query="SELECT 1 AS value"))
+    assert rows == [{"value": 1}]
+
+
+def test_fetch_columns_matches_execute():
+    """The binary COPY and tuple paths return the same values as execute."""
+
+    query = """SELECT
+        value::INTEGER AS id,
+        value * 0.5 AS price,
+        TIMESTAMPTZ '2024-01-01 00:00:00+00' + value * INTERVAL '1 second' AS time
+    FROM generate_series(1, %s) AS value
+    ORDER BY value"""
+
+    rows = TimeScaleService().execute(query=query, params=(1000,))
+    binary = TimeScaleService().fetch_columns(query=query, params=(1000,))
+    tuples = TimeScaleService().fetch_columns(query=query, params=(1000,), binary=False)
+
+    for columns in (binary, tuples):
+        assert columns["id"].dtype.kind == "i"
+        assert columns["id"].tolist() == [row["id"] for row in rows]
+        assert columns["price"].tolist() == [row["price"] for row in rows]
+        assert columns["time"][0] == np.datetime64("2024-01-01T00:00:01")
+        assert len(columns["time"]) == 1000
+
+
+def test_fetch_columns_falls_back_on_nulls_and_text():
+    """NULLs and text columns are read through tuples."""
+
+    columns = TimeScaleService().fetch_columns(
+        query="""SELECT 'EUR_USD' AS instrument, NULLIF(value, 2)::FLOAT AS price
+        FROM generate_series(1, 3) AS value ORDER BY value""",
+    )
+
+    assert columns["instrument"].tolist() == ["EUR_USD"] * 3
+    assert columns["price"][0] == 1.0
+    assert np.isnan(columns["price"][1])
+
+
+def test_fetch_dataframe_is_utc():
+    """Timestamps in the DataFrame are timezone aware UTC."""
+
+    data = TimeScaleService().fetch_dataframe(
+        query="SELECT TIMESTAMPTZ '2024-01-01 12:00:00+02' AS time, 1.5 AS price",
+    )
+
+    assert str(data["time"].dt.tz) == "UTC"
+    assert data["time"][0].hour == 10
+    assert data["price"][0] == 1.5
@@ -0,0 +1,65 @@
+"""Test the latency tracking utilities."""
+
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import pytest
+
+from foresight.utils.latency import ORIGIN_TIME_ATTRIBUTE
+from foresight.utils.latency import SENT_TIME_ATTRIBUTE
+from foresight.utils.latency import LatencyTracker
+from foresight.utils.latency import parse_time_attribute
+from foresight.utils.latency import percentile
+from foresight.utils.latency import time_attributes
+
+
+def test_percentile():
+    """Test the nearest-rank percentile."""
+
+    samples = [float(i) for i in range(1, 101)]
+
+    assert percentile(samples, 50) == 50.0
+    assert percentile(samples, 95) == 95.0
+    assert percentile(samples, 99) == 99.0
+    assert percentile(samples, 100) == 100.0
+    assert percentile([3.0], 99) == 3.0
+
+    with pytest.raises(ValueError):
+        percentile([], 50)
+
+
+def test_record_and_summarize():
+    """Test recording samples and summarizing them per stage."""
+
+    # ARRANGE
+    tracker = LatencyTracker(flush_interval=3600)
+    now = datetime(2021, 1, 1, 0, 0, 10, tzinfo=timezone.utc)
+
+    # ACT
+    for seconds in range(1, 11):
+        tracker.record(
+            stage="stream",
+            origin_time=now - timedelta(seconds=seconds),
+            now=now,
+        )
+    metric = tracker.summarize("stream")
+
+    # ASSERT
+    assert metric.stage == "stream"
+    assert metric.count == 10
+    assert metric.p50 == 5.0
+    assert metric.p99 == 10.0
+    assert metric.max == 10.0
+    assert tracker.summarize("window") is None
+
+
+def test_time_attributes_round_trip():
+    """Test that the origin time survives the SQS message attributes."""
+
+    origin_time = datetime(2021, 1, 1, 0, 0, tzinfo=timezone.utc)
+    message = {"MessageAttributes": time_attributes(origin_time)}
+
+    assert parse_time_attribute(message, ORIGIN_TIME_ATTRIBUTE) == origin_time
+    assert parse_time_attribute(message, SENT_TIME_ATTRIBUTE) > origin_time
+    assert parse_time_attribute({}, ORIGIN_TIME_ATTRIBUTE) is None
@@ -0,0 +1,89 @@
+"""Test the queued logging setup."""
+
+import io
+import logging
+
+import pytest
+
+from foresight.utils.logger import SampledLogger
+from foresight.utils.logger import configure_logging
+from foresight.utils.logger import generate_logger
+from foresight.utils.logger import shutdown_logging
+
+
+class CountingRepr:
+    """Counts how often it is rendered into a log message."""
+
+    renders = 0
+
+    def __str__(self):
+        CountingRepr.renders += 1
+        return "rendered"
+
+
+def test_generate_logger_does_not_stack_handlers():
+    """Calling generate_logger repeatedly attaches a single handler."""
+
+    logger = generate_logger(name="foresight.test.stacking")
+    logger = generate_logger(name="foresight.test.stacking")
+
+    assert len(logger.handlers) == 1
+
+
+def test_records_are_written_by_listener():
+    """Records are formatted and written by the background listener."""
+
+    # ARRANGE
+    stream = io.StringIO()
+    configure_logging(formatter_str="%(levelname)s %(message)s", stream=stream)
+    logger = generate_logger(name="foresight.test.listener")
+
+    # ACT
+    logger.info("hello %s", "world")
+    shutdown_logging()
+
+    # ASSERT
+    assert stream.getvalue() == "INFO hello world\n"
+
+    configure_logging()
+
+
+def test_disabled_level_does_no_formatting():
+    """No message is rendered when the level is disabled."""
+
+    logger = generate_logger(name="foresight.test.disabled", log_level="WARNING")
+    tick_logger = SampledLogger(logger)
+
+    assert tick_logger.log("%s", CountingRepr()) is False
+    assert CountingRepr.renders == 0
+
+
+def test_sampled_logger_every_n():
+    """Only one out of every n calls is logged."""
+
+    logger = generate_logger(name="foresight.test.sampled")
+    tick_logger = SampledLogger(logger, every_n=10, level=logging.DEBUG)
+    logger.setLevel(logging.DEBUG)
+
+    logged = [tick_logger.log("tick %s", i) for i in range(100)]
+
+    assert sum(logged) == 10
+    assert tick_logger.suppressed == 90
+
+
+def test_sampled_logger_rate_limit():
+    """At most max_per_second lines are logged in a burst."""
+
+    logger = generate_logger(name="foresight.test.rate_limited", log_level="DEBUG")
+    tick_logger = SampledLogger(logger, max_per_second=1, level=logging.DEBUG)
+
+    logged = [tick_logger.log("tick %s", i) for i in range(100)]
+
+    assert sum(logged) == 1
+
+
+def test_sampled_logger_invalid():
+    """Sampling needs a positive rate."""
+
+    with pytest.raises(ValueError):
+        SampledLogger(logging.getLogger(__name__), every_n=0)
@@ -0,0 +1,141 @@
+"""Test the schema migrations."""
+
+import datetime
+import json
+
+import pytest
+
+from foresight.utils.database import TimeScaleService
+from foresight.utils.migrations import SCHEMAS
+from foresight.utils.migrations import Migration
+from foresight.utils.migrations import applied_versions
+from foresight.utils.migrations import check_schemas
+from foresight.utils.migrations import forget_migrations
+from foresight.utils.migrations import migrate
+from foresight.utils.models.forex_data import ForexData
+
+
+def plan_nodes(plan: dict) -> list[dict]:
+    """Flatten a JSON query plan into its nodes."""
+    nodes = [plan]
+    for child in plan.get("Plans", []):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+
+def test_check_schemas():
+    """The shipped schemas have unique increasing versions."""
+
+    check_schemas()
+
+    with pytest.raises(ValueError):
+        check_schemas(
+            {
+                "broken": [
+                    Migration(version=2, description="second", statements=[]),
+                    Migration(version=1, description="first", statements=[]),
+                ],
+            },
+        )
+
+
+def test_unknown_schema():
+    """Only known schemas can be migrated."""
+
+    with pytest.raises(ValueError):
+        migrate(schema="unknown")
+
+
+def test_migrate_is_idempotent():
+    """Applying the migrations twice only runs them once."""
+
+    # ARRANGE / ACT
+    table_name = "migrations_test_results"
+    first = migrate(schema="indicator_results", table_name=table_name)
+    second = migrate(schema="indicator_results", table_name=table_name)
+
+    # ASSERT
+    assert first == [migration.version for migration in SCHEMAS["indicator_results"]]
+    assert second == []
+    assert applied_versions(table_name) == set(first)
+
+    # The primary key serves the latest result per component, no index duplicates it
+    indexes = TimeScaleService().execute(
+        query="SELECT indexname FROM pg_indexes WHERE tablename = %s",
+        params=(table_name,),
+    )
+    assert [row["indexname"] for row in indexes] == [f"{table_name}_pkey"]
+
+    TimeScaleService().execute(query=f"DROP TABLE {table_name}")
+    forget_migrations(table_name=table_name)
+
+
+def test_new_migration_keeps_data(monkeypatch):
+    """A later migration is applied to an existing table without losing rows."""
+
+    # ARRANGE
+    table_name = "migrations_test_feed"
+    migrate(schema="subscription_feed", table_name=table_name)
+    TimeScaleService().execute(
+        query=f"""INSERT INTO {table_name} (queue_url, instrument, timescale, order_type)
+        VALUES ('queue', 'EUR_USD', 'S', 'bid')""",
+    )
+    monkeypatch.setitem(
+        SCHEMAS,
+        "subscription_feed",
+        SCHEMAS["subscription_feed"]
+        + [
+            Migration(
+                version=99,
+                description="Add a created column",
+                statements=[
+                    """ALTER TABLE {table_name}
+                    ADD COLUMN created TIMESTAMPTZ NOT NULL DEFAULT NOW()""",
+                ],
+            ),
+        ],
+    )
+
+    # ACT
+    applied = migrate(schema="subscription_feed", table_name=table_name)
+
+    # ASSERT
+    rows = TimeScaleService().execute(query=f"SELECT * FROM {table_name}")
+    assert applied == [99]
+    assert len(rows) == 1
+    assert rows[0]["created"] is not None
+
+    TimeScaleService().execute(query=f"DROP TABLE {table_name}")
+    TimeScaleService().execute(query=f"DROP FUNCTION IF EXISTS {table_name}_notify()")
+    forget_migrations(table_name=table_name)
+
+
+@pytest.mark.usefixtures("setup_forex_data_table")
+def test_fetch_uses_instrument_time_index():
+    """EXPLAIN ANALYZE of the fetch filter scans the (instrument, time) index."""
+
+    # ARRANGE
+    dt = datetime.datetime.now(datetime.timezone.utc)
+    ForexData.insert_multiple(
+        data=[
+            ForexData(
+                instrument=instrument,
+                time=dt - datetime.timedelta(seconds=i),
+                bid=1.0,
+                ask=1.0001,
+            )
+            for i in range(500)
+            for instrument in ["EUR_USD", "GBP_USD", "USD_JPY"]
+        ],
+    )
+    TimeScaleService().execute(query="ANALYZE forex_data")
+
+    # ACT
+    plan = TimeScaleService().explain(
+        query="""SELECT time, bid, ask FROM forex_data
+        WHERE instrument = 'EUR_USD' ORDER BY time DESC LIMIT 10""",
+    )
+
+    # ASSERT
+    index_names = [node.get("Index Name", "") for node in plan_nodes(plan["Plan"])]
+    assert any("instrument_time_idx" in name for name in index_names), json.dumps(plan)
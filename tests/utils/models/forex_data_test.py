@@ -2,10 +2,12 @@
 
 import datetime
 
+import numpy as np
 import pytest
 
 from foresight.utils.database import TimeScaleService
 from foresight.utils.models.forex_data import ForexData
+from foresight.utils.models.storage_policy import StoragePolicy
 
 
 def test_valid_forex_data():
@@ -107,6 +109,65 @@ def test_create_table():
         assert column["data_type"] == expected_columns[column["column_name"]]
 
 
+def test_create_table_storage_policy():
+    """Test that compression and retention are configured on the table."""
+
+    # ARRANGE / ACT
+    table_name = ForexData.create_table(
+        table_name="forex_data_policy_test",
+        policy=StoragePolicy(compress_after="7 days", retention="30 days"),
+    )
+
+    # ASSERT
+    assert StoragePolicy.compression_configured(table_name)
+    (settings,) = TimeScaleService().execute(
+        query="""SELECT segmentby, orderby
+        FROM timescaledb_information.hypertable_compression_settings
+        WHERE hypertable = %s::REGCLASS""",
+        params=(table_name,),
+    )
+    assert settings["segmentby"] == "instrument"
+    assert settings["orderby"].startswith("time DESC")
+
+    jobs = TimeScaleService().execute(
+        query=f"""SELECT proc_name FROM timescaledb_information.jobs
+        WHERE hypertable_name = '{table_name}'""",
+    )
+    assert sorted(job["proc_name"] for job in jobs) == [
+        "policy_compression",
+        "policy_retention",
+    ]
+
+    ForexData.drop_table(table_name=table_name)
+
+
+def test_storage_policy_reapplied_and_errors_raised():
+    """Compression configured once is kept, and invalid settings raise."""
+
+    # ARRANGE
+    policy = StoragePolicy(compress_after="7 days")
+    table_name = ForexData.create_table(
+        table_name="forex_data_reapply_test",
+        policy=policy,
+    )
+
+    try:
+        # ACT / ASSERT
+        assert StoragePolicy.compression_configured(table_name)
+        policy.apply(table_name=table_name, segment_by="instrument")
+
+        ForexData.drop_table(table_name=table_name)
+        table_name = ForexData.create_table(
+            table_name="forex_data_reapply_test",
+            policy=StoragePolicy(compress_after=None),
+        )
+        assert not StoragePolicy.compression_configured(table_name)
+        with pytest.raises(Exception):
+            policy.apply(table_name=table_name, segment_by="missing_column")
+    finally:
+        ForexData.drop_table(table_name=table_name)
+
+
 @pytest.mark.usefixtures("setup_forex_data_table")
 def test_insert_and_fetch():
     """Insert and fetch forex data."""
@@ -151,6 +212,112 @@ def test_insert_and_fetch():
         assert data[i].ask > data[i - 1].ask
 
 
+@pytest.mark.usefixtures("setup_forex_data_table")
+def test_fetch_averages_buckets():
+    """Ticks within the same second are averaged into a single bucket."""
+
+    # ARRANGE
+    dt = datetime.datetime(2021, 1, 1, 0, 0, tzinfo=datetime.timezone.utc)
+    ForexData.insert_multiple(
+        data=[
+            ForexData(
+                instrument="EUR_USD",
+                time=dt + datetime.timedelta(milliseconds=250 * i),
+                bid=1.0 + i,
+                ask=2.0 + i,
+            )
+            for i in range(8)
+        ],
+    )
+
+    # ACT
+    data = ForexData.fetch()
+
+    # ASSERT
+    assert len(data) == 2
+    assert data[0].time == dt
+    assert data[0].bid == 2.5  # mean of 1, 2, 3, 4
+    assert data[1].ask == 7.5  # mean of 6, 7, 8, 9
+
+
+@pytest.mark.usefixtures("add_sample_forex_data")
+def test_stream_matches_fetch():
+    """Streaming in chunks returns the same buckets as fetch."""
+
+    chunks = list(ForexData.stream(chunk_size=2))
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert [row for chunk in chunks for row in chunk] == ForexData.fetch()
+
+    start = ForexData.fetch()[1].time
+    assert len([row for chunk in ForexData.stream(start=start) for row in chunk]) == 4
+
+
+@pytest.mark.usefixtures("add_sample_forex_data")
+def test_fetch_columns_matches_fetch():
+    """The columnar fetch returns the same buckets as fetch."""
+
+    columns = ForexData.fetch_columns(timescale="M")
+    rows = ForexData.fetch(timescale="M")
+
+    assert columns["bid"].tolist() == [row.bid for row in rows]
+    assert columns["ask"].tolist() == [row.ask for row in rows]
+    assert columns["time"].tolist() == [
+        row.time.astimezone(datetime.timezone.utc).replace(tzinfo=None) for row in rows
+    ]
+
+
+@pytest.mark.usefixtures("setup_forex_data_table")
+def test_fetch_window_fills_gaps():
+    """The window has exactly N buckets, gaps carried forward or left as NaN."""
+
+    # ARRANGE
+    start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    ForexData.insert_multiple(
+        data=[
+            ForexData(
+                instrument="EUR_USD",
+                time=start + datetime.timedelta(seconds=seconds),
+                bid=bid,
+                ask=bid + 1,
+            )
+            for seconds, bid in [(0, 1.0), (0.5, 2.0), (3, 4.0), (7, 5.0)]
+        ],
+    )
+    end = start + datetime.timedelta(seconds=6.5)
+
+    # ACT
+    locf = ForexData.fetch_window(length=6, end=end, fill="locf")
+    nan = ForexData.fetch_window(length=6, end=end, fill="nan")
+
+    # ASSERT
+    for window in (locf, nan):
+        assert window["time"][0] == np.datetime64("2024-01-01T00:00:01")
+        assert window["time"][-1] == np.datetime64("2024-01-01T00:00:06")
+        assert window["tick_count"].tolist() == [0, 0, 1, 0, 0, 0]
+
+    # The first buckets carry the bucket before the window forward
+    assert locf["bid"].tolist() == [1.5, 1.5, 4.0, 4.0, 4.0, 4.0]
+    assert locf["ask"].tolist() == [2.5, 2.5, 5.0, 5.0, 5.0, 5.0]
+    assert np.isnan(nan["bid"]).tolist() == [True, True, False, True, True, True]
+
+
+@pytest.mark.usefixtures("setup_forex_data_table")
+def test_fetch_window_without_data():
+    """A window without any data still has N buckets."""
+
+    window = ForexData.fetch_window(length=10, timescale="M")
+
+    assert len(window["time"]) == 10
+    assert np.isnan(window["bid"]).all()
+
+    with pytest.raises(ValueError):
+        ForexData.window_query("EUR_USD", "M", length=0)
+
+    with pytest.raises(ValueError):
+        ForexData.window_query("EUR_USD", "M", length=10, fill="zero")
+
+
 def test_convert_to_price():
     """Test the convert_to_price method."""
 
@@ -0,0 +1,75 @@
+"""Test the IndicatorCheckpoint model."""
+
+from datetime import datetime
+from datetime import timezone
+
+import pytest
+
+from foresight.utils.models.indicator_checkpoint import IndicatorCheckpoint
+
+
+TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture()
+def checkpoint() -> IndicatorCheckpoint:
+    """A checkpoint of a replica of an indicator."""
+    return IndicatorCheckpoint(
+        component_name="test_checkpoint",
+        replica="first",
+        time=TIME,
+        watermark=TIME,
+        result=[{"price": 2.0, "ma_fast": 1.5}],
+    )
+
+
+@pytest.fixture()
+def setup_indicator_checkpoint_table():
+    """Setup a temporary indicator checkpoints table."""
+    table_name = IndicatorCheckpoint.create_table(
+        table_name="test_indicator_checkpoints",
+    )
+    yield table_name
+    IndicatorCheckpoint.drop_table(table_name=table_name)
+
+
+def test_insert_and_fetch(checkpoint, setup_indicator_checkpoint_table):
+    """Checkpoints are replaced per replica in the database."""
+
+    table_name = setup_indicator_checkpoint_table
+    other = checkpoint.model_copy(update={"replica": "second", "watermark": None})
+
+    assert (
+        IndicatorCheckpoint.fetch("test_checkpoint", "first", table_name=table_name)
+        is None
+    )
+
+    checkpoint.insert(table_name=table_name)
+    checkpoint.model_copy(update={"result": None}).insert(table_name=table_name)
+    other.insert(table_name=table_name)
+
+    fetched = IndicatorCheckpoint.fetch(
+        "test_checkpoint",
+        "first",
+        table_name=table_name,
+    )
+    assert fetched == checkpoint.model_copy(update={"result": None})
+    assert (
+        IndicatorCheckpoint.fetch("test_checkpoint", "second", table_name=table_name)
+        == other
+    )
+
+
+def test_write_and_read(checkpoint, tmp_path):
+    """Checkpoint files are replaced per replica."""
+
+    assert IndicatorCheckpoint.read(str(tmp_path), "test_checkpoint", "first") is None
+
+    path = checkpoint.write(str(tmp_path))
+
+    assert path == str(tmp_path / "test_checkpoint.first.json")
+    assert (
+        IndicatorCheckpoint.read(str(tmp_path), "test_checkpoint", "first")
+        == checkpoint
+    )
+    assert [file.name for file in tmp_path.iterdir()] == ["test_checkpoint.first.json"]
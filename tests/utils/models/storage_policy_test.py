@@ -0,0 +1,52 @@
+"""Test the storage policy model."""
+
+import pytest
+
+from foresight.utils.models.storage_policy import StoragePolicy
+
+
+def test_valid_storage_policy():
+    """Test valid storage policies."""
+
+    policy = StoragePolicy()
+    assert policy.chunk_time_interval == "1 day"
+    assert policy.compress_after == "7 days"
+    assert policy.retention is None
+
+    policy = StoragePolicy(
+        chunk_time_interval="6 hours",
+        compress_after=None,
+        retention="1 year",
+    )
+    assert policy.chunk_time_interval == "6 hours"
+    assert policy.compress_after is None
+    assert policy.retention == "1 year"
+
+
+@pytest.mark.parametrize(
+    "invalid_options",
+    [
+        {"chunk_time_interval": "daily"},
+        {"compress_after": "7 days'; DROP TABLE forex_data; --"},
+        {"retention": "1 fortnight"},
+    ],
+)
+def test_invalid_storage_policy(invalid_options):
+    """Test invalid intervals are rejected."""
+
+    with pytest.raises(ValueError):
+        StoragePolicy(**invalid_options)
+
+
+def test_from_env(monkeypatch):
+    """Test loading the policy from the environment."""
+
+    monkeypatch.setenv("FOREX_CHUNK_TIME_INTERVAL", "12 hours")
+    monkeypatch.setenv("FOREX_COMPRESS_AFTER", "")
+    monkeypatch.setenv("FOREX_RETENTION", "90 days")
+
+    policy = StoragePolicy.from_env(prefix="FOREX")
+
+    assert policy.chunk_time_interval == "12 hours"
+    assert policy.compress_after is None
+    assert policy.retention == "90 days"
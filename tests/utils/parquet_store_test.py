@@ -0,0 +1,151 @@
+"""Test the Parquet export and scans."""
+
+import datetime
+import os
+
+import numpy as np
+import pytest
+
+from foresight.utils.models.forex_bar import ForexBar
+from foresight.utils.models.forex_data import ForexData
+from foresight.utils.parquet_store import ParquetStore
+
+
+pytest.importorskip("pyarrow")
+
+START = datetime.datetime(2024, 1, 1, 23, 59, tzinfo=datetime.timezone.utc)
+
+TICKS_TABLE = "parquet_store_test_ticks"
+BARS_TABLE = "parquet_store_test_bars"
+
+
+def ticks(instrument: str, seconds: list[float], bid: float = 1.0) -> list[ForexData]:
+    """Ticks of an instrument at the seconds after START."""
+    return [
+        ForexData(
+            instrument=instrument,
+            time=START + datetime.timedelta(seconds=offset),
+            bid=bid + index,
+            ask=bid + index + 1,
+        )
+        for index, offset in enumerate(seconds)
+    ]
+
+
+@pytest.fixture
+def ticks_table():
+    """A scratch forex table with ticks of two instruments across midnight."""
+    table_name = ForexData.create_table(table_name=TICKS_TABLE)
+    ForexData.insert_multiple(
+        data=ticks("EUR_USD", [0, 0.5, 30, 61, 90]) + ticks("GBP_USD", [10, 70], 5.0),
+        table_name=table_name,
+    )
+    yield table_name
+    ForexData.drop_table(table_name=table_name)
+
+
+def test_export_is_incremental(tmp_path, ticks_table):
+    """Rows are exported once per partition, resuming from the watermarks."""
+
+    store = ParquetStore(root=str(tmp_path))
+    until = START + datetime.timedelta(seconds=80)
+
+    # ACT
+    exported = store.export(table_name=ticks_table, until=until)
+
+    # ASSERT
+    assert exported == {"EUR_USD": 4, "GBP_USD": 2}
+    assert store.load_watermarks("forex_data")["EUR_USD"] == until
+    assert sorted(os.listdir(tmp_path / "forex_data" / "instrument=EUR_USD")) == [
+        "date=2024-01-01",
+        "date=2024-01-02",
+    ]
+
+    # Exporting again only writes the rows after the watermark
+    ForexData.insert_multiple(data=ticks("EUR_USD", [100], 9.0), table_name=ticks_table)
+    exported = store.export(
+        table_name=ticks_table, until=until + datetime.timedelta(seconds=60)
+    )
+    assert exported == {"EUR_USD": 2, "GBP_USD": 0}
+    assert len(store.scan(instrument="EUR_USD")["time"]) == 6
+
+
+def test_scan_prunes(tmp_path, ticks_table):
+    """Scans only return the instrument, time range and columns asked for."""
+
+    store = ParquetStore(root=str(tmp_path))
+    store.export(table_name=ticks_table, until=START + datetime.timedelta(minutes=5))
+
+    data = store.scan(
+        instrument="EUR_USD",
+        start=START + datetime.timedelta(seconds=30),
+        end=START + datetime.timedelta(seconds=90),
+        columns=["bid"],
+    )
+
+    assert sorted(data) == ["bid", "time"]
+    assert data["bid"].tolist() == [3.0, 4.0]
+    assert data["time"].dtype == np.dtype("datetime64[us]")
+
+    every_instrument = store.scan()
+    assert len(every_instrument["time"]) == 7
+    assert (np.diff(every_instrument["time"]) >= np.timedelta64(0, "us")).all()
+
+    assert len(ParquetStore(root=str(tmp_path / "empty")).scan()["time"]) == 0
+
+
+def test_scan_buckets_matches_fetch_columns(tmp_path, ticks_table):
+    """Buckets computed from the files are the buckets computed by the database."""
+
+    store = ParquetStore(root=str(tmp_path))
+    store.export(table_name=ticks_table, until=START + datetime.timedelta(minutes=5))
+
+    for timescale in ["S", "M"]:
+        buckets = store.scan_buckets("EUR_USD", timescale)
+        expected = ForexData.fetch_columns("EUR_USD", timescale, table_name=ticks_table)
+
+        assert buckets["time"].tolist() == expected["time"].tolist()
+        np.testing.assert_allclose(buckets["bid"], expected["bid"])
+        np.testing.assert_allclose(buckets["ask"], expected["ask"])
+
+    prices = store.scan_prices("EUR_USD", "M", order_type="mid")
+    assert list(prices.columns) == ["instrument", "time", "price"]
+    assert prices["price"].tolist() == [2.5, 5.0]
+    assert str(prices["time"].dt.tz) == "UTC"
+
+
+def test_export_complete_bars(tmp_path):
+    """Bars are exported per resolution once their interval has ended."""
+
+    table_name = ForexBar.create_table(table_name=BARS_TABLE)
+    try:
+        ForexBar.insert_multiple(
+            data=[
+                ForexBar(
+                    instrument="EUR_USD",
+                    resolution=resolution,
+                    time=START + datetime.timedelta(minutes=minute),
+                    **{
+                        f"{side}_{field}": 1.0 + minute
+                        for side in ["bid", "ask"]
+                        for field in ["open", "high", "low", "close", "mean"]
+                    },
+                    tick_count=1,
+                )
+                for resolution, minute in [("M", 0), ("M", 1), ("M", 2), ("H", 1)]
+            ],
+            table_name=table_name,
+        )
+        store = ParquetStore(root=str(tmp_path))
+
+        exported = store.export(
+            "forex_bars",
+            table_name=table_name,
+            until=START + datetime.timedelta(minutes=2, seconds=30),
+        )
+
+        assert exported == {"EUR_USD/M": 2, "EUR_USD/H": 0}
+        bars = store.scan("forex_bars", resolution="M", columns=["bid_close"])
+        assert bars["bid_close"].tolist() == [1.0, 2.0]
+    finally:
+        ForexBar.drop_table(table_name=table_name)
@@ -0,0 +1,161 @@
+"""Test the storage backends of the models."""
+
+import datetime
+
+import numpy as np
+import pytest
+
+from foresight.utils.models.forex_data import ForexData
+from foresight.utils.models.subscription_feed import SubscriptionFeed
+from foresight.utils.storage import create_storage
+from foresight.utils.storage import get_storage
+
+
+START = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+@pytest.fixture(params=["timescale", "duckdb"])
+def storage(request, monkeypatch):
+    """Select each storage backend in turn."""
+    if request.param == "duckdb":
+        pytest.importorskip("duckdb")
+    monkeypatch.setenv("STORAGE_BACKEND", request.param)
+    return get_storage()
+
+
+@pytest.fixture
+def forex_table(storage):
+    """A forex table with ticks spread over a few seconds and minutes."""
+    table_name = ForexData.create_table(table_name="storage_forex_data")
+    ForexData.insert_multiple(
+        data=[
+            ForexData(
+                instrument="EUR_USD",
+                time=START + datetime.timedelta(seconds=seconds),
+                bid=bid,
+                ask=bid + 1,
+            )
+            for seconds, bid in [(0, 1.0), (0.5, 2.0), (3, 4.0), (7, 5.0), (65, 6.0)]
+        ],
+        table_name=table_name,
+    )
+    ForexData(
+        instrument="GBP_USD",
+        time=START,
+        bid=9.0,
+        ask=10.0,
+    ).insert(table_name=table_name)
+    yield table_name
+    ForexData.drop_table(table_name=table_name)
+
+
+def test_get_storage(monkeypatch):
+    """The backend is selected by STORAGE_BACKEND and created once."""
+
+    monkeypatch.setenv("STORAGE_BACKEND", "timescale")
+    assert get_storage().name == "timescale"
+    assert get_storage() is get_storage()
+
+    with pytest.raises(ValueError):
+        create_storage("sqlite")
+
+
+def test_fetch_buckets(storage, forex_table):
+    """Ticks are averaged per bucket of the instrument, in ascending time."""
+
+    rows = storage.fetch_forex("EUR_USD", "S", table_name=forex_table)
+
+    assert [row["time"] for row in rows] == [
+        START + datetime.timedelta(seconds=seconds) for seconds in (0, 3, 7, 65)
+    ]
+    assert [row["bid"] for row in rows] == [1.5, 4.0, 5.0, 6.0]
+    assert [row["tick_count"] for row in rows] == [2, 1, 1, 1]
+    assert [row["last_time"] for row in rows] == [
+        START + datetime.timedelta(seconds=seconds) for seconds in (0.5, 3, 7, 65)
+    ]
+
+    minutes = storage.fetch_forex(
+        "EUR_USD",
+        "M",
+        start=START,
+        end=START + datetime.timedelta(minutes=1),
+        table_name=forex_table,
+    )
+    assert len(minutes) == 1
+    assert minutes[0]["bid"] == pytest.approx(3.0)
+
+
+def test_stream_and_columns_match_fetch(storage, forex_table):
+    """Streamed and columnar buckets are the fetched buckets."""
+
+    rows = storage.fetch_forex("EUR_USD", "S", table_name=forex_table)
+    streamed = storage.stream_forex(
+        "EUR_USD",
+        "S",
+        chunk_size=3,
+        table_name=forex_table,
+    )
+    columns = storage.fetch_forex_columns("EUR_USD", "S", table_name=forex_table)
+
+    assert [len(chunk) for chunk in streamed] == [3, 1]
+    assert columns["bid"].tolist() == [row["bid"] for row in rows]
+    assert columns["time"].tolist() == [
+        row["time"].replace(tzinfo=None) for row in rows
+    ]
+
+
+def test_fetch_window(storage, forex_table):
+    """Both backends fill the window the same way."""
+
+    end = START + datetime.timedelta(seconds=6.5)
+
+    locf = storage.fetch_forex_window(
+        "EUR_USD",
+        "S",
+        6,
+        end=end,
+        table_name=forex_table,
+    )
+    nan = storage.fetch_forex_window(
+        "EUR_USD",
+        "S",
+        6,
+        end=end,
+        fill="nan",
+        table_name=forex_table,
+    )
+
+    assert locf["time"][0] == np.datetime64("2024-01-01T00:00:01")
+    assert locf["tick_count"].tolist() == [0, 0, 1, 0, 0, 0]
+    assert locf["bid"].tolist() == [1.5, 1.5, 4.0, 4.0, 4.0, 4.0]
+    assert np.isnan(nan["bid"]).tolist() == [True, True, False, True, True, True]
+
+    empty = storage.fetch_forex_window(
+        "USD_JPY",
+        "M",
+        3,
+        end=end,
+        table_name=forex_table,
+    )
+    assert len(empty["time"]) == 3
+    assert np.isnan(empty["bid"]).all()
+
+
+def test_subscriptions(storage):
+    """Subscriptions round trip through the backend."""
+
+    table_name = SubscriptionFeed.create_table(table_name="storage_subscription_feed")
+    try:
+        SubscriptionFeed(
+            queue_url="https://queue",
+            instrument="EUR_USD",
+            timescale="M",
+            order_type="mid",
+        ).insert(table_name=table_name)
+
+        feeds = SubscriptionFeed.fetch(table_name=table_name)
+
+        assert [feed.instrument for feed in feeds] == ["EUR_USD"]
+        assert feeds[0].order_type == "mid"
+    finally:
+        SubscriptionFeed.drop_table(table_name=table_name)
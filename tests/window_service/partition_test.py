@@ -0,0 +1,139 @@
+"""Test the partitioned worker processes of the window service."""
+
+import os
+import time
+from datetime import datetime
+from datetime import timezone
+
+import pytest
+
+from foresight.utils.models.subscription_feed import SubscriptionFeed
+from foresight.window_service.partition import PartitionedPool
+from foresight.window_service.partition import feed_key
+from foresight.window_service.partition import partition_of
+from foresight.window_service.partition import run_partition
+from foresight.window_service.scheduler import CadenceScheduler
+
+
+def make_feed(instrument: str, timescale: str = "M") -> SubscriptionFeed:
+    """Build a subscription feed for the instrument."""
+    return SubscriptionFeed(
+        queue_url=f"https://sqs.us-east-1.amazonaws.com/123456789012/{instrument}",
+        instrument=instrument,
+        timescale=timescale,
+        order_type="bid",
+    )
+
+
+def send_pid(feed: SubscriptionFeed, *window) -> int:
+    """Feed run returning the process it ran in, failing for one instrument."""
+    if feed.instrument == "FAIL":
+        raise ValueError("Failed")
+    return os.getpid()
+
+
+def send_one(feed: SubscriptionFeed, *window) -> int:
+    """Feed run sending a single message."""
+    return 1
+
+
+FEEDS = [make_feed(f"I{index:03d}") for index in range(40)]
+
+
+@pytest.fixture()
+def pool():
+    """Two forked worker processes."""
+    pool = PartitionedPool(partitions=2, start_method="fork")
+    yield pool
+    pool.shutdown()
+
+
+def test_partition_of():
+    """Feeds are spread over every partition and always land in the same one."""
+
+    partitions = [partition_of(feed, 4) for feed in FEEDS]
+
+    assert set(partitions) == {0, 1, 2, 3}
+    assert partitions == [partition_of(feed, 4) for feed in FEEDS]
+
+
+def test_partitions_run_in_their_own_process(pool):
+    """Every partition runs its feeds in one worker process of its own."""
+
+    groups = pool.split(FEEDS)
+    pids = {
+        partition: {
+            result["messages_sent"]
+            for result in pool.submit(
+                partition,
+                send_pid,
+                feeds,
+            ).result()
+        }
+        for partition, feeds in groups.items()
+    }
+
+    assert all(len(partition_pids) == 1 for partition_pids in pids.values())
+    assert len(set.union(*pids.values())) == 2
+    assert os.getpid() not in set.union(*pids.values())
+
+
+def test_run_cycle(pool):
+    """A cycle collects the messages and failures of every partition."""
+
+    cycle = pool.run_cycle(send_one, FEEDS)
+    assert cycle["feeds"] == 40
+    assert cycle["messages_sent"] == 40
+    assert cycle["failures"] == 0
+
+    cycle = pool.run_cycle(send_pid, [make_feed("FAIL")])
+    assert cycle["failures"] == 1
+    assert cycle["messages_sent"] == 0
+
+
+def test_feeds_run_over_their_own_window():
+    """Every feed of a partition runs over the window of its key."""
+
+    feeds = [make_feed("EUR_USD"), make_feed("GBP_USD")]
+    windows = {
+        feed_key(feed): (
+            datetime.fromtimestamp(start, tz=timezone.utc),
+            datetime.fromtimestamp(60, tz=timezone.utc),
+        )
+        for feed, start in zip(feeds, [0, -60])
+    }
+
+    def window_length(feed: SubscriptionFeed, start: datetime, end: datetime) -> int:
+        return int((end - start).total_seconds())
+
+    results = run_partition(window_length, feeds, windows=windows)
+
+    assert [result["messages_sent"] for result in results] == [60, 120]
+
+
+def test_invalid_partitions():
+    """A pool needs at least one partition."""
+
+    with pytest.raises(ValueError):
+        PartitionedPool(partitions=0)
+
+
+def test_scheduler_with_pool(pool):
+    """The scheduler dispatches a future per partition and collects the results."""
+
+    scheduler = CadenceScheduler(
+        run_feed=send_one,
+        fetch_feeds=lambda: FEEDS,
+        clock=lambda: 0.0,
+        pool=pool,
+    )
+    futures = scheduler.dispatch(now=0.0)
+    scheduler.executor.shutdown(wait=True)
+
+    # Results are collected by a callback once each partition completes
+    deadline = time.time() + 10
+    while scheduler.messages_sent < 40 and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert len(futures) == 2
+    assert scheduler.messages_sent == 40
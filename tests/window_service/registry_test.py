@@ -0,0 +1,104 @@
+"""Test the subscription registry of the window service."""
+
+import time
+
+import pytest
+
+from foresight.utils.database import TimeScaleService
+from foresight.utils.models.subscription_feed import SubscriptionFeed
+from foresight.window_service.registry import SubscriptionRegistry
+
+
+def make_feed(queue: str, timescale: str = "M") -> SubscriptionFeed:
+    """Build a subscription feed for the queue."""
+    return SubscriptionFeed(
+        queue_url=f"https://sqs.us-east-1.amazonaws.com/123456789012/{queue}",
+        instrument="EUR_USD",
+        timescale=timescale,
+        order_type="bid",
+    )
+
+
+def poll_until(registry: SubscriptionRegistry, changes: int, timeout: float = 2.0):
+    """Poll the registry until it applied the number of changes."""
+    deadline = time.monotonic() + timeout
+    while registry.changes < changes and time.monotonic() < deadline:
+        registry.poll(timeout=0.05)
+
+
+@pytest.fixture()
+def registry(setup_subscription_feed_table):
+    """A listening registry with one subscription loaded."""
+    make_feed("first").insert(table_name=setup_subscription_feed_table)
+
+    calls = []
+    registry = SubscriptionRegistry(
+        table_name=setup_subscription_feed_table,
+        on_change=lambda: calls.append(1),
+    )
+    registry.listen()
+    registry.load()
+    registry.calls = calls
+    yield registry
+    registry.close()
+
+
+def test_load(registry):
+    """The registry starts with the content of the table."""
+
+    assert [feed.queue_url for feed in registry.feeds()] == [
+        make_feed("first").queue_url,
+    ]
+    assert registry.loads == 1
+
+
+def test_changes_are_applied(registry, setup_subscription_feed_table):
+    """Inserts, updates, deletes and truncates reach the registry without reloading."""
+
+    table_name = setup_subscription_feed_table
+    make_feed("second", timescale="S").insert(table_name=table_name)
+    poll_until(registry, changes=1)
+    assert {feed.timescale for feed in registry.feeds()} == {"M", "S"}
+
+    TimeScaleService().execute(
+        query=f"UPDATE {table_name} SET timescale = 'H' WHERE timescale = 'S'",
+    )
+    poll_until(registry, changes=2)
+    assert {feed.timescale for feed in registry.feeds()} == {"M", "H"}
+
+    TimeScaleService().execute(query=f"DELETE FROM {table_name} WHERE timescale = 'M'")
+    poll_until(registry, changes=3)
+    assert [feed.timescale for feed in registry.feeds()] == ["H"]
+
+    TimeScaleService().execute(query=f"TRUNCATE {table_name}")
+    poll_until(registry, changes=4)
+    assert registry.feeds() == []
+
+    assert registry.loads == 1
+    assert len(registry.calls) == 4
+
+
+def test_idle_poll(registry):
+    """Polling without changes neither queries the table nor reports a change."""
+
+    assert registry.poll(timeout=0.01) == 0
+    assert registry.loads == 1
+    assert registry.calls == []
+
+
+def test_background_thread(setup_subscription_feed_table):
+    """The background thread applies changes within milliseconds."""
+
+    registry = SubscriptionRegistry(table_name=setup_subscription_feed_table)
+    registry.start()
+    try:
+        start = time.monotonic()
+        make_feed("first").insert(table_name=setup_subscription_feed_table)
+        while not registry.feeds() and time.monotonic() - start < 2.0:
+            time.sleep(0.001)
+
+        assert len(registry.feeds()) == 1
+        assert time.monotonic() - start < 0.5
+    finally:
+        registry.stop()
+    assert registry.connection is None
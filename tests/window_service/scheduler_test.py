@@ -0,0 +1,222 @@
+"""Test the cadence scheduler of the window service."""
+
+import threading
+from datetime import datetime
+
+import pytest
+
+from foresight.utils.models.subscription_feed import SubscriptionFeed
+from foresight.window_service.scheduler import CadenceScheduler
+from foresight.window_service.scheduler import next_boundary
+
+
+def make_feed(timescale: str, queue: str = "queue") -> SubscriptionFeed:
+    """Build a subscription feed for the timescale."""
+    return SubscriptionFeed(
+        queue_url=f"https://sqs.us-east-1.amazonaws.com/123456789012/{queue}",
+        instrument="EUR_USD",
+        timescale=timescale,
+        order_type="bid",
+    )
+
+
+@pytest.fixture()
+def scheduler():
+    """A scheduler recording the feeds it runs."""
+    runs, windows = [], []
+
+    def run_feed(feed: SubscriptionFeed, start: datetime, end: datetime) -> int:
+        runs.append(feed.timescale)
+        windows.append((feed.timescale, start.timestamp(), end.timestamp()))
+        return 1
+
+    feeds = [make_feed("S", "seconds"), make_feed("M", "minutes")]
+    scheduler = CadenceScheduler(
+        run_feed=run_feed,
+        fetch_feeds=lambda: feeds,
+        max_workers=2,
+        clock=lambda: 0.0,
+    )
+    scheduler.runs = runs
+    scheduler.windows = windows
+    yield scheduler
+    scheduler.executor.shutdown(wait=True)
+
+
+def wait_for(futures):
+    """Wait for all the futures to complete."""
+    for future in futures:
+        future.result(timeout=5)
+
+
+def test_next_boundary():
+    """Deadlines are aligned to the cadence."""
+
+    assert next_boundary(0.0, 60) == 60
+    assert next_boundary(59.9, 60) == 60
+    assert next_boundary(60.0, 60) == 120
+    assert next_boundary(3601.5, 3600) == 7200
+
+
+def test_feeds_run_at_their_cadence(scheduler):
+    """Second feeds run every second while minute feeds run every minute."""
+
+    # ACT
+    for now in [0.0, 0.5, 1.0, 2.0, 60.0]:
+        wait_for(scheduler.dispatch(now=now))
+
+    # ASSERT
+    assert scheduler.runs.count("S") == 4  # 0, 1, 2, 60
+    assert scheduler.runs.count("M") == 2  # 0, 60
+    assert scheduler.messages_sent == 6
+    assert scheduler.missed_windows == 57  # 3..59 seconds were skipped
+
+
+def test_missed_windows_run_once(scheduler):
+    """A late deadline catches up with a single run for the current window."""
+
+    wait_for(scheduler.dispatch(now=0.0))
+    wait_for(scheduler.dispatch(now=300.5))
+
+    assert scheduler.runs.count("M") == 2
+    assert scheduler.missed_windows == 4 + 299
+    assert scheduler.deadlines["M"] == 360
+
+    # The catch up run covers every bucket completed since the first run
+    minutes = [window for window in scheduler.windows if window[0] == "M"]
+    assert minutes == [("M", -60, 0), ("M", 0, 300)]
+    seconds = [window for window in scheduler.windows if window[0] == "S"]
+    assert seconds == [("S", -1, 0), ("S", 0, 300)]
+
+
+def test_windows_follow_each_other(scheduler):
+    """Windows on time are the buckets completed since the previous run."""
+
+    for now in [0.0, 1.2, 2.0, 3.9]:
+        wait_for(scheduler.dispatch(now=now))
+
+    assert [window[1:] for window in scheduler.windows if window[0] == "S"] == [
+        (-1, 0),
+        (0, 1),
+        (1, 2),
+        (2, 3),
+    ]
+
+
+def test_running_feed_is_not_duplicated():
+    """A feed still running at its next deadline is skipped as an overrun."""
+
+    # ARRANGE
+    release = threading.Event()
+    runs = []
+
+    def run_feed(feed: SubscriptionFeed, start: datetime, end: datetime) -> int:
+        runs.append(feed.timescale)
+        release.wait(timeout=5)
+        return 1
+
+    scheduler = CadenceScheduler(
+        run_feed=run_feed,
+        fetch_feeds=lambda: [make_feed("S")],
+        clock=lambda: 0.0,
+    )
+
+    # ACT
+    first = scheduler.dispatch(now=0.0)
+    second = scheduler.dispatch(now=1.0)
+    release.set()
+    wait_for(first)
+    scheduler.executor.shutdown(wait=True)
+
+    # ASSERT
+    assert len(first) == 1
+    assert len(second) == 0
+    assert runs == ["S"]
+    assert scheduler.overruns == 1
+
+
+def test_skipped_feed_catches_up():
+    """The window after a skipped one covers the buckets of both."""
+
+    # ARRANGE
+    release = threading.Event()
+    windows = []
+
+    def run_feed(feed: SubscriptionFeed, start: datetime, end: datetime) -> int:
+        windows.append((start.timestamp(), end.timestamp()))
+        release.wait(timeout=5)
+        return 1
+
+    scheduler = CadenceScheduler(
+        run_feed=run_feed,
+        fetch_feeds=lambda: [make_feed("S")],
+        clock=lambda: 0.0,
+    )
+
+    # ACT
+    first = scheduler.dispatch(now=0.0)
+    assert scheduler.dispatch(now=1.0) == []
+    release.set()
+    wait_for(first)
+    wait_for(scheduler.dispatch(now=2.0))
+    scheduler.executor.shutdown(wait=True)
+
+    # ASSERT
+    assert windows == [(-1, 0), (0, 2)]
+
+
+def test_buckets_complete_after_the_lag():
+    """A bucket is only sent once the lag after its end has passed."""
+
+    windows = []
+
+    def run_feed(feed: SubscriptionFeed, start: datetime, end: datetime) -> int:
+        windows.append((start.timestamp(), end.timestamp()))
+        return 1
+
+    scheduler = CadenceScheduler(
+        run_feed=run_feed,
+        fetch_feeds=lambda: [make_feed("S")],
+        clock=lambda: 0.0,
+        lag=2.0,
+    )
+
+    for now in [1.0, 1.5, 2.0, 3.5]:
+        wait_for(scheduler.dispatch(now=now))
+    scheduler.executor.shutdown(wait=True)
+
+    assert windows == [(-2, -1), (-1, 0), (0, 1)]
+    assert scheduler.deadlines["S"] == 4.0
+
+
+def test_feed_errors_do_not_stop_the_scheduler():
+    """A failing feed is logged and counts no messages."""
+
+    def run_feed(feed: SubscriptionFeed, start: datetime, end: datetime) -> int:
+        raise RuntimeError("boom")
+
+    scheduler = CadenceScheduler(
+        run_feed=run_feed,
+        fetch_feeds=lambda: [make_feed("M")],
+        clock=lambda: 0.0,
+    )
+
+    futures = scheduler.dispatch(now=0.0)
+
+    assert [future.result(timeout=5) for future in futures] == [0]
+    assert scheduler.seconds_until_next_deadline(now=30.0) == 30.0
+    scheduler.executor.shutdown(wait=True)
+
+
+def test_request_refresh(scheduler):
+    """A requested refresh reloads the feeds on the next dispatch and wakes the loop."""
+
+    scheduler.refresh_feeds(now=0.0)
+    scheduler.fetch_feeds = lambda: [make_feed("H", "hours")]
+    scheduler.refresh_feeds(now=1.0)
+    assert {feed.timescale for feed in scheduler.feeds} != {"H"}
+
+    scheduler.request_refresh()
+    assert scheduler.wake_event.is_set()
+    scheduler.refresh_feeds(now=1.0)
+    assert [feed.timescale for feed in scheduler.feeds] == ["H"]
@@ -1,14 +1,20 @@
 """Test for the window service."""
 
 import uuid
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
 
 import pytest
 from boto3_type_annotations.sqs import Client
 
 from foresight.utils.aws import get_client
+from foresight.utils.latency import ORIGIN_TIME_ATTRIBUTE
 from foresight.utils.models.forex_data import ForexData
 from foresight.utils.models.subscription_feed import SubscriptionFeed
 from foresight.window_service.app import send_data_to_queues
+from foresight.window_service.app import send_feed_to_queue
+from foresight.window_service.partition import PartitionedPool
 
 
 @pytest.fixture()
@@ -72,3 +78,89 @@ def test_send_data_to_queues(setup_subscription_feed, add_sample_forex_data):
                 found_message = True
                 break
         assert found_message
+
+
+def test_send_data_to_queues_partitioned(
+    setup_subscription_feed,
+    add_sample_forex_data,
+):
+    """Subscriptions partitioned across worker processes send the same messages."""
+
+    # ARRANGE
+    pool = PartitionedPool(partitions=2)
+
+    # ACT
+    try:
+        messages_sent: int = send_data_to_queues(pool=pool)
+    finally:
+        pool.shutdown()
+
+    # ASSERT
+    assert messages_sent == len(add_sample_forex_data)
+
+
+def test_origin_is_the_newest_tick(setup_subscription_feed, setup_forex_data_table):
+    """The origin time of a bucket is its newest tick, not the bucket start."""
+
+    # ARRANGE
+    feed: SubscriptionFeed = setup_subscription_feed
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    ForexData.insert_multiple(
+        data=[
+            ForexData(
+                instrument="EUR_USD",
+                time=start + timedelta(milliseconds=milliseconds),
+                bid=1.0,
+                ask=2.0,
+            )
+            for milliseconds in (0, 750)
+        ],
+    )
+
+    # ACT
+    assert send_feed_to_queue(feed) == 1
+
+    # ASSERT
+    message = get_client("sqs").receive_message(
+        QueueUrl=feed.queue_url,
+        MessageAttributeNames=["All"],
+    )["Messages"][0]
+    assert ForexData.model_validate_sqs_messages([message])[0].time == start
+    origin = message["MessageAttributes"][ORIGIN_TIME_ATTRIBUTE]["StringValue"]
+    assert datetime.fromisoformat(origin) == start + timedelta(milliseconds=750)
+
+
+def test_only_the_window_is_sent(setup_subscription_feed, setup_forex_data_table):
+    """A feed run over a window sends the buckets of that window only."""
+
+    # ARRANGE
+    feed: SubscriptionFeed = setup_subscription_feed
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    ForexData.insert_multiple(
+        data=[
+            ForexData(
+                instrument="EUR_USD",
+                time=start + timedelta(seconds=second),
+                bid=1.0 + second,
+                ask=2.0 + second,
+            )
+            for second in range(5)
+        ],
+    )
+
+    # ACT
+    messages_sent = send_feed_to_queue(
+        feed,
+        start=start + timedelta(seconds=1),
+        end=start + timedelta(seconds=3),
+    )
+
+    # ASSERT
+    messages = get_client("sqs").receive_message(
+        QueueUrl=feed.queue_url,
+        MaxNumberOfMessages=10,
+    )["Messages"]
+    assert messages_sent == 2
+    assert sorted(
+        message.time for message in ForexData.model_validate_sqs_messages(messages)
+    ) == [start + timedelta(seconds=1), start + timedelta(seconds=2)]